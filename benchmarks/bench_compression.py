@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark des sorties compressées d'un événement
+Projet JSON (300 frames x 23 objets, masques RLE réels) et chunks du store de
+masques : taille sur disque, temps d'écriture et de relecture par compression et niveau
+"""
+
+import sys
+import time
+import base64
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from pycocotools import mask as mask_utils
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.utils.json_serializer import json_serializer
+from eva2sport.utils.compression import zstandard, compressed_path, open_writer
+from eva2sport.export.mask_store import MaskStore, build_mask_store
+from bench_project_formats import make_project, N_FRAMES, N_OBJECTS
+from bench_mask_codecs import make_tracks
+
+
+SETTINGS = [(None, None), ('gzip', 1), ('gzip', 6)] + ([('zstd', 1), ('zstd', 3), ('zstd', 9)] if zstandard else [])
+
+
+def make_event_project() -> dict:
+    """Projet synthétique dont les masques sont les RLE de joueurs en mouvement"""
+    project = make_project()
+    for processed in range(N_FRAMES):
+        # Trajectoires générées par tranches de 25 frames pour borner la mémoire
+        if processed % 25 == 0:
+            tracks = make_tracks(25, N_OBJECTS, seed=processed)
+        masks = np.asfortranarray(tracks[processed % 25].transpose(1, 2, 0), dtype=np.uint8)
+        for annotation, rle in zip(project['annotations'][str(processed)], mask_utils.encode(masks)):
+            annotation['mask']['counts'] = base64.b64encode(rle['counts']).decode('ascii')
+    return project
+
+
+def timed(function) -> float:
+    """Durée (s) d'un appel"""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    print("🧪 Génération du projet (masques RLE réels)...")
+    project = make_event_project()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        # Store de référence (non compressé) : les variantes recompressent ses chunks
+        # pour isoler le coût de la compression du décodage RLE
+        base_store = directory / "base_masks"
+        build_mask_store(json_serializer.loads(json_serializer.dumps(project)), base_store)
+        chunks = [path.read_bytes() for path in sorted(base_store.glob("chunk_*.bin"))]
+
+        print(f"📦 Événement: {N_FRAMES} frames x {N_OBJECTS} objets")
+        print(f"   {'compression':<12} {'projet JSON':>17} {'écriture':>9} {'lecture':>9} | "
+              f"{'store masques':>17} {'écriture':>9} {'lecture':>9}")
+        reference = None
+        for compression, level in SETTINGS:
+            name = f"{compression or 'aucune'}{f'-{level}' if level else ''}"
+            json_path = compressed_path(directory / f"{name}_project.json", compression)
+            t_json_write = timed(lambda: json_serializer.dump(project, json_path, compression=compression,
+                                                              level=level))
+            t_json_read = timed(lambda: json_serializer.load(json_path))
+            json_size = json_path.stat().st_size
+
+            store_dir = directory / f"{name}_masks"
+            store_dir.mkdir()
+            shutil.copy(base_store / "index.npy", store_dir)
+            shutil.copy(base_store / "index.json", store_dir)
+
+            def write_chunks():
+                for chunk, data in enumerate(chunks):
+                    with open_writer(MaskStore.chunk_path(store_dir, chunk), compression, level) as f:
+                        f.write(data)
+
+            t_store_write = timed(write_chunks)
+            store = MaskStore(store_dir)
+            t_store_read = timed(lambda: [store._chunk(chunk) for chunk in range(len(chunks))])
+            store_size = sum(f.stat().st_size for f in store_dir.glob("chunk_*.bin"))
+
+            reference = reference or (json_size, store_size)
+            print(f"   {name:<12} {json_size / 1e6:7.2f} MB (x{reference[0] / json_size:4.1f}) "
+                  f"{t_json_write * 1000:6.0f} ms {t_json_read * 1000:6.0f} ms | "
+                  f"{store_size / 1e6:7.2f} MB (x{reference[1] / store_size:4.1f}) "
+                  f"{t_store_write * 1000:6.0f} ms {t_store_read * 1000:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
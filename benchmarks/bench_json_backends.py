@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark des backends JSON du sérialiseur
+Écriture (indentée comme save_project_json, compacte) et lecture d'un projet
+de 300 frames x 23 objets avec chaque backend installé
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.utils.json_serializer import JSONSerializer
+from bench_project_formats import make_project, median_time, N_FRAMES, N_OBJECTS
+
+
+def main():
+    project = make_project()
+    backends = JSONSerializer.available_backends()
+
+    print(f"📦 Projet: {N_FRAMES} frames x {N_OBJECTS} objets — backends: {', '.join(backends)}")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            serializer = JSONSerializer(backend)
+            path = Path(directory) / f"bench_{backend}.json"
+            compact_path = Path(directory) / f"bench_{backend}.compact.json"
+
+            t_dump = median_time(lambda: serializer.dump(project, path))
+            t_dump_compact = median_time(lambda: serializer.dump(project, compact_path, indent=False))
+            t_load = median_time(lambda: serializer.load(path))
+            assert serializer.load(path) == project, f"{backend}: relecture différente"
+            results[backend] = (t_dump, t_dump_compact, t_load, path.stat().st_size)
+
+    # Gains par rapport au module json standard
+    json_dump, _, json_load, _ = results['json']
+    for backend, (t_dump, t_dump_compact, t_load, size) in results.items():
+        print(f"   {backend:<8} écriture {t_dump * 1000:7.1f} ms (x{json_dump / t_dump:4.1f}) | "
+              f"compacte {t_dump_compact * 1000:7.1f} ms | "
+              f"lecture {t_load * 1000:7.1f} ms (x{json_load / t_load:4.1f}) | {size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de la base SQLite du match
+40 événements de 300 frames x 23 objets répartis sur 90 min : écriture par
+événement, puis « toutes les positions du joueur 7 en deuxième mi-temps »
+comparé au parcours des projets JSON de chaque événement
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.export.match_store import MatchStore
+from eva2sport.utils.frame_mapping import FrameMapping
+from eva2sport.utils.json_serializer import json_serializer
+from eva2sport.analytics.trajectory_store import TrajectoryStore
+from bench_project_formats import make_project, median_time, N_FRAMES, N_OBJECTS, FRAME_INTERVAL
+
+
+N_EVENTS = 40
+MATCH_FRAMES = 90 * 60 * 25
+HALF_TIME = MATCH_FRAMES // 2
+PLAYER = "7"
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        json_paths = []
+        write_times = []
+        with MatchStore(directory / "match.sqlite") as store:
+            for k, start in enumerate(np.linspace(0, MATCH_FRAMES - N_FRAMES * FRAME_INTERVAL, N_EVENTS).astype(int)):
+                project = make_project(seed=k)
+                project['metadata']['frame_mapping'] = FrameMapping(
+                    [[int(start), int(start) + N_FRAMES * FRAME_INTERVAL, FRAME_INTERVAL]], MATCH_FRAMES
+                ).to_json()
+                event = {"event_id": f"event_{k}", "timestamp_seconds": start / 25.0, "status": "completed"}
+
+                json_paths.append(json_serializer.dump(project, directory / f"event_{k}_project.json"))
+                trajectories = TrajectoryStore.from_project_data(project)
+                start_time = time.perf_counter()
+                store.write_event(event, project, trajectories)
+                write_times.append(time.perf_counter() - start_time)
+
+            def query_sqlite():
+                return store.object_positions(PLAYER, start_frame=HALF_TIME, columns=('frame', 'field_x', 'field_y'))
+
+            def query_json():
+                frames = []
+                for path in json_paths:
+                    trajectory = TrajectoryStore.from_project_data(json_serializer.load(path)).get(PLAYER)
+                    frames.extend(trajectory.frames[trajectory.frames >= HALF_TIME].tolist())
+                return frames
+
+            n_positions = len(query_sqlite()['frame'])
+            assert query_json() == query_sqlite()['frame'].tolist(), "Résultats SQLite et JSON différents"
+            t_sqlite = median_time(query_sqlite)
+            t_json = median_time(query_json, repeats=1)
+
+        size = sum(path.stat().st_size for path in directory.glob("match.sqlite*"))
+        print(f"🗄️ Match: {N_EVENTS} événements x {N_FRAMES} frames x {N_OBJECTS} objets ({size / 1e6:.1f} MB)")
+        print(f"⏱️  Écriture par événement (transaction): {np.median(write_times) * 1000:.1f} ms")
+        print(f"⏱️  Joueur {PLAYER}, 2e mi-temps ({n_positions} positions):")
+        print(f"   SQLite:        {t_sqlite * 1000:.2f} ms")
+        print(f"   Projets JSON:  {t_json * 1000:.0f} ms (x{t_json / t_sqlite:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark du chargement d'un projet
+Compare le JSON historique (indent=2) et le format binaire .evab
+pour 300 frames x 23 objets : projet complet, colonne, frame isolée, statistiques
+"""
+
+import sys
+import json
+import time
+import uuid
+import base64
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.export.binary_project import save_project_binary, load_project_binary, BinaryProjectReader
+
+
+N_FRAMES = 300
+N_OBJECTS = 23
+FRAME_INTERVAL = 3
+REPEATS = 5
+
+
+def make_project(n_frames: int = N_FRAMES, n_objects: int = N_OBJECTS, seed: int = 0) -> dict:
+    """Projet enrichi synthétique au schéma courant (RLE aléatoires de taille réaliste)"""
+    rng = np.random.default_rng(seed)
+    frame_mapping = [None] * (n_frames * FRAME_INTERVAL)
+    annotations = {}
+    for processed in range(n_frames):
+        frame_mapping[processed * FRAME_INTERVAL] = processed
+        frame_annotations = []
+        for obj in range(n_objects):
+            x, y = int(rng.integers(0, 1900)), int(rng.integers(0, 1000))
+            frame_annotations.append({
+                "id": str(uuid.UUID(bytes=rng.bytes(16), version=4)),
+                "objectId": str(obj),
+                "type": "mask",
+                "mask": {
+                    "format": "rle_coco_base64",
+                    "size": [1080, 1920],
+                    "counts": base64.b64encode(rng.bytes(int(rng.integers(60, 200)))).decode('ascii')
+                },
+                "bbox": {"output": {"x": x, "y": y, "width": 20, "height": 60}},
+                "points": {"output": {
+                    "image": {"CENTER_BOTTOM": {"x": x + 10.0, "y": y + 60.0}},
+                    "field": {"CENTER_BOTTOM": {"x": float(rng.uniform(-52, 52)), "y": float(rng.uniform(-34, 34))}}
+                }},
+                "area": int(rng.integers(100, 2000)),
+                "centroid": {"x": x + 10.0, "y": y + 30.0},
+                "maskScore": float(rng.uniform(0, 1)),
+                "pose": None,
+                "warning": False
+            })
+        annotations[str(processed)] = frame_annotations
+
+    return {
+        "format_version": "1.0",
+        "video": "bench.mp4",
+        "metadata": {"fps": 25.0, "frame_interval": FRAME_INTERVAL, "frame_mapping": frame_mapping},
+        "objects": {str(obj): {"id": str(obj), "type": "ball" if obj == 0 else "player"} for obj in range(n_objects)},
+        "annotations": annotations
+    }
+
+
+def median_time(function, repeats: int = REPEATS) -> float:
+    """Temps médian (s) d'un appel"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    project = make_project()
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = Path(directory) / "bench_project.json"
+        binary_path = Path(directory) / "bench_project.evab"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(project, f, indent=2, ensure_ascii=False)
+        save_project_binary(project, binary_path)
+
+        assert load_project_binary(binary_path) == project, "Relecture binaire non identique"
+
+        def load_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        def load_columns():
+            with BinaryProjectReader(binary_path) as reader:
+                return reader.column('field_xy').sum()
+
+        def load_one_frame():
+            with BinaryProjectReader(binary_path) as reader:
+                return reader.get_frame(N_FRAMES // 2)
+
+        def export_stats():
+            with BinaryProjectReader(binary_path) as reader:
+                return sum(reader.frame_sizes().values())
+
+        t_json = median_time(load_json)
+        t_binary = median_time(lambda: load_project_binary(binary_path))
+        t_columns = median_time(load_columns)
+        t_frame = median_time(load_one_frame)
+        t_stats = median_time(export_stats)
+
+        print(f"📦 Projet: {N_FRAMES} frames x {N_OBJECTS} objets")
+        print(f"   JSON:    {json_path.stat().st_size / 1e6:.2f} MB")
+        print(f"   Binaire: {binary_path.stat().st_size / 1e6:.2f} MB")
+        print(f"⏱️  json.load:                 {t_json * 1000:.1f} ms")
+        print(f"⏱️  .evab → dict complet:      {t_binary * 1000:.1f} ms (x{t_json / t_binary:.1f})")
+        print(f"⏱️  .evab → colonne field_xy:  {t_columns * 1000:.2f} ms (x{t_json / t_columns:.0f})")
+        print(f"⏱️  .evab → une frame:         {t_frame * 1000:.2f} ms (x{t_json / t_frame:.0f})")
+        print(f"⏱️  .evab → objets par frame:  {t_stats * 1000:.2f} ms (x{t_json / t_stats:.0f})")
+
+
+if __name__ == "__main__":
+    main()
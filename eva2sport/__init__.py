@@ -10,15 +10,37 @@ Usage avancé:
     >>> results = pipeline.run_full_pipeline()
 """
 
-from .pipeline import EVA2SportPipeline
-from .config import Config
-from .export.multi_event_manager import MultiEventManager
-from typing import Optional
+import importlib
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .pipeline import EVA2SportPipeline
+    from .config import Config
+    from .export.multi_event_manager import MultiEventManager
+
+# Imports différés : un sous-module chargé seul (ex. worker 'spawn' de
+# enrichment.parallel_enricher) n'importe ni la pipeline ni torch
+_LAZY_IMPORTS = {
+    'EVA2SportPipeline': '.pipeline',
+    'Config': '.config',
+    'MultiEventManager': '.export.multi_event_manager',
+}
+
+
+def __getattr__(name: str):
+    """Charge une classe publique au premier accès"""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 def create_pipeline(video_name: str, working_dir: str = None,
                    segment_offset_before_seconds: Optional[float] = None,
                    segment_offset_after_seconds: Optional[float] = None,
-                   **kwargs) -> EVA2SportPipeline:
+                   **kwargs) -> 'EVA2SportPipeline':
     """
     Crée une pipeline de tracking vidéo
     
@@ -40,6 +62,7 @@ def create_pipeline(video_name: str, working_dir: str = None,
         ...                                     segment_offset_before_seconds=2.0,
         ...                                     segment_offset_after_seconds=3.0)
     """
+    from .pipeline import EVA2SportPipeline
     return EVA2SportPipeline(
         video_name, 
         working_dir,
@@ -68,7 +91,7 @@ def track_video(video_name: str, working_dir: str = None,
     pipeline = create_pipeline(video_name, working_dir)
     return pipeline.run_full_pipeline(force_extraction=force_extraction)
 
-def create_config(video_name: str, working_dir: str = None, **kwargs) -> Config:
+def create_config(video_name: str, working_dir: str = None, **kwargs) -> 'Config':
     """
     Crée une configuration personnalisée
     
@@ -87,6 +110,7 @@ def create_config(video_name: str, working_dir: str = None, **kwargs) -> Config:
         ...     SEGMENT_MODE=True
         ... )
     """
+    from .config import Config
     config = Config(video_name, working_dir)
     
     # Appliquer les options personnalisées
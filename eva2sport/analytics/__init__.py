@@ -0,0 +1,10 @@
+"""
+Modules d'analyse EVA2SPORT
+"""
+
+from .trajectory_store import TrajectoryStore, ObjectTrajectory
+from .kinematics import KinematicsEngine, KinematicsResult
+from .spatial_index import FrameSpatialIndex
+
+__all__ = ['TrajectoryStore', 'ObjectTrajectory', 'KinematicsEngine', 'KinematicsResult',
+           'FrameSpatialIndex']
@@ -0,0 +1,180 @@
+"""
+Cinématique vectorisée de tous les objets suivis
+Vitesse, accélération, cap, distance cumulée et sprints calculés en une passe NumPy
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union
+
+import numpy as np
+
+from .trajectory_store import TrajectoryStore
+
+
+# Seuils de vitesse usuels en football (m/s) : course intense et sprint
+DEFAULT_SPRINT_THRESHOLDS = {
+    'high_speed': 5.5,   # 19.8 km/h
+    'sprint': 7.0,       # 25.2 km/h
+}
+
+
+@dataclass
+class KinematicsResult:
+    """Colonnes cinématiques alignées ligne à ligne sur le TrajectoryStore source"""
+    object_ids: List[str]
+    offsets: np.ndarray
+    time: np.ndarray                 # (R,) secondes depuis la frame 0 de la vidéo
+    velocity: np.ndarray             # (R, 2) m/s (NaN si indéfinie)
+    speed: np.ndarray                # (R,) m/s
+    acceleration: np.ndarray         # (R,) m/s²
+    heading: np.ndarray              # (R,) radians, repère terrain
+    cumulative_distance: np.ndarray  # (R,) mètres depuis la première apparition
+    sprint_counts: Dict[str, np.ndarray] = field(default_factory=dict)  # nom → (n_objects,)
+
+    def get(self, object_id: Union[str, int]) -> Optional[Dict[str, np.ndarray]]:
+        """Colonnes d'un objet (vues)"""
+        object_id = str(object_id)
+        if object_id not in self.object_ids:
+            return None
+        row = self.object_ids.index(object_id)
+        window = slice(int(self.offsets[row]), int(self.offsets[row + 1]))
+        return {
+            'time': self.time[window],
+            'velocity': self.velocity[window],
+            'speed': self.speed[window],
+            'acceleration': self.acceleration[window],
+            'heading': self.heading[window],
+            'cumulative_distance': self.cumulative_distance[window]
+        }
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Distance totale, vitesse max et nombre de sprints par objet"""
+        results = {}
+        for row, object_id in enumerate(self.object_ids):
+            start, stop = int(self.offsets[row]), int(self.offsets[row + 1])
+            speed = self.speed[start:stop]
+            finite = speed[np.isfinite(speed)]
+            results[object_id] = {
+                'distance': float(self.cumulative_distance[stop - 1]) if stop > start else 0.0,
+                'max_speed': float(finite.max()) if len(finite) else None,
+                'mean_speed': float(finite.mean()) if len(finite) else None,
+                'sprints': {name: int(counts[row]) for name, counts in self.sprint_counts.items()}
+            }
+        return results
+
+
+class KinematicsEngine:
+    """
+    Calcule la cinématique de tous les objets d'un TrajectoryStore sans boucle Python par frame
+
+    Le pas de temps réel vient des frames originales et du FPS (pas fixe
+    frame_interval ou échantillonnage adaptatif). Un pas plus long que
+    max_gap_seconds, ou sans position terrain, coupe la trajectoire : aucune
+    vitesse ni distance n'est calculée à travers un trou.
+    """
+
+    def __init__(self, fps: float, max_gap_seconds: float = 1.0,
+                 sprint_thresholds: Optional[Dict[str, float]] = None,
+                 min_sprint_duration: float = 1.0):
+        """
+        Args:
+            fps: FPS de la vidéo source
+            max_gap_seconds: Écart maximal entre deux positions consécutives d'une trajectoire
+            sprint_thresholds: Seuils de vitesse nommés (m/s) pour le comptage des sprints
+            min_sprint_duration: Durée minimale (s) au-dessus du seuil pour compter un sprint
+        """
+        if not fps or fps <= 0:
+            raise ValueError(f"❌ FPS invalide: {fps}")
+        self.fps = float(fps)
+        self.max_gap_seconds = max_gap_seconds
+        self.sprint_thresholds = dict(sprint_thresholds or DEFAULT_SPRINT_THRESHOLDS)
+        self.min_sprint_duration = min_sprint_duration
+
+    @classmethod
+    def from_project_data(cls, project_data: Dict[str, Any], **kwargs) -> 'KinematicsEngine':
+        """Moteur configuré avec le FPS du projet"""
+        return cls(project_data['metadata']['fps'], **kwargs)
+
+    def compute(self, store: TrajectoryStore, position_column: str = 'field_xy') -> KinematicsResult:
+        """
+        Cinématique de tous les objets
+
+        Args:
+            store: Trajectoires colonnaires
+            position_column: Colonne de positions terrain à dériver ('field_xy' ou une version lissée)
+        """
+        offsets = store.offsets
+        n_rows = store.n_rows
+        time = np.asarray(store.columns['frames'], dtype=np.float64) / self.fps
+        positions = np.asarray(store.columns[position_column], dtype=np.float64)
+        object_index = np.repeat(np.arange(len(store)), np.diff(offsets))
+
+        # Pas i → i+1 valides : même objet, positions connues, écart de temps raisonnable
+        dt = np.diff(time)
+        delta = np.diff(positions, axis=0)
+        connected = (object_index[1:] == object_index[:-1]) & (dt > 0) & (dt <= self.max_gap_seconds)
+        connected &= np.isfinite(delta).all(axis=1)
+        safe_dt = np.where(connected, dt, 1.0)
+        step_velocity = np.where(connected[:, None], delta / safe_dt[:, None], np.nan)
+        step_distance = np.where(connected, np.hypot(delta[:, 0], delta[:, 1]), 0.0)
+
+        velocity = self._row_average(step_velocity, n_rows)
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])
+        heading = np.arctan2(velocity[:, 1], velocity[:, 0])
+
+        # Accélération : dérivée de la vitesse sur les mêmes pas
+        speed_step = np.where(connected, np.diff(speed) / safe_dt, np.nan)
+        acceleration = self._row_average(speed_step[:, None], n_rows)[:, 0]
+
+        # Distance cumulée par objet (remise à zéro au début de chaque objet)
+        cumulative = np.zeros(n_rows)
+        cumulative[1:] = np.cumsum(step_distance)
+        if n_rows:
+            cumulative -= cumulative[offsets[:-1]][object_index]
+
+        sprint_counts = {
+            name: self._count_runs(speed >= threshold, connected, time, object_index, len(store))
+            for name, threshold in self.sprint_thresholds.items()
+        }
+
+        return KinematicsResult(
+            object_ids=list(store.object_ids),
+            offsets=np.array(offsets),
+            time=time,
+            velocity=velocity,
+            speed=speed,
+            acceleration=acceleration,
+            heading=heading,
+            cumulative_distance=cumulative,
+            sprint_counts=sprint_counts
+        )
+
+    @staticmethod
+    def _row_average(step_values: np.ndarray, n_rows: int) -> np.ndarray:
+        """Valeur par ligne : moyenne des pas valides entrant et sortant (différence centrée)"""
+        width = step_values.shape[1]
+        before = np.full((n_rows, width), np.nan)
+        after = np.full((n_rows, width), np.nan)
+        if n_rows > 1:
+            before[1:] = step_values
+            after[:-1] = step_values
+        count = np.isfinite(before[:, 0]).astype(np.float64) + np.isfinite(after[:, 0])
+        total = np.nan_to_num(before) + np.nan_to_num(after)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count[:, None] > 0, total / count[:, None], np.nan)
+
+    def _count_runs(self, above: np.ndarray, connected: np.ndarray, time: np.ndarray,
+                    object_index: np.ndarray, n_objects: int) -> np.ndarray:
+        """Nombre de passages continus au-dessus d'un seuil d'au moins min_sprint_duration, par objet"""
+        if not len(above):
+            return np.zeros(n_objects, dtype=np.int64)
+        linked = np.zeros(len(above), dtype=bool)   # ligne i reliée à i-1
+        linked[1:] = connected
+        continues_from_previous = linked & np.concatenate([[False], above[:-1]])
+        continues_to_next = np.concatenate([linked[1:] & above[1:], [False]])
+
+        starts = np.flatnonzero(above & ~continues_from_previous)
+        ends = np.flatnonzero(above & ~continues_to_next)
+        durations = time[ends] - time[starts]
+        kept = starts[durations >= self.min_sprint_duration]
+        return np.bincount(object_index[kept], minlength=n_objects)
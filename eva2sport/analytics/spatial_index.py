@@ -0,0 +1,260 @@
+"""
+Index spatial par frame des positions terrain
+Requêtes de proximité (plus proche du ballon, rayon, adversaire le plus proche)
+et métriques de possession / pression vectorisées sur tout un segment ou un match
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .trajectory_store import TrajectoryStore
+
+
+class FrameSpatialIndex:
+    """
+    Positions terrain rangées en grille dense (frame, objet, xy)
+
+    Avec au plus une vingtaine d'objets par frame, un arbre par frame coûte
+    plus cher à construire qu'il ne fait gagner : les requêtes calculent
+    directement les distances de toutes les frames en lot, par blocs de
+    chunk_size frames pour borner la mémoire. Aucune requête ne reparcourt
+    les annotations JSON. La grille est persistée à côté des trajectoires
+    (save/load, memmap en lecture).
+    """
+
+    FORMAT_VERSION = 1
+    BALL_TYPES = ('ball', 'ballon')
+    PLAYER_TYPES = ('player',)
+
+    def __init__(self, frames: np.ndarray, object_ids: List[str], positions: np.ndarray,
+                 types: Sequence[Optional[str]], teams: Sequence[Optional[str]],
+                 chunk_size: int = 4096, position_column: str = 'field_xy'):
+        """
+        Args:
+            frames: (F,) frames originales indexées, croissantes
+            object_ids: Ids des O objets (colonnes de la grille)
+            positions: (F, O, 2) positions terrain, NaN si l'objet n'est pas localisé
+            types: Type de chaque objet ('player', 'ball'...)
+            teams: Équipe de chaque objet (None si inconnue)
+            chunk_size: Nombre de frames traitées par bloc dans les requêtes par paires
+            position_column: Colonne des trajectoires d'où viennent les positions
+        """
+        self.frames = np.asarray(frames, dtype=np.int64)
+        self.object_ids = list(object_ids)
+        self.positions = positions
+        self.types = np.array([t or 'unknown' for t in types], dtype=object)
+        self.teams = np.array([t if t is not None else '' for t in teams], dtype=object)
+        self.chunk_size = chunk_size
+        self.position_column = position_column
+        self._columns = {obj_id: i for i, obj_id in enumerate(self.object_ids)}
+
+    @classmethod
+    def from_store(cls, store: TrajectoryStore, objects: Dict[str, Dict[str, Any]],
+                   position_column: str = 'field_xy') -> 'FrameSpatialIndex':
+        """
+        Construit la grille depuis les trajectoires colonnaires
+
+        Args:
+            store: Trajectoires colonnaires
+            objects: Section 'objects' du projet (type, équipe)
+            position_column: 'field_xy' ou 'field_smoothed_xy'
+        """
+        frames_column = np.asarray(store.columns['frames'])
+        frames = np.unique(frames_column)
+        object_index = np.repeat(np.arange(len(store)), np.diff(store.offsets))
+        frame_index = np.searchsorted(frames, frames_column)
+
+        positions = np.full((len(frames), len(store), 2), np.nan)
+        positions[frame_index, object_index] = store.columns[position_column]
+
+        types = [objects.get(obj_id, {}).get('type') for obj_id in store.object_ids]
+        teams = [objects.get(obj_id, {}).get('team') for obj_id in store.object_ids]
+        return cls(frames, store.object_ids, positions, types, teams, position_column=position_column)
+
+    @classmethod
+    def from_project_data(cls, project_data: Dict[str, Any],
+                          position_column: str = 'field_xy') -> 'FrameSpatialIndex':
+        """Construit la grille directement depuis un projet enrichi"""
+        store = TrajectoryStore.from_project_data(project_data)
+        return cls.from_store(store, project_data.get('objects', {}), position_column)
+
+    def save(self, directory: Union[str, Path]) -> Path:
+        """
+        Écrit frames et positions en .npy et un index JSON (ids, types, équipes)
+
+        Returns:
+            Dossier de l'index spatial
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "frames.npy", np.ascontiguousarray(self.frames))
+        np.save(directory / "positions.npy", np.ascontiguousarray(self.positions))
+        index = {
+            'format_version': self.FORMAT_VERSION,
+            'position_column': self.position_column,
+            'object_ids': self.object_ids,
+            'types': self.types.tolist(),
+            'teams': [team or None for team in self.teams.tolist()]
+        }
+        with open(directory / "index.json", 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> 'FrameSpatialIndex':
+        """
+        Recharge un index écrit par save
+
+        Args:
+            directory: Dossier de l'index spatial
+            mmap: Ouvre la grille en memmap lecture seule
+        """
+        directory = Path(directory)
+        with open(directory / "index.json", 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('format_version') != cls.FORMAT_VERSION:
+            raise ValueError(f"❌ Version d'index spatial non supportée: {index.get('format_version')}")
+
+        mmap_mode = 'r' if mmap else None
+        return cls(np.load(directory / "frames.npy", mmap_mode=mmap_mode), index['object_ids'],
+                   np.load(directory / "positions.npy", mmap_mode=mmap_mode),
+                   index['types'], index['teams'], position_column=index['position_column'])
+
+    # ===== REQUÊTES =====
+
+    def column(self, object_id: Union[str, int]) -> int:
+        """Colonne d'un objet dans la grille"""
+        column = self._columns.get(str(object_id))
+        if column is None:
+            raise KeyError(f"Objet inconnu: {object_id}")
+        return column
+
+    def type_mask(self, types: Sequence[str]) -> np.ndarray:
+        """(O,) objets dont le type est dans types"""
+        return np.isin(self.types, list(types))
+
+    def ball_positions(self) -> np.ndarray:
+        """(F, 2) position du ballon par frame (premier ballon localisé)"""
+        balls = np.flatnonzero(self.type_mask(self.BALL_TYPES))
+        result = np.full((len(self.frames), 2), np.nan)
+        for column in balls:
+            missing = np.isnan(result[:, 0])
+            result[missing] = self.positions[missing, column]
+        return result
+
+    def distances_to(self, targets: np.ndarray) -> np.ndarray:
+        """(F, O) distance de chaque objet à une cible par frame ((F, 2) ou (2,))"""
+        delta = self.positions - np.asarray(targets, dtype=np.float64).reshape(-1, 1, 2)
+        return np.hypot(delta[..., 0], delta[..., 1])
+
+    def nearest(self, targets: np.ndarray, candidates: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Objet le plus proche d'une cible à chaque frame
+
+        Args:
+            targets: Cible (F, 2) par frame ou point fixe (2,)
+            candidates: Masque (O,) ou (F, O) des objets éligibles
+
+        Returns:
+            {'frames', 'columns' (F,) (-1 si aucun), 'object_ids', 'distances' (F,)}
+        """
+        distances = self.distances_to(targets)
+        if candidates is not None:
+            distances = np.where(candidates, distances, np.nan)
+        distances = np.where(np.isnan(distances), np.inf, distances)
+
+        n_frames = len(self.frames)
+        if distances.shape[1]:
+            columns = np.argmin(distances, axis=1)
+            best = distances[np.arange(n_frames), columns]
+        else:
+            columns = np.full(n_frames, -1)
+            best = np.full(n_frames, np.inf)
+        found = np.isfinite(best)
+        columns = np.where(found, columns, -1)
+        return {
+            'frames': self.frames,
+            'columns': columns,
+            'object_ids': [self.object_ids[c] if c >= 0 else None for c in columns.tolist()],
+            'distances': np.where(found, best, np.nan)
+        }
+
+    def nearest_to_ball(self, types: Sequence[str] = PLAYER_TYPES) -> Dict[str, Any]:
+        """Joueur le plus proche du ballon à chaque frame"""
+        return self.nearest(self.ball_positions(), self.type_mask(types))
+
+    def within_radius(self, center: Union[str, int, np.ndarray], radius: float,
+                      types: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        (F, O) objets à moins de radius mètres d'un objet (id) ou d'un point
+
+        L'objet de référence lui-même est exclu.
+        """
+        exclude = None
+        if isinstance(center, (str, int)):
+            exclude = self.column(center)
+            center = self.positions[:, exclude]
+        mask = self.distances_to(center) <= radius
+        if types is not None:
+            mask &= self.type_mask(types)
+        if exclude is not None:
+            mask[:, exclude] = False
+        return mask
+
+    def opponents_of(self, object_id: Union[str, int]) -> np.ndarray:
+        """(O,) joueurs d'une autre équipe (connue) que l'objet"""
+        team = self.teams[self.column(object_id)]
+        if not team:
+            return np.zeros(len(self.object_ids), dtype=bool)
+        return self.type_mask(self.PLAYER_TYPES) & (self.teams != '') & (self.teams != team)
+
+    def closest_opponent(self, object_id: Union[str, int]) -> Dict[str, Any]:
+        """Adversaire le plus proche d'un joueur à chaque frame (même format que nearest)"""
+        return self.nearest(self.positions[:, self.column(object_id)], self.opponents_of(object_id))
+
+    # ===== MÉTRIQUES =====
+
+    def pressure(self, radius: float = 5.0) -> np.ndarray:
+        """
+        (F, O) nombre d'adversaires à moins de radius mètres de chaque joueur
+
+        Distances par paires calculées par blocs de frames : (bloc, O, O).
+        """
+        players = np.flatnonzero(self.type_mask(self.PLAYER_TYPES) & (self.teams != ''))
+        teams = self.teams[players]
+        opponents = teams[:, None] != teams[None, :]
+
+        counts = np.zeros(self.positions.shape[:2], dtype=np.int64)
+        for start in range(0, len(self.frames), self.chunk_size):
+            block = self.positions[start:start + self.chunk_size, players]
+            delta = block[:, :, None, :] - block[:, None, :, :]
+            close = np.hypot(delta[..., 0], delta[..., 1]) <= radius
+            counts[start:start + self.chunk_size, players] = (close & opponents).sum(axis=2)
+        return counts
+
+    def possession(self, max_distance: float = 2.0) -> Dict[str, Any]:
+        """
+        Possession par frame : équipe du joueur le plus proche du ballon s'il est à moins de max_distance
+
+        Returns:
+            {'frames', 'object_ids', 'teams' (None sans possession), 'shares' {équipe: part des frames possédées}}
+        """
+        nearest = self.nearest_to_ball()
+        owned = np.isfinite(nearest['distances']) & (nearest['distances'] <= max_distance)
+        teams = np.where(owned, self.teams[np.maximum(nearest['columns'], 0)], '')
+
+        owned_teams = teams[owned & (teams != '')]
+        shares = {}
+        if len(owned_teams):
+            names, counts = np.unique(owned_teams.astype(str), return_counts=True)
+            shares = {str(name): float(count / counts.sum()) for name, count in zip(names, counts)}
+
+        return {
+            'frames': self.frames,
+            'object_ids': [obj_id if keep else None for obj_id, keep in zip(nearest['object_ids'], owned.tolist())],
+            'teams': [team or None for team in teams.tolist()],
+            'shares': shares
+        }
@@ -0,0 +1,197 @@
+"""
+Stockage colonnaire des trajectoires des objets suivis
+Un tableau NumPy contigu par colonne, persisté à côté du JSON projet et rechargé sans copie
+"""
+
+import json
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Iterator, Union
+
+import numpy as np
+
+from ..utils.frame_mapping import FrameMapping
+
+
+def processed_to_original_frames(project_data: Dict[str, Any]) -> Dict[int, int]:
+    """Index de frame traitée → frame originale, depuis metadata.frame_mapping (compact ou liste)"""
+    return dict(enumerate(FrameMapping.from_project_data(project_data).original_frames()))
+
+
+def object_sort_key(object_id: str) -> tuple:
+    """Ordre des objets : ids numériques croissants, puis les autres"""
+    return (0, int(object_id), '') if object_id.isdigit() else (1, 0, object_id)
+
+
+@dataclass
+class ObjectTrajectory:
+    """Trajectoire d'un objet : une ligne par frame où il est annoté, triée par frame"""
+    object_id: str
+    frames: np.ndarray      # (T,) frame originale
+    processed: np.ndarray   # (T,) index de frame traitée
+    image_xy: np.ndarray    # (T, 2) point CENTER_BOTTOM image (NaN si absent)
+    field_xy: np.ndarray    # (T, 2) point CENTER_BOTTOM terrain en mètres (NaN si absent)
+    bbox: np.ndarray        # (T, 4) x, y, width, height (NaN si absent)
+    score: np.ndarray       # (T,) score SAM2 (NaN si inconnu)
+    field_smoothed_xy: Optional[np.ndarray] = None  # (T, 2) position lissée (NaN si absente)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def visible(self) -> np.ndarray:
+        """Masque des frames avec une position terrain"""
+        return np.isfinite(self.field_xy[:, 0])
+
+
+class TrajectoryStore:
+    """
+    Trajectoires de tous les objets d'un projet en colonnes
+
+    Les lignes d'un même objet sont contiguës (objets triés par id, frames
+    croissantes) : la trajectoire d'un objet est une vue par tranche des
+    colonnes, y compris sur les fichiers .npy ouverts en memmap.
+    """
+
+    FORMAT_VERSION = 1
+    COLUMNS = {
+        'frames': np.int64,
+        'processed': np.int64,
+        'image_xy': np.float64,
+        'field_xy': np.float64,
+        'bbox': np.float64,
+        'score': np.float64,
+        'field_smoothed_xy': np.float64,
+    }
+
+    def __init__(self, object_ids: List[str], offsets: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            object_ids: Ids des objets dans l'ordre de stockage
+            offsets: (n_objects + 1,) début de chaque objet dans les colonnes
+            columns: Colonnes (une ligne par annotation) de COLUMNS
+        """
+        self.object_ids = list(object_ids)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.columns = columns
+        self._rows = {obj_id: i for i, obj_id in enumerate(self.object_ids)}
+
+    @classmethod
+    def from_project_data(cls, project_data: Dict[str, Any]) -> 'TrajectoryStore':
+        """
+        Construit les colonnes en un seul parcours des annotations du projet
+
+        Les frames traitées sont converties en frames originales via
+        metadata.frame_mapping (frame originale → index traité).
+        """
+        processed_to_original = processed_to_original_frames(project_data)
+
+        rows: Dict[str, List[tuple]] = {}
+        nan2 = (np.nan, np.nan)
+        nan4 = (np.nan, np.nan, np.nan, np.nan)
+        for frame_key, frame_annotations in project_data.get('annotations', {}).items():
+            processed = int(frame_key)
+            original = processed_to_original.get(processed, processed)
+            for annotation in frame_annotations:
+                bbox = (annotation.get('bbox') or {}).get('output')
+                points = (annotation.get('points') or {}).get('output') or {}
+                image_point = (points.get('image') or {}).get('CENTER_BOTTOM')
+                field_point = (points.get('field') or {}).get('CENTER_BOTTOM')
+                smoothed_point = (points.get('field_smoothed') or {}).get('CENTER_BOTTOM')
+                score = annotation.get('maskScore')
+                rows.setdefault(str(annotation['objectId']), []).append((
+                    original,
+                    processed,
+                    (image_point['x'], image_point['y']) if image_point else nan2,
+                    (field_point['x'], field_point['y']) if field_point else nan2,
+                    (bbox['x'], bbox['y'], bbox['width'], bbox['height']) if bbox else nan4,
+                    score if score is not None else np.nan,
+                    (smoothed_point['x'], smoothed_point['y']) if smoothed_point else nan2,
+                ))
+
+        object_ids = sorted(rows, key=object_sort_key)
+        ordered = []
+        offsets = [0]
+        for obj_id in object_ids:
+            object_rows = sorted(rows[obj_id], key=lambda row: row[0])
+            ordered.extend(object_rows)
+            offsets.append(len(ordered))
+
+        columns = {}
+        for position, (name, dtype) in enumerate(cls.COLUMNS.items()):
+            values = [row[position] for row in ordered]
+            column = np.array(values, dtype=dtype)
+            if name in ('image_xy', 'field_xy', 'field_smoothed_xy'):
+                column = column.reshape(-1, 2)
+            elif name == 'bbox':
+                column = column.reshape(-1, 4)
+            columns[name] = column
+
+        return cls(object_ids, np.array(offsets, dtype=np.int64), columns)
+
+    def get(self, object_id: Union[str, int]) -> Optional[ObjectTrajectory]:
+        """Trajectoire d'un objet (vues sur les colonnes, sans copie)"""
+        row = self._rows.get(str(object_id))
+        if row is None:
+            return None
+        start, stop = int(self.offsets[row]), int(self.offsets[row + 1])
+        return ObjectTrajectory(
+            object_id=self.object_ids[row],
+            **{name: column[start:stop] for name, column in self.columns.items()}
+        )
+
+    def __iter__(self) -> Iterator[ObjectTrajectory]:
+        for obj_id in self.object_ids:
+            yield self.get(obj_id)
+
+    def __len__(self) -> int:
+        return len(self.object_ids)
+
+    def __contains__(self, object_id) -> bool:
+        return str(object_id) in self._rows
+
+    @property
+    def n_rows(self) -> int:
+        """Nombre total d'annotations stockées"""
+        return int(self.offsets[-1])
+
+    def save(self, directory: Union[str, Path]) -> Path:
+        """
+        Écrit une colonne par fichier .npy et un index JSON (ids, offsets)
+
+        Returns:
+            Dossier des trajectoires
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(column))
+        index = {
+            'format_version': self.FORMAT_VERSION,
+            'object_ids': self.object_ids,
+            'offsets': self.offsets.tolist(),
+            'columns': list(self.columns)
+        }
+        with open(directory / "index.json", 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> 'TrajectoryStore':
+        """
+        Recharge un stockage écrit par save
+
+        Args:
+            directory: Dossier des trajectoires
+            mmap: Ouvre les colonnes en memmap lecture seule (aucune copie ni lecture complète)
+        """
+        directory = Path(directory)
+        with open(directory / "index.json", 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('format_version') != cls.FORMAT_VERSION:
+            raise ValueError(f"❌ Version de trajectoires non supportée: {index.get('format_version')}")
+
+        mmap_mode = 'r' if mmap else None
+        columns = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+                   for name in index['columns']}
+        return cls(index['object_ids'], np.array(index['offsets'], dtype=np.int64), columns)
@@ -0,0 +1,68 @@
+"""
+Interface en ligne de commande EVA2SPORT
+
+Usage:
+    eva2sport reenrich SD_13_06_2025_cam1
+    eva2sport reenrich SD_13_06_2025_cam1 --calib data/videos/new_calib.json
+    eva2sport reenrich SD_13_06_2025_cam1 --no-match-store
+    eva2sport recover data/videos/outputs/SD_13_06_2025_cam1/SD_13_06_2025_cam1_project.evab
+"""
+
+import sys
+import argparse
+from typing import List, Optional
+
+
+def _reenrich(args: argparse.Namespace) -> int:
+    """Recalcule les positions terrain de tous les événements d'une vidéo"""
+    from .export.multi_event_manager import MultiEventManager
+
+    # Base du match mise à jour si elle existe (match_store=None), sauf option contraire
+    with MultiEventManager(args.video_name, args.working_dir, match_store=args.match_store) as manager:
+        results = manager.reenrich_calibration(args.calib)
+    return 0 if results['events'] else 1
+
+
+def _recover(args: argparse.Namespace) -> int:
+    """Finalise un projet binaire interrompu"""
+    from .export.binary_project import recover_project_binary
+
+    recovered = recover_project_binary(args.path)
+    return 0 if recovered['frames'] else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Parser des sous-commandes"""
+    parser = argparse.ArgumentParser(prog="eva2sport", description="Pipeline EVA2SPORT")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reenrich = subparsers.add_parser(
+        "reenrich",
+        help="Recalcule points.output.field depuis les points image après un changement de calibration"
+    )
+    reenrich.add_argument("video_name", help="Nom de la vidéo (sans extension)")
+    reenrich.add_argument("--working-dir", default=None, help="Répertoire de travail (défaut: courant)")
+    reenrich.add_argument("--calib", default=None,
+                          help="Fichier de calibration (défaut: data/videos/{video}_calib.json)")
+    reenrich.add_argument("--match-store", action=argparse.BooleanOptionalAction, default=None,
+                          help="Met à jour la base SQLite du match (défaut: si la base existe)")
+    reenrich.set_defaults(handler=_reenrich)
+
+    recover = subparsers.add_parser(
+        "recover",
+        help="Finalise un projet .evab interrompu (conserve les frames complètes)"
+    )
+    recover.add_argument("path", help="Fichier .evab")
+    recover.set_defaults(handler=_recover)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la commande eva2sport"""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,8 @@ from typing import Optional, Tuple, List, Dict, Any, Union
 from dataclasses import dataclass
 import torch
 
+from .utils.compression import compressed_path
+
 
 @dataclass
 class EventInterval:
@@ -56,6 +58,59 @@ class Config:
         self.EXTRACT_FRAMES = kwargs.get('extract_frames', True)
         self.FORCE_EXTRACTION = kwargs.get('force_extraction', False)
         
+        # Échantillonnage adaptatif (remplace le pas fixe FRAME_INTERVAL si activé)
+        self.ADAPTIVE_SAMPLING = kwargs.get('adaptive_sampling', False)
+        self.ADAPTIVE_FRAME_BUDGET = kwargs.get('adaptive_frame_budget', None)
+        self.ADAPTIVE_MIN_INTERVAL = kwargs.get('adaptive_min_interval', 1)
+        self.ADAPTIVE_MAX_INTERVAL = kwargs.get('adaptive_max_interval', 2 * self.FRAME_INTERVAL)
+        
+        # Détection des changements de plan (bornage de la propagation)
+        self.SHOT_DETECTION = kwargs.get('shot_detection', False)
+        self.SHOT_HIST_THRESHOLD = kwargs.get('shot_hist_threshold', 0.5)
+        self.SHOT_DIFF_THRESHOLD = kwargs.get('shot_diff_threshold', 0.12)
+        
+        # Surveillance de la dérive du tracking
+        self.DRIFT_DETECTION = kwargs.get('drift_detection', False)
+        self.DRIFT_AUTO_REANCHOR = kwargs.get('drift_auto_reanchor', False)
+        self.DRIFT_MIN_OBJECT_SCORE = kwargs.get('drift_min_object_score', 0.5)
+        self.DRIFT_MAX_AREA_RATIO = kwargs.get('drift_max_area_ratio', 3.0)
+        self.DRIFT_MAX_SPEED = kwargs.get('drift_max_speed', 12.0)
+        
+        # Sortie des annotations : 'rle' (masques + bbox), 'bbox' (sans transfert des masques)
+        # ou 'store' (masques bit-packés hors JSON, référencés par (chunk, offset))
+        self.MASK_OUTPUT = kwargs.get('mask_output', 'rle')
+        # Codec du store : 'packbits' (découpes indépendantes) ou 'delta' (clé tous les N masques + XOR RLE)
+        self.MASK_STORE_CODEC = kwargs.get('mask_store_codec', 'packbits')
+        self.MASK_KEYFRAME_INTERVAL = kwargs.get('mask_keyframe_interval', 10)
+        
+        # Enrichissement parallèle des frames (0 = séquentiel, None = tous les cœurs)
+        self.ENRICHMENT_WORKERS = kwargs.get('enrichment_workers', 0)
+        
+        # Lissage des trajectoires terrain (Kalman/RTS) après enrichissement
+        self.TRAJECTORY_SMOOTHING = kwargs.get('trajectory_smoothing', False)
+        self.SMOOTHING_MEASUREMENT_STD = kwargs.get('smoothing_measurement_std', 0.5)
+        self.SMOOTHING_ACCELERATION_STD = kwargs.get('smoothing_acceleration_std', 3.0)
+        self.SMOOTHING_BALL_ACCELERATION_STD = kwargs.get('smoothing_ball_acceleration_std', 15.0)
+        self.SMOOTHING_MAX_GAP_SECONDS = kwargs.get('smoothing_max_gap_seconds', 1.0)
+        
+        # Copie binaire compacte du projet (.evab) écrite en flux pendant le tracking,
+        # un bloc de frames à la fois (récupérable après un crash : eva2sport recover).
+        # None : activée si l'export vidéo est demandé (rendu sans charger tout le JSON)
+        self.PROJECT_BINARY = kwargs.get('project_binary', None)
+        self.BINARY_FRAMES_PER_BLOCK = kwargs.get('binary_frames_per_block', 64)
+        
+        # Compression des sorties (projet JSON, store de masques) : None, 'zstd' ou 'gzip'
+        # Niveau None = défaut du codec (zstd 3, gzip 6) ; la relecture détecte le format
+        self.OUTPUT_COMPRESSION = kwargs.get('output_compression', None)
+        self.OUTPUT_COMPRESSION_LEVEL = kwargs.get('output_compression_level', None)
+        
+        # Cache des résultats par étape (clés dérivées du contenu)
+        self.USE_CACHE = kwargs.get('use_cache', True)
+        
+        # Frames originales retenues à l'extraction (ordre traité), renseigné par VideoProcessor
+        self.processed_frames: Optional[List[int]] = None
+        self.shot_cut_frames: List[int] = []
+        
         # Segmentation - juste stocker les offsets
         self.SEGMENT_OFFSET_BEFORE_SECONDS = segment_offset_before_seconds
         self.SEGMENT_OFFSET_AFTER_SECONDS = segment_offset_after_seconds
@@ -103,7 +158,14 @@ class Config:
         self.output_dir = self.video_output_dir / self.VIDEO_NAME_WITH_EVENT
         self.frames_dir = self.output_dir / "frames"
         self.masks_dir = self.output_dir / "masks"
-        self.output_json_path = self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_project.json"
+        self.output_json_path = compressed_path(self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_project.json",
+                                                self.OUTPUT_COMPRESSION)
+        self.output_binary_path = self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_project.evab"
+        self.extraction_info_path = self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_extraction.json"
+        self.cache_dir = self.output_dir / "cache"
+        self.trajectories_dir = self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_trajectories"
+        self.spatial_index_dir = self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_spatial"
+        self.mask_store_dir = self.output_dir / f"{self.VIDEO_NAME_WITH_EVENT}_masks"
         
         # Checkpoint
         self.checkpoint_path = self.checkpoints_dir / self.SAM2_CHECKPOINT
@@ -268,8 +330,13 @@ class Config:
         # L'ancrage doit être calculé en tenant compte du FRAME_INTERVAL
         
         # Convertir en frames traitées
-        reference_frame_processed = reference_frame // self.FRAME_INTERVAL
-        start_frame_processed = start_frame // self.FRAME_INTERVAL
+        if self.processed_frames:
+            # Échantillonnage explicite (adaptatif) : utiliser le mapping réel
+            reference_frame_processed = self.processed_index_for_frame(reference_frame)
+            start_frame_processed = self.processed_index_for_frame(start_frame)
+        else:
+            reference_frame_processed = reference_frame // self.FRAME_INTERVAL
+            start_frame_processed = start_frame // self.FRAME_INTERVAL
         
         # L'index d'ancrage dans le segment traité
         anchor_frame_in_segment = reference_frame_processed - start_frame_processed
@@ -349,6 +416,9 @@ class Config:
         print(f"   📁 Répertoire: {self.working_dir}")
         print(f"   🖥️ Device: {self.device}")
         print(f"   ⏯️ Intervalle: {self.FRAME_INTERVAL}")
+        if self.ADAPTIVE_SAMPLING:
+            budget = self.ADAPTIVE_FRAME_BUDGET or "auto"
+            print(f"   🏃 Échantillonnage adaptatif: budget {budget}, écart [{self.ADAPTIVE_MIN_INTERVAL}, {self.ADAPTIVE_MAX_INTERVAL}]")
         
         if self.is_event_mode:
             print(f"   🎯 Mode: Event")
@@ -393,6 +463,36 @@ class Config:
             fps = self.get_video_fps()
         return int(round(seconds * fps))
     
+    def processed_index_for_frame(self, original_frame: int, start_frame: int = 0) -> int:
+        """
+        Convertit une frame originale en index traité (relatif au début du segment)
+        
+        Args:
+            original_frame: Frame de la vidéo originale
+            start_frame: Première frame originale du segment
+            
+        Returns:
+            Index de la dernière frame traitée <= original_frame
+        """
+        if self.processed_frames:
+            from bisect import bisect_right
+            # processed_frames est absolu : l'index 0 correspond au début du segment extrait
+            return max(0, bisect_right(self.processed_frames, original_frame) - 1)
+        return (original_frame - start_frame) // self.FRAME_INTERVAL
+    
+    def original_frame_for_index(self, processed_idx: int, start_frame: int = 0) -> int:
+        """Convertit un index traité en frame originale de la vidéo"""
+        if self.processed_frames:
+            return self.processed_frames[processed_idx]
+        return start_frame + processed_idx * self.FRAME_INTERVAL
+    
+    def get_processed_shot_cuts(self) -> List[int]:
+        """Retourne les coupes de plan détectées en index traités"""
+        if not self.shot_cut_frames or not self.processed_frames:
+            return []
+        from .tracking.shot_detector import ShotBoundaryDetector
+        return ShotBoundaryDetector.cuts_to_processed(self.shot_cut_frames, self.processed_frames)
+    
     def get_segment_offsets_frames(self):
         """Calcule les offsets en frames"""
         if not self.is_segment_mode:
@@ -2,8 +2,35 @@
 Modules d'enrichissement EVA2SPORT
 """
 
-from .annotation_enricher import AnnotationEnricher
-from .projection_utils import ProjectionUtils
-from .bbox_calculator import BBoxCalculator
+import importlib
 
-__all__ = ['AnnotationEnricher', 'ProjectionUtils', 'BBoxCalculator']
\ No newline at end of file
+# Imports différés : les workers de parallel_enricher importent ce paquet
+# sans charger torch (annotation_enricher, mask_ops) ni la configuration
+_LAZY_IMPORTS = {
+    'AnnotationEnricher': '.annotation_enricher',
+    'ProjectionUtils': '.projection_utils',
+    'BBoxCalculator': '.bbox_calculator',
+    'FieldProjector': '.field_projector',
+    'CalibrationTrack': '.calibration_track',
+    'compute_mask_stats': '.mask_ops',
+    'BatchRLEEncoder': '.rle_encoder',
+    'ParallelFrameEnricher': '.parallel_enricher',
+    'TrajectorySmoother': '.trajectory_smoother',
+    'CalibrationReenricher': '.reenricher',
+}
+
+
+def __getattr__(name: str):
+    """Charge un module d'enrichissement au premier accès"""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ['AnnotationEnricher', 'ProjectionUtils', 'BBoxCalculator', 'FieldProjector',
+           'CalibrationTrack', 'compute_mask_stats',
+           'BatchRLEEncoder', 'ParallelFrameEnricher', 'TrajectorySmoother',
+           'CalibrationReenricher']
\ No newline at end of file
@@ -5,16 +5,22 @@ Extrait du notebook SAM_inference_segment.ipynb
 
 import uuid
 import base64
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
 import numpy as np
 import torch
-from pycocotools.mask import encode as encode_rle, toBbox
+from pycocotools.mask import frPyObjects
 
 from ..config import Config
+from ..utils.frame_mapping import FrameMapping
 from .projection_utils import ProjectionUtils
 from .bbox_calculator import BBoxCalculator
+from .field_projector import FieldProjector
+from .calibration_track import CalibrationTrack
+from .mask_ops import compute_mask_stats
+from .rle_encoder import BatchRLEEncoder
+from .parallel_enricher import ParallelFrameEnricher
 
 
 class AnnotationEnricher:
@@ -24,7 +30,23 @@ class AnnotationEnricher:
         self.config = config
         self.projection_utils = ProjectionUtils()
         self.bbox_calculator = BBoxCalculator()
+        self.rle_encoder = BatchRLEEncoder()
+        # Pool de l'enrichissement parallèle, démarré au premier usage (ENRICHMENT_WORKERS)
+        self._frame_enricher: Optional[ParallelFrameEnricher] = None
     
+    def start_workers(self) -> None:
+        """Démarre le pool de l'enrichissement parallèle (recouvre la propagation SAM2)"""
+        if self.config.ENRICHMENT_WORKERS == 0 or self.config.MASK_OUTPUT == 'bbox':
+            return
+        if self._frame_enricher is None:
+            self._frame_enricher = ParallelFrameEnricher(self.config.ENRICHMENT_WORKERS)
+        self._frame_enricher.start()
+    
+    def close(self) -> None:
+        """Arrête le pool de workers de l'enrichissement parallèle"""
+        if self._frame_enricher is not None:
+            self._frame_enricher.close()
+            self._frame_enricher = None
 
     
     def enrich_all_annotations(self, project_data: Dict[str, Any], 
@@ -33,36 +55,47 @@ class AnnotationEnricher:
         
         print("🎯 Enrichissement des annotations avec projections terrain...")
         
-        cam_params = project_config['calibration']['camera_parameters']
-        enriched_count = 0
+        projector = self.build_projector(project_config)
         
-        for frame_idx, annotations in project_data['annotations'].items():
-            for annotation in annotations:
-                # Enrichir avec projection terrain si bbox disponible
-                if annotation.get('bbox', {}).get('output'):
-                    bbox = annotation['bbox']['output']
-                    points_output = self.bbox_calculator.calculate_points_from_bbox(
-                        bbox, cam_params
-                    )
-                    annotation['points']['output'] = points_output
-                    enriched_count += 1
+        # Projection de tout le segment en un seul lot
+        annotations = []
+        frames = []
+        for frame_idx, frame_annotations in project_data['annotations'].items():
+            original_frame = self.config.original_frame_for_index(int(frame_idx))
+            annotations.extend(frame_annotations)
+            frames.extend([original_frame] * len(frame_annotations))
+        enriched_count = self._project_annotations(annotations, projector, frames)
         
         print(f"✅ {enriched_count} annotations enrichies avec projections terrain")
         return project_data
     
     def process_propagation_results(self, propagation_results: Dict[str, Any], 
                                   project_data: Dict[str, Any], 
-                                  project_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Convertit les résultats de propagation SAM2 en annotations enrichies"""
+                                  project_config: Dict[str, Any],
+                                  verbose: bool = True,
+                                  projector: Optional[Union[FieldProjector, CalibrationTrack]] = None) -> Dict[str, Any]:
+        """
+        Convertit les résultats de propagation SAM2 en annotations enrichies
+        
+        Peut être appelé bloc par bloc (écriture en flux) : les annotations de
+        chaque appel s'ajoutent à celles du projet, et le projecteur construit
+        une fois par flux (build_projector) garde son cache d'une frame à l'autre.
+        """
         
-        print("🎯 Traitement des résultats de propagation...")
+        if verbose:
+            print("🎯 Traitement des résultats de propagation...")
         
         # Initialiser les annotations si nécessaire
         if 'annotations' not in project_data:
             project_data['annotations'] = {}
         
-        cam_params = project_config['calibration']['camera_parameters']
-        total_processed = 0
+        if projector is None:
+            projector = self.build_projector(project_config)
+        created_annotations = []
+        created_frames = []
+        
+        # Stats et RLE de toutes les frames en parallèle (fusion dans l'ordre des frames)
+        frame_stats = self._compute_propagation_stats(propagation_results, verbose)
         
         # Traiter chaque frame de la propagation
         for frame_idx, frame_results in propagation_results.items():
@@ -73,20 +106,30 @@ class AnnotationEnricher:
             if str(frame_idx) not in project_data['annotations']:
                 project_data['annotations'][str(frame_idx)] = []
             
-            # Traiter chaque objet détecté
-            for i, obj_id in enumerate(obj_ids):
-                annotation = self._create_mask_annotation(
-                    obj_id=obj_id,
-                    mask_logits=mask_logits[i],
+            # Traiter tous les objets de la frame en une fois
+            if frame_stats is not None:
+                frame_annotations = self._build_frame_annotations(
+                    obj_ids, frame_stats[frame_idx], mask_logits.shape[-2:],
+                    predictor=None, inference_state=None, frame_idx=frame_idx
+                )
+            else:
+                frame_annotations = self._create_frame_annotations(
+                    obj_ids=obj_ids,
+                    mask_logits=mask_logits,
                     predictor=None,  # Passé None car nous n'avons pas accès direct ici
                     inference_state=None,
-                    frame_idx=frame_idx,
-                    cam_params=cam_params
+                    frame_idx=frame_idx
                 )
-                project_data['annotations'][str(frame_idx)].append(annotation)
-                total_processed += 1
+            project_data['annotations'][str(frame_idx)].extend(frame_annotations)
+            created_annotations.extend(frame_annotations)
+            created_frames.extend([self.config.original_frame_for_index(int(frame_idx))] * len(obj_ids))
+        
+        # Points image/terrain de tout le segment en une projection
+        self._project_annotations(created_annotations, projector, created_frames)
+        total_processed = len(created_annotations)
         
-        print(f"✅ {total_processed} annotations créées depuis la propagation")
+        if verbose:
+            print(f"✅ {total_processed} annotations créées depuis la propagation")
         return project_data
     
     # ===== MÉTHODES AUXILIAIRES (SEULEMENT CELLES LIÉES À L'ENRICHISSEMENT) =====
@@ -109,12 +152,9 @@ class AnnotationEnricher:
         else:
             # Mode complet : utiliser le mapping
             anchor_frame = project_data['metadata']['anchor_frame']
-            frame_mapping = project_data['metadata']['frame_mapping']
+            processed_idx = FrameMapping.from_project_data(project_data).processed_index(anchor_frame)
             
-            if anchor_frame < len(frame_mapping) and frame_mapping[anchor_frame] is not None:
-                return frame_mapping[anchor_frame]
-            
-            return 0
+            return processed_idx if processed_idx is not None else 0
     
     def _process_frame_annotations(self, project_data: Dict[str, Any], 
                                  project_config: Dict[str, Any],
@@ -126,75 +166,144 @@ class AnnotationEnricher:
         if str(frame_idx) not in project_data['annotations']:
             project_data['annotations'][str(frame_idx)] = []
 
-        cam_params = project_config['calibration']['camera_parameters']
-
+        frame_annotations = self._create_frame_annotations(
+            obj_ids=obj_ids,
+            mask_logits=mask_logits,
+            predictor=predictor,
+            inference_state=inference_state,
+            frame_idx=frame_idx
+        )
+        
+        # Une projection pour tous les objets de la frame
+        original_frame = self.config.original_frame_for_index(int(frame_idx))
+        self._project_annotations(frame_annotations, self.build_projector(project_config),
+                                  [original_frame] * len(frame_annotations))
+        project_data['annotations'][str(frame_idx)].extend(frame_annotations)
+    
+    def _create_frame_annotations(self, obj_ids: List[int], mask_logits: torch.Tensor,
+                                  predictor, inference_state, frame_idx: int) -> List[Dict]:
+        """
+        Crée les annotations de tous les objets d'une frame (points calculés ensuite par _project_annotations)
+        
+        Présence, aire, bbox et centroïde sont calculés sur le device en une réduction ;
+        seuls les masques non vides sont copiés vers l'hôte, et aucun en mode 'bbox'.
+        """
+        stats = compute_mask_stats(mask_logits)
+        
+        # Transfert groupé des seuls masques persistés, encodés en un appel
+        stats['masks'] = {}
+        present_rows = np.flatnonzero(stats['present'])
+        if self.config.MASK_OUTPUT != 'bbox' and len(present_rows):
+            masks = mask_logits[torch.as_tensor(present_rows, device=mask_logits.device)] > 0.0
+            if masks.ndim == 4:
+                masks = masks[:, 0]
+            stats['masks'] = dict(zip(present_rows.tolist(), self.rle_encoder.encode_base64(masks)))
+        
+        return self._build_frame_annotations(obj_ids, stats, mask_logits.shape[-2:],
+                                             predictor, inference_state, frame_idx)
+    
+    def _build_frame_annotations(self, obj_ids: List[int], stats: Dict[str, Any], mask_size,
+                                 predictor, inference_state, frame_idx: int) -> List[Dict]:
+        """Assemble les annotations d'une frame à partir des stats et des masques encodés"""
+        height, width = int(mask_size[0]), int(mask_size[1])
+        keep_masks = self.config.MASK_OUTPUT != 'bbox'
+        encoded_masks = stats['masks']
+        
+        annotations = []
         for i, obj_id in enumerate(obj_ids):
-            annotation = self._create_mask_annotation(
-                obj_id=obj_id,
-                mask_logits=mask_logits[i],
-                predictor=predictor,
-                inference_state=inference_state,
-                frame_idx=frame_idx,
-                cam_params=cam_params
-            )
-            project_data['annotations'][str(frame_idx)].append(annotation)
+            mask_output = None
+            if keep_masks:
+                mask_output = encoded_masks.get(i)
+                if mask_output is None:
+                    # Masque vide : RLE construit sans données
+                    rle = frPyObjects({"size": [height, width], "counts": [height * width]}, height, width)
+                    mask_output = {
+                        "format": "rle_coco_base64",
+                        "size": [int(rle["size"][0]), int(rle["size"][1])],
+                        "counts": base64.b64encode(rle["counts"]).decode('ascii')
+                    }
+            
+            bbox_output = None
+            centroid = None
+            if stats['present'][i]:
+                x, y, w, h = stats['bbox'][i]
+                bbox_output = {"x": int(x), "y": int(y), "width": int(w), "height": int(h)}
+                centroid = {"x": float(stats['centroid'][i, 0]), "y": float(stats['centroid'][i, 1])}
+            
+            annotations.append({
+                "id": str(uuid.uuid4()),
+                "objectId": str(obj_id),
+                "type": "mask" if keep_masks else "bbox",
+                "mask": mask_output,
+                "bbox": {
+                    "output": bbox_output
+                },
+                "points": {
+                    "output": None
+                },
+                "area": int(stats['area'][i]),
+                "centroid": centroid,
+                "maskScore": self._get_object_score(predictor, inference_state, frame_idx, obj_id),
+                "pose": None,
+                "warning": False
+            })
+        
+        return annotations
     
-    def _create_mask_annotation(self, obj_id: int, mask_logits: torch.Tensor,
-                              predictor, inference_state, frame_idx: int,
-                              cam_params: Dict) -> Dict:
-        """Crée une annotation de masque complète"""
-        
-        # Conversion en masque binaire
-        mask = (mask_logits > 0.0).cpu().numpy()
-        if mask.ndim == 3 and mask.shape[0] == 1:
-            mask = np.squeeze(mask, axis=0)
-
-        # Encodage RLE
-        if not mask.flags['F_CONTIGUOUS']:
-            mask = np.asfortranarray(mask)
-
-        rle = encode_rle(mask.astype(np.uint8))
-        base64_counts = base64.b64encode(rle["counts"]).decode('ascii')
-
-        # Calcul bbox et points output
-        bbox_output = None
-        points_output = None
-
-        if mask.sum() > 0:
-            bbox = toBbox(rle)
-            bbox_output = {
-                "x": int(bbox[0]),
-                "y": int(bbox[1]),
-                "width": int(bbox[2]),
-                "height": int(bbox[3])
-            }
-            # Calcul des points output depuis la bbox
-            points_output = self.bbox_calculator.calculate_points_from_bbox(
-                bbox_output, cam_params
-            )
-
-        # Score du masque
-        mask_score = self._get_object_score(predictor, inference_state, frame_idx, obj_id)
-
-        return {
-            "id": str(uuid.uuid4()),
-            "objectId": str(obj_id),
-            "type": "mask",
-            "mask": {
-                "format": "rle_coco_base64",
-                "size": [int(rle["size"][0]), int(rle["size"][1])],
-                "counts": base64_counts
-            },
-            "bbox": {
-                "output": bbox_output
-            },
-            "points": {
-                "output": points_output
-            },
-            "maskScore": mask_score,
-            "pose": None,
-            "warning": False
-        }
+    def _compute_propagation_stats(self, propagation_results: Dict[str, Any],
+                                   verbose: bool = True) -> Optional[Dict[Any, Dict]]:
+        """
+        Stats de toutes les frames sur le device, RLE sur le pool de workers
+        (persistant, arrêté par close())
+        
+        Returns:
+            {frame_idx: stats} ou None si l'enrichissement reste séquentiel
+            (workers désactivés, mode 'bbox' sans masques à encoder, une seule frame)
+        """
+        workers = self.config.ENRICHMENT_WORKERS
+        if workers == 0 or self.config.MASK_OUTPUT == 'bbox' or len(propagation_results) < 2:
+            return None
+        
+        frame_indices = list(propagation_results.keys())
+        frame_logits = [propagation_results[frame_idx]['mask_logits'] for frame_idx in frame_indices]
+        
+        if self._frame_enricher is None:
+            self._frame_enricher = ParallelFrameEnricher(workers)
+        if verbose:
+            print(f"⚙️ Enrichissement parallèle: {len(frame_indices)} frames sur {self._frame_enricher.workers} workers")
+        return dict(zip(frame_indices, self._frame_enricher.run(frame_logits)))
+    
+    def build_projector(self, project_config: Dict[str, Any]) -> Union[FieldProjector, CalibrationTrack]:
+        """Projection du projet : piste de calibration si présente, sinon calibration statique"""
+        calibration = project_config['calibration']
+        track = CalibrationTrack.from_calibration(calibration)
+        if track is not None:
+            return track
+        return FieldProjector(calibration['camera_parameters'])
+    
+    def _project_annotations(self, annotations: List[Dict],
+                             cam_params: Union[Dict, FieldProjector, CalibrationTrack],
+                             frames: Optional[List[int]] = None) -> int:
+        """
+        Calcule les points output (image + terrain) d'un lot d'annotations en une projection
+        
+        Args:
+            annotations: Annotations à enrichir
+            cam_params: Calibration, projecteur compilé ou piste de calibration
+            frames: Frame originale de chaque annotation (calibration variable)
+        
+        Returns:
+            Nombre d'annotations avec une bbox (donc enrichies)
+        """
+        indices = [i for i, a in enumerate(annotations) if a.get('bbox', {}).get('output')]
+        with_bbox = [annotations[i] for i in indices]
+        points = self.bbox_calculator.calculate_points_from_bboxes(
+            [a['bbox']['output'] for a in with_bbox], cam_params,
+            [frames[i] for i in indices] if frames is not None else None
+        )
+        for annotation, points_output in zip(with_bbox, points):
+            annotation.setdefault('points', {})['output'] = points_output
+        return len(with_bbox)
     
     def _get_object_score(self, predictor, inference_state, frame_idx: int, obj_id: int) -> Optional[float]:
         """Récupère le score d'objet de manière sûre"""
@@ -2,9 +2,12 @@
 Calculateur de bounding boxes et points de projection
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 import numpy as np
 
+from .field_projector import FieldProjector
+from .calibration_track import CalibrationTrack
+
 
 class BBoxCalculator:
     """Calcule les bounding boxes et projections terrain"""
@@ -21,66 +24,68 @@ class BBoxCalculator:
         Returns:
             Dict avec points image et terrain
         """
-        if not bbox:
-            return None
-
-        # Point CENTER_BOTTOM dans le plan image
-        center_bottom_x = bbox['x'] + bbox['width'] / 2
-        center_bottom_y = bbox['y'] + bbox['height']  # Bas de la bbox
-
-        # Structure de base
-        points_output = {
-            "image": {
-                "CENTER_BOTTOM": {
-                    "x": float(center_bottom_x),
-                    "y": float(center_bottom_y)
-                }
-            },
-            "field": {
-                "CENTER_BOTTOM": None
-            }
-        }
-
+        return self.calculate_points_from_bboxes([bbox], cam_params)[0]
+    
+    def calculate_points_from_bboxes(self, bboxes: List[Optional[Dict[str, int]]],
+                                     cam_params: Union[Dict, FieldProjector, CalibrationTrack, None] = None,
+                                     frames: Optional[List[int]] = None) -> List[Optional[Dict]]:
+        """
+        Calcule les points de sortie d'un lot de bounding boxes en une projection
+        
+        Args:
+            bboxes: Liste de dicts 'x', 'y', 'width', 'height' (None ignorés)
+            cam_params: Paramètres de calibration caméra, FieldProjector déjà compilé
+                ou CalibrationTrack (calibration variable dans le temps)
+            frames: Frame originale de chaque bbox (requis avec une CalibrationTrack)
+            
+        Returns:
+            Points image et terrain par bbox (None pour les bbox absentes)
+        """
+        valid = [i for i, bbox in enumerate(bboxes) if bbox]
+        results: List[Optional[Dict]] = [None] * len(bboxes)
+        if not valid:
+            return results
+        
+        # Points CENTER_BOTTOM dans le plan image
+        boxes = np.array([
+            [bboxes[i]['x'], bboxes[i]['y'], bboxes[i]['width'], bboxes[i]['height']] for i in valid
+        ], dtype=np.float64)
+        image_points = FieldProjector.bbox_bottom_centers(boxes)
+        
         # Projection terrain si paramètres fournis
+        field_points = None
         if cam_params:
             try:
-                image_point = [center_bottom_x, center_bottom_y]
-                field_point = self._image_to_world(image_point, cam_params)
-
-                points_output["field"]["CENTER_BOTTOM"] = {
-                    "x": float(field_point[0]),
-                    "y": float(field_point[1])
-                }
-
+                if isinstance(cam_params, CalibrationTrack):
+                    field_points = cam_params.image_to_field([frames[i] for i in valid], image_points)
+                else:
+                    projector = cam_params if isinstance(cam_params, FieldProjector) else FieldProjector(cam_params)
+                    field_points = projector.image_to_field(image_points)
             except Exception as e:
                 print(f"⚠️ Erreur projection terrain: {e}")
-                points_output["field"]["CENTER_BOTTOM"] = None
-
-        return points_output
+        
+        for row, i in enumerate(valid):
+            field_point = None
+            if field_points is not None and np.all(np.isfinite(field_points[row])):
+                field_point = {
+                    "x": float(field_points[row, 0]),
+                    "y": float(field_points[row, 1])
+                }
+            
+            results[i] = {
+                "image": {
+                    "CENTER_BOTTOM": {
+                        "x": float(image_points[row, 0]),
+                        "y": float(image_points[row, 1])
+                    }
+                },
+                "field": {
+                    "CENTER_BOTTOM": field_point
+                }
+            }
+        
+        return results
     
     def _image_to_world(self, point_2d, cam_params):
         """Projette un point 2D vers le plan terrain (Z=0)"""
-        
-        # Matrice de projection P
-        K = np.array([
-            [cam_params["cam_params"]["x_focal_length"], 0, cam_params["cam_params"]["principal_point"][0]],
-            [0, cam_params["cam_params"]["y_focal_length"], cam_params["cam_params"]["principal_point"][1]],
-            [0, 0, 1]
-        ])
-        R = np.array(cam_params["cam_params"]["rotation_matrix"])
-        t = -R @ np.array(cam_params["cam_params"]["position_meters"])
-        P = K @ np.hstack((R, t.reshape(-1,1)))
-
-        # Point sur le plan image en coordonnées homogènes
-        point_2d_h = np.array([point_2d[0], point_2d[1], 1])
-
-        # Rétro-projection du rayon depuis la caméra
-        ray = np.linalg.inv(K) @ point_2d_h
-        ray = R.T @ ray
-
-        # Intersection avec le plan Z=0
-        camera_pos = np.array(cam_params["cam_params"]["position_meters"])
-        t = -camera_pos[2] / ray[2]
-        world_point = camera_pos + t * ray
-
-        return world_point[:2]  # Retourner seulement X,Y puisque Z=0
\ No newline at end of file
+        return FieldProjector(cam_params).image_to_field([point_2d])[0]
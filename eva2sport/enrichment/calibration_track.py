@@ -0,0 +1,241 @@
+"""
+Calibration caméra variable dans le temps
+Keyframes de paramètres caméra interpolés par frame (slerp rotation, lerp focale)
+"""
+
+import numpy as np
+from typing import Dict, Any, List, Optional, Iterable
+
+from .field_projector import FieldProjector, distort_points, undistort_points
+
+
+def rotation_matrices_to_quaternions(rotations: np.ndarray) -> np.ndarray:
+    """Convertit des matrices de rotation (N, 3, 3) en quaternions unitaires (N, 4) [w, x, y, z]"""
+    R = np.asarray(rotations, dtype=np.float64).reshape(-1, 3, 3)
+    quats = np.empty((len(R), 4))
+
+    for i, m in enumerate(R):
+        trace = m[0, 0] + m[1, 1] + m[2, 2]
+        if trace > 0:
+            s = 2.0 * np.sqrt(trace + 1.0)
+            quats[i] = [0.25 * s, (m[2, 1] - m[1, 2]) / s, (m[0, 2] - m[2, 0]) / s, (m[1, 0] - m[0, 1]) / s]
+        elif m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+            s = 2.0 * np.sqrt(1.0 + m[0, 0] - m[1, 1] - m[2, 2])
+            quats[i] = [(m[2, 1] - m[1, 2]) / s, 0.25 * s, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s]
+        elif m[1, 1] > m[2, 2]:
+            s = 2.0 * np.sqrt(1.0 + m[1, 1] - m[0, 0] - m[2, 2])
+            quats[i] = [(m[0, 2] - m[2, 0]) / s, (m[0, 1] + m[1, 0]) / s, 0.25 * s, (m[1, 2] + m[2, 1]) / s]
+        else:
+            s = 2.0 * np.sqrt(1.0 + m[2, 2] - m[0, 0] - m[1, 1])
+            quats[i] = [(m[1, 0] - m[0, 1]) / s, (m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, 0.25 * s]
+
+    return quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+
+def quaternions_to_rotation_matrices(quats: np.ndarray) -> np.ndarray:
+    """Convertit des quaternions (N, 4) [w, x, y, z] en matrices de rotation (N, 3, 3)"""
+    q = np.asarray(quats, dtype=np.float64).reshape(-1, 4)
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    w, x, y, z = q.T
+
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=-1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=-1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=-1)
+    ], axis=1)
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """Interpolation sphérique vectorisée entre quaternions (N, 4) pour des poids (N,)"""
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64).copy()
+    alpha = np.asarray(alpha, dtype=np.float64)[:, None]
+
+    # Chemin le plus court
+    dot = np.sum(q0 * q1, axis=1, keepdims=True)
+    q1 = np.where(dot < 0, -q1, q1)
+    dot = np.abs(dot)
+
+    # Quaternions presque identiques : interpolation linéaire normalisée
+    linear = dot > 0.9995
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.where(linear, 1.0, np.sin(theta))
+    w0 = np.where(linear, 1 - alpha, np.sin((1 - alpha) * theta) / sin_theta)
+    w1 = np.where(linear, alpha, np.sin(alpha * theta) / sin_theta)
+
+    result = w0 * q0 + w1 * q1
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
+
+
+class CalibrationTrack:
+    """
+    Calibration keyframée, interpolée pour chaque frame
+
+    Entre deux keyframes, la rotation est interpolée par slerp et les autres
+    paramètres (focales, point principal, position, distorsion) linéairement ;
+    hors des keyframes, la calibration la plus proche est conservée. Les
+    matrices par frame sont calculées une fois puis gardées en cache sous
+    forme de tableaux, et les projections prennent des lots (frames, points).
+    """
+
+    def __init__(self, keyframes: List[Dict[str, Any]]):
+        """
+        Args:
+            keyframes: Liste de {'frame': frame originale, 'camera_parameters': {...}}
+                au même format que calibration.camera_parameters
+        """
+        if not keyframes:
+            raise ValueError("❌ Piste de calibration vide")
+
+        keyframes = sorted(keyframes, key=lambda k: k['frame'])
+        params = [k['camera_parameters']['cam_params'] for k in keyframes]
+
+        self.key_frames = np.array([k['frame'] for k in keyframes], dtype=np.float64)
+        self.key_quats = rotation_matrices_to_quaternions([p['rotation_matrix'] for p in params])
+        # Paramètres interpolés linéairement : fx, fy, cx, cy, position (3), distorsion (12)
+        self.key_linear = np.array([
+            [p['x_focal_length'], p['y_focal_length'], *p['principal_point'][:2], *p['position_meters'][:3],
+             *FieldProjector.coefficients(p.get('radial_distortion'), 6),
+             *FieldProjector.coefficients(p.get('tangential_distortion'), 2),
+             *FieldProjector.coefficients(p.get('thin_prism_distortion'), 4)]
+            for p in params
+        ], dtype=np.float64)
+        self.has_distortion = bool(np.any(self.key_linear[:, 7:]))
+
+        # Cache des paramètres compilés par frame
+        self._frames = np.empty(0, dtype=np.int64)
+        self._rotations = np.empty((0, 3, 3))
+        self._linear = np.empty((0, self.key_linear.shape[1]))
+        self._backprojections = np.empty((0, 3, 3))
+        self._projections = np.empty((0, 3, 4))
+
+    @classmethod
+    def from_calibration(cls, calibration: Dict[str, Any]) -> Optional['CalibrationTrack']:
+        """Crée la piste depuis calibration['camera_track'] (None si calibration statique)"""
+        keyframes = (calibration or {}).get('camera_track')
+        return cls(keyframes) if keyframes else None
+
+    def interpolate(self, frames: Iterable[int]) -> Dict[str, np.ndarray]:
+        """
+        Paramètres interpolés pour des frames originales
+
+        Returns:
+            Dict avec 'rotation' (N, 3, 3) et 'linear' (N, 19) [fx, fy, cx, cy, position, distorsion]
+        """
+        frames = np.asarray(list(frames) if not isinstance(frames, np.ndarray) else frames, dtype=np.float64)
+        n_keys = len(self.key_frames)
+
+        upper = np.clip(np.searchsorted(self.key_frames, frames, side='right'), 1, max(1, n_keys - 1))
+        lower = upper - 1
+        if n_keys == 1:
+            upper = lower
+
+        span = self.key_frames[upper] - self.key_frames[lower]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha = np.where(span > 0, (frames - self.key_frames[lower]) / span, 0.0)
+        alpha = np.clip(alpha, 0.0, 1.0)
+
+        quats = slerp(self.key_quats[lower], self.key_quats[upper], alpha)
+        linear = self.key_linear[lower] + alpha[:, None] * (self.key_linear[upper] - self.key_linear[lower])
+
+        return {'rotation': quaternions_to_rotation_matrices(quats), 'linear': linear}
+
+    def compile(self, frames: Iterable[int]) -> None:
+        """Pré-calcule et met en cache les matrices des frames absentes du cache"""
+        frames = np.unique(np.asarray(list(frames), dtype=np.int64))
+        missing = np.setdiff1d(frames, self._frames, assume_unique=True)
+        if len(missing) == 0:
+            return
+
+        params = self.interpolate(missing)
+        rotations, linear = params['rotation'], params['linear']
+
+        K = np.zeros((len(missing), 3, 3))
+        K[:, 0, 0], K[:, 1, 1] = linear[:, 0], linear[:, 1]
+        K[:, 0, 2], K[:, 1, 2] = linear[:, 2], linear[:, 3]
+        K[:, 2, 2] = 1.0
+        positions = linear[:, 4:7]
+
+        t = -np.einsum('nij,nj->ni', rotations, positions)
+        projections = K @ np.concatenate((rotations, t[:, :, None]), axis=2)
+        backprojections = np.transpose(rotations, (0, 2, 1)) @ np.linalg.inv(K)
+
+        all_frames = np.concatenate((self._frames, missing))
+        order = np.argsort(all_frames)
+        self._frames = all_frames[order]
+        self._rotations = np.concatenate((self._rotations, rotations))[order]
+        self._linear = np.concatenate((self._linear, linear))[order]
+        self._backprojections = np.concatenate((self._backprojections, backprojections))[order]
+        self._projections = np.concatenate((self._projections, projections))[order]
+
+    def image_to_field(self, frames: Iterable[int], image_points: np.ndarray) -> np.ndarray:
+        """
+        Projette un lot de points image sur le terrain, chacun avec la calibration de sa frame
+
+        Args:
+            frames: Frame originale de chaque point (N,)
+            image_points: Points (N, 2) en pixels
+
+        Returns:
+            Points terrain (N, 2) en mètres
+        """
+        points = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+        rows = self._rows_for(frames)
+        linear = self._linear[rows]
+        positions = linear[:, 4:7]
+
+        if self.has_distortion:
+            normalized = (points - linear[:, 2:4]) / linear[:, 0:2]
+            normalized = undistort_points(
+                normalized, linear[:, 7:13].T, linear[:, 13:15].T, linear[:, 15:19].T,
+                FieldProjector.UNDISTORT_MAX_ITERATIONS, FieldProjector.UNDISTORT_TOLERANCE
+            )
+            homogeneous = np.hstack((normalized, np.ones((len(points), 1))))
+            rays = np.einsum('nji,nj->ni', self._rotations[rows], homogeneous)
+        else:
+            homogeneous = np.hstack((points, np.ones((len(points), 1))))
+            rays = np.einsum('nij,nj->ni', self._backprojections[rows], homogeneous)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = -positions[:, 2] / rays[:, 2]
+        return (positions + scale[:, None] * rays)[:, :2]
+
+    def field_to_image(self, frames: Iterable[int], field_points: np.ndarray) -> np.ndarray:
+        """Projette un lot de points terrain (N, 2) dans l'image de leur frame"""
+        points = np.atleast_2d(np.asarray(field_points, dtype=np.float64))
+        if points.shape[1] == 2:
+            points = np.hstack((points, np.zeros((len(points), 1))))
+        rows = self._rows_for(frames)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.has_distortion:
+                linear = self._linear[rows]
+                camera_points = np.einsum('nij,nj->ni', self._rotations[rows], points - linear[:, 4:7])
+                normalized = camera_points[:, :2] / camera_points[:, 2:3]
+                distorted = distort_points(normalized, linear[:, 7:13].T, linear[:, 13:15].T, linear[:, 15:19].T)
+                return distorted * linear[:, 0:2] + linear[:, 2:4]
+
+            homogeneous = np.hstack((points, np.ones((len(points), 1))))
+            image_h = np.einsum('nij,nj->ni', self._projections[rows], homogeneous)
+            return image_h[:, :2] / image_h[:, 2:3]
+
+    def projector_for_frame(self, frame: int) -> FieldProjector:
+        """FieldProjector statique avec la calibration interpolée d'une frame"""
+        params = self.interpolate([frame])
+        linear = params['linear'][0]
+        return FieldProjector({"cam_params": {
+            "x_focal_length": linear[0],
+            "y_focal_length": linear[1],
+            "principal_point": linear[2:4].tolist(),
+            "position_meters": linear[4:7].tolist(),
+            "rotation_matrix": params['rotation'][0].tolist(),
+            "radial_distortion": linear[7:13].tolist(),
+            "tangential_distortion": linear[13:15].tolist(),
+            "thin_prism_distortion": linear[15:19].tolist()
+        }})
+
+    def _rows_for(self, frames: Iterable[int]) -> np.ndarray:
+        """Lignes du cache correspondant à chaque frame (compile les frames manquantes)"""
+        frames = np.asarray(list(frames) if not isinstance(frames, np.ndarray) else frames, dtype=np.int64)
+        self.compile(frames)
+        return np.searchsorted(self._frames, frames)
@@ -0,0 +1,185 @@
+"""
+Moteur de projection image ↔ terrain
+Compile une calibration une seule fois et projette N points en un appel NumPy
+"""
+
+import numpy as np
+from typing import Dict, Any
+
+
+def distortion_terms(x: np.ndarray, y: np.ndarray, radial: np.ndarray,
+                     tangential: np.ndarray, thin_prism: np.ndarray):
+    """
+    Facteur radial et décalages tangentiel + prisme fin
+
+    Les coefficients ont la forme (6,), (2,), (4,) pour une calibration
+    commune, ou (6, N), (2, N), (4, N) pour une calibration par point.
+    """
+    k1, k2, k3, k4, k5, k6 = radial
+    p1, p2 = tangential
+    s1, s2, s3, s4 = thin_prism
+
+    r2 = x * x + y * y
+    r4 = r2 * r2
+    r6 = r4 * r2
+    radial_factor = (1 + k1 * r2 + k2 * r4 + k3 * r6) / (1 + k4 * r2 + k5 * r4 + k6 * r6)
+    xy = x * y
+    dx = 2 * p1 * xy + p2 * (r2 + 2 * x * x) + s1 * r2 + s2 * r4
+    dy = p1 * (r2 + 2 * y * y) + 2 * p2 * xy + s3 * r2 + s4 * r4
+    return radial_factor, dx, dy
+
+
+def distort_points(normalized: np.ndarray, radial: np.ndarray,
+                   tangential: np.ndarray, thin_prism: np.ndarray) -> np.ndarray:
+    """Applique la distorsion à des coordonnées normalisées (N, 2)"""
+    x, y = normalized[:, 0], normalized[:, 1]
+    radial_factor, dx, dy = distortion_terms(x, y, radial, tangential, thin_prism)
+    return np.stack((x * radial_factor + dx, y * radial_factor + dy), axis=1)
+
+
+def undistort_points(distorted: np.ndarray, radial: np.ndarray, tangential: np.ndarray,
+                     thin_prism: np.ndarray, max_iterations: int = 20,
+                     tolerance: float = 1e-10) -> np.ndarray:
+    """
+    Inverse la distorsion de coordonnées normalisées (N, 2)
+
+    Itération de point fixe x = (x_d - δ(x)) / radial(x), vectorisée sur
+    tous les points, arrêtée quand tous les points ont convergé.
+    """
+    xd, yd = distorted[:, 0], distorted[:, 1]
+    x, y = xd.copy(), yd.copy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(max_iterations):
+            radial_factor, dx, dy = distortion_terms(x, y, radial, tangential, thin_prism)
+            x_new = (xd - dx) / radial_factor
+            y_new = (yd - dy) / radial_factor
+            delta = np.nanmax(np.abs(x_new - x) + np.abs(y_new - y), initial=0.0)
+            x, y = x_new, y_new
+            if delta < tolerance:
+                break
+
+    return np.stack((x, y), axis=1)
+
+
+class FieldProjector:
+    """
+    Projection vectorisée entre le plan image et le plan terrain (Z=0)
+
+    Les matrices (K, K⁻¹, R, P et la matrice de rétro-projection R^T·K⁻¹) sont
+    calculées à la construction ; les méthodes de projection travaillent sur des
+    tableaux (N, 2) sans boucle Python.
+
+    La distorsion suit le modèle de calibration SoccerNet (identique à OpenCV) :
+    radiale rationnelle (k1..k3 au numérateur, k4..k6 au dénominateur),
+    tangentielle (p1, p2) et prisme fin (s1..s4). Sans distorsion, la
+    projection reste purement linéaire.
+    """
+
+    UNDISTORT_MAX_ITERATIONS = 20
+    UNDISTORT_TOLERANCE = 1e-10
+
+    def __init__(self, cam_params: Dict[str, Any]):
+        """
+        Args:
+            cam_params: Paramètres de calibration (clé 'cam_params' du projet)
+        """
+        params = cam_params["cam_params"]
+
+        self.K = np.array([
+            [params["x_focal_length"], 0, params["principal_point"][0]],
+            [0, params["y_focal_length"], params["principal_point"][1]],
+            [0, 0, 1]
+        ], dtype=np.float64)
+        self.R = np.array(params["rotation_matrix"], dtype=np.float64)
+        self.camera_position = np.array(params["position_meters"], dtype=np.float64)
+
+        t = -self.R @ self.camera_position
+        self.P = self.K @ np.hstack((self.R, t.reshape(-1, 1)))
+        self.K_inv = np.linalg.inv(self.K)
+
+        # Rayon monde = R^T · K⁻¹ · [u, v, 1]
+        self._backprojection = self.R.T @ self.K_inv
+        
+        # Coefficients de distorsion (absents = 0)
+        self.radial = self.coefficients(params.get("radial_distortion"), 6)
+        self.tangential = self.coefficients(params.get("tangential_distortion"), 2)
+        self.thin_prism = self.coefficients(params.get("thin_prism_distortion"), 4)
+        self.has_distortion = bool(
+            np.any(self.radial) or np.any(self.tangential) or np.any(self.thin_prism)
+        )
+
+    def image_to_field(self, image_points: np.ndarray) -> np.ndarray:
+        """
+        Projette des points image sur le plan terrain Z=0
+
+        Args:
+            image_points: Points (N, 2) en pixels
+
+        Returns:
+            Points terrain (N, 2) en mètres (NaN si le rayon est parallèle au terrain)
+        """
+        points = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+        if self.has_distortion:
+            normalized = self.undistort_normalized(self.image_to_normalized(points))
+            rays = normalized @ self.R.T[:, :2].T + self.R.T[:, 2]
+        else:
+            rays = points @ self._backprojection[:, :2].T + self._backprojection[:, 2]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = -self.camera_position[2] / rays[:, 2]
+        world = self.camera_position + scale[:, None] * rays
+        return world[:, :2]
+
+    def field_to_image(self, field_points: np.ndarray) -> np.ndarray:
+        """
+        Projette des points terrain (N, 2) ou monde (N, 3) dans l'image
+
+        Returns:
+            Points image (N, 2) en pixels
+        """
+        points = np.atleast_2d(np.asarray(field_points, dtype=np.float64))
+        if points.shape[1] == 2:
+            points = np.hstack((points, np.zeros((len(points), 1))))
+
+        if self.has_distortion:
+            camera_points = (points - self.camera_position) @ self.R.T
+            with np.errstate(divide='ignore', invalid='ignore'):
+                normalized = camera_points[:, :2] / camera_points[:, 2:3]
+            return self.normalized_to_image(self.distort_normalized(normalized))
+
+        image_h = points @ self.P[:, :3].T + self.P[:, 3]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return image_h[:, :2] / image_h[:, 2:3]
+
+    def image_to_normalized(self, image_points: np.ndarray) -> np.ndarray:
+        """Pixels (N, 2) → coordonnées normalisées (distordues) du plan caméra"""
+        return (image_points - self.K[:2, 2]) / np.diag(self.K)[:2]
+
+    def normalized_to_image(self, normalized: np.ndarray) -> np.ndarray:
+        """Coordonnées normalisées (N, 2) → pixels"""
+        return normalized * np.diag(self.K)[:2] + self.K[:2, 2]
+
+    def distort_normalized(self, normalized: np.ndarray) -> np.ndarray:
+        """Applique la distorsion à des coordonnées normalisées (N, 2)"""
+        return distort_points(normalized, self.radial, self.tangential, self.thin_prism)
+
+    def undistort_normalized(self, distorted: np.ndarray) -> np.ndarray:
+        """Inverse la distorsion de coordonnées normalisées (N, 2)"""
+        return undistort_points(distorted, self.radial, self.tangential, self.thin_prism,
+                                self.UNDISTORT_MAX_ITERATIONS, self.UNDISTORT_TOLERANCE)
+
+    @staticmethod
+    def coefficients(values, size: int) -> np.ndarray:
+        """Coefficients complétés par des zéros à la taille attendue"""
+        coefficients = np.zeros(size, dtype=np.float64)
+        if values:
+            values = np.asarray(values, dtype=np.float64).ravel()[:size]
+            coefficients[:len(values)] = values
+        return coefficients
+
+    @staticmethod
+    def bbox_bottom_centers(bboxes: np.ndarray) -> np.ndarray:
+        """Points CENTER_BOTTOM (N, 2) de bboxes (N, 4) au format [x, y, width, height]"""
+        boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        return np.stack((boxes[:, 0] + boxes[:, 2] / 2, boxes[:, 1] + boxes[:, 3]), axis=1)
@@ -0,0 +1,73 @@
+"""
+Opérations sur les masques côté tenseur
+Statistiques de tous les objets d'une frame calculées sur le device avant tout transfert
+"""
+
+import torch
+import numpy as np
+from typing import Dict
+
+
+def compute_mask_stats(mask_logits: torch.Tensor, threshold: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Calcule présence, aire, bbox et centroïde de N masques en une réduction batchée
+
+    Seul un petit tableau (N, 7) est copié vers l'hôte ; les masques pleine
+    résolution restent sur le device.
+
+    Args:
+        mask_logits: Logits SAM2 (N, 1, H, W) ou (N, H, W)
+        threshold: Seuil de binarisation des logits
+
+    Returns:
+        Dict avec 'present' (N,) bool, 'area' (N,) int, 'bbox' (N, 4) int
+        [x, y, width, height] (convention pycocotools toBbox) et 'centroid' (N, 2) float
+    """
+    masks = mask_logits > threshold
+    if masks.ndim == 4:
+        masks = masks[:, 0]
+
+    n_objects, height, width = masks.shape
+    if n_objects == 0:
+        return {
+            'present': np.zeros(0, dtype=bool),
+            'area': np.zeros(0, dtype=np.int64),
+            'bbox': np.zeros((0, 4), dtype=np.int64),
+            'centroid': np.zeros((0, 2), dtype=np.float64)
+        }
+
+    row_counts = masks.sum(dim=-1, dtype=torch.float32)   # (N, H)
+    col_counts = masks.sum(dim=-2, dtype=torch.float32)   # (N, W)
+    area = row_counts.sum(dim=-1)
+
+    y_idx = torch.arange(height, device=masks.device, dtype=torch.float32)
+    x_idx = torch.arange(width, device=masks.device, dtype=torch.float32)
+    rows = row_counts > 0
+    cols = col_counts > 0
+
+    y_min = torch.where(rows, y_idx, float(height)).amin(dim=-1)
+    y_max = torch.where(rows, y_idx, -1.0).amax(dim=-1)
+    x_min = torch.where(cols, x_idx, float(width)).amin(dim=-1)
+    x_max = torch.where(cols, x_idx, -1.0).amax(dim=-1)
+
+    safe_area = area.clamp(min=1.0)
+    centroid_x = (col_counts * x_idx).sum(dim=-1) / safe_area
+    centroid_y = (row_counts * y_idx).sum(dim=-1) / safe_area
+
+    # Un seul transfert device → hôte pour toute la frame
+    stats = torch.stack([area, x_min, y_min, x_max, y_max, centroid_x, centroid_y], dim=-1)
+    stats = stats.cpu().numpy().astype(np.float64)
+
+    present = stats[:, 0] > 0
+    bbox = np.zeros((n_objects, 4), dtype=np.int64)
+    bbox[present, 0] = stats[present, 1]
+    bbox[present, 1] = stats[present, 2]
+    bbox[present, 2] = stats[present, 3] - stats[present, 1] + 1
+    bbox[present, 3] = stats[present, 4] - stats[present, 2] + 1
+
+    return {
+        'present': present,
+        'area': stats[:, 0].astype(np.int64),
+        'bbox': bbox,
+        'centroid': np.where(present[:, None], stats[:, 5:7], np.nan)
+    }
@@ -0,0 +1,207 @@
+"""
+Enrichissement parallèle des frames
+Pool de processus persistant alimenté par des buffers de masques en mémoire partagée,
+résultats fusionnés dans l'ordre des frames
+
+Le module n'importe ni torch ni la pipeline : un worker 'spawn' ne charge que
+numpy, OpenCV et pycocotools.
+"""
+
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .rle_encoder import BatchRLEEncoder
+
+
+# État de chaque processus worker : encodeur et segment partagé attaché (par nom)
+_worker_encoder: Optional[BatchRLEEncoder] = None
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+_worker_memory_name: Optional[str] = None
+
+
+def _init_worker():
+    """Crée l'encodeur RLE du worker (une fois par processus)"""
+    global _worker_encoder
+    _worker_encoder = BatchRLEEncoder()
+
+
+def _ready() -> bool:
+    """Tâche vide : force le démarrage d'un worker"""
+    return True
+
+
+def _attach(memory_name: str) -> shared_memory.SharedMemory:
+    """Segment partagé courant ; rattaché si le parent l'a réalloué (frames plus grandes)"""
+    global _worker_memory, _worker_memory_name
+    if _worker_memory_name != memory_name:
+        if _worker_memory is not None:
+            _worker_memory.close()
+        _worker_memory = shared_memory.SharedMemory(name=memory_name)
+        _worker_memory_name = memory_name
+    return _worker_memory
+
+
+def _encode_slot(memory_name: str, offset: int, shape: tuple) -> List[Dict[str, Any]]:
+    """Encode en RLE base64 les masques écrits dans un slot du buffer partagé (exécuté dans le worker)"""
+    memory = _attach(memory_name)
+    masks = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf, offset=offset)
+    try:
+        return _worker_encoder.encode_base64(masks)
+    finally:
+        del masks
+
+
+class ParallelFrameEnricher:
+    """
+    Répartit l'encodage RLE des frames sur un pool de processus
+
+    Présence, aire, bbox et centroïde sont calculés dans le processus appelant,
+    sur le device des logits (compute_mask_stats) : seuls les masques des objets
+    présents sont binarisés puis écrits dans des slots d'un segment SharedMemory,
+    et seuls un offset et une forme transitent vers les workers. Le nombre de
+    slots borne la mémoire utilisée : au-delà, on attend la plus ancienne frame
+    en vol. Les résultats sont rendus dans l'ordre d'entrée.
+
+    Le pool et le segment sont créés au premier appel puis réutilisés : close()
+    (ou un bloc with) les libère. start() lance les workers à l'avance pour que
+    leur démarrage (imports du processus 'spawn') recouvre un autre calcul.
+    """
+
+    def __init__(self, workers: Optional[int] = None, slots_per_worker: int = 2,
+                 start_method: str = 'spawn'):
+        """
+        Args:
+            workers: Nombre de processus (défaut: nombre de cœurs)
+            slots_per_worker: Frames en vol par worker
+            start_method: Méthode de démarrage multiprocessing ('spawn' sûr avec CUDA)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = max(1, self.workers * slots_per_worker)
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._memory: Optional[shared_memory.SharedMemory] = None
+
+    def run(self, frame_logits: List[Any], threshold: float = 0.0,
+            encode_masks: bool = True) -> List[Dict[str, Any]]:
+        """
+        Enrichit une liste de frames
+
+        La binarisation est faite frame par frame au moment de l'écriture dans un
+        slot : aucun masque pleine résolution n'est matérialisé pour tout le segment.
+
+        Args:
+            frame_logits: Logits (N, 1, H, W) ou (N, H, W) de chaque frame (torch ou numpy)
+            threshold: Seuil de binarisation des logits
+            encode_masks: Encoder les masques en RLE (False en mode 'bbox')
+
+        Returns:
+            Stats de compute_mask_stats de chaque frame, dans l'ordre d'entrée, avec
+            'masks' : {ligne: masque encodé} pour les objets présents
+        """
+        # torch n'est importé que par le processus appelant, jamais par les workers
+        import torch
+        from .mask_ops import compute_mask_stats
+
+        results = []
+        pending = []
+        for position, logits in enumerate(frame_logits):
+            logits = torch.as_tensor(logits)
+            stats = compute_mask_stats(logits, threshold)
+            stats['masks'] = {}
+            results.append(stats)
+            present_rows = np.flatnonzero(stats['present'])
+            if encode_masks and len(present_rows):
+                pending.append((position, present_rows, logits))
+
+        if self.workers <= 1 or len(pending) <= 1:
+            encoder = BatchRLEEncoder()
+            for position, rows, logits in pending:
+                masks = self._binarize(logits, rows, threshold)
+                results[position]['masks'] = dict(zip(rows.tolist(), encoder.encode_base64(masks)))
+            return results
+
+        shapes = [(len(rows), int(logits.shape[-2]), int(logits.shape[-1])) for _, rows, logits in pending]
+        slot_size = max(int(np.prod(shape)) for shape in shapes)
+        n_slots = min(self.slots, len(pending))
+        memory = self._reserve(slot_size * n_slots)
+        pool = self._get_pool()
+
+        free_slots = list(range(n_slots))
+        in_flight = deque()
+        for (position, rows, logits), shape in zip(pending, shapes):
+            if not free_slots:
+                done_position, done_rows, slot, future = in_flight.popleft()
+                results[done_position]['masks'] = dict(zip(done_rows.tolist(), future.result()))
+                free_slots.append(slot)
+
+            slot = free_slots.pop()
+            offset = slot * slot_size
+            self._write_slot(memory, offset, shape, self._binarize(logits, rows, threshold))
+            in_flight.append((position, rows, slot, pool.submit(_encode_slot, memory.name, offset, shape)))
+
+        for position, rows, _, future in in_flight:
+            results[position]['masks'] = dict(zip(rows.tolist(), future.result()))
+        return results
+
+    def start(self):
+        """Démarre les workers sans attendre qu'ils soient prêts"""
+        if self.workers > 1:
+            pool = self._get_pool()
+            for _ in range(self.workers):
+                pool.submit(_ready)
+
+    def close(self):
+        """Arrête le pool et libère le segment partagé"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def __enter__(self) -> 'ParallelFrameEnricher':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Pool de workers, démarré au premier appel"""
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=_init_worker)
+        return self._pool
+
+    def _reserve(self, size: int) -> shared_memory.SharedMemory:
+        """Segment partagé d'au moins size octets (réalloué seulement s'il est trop petit)"""
+        if self._memory is None or self._memory.size < size:
+            if self._memory is not None:
+                self._memory.close()
+                self._memory.unlink()
+            self._memory = shared_memory.SharedMemory(create=True, size=max(1, size))
+        return self._memory
+
+    @staticmethod
+    def _write_slot(memory: shared_memory.SharedMemory, offset: int, shape: tuple, masks: Any):
+        """Copie des masques binaires dans un slot, directement depuis le device"""
+        import torch
+        view = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf, offset=offset)
+        torch.from_numpy(view).copy_(masks)
+        del view
+
+    @staticmethod
+    def _binarize(logits: Any, rows: np.ndarray, threshold: float) -> Any:
+        """Masques binaires (n, H, W) des seules lignes présentes, sur le device d'origine"""
+        import torch
+        if len(rows) < logits.shape[0]:
+            logits = logits[torch.as_tensor(rows, device=logits.device)]
+        masks = logits > threshold
+        return masks[:, 0] if masks.ndim == 4 else masks
@@ -5,6 +5,8 @@ Utilitaires de projection et transformations géométriques
 import numpy as np
 from typing import List, Tuple, Dict, Any
 
+from .field_projector import FieldProjector
+
 
 class ProjectionUtils:
     """Utilitaires pour les projections et transformations"""
@@ -12,32 +14,7 @@ class ProjectionUtils:
     @staticmethod
     def world_to_image(world_point: List[float], cam_params: Dict) -> List[float]:
         """Projette un point 3D monde vers l'image 2D"""
-        
-        # Matrice intrinsèque
-        K = np.array([
-            [cam_params["cam_params"]["x_focal_length"], 0, cam_params["cam_params"]["principal_point"][0]],
-            [0, cam_params["cam_params"]["y_focal_length"], cam_params["cam_params"]["principal_point"][1]],
-            [0, 0, 1]
-        ])
-        
-        # Matrice extrinsèque
-        R = np.array(cam_params["cam_params"]["rotation_matrix"])
-        t = -R @ np.array(cam_params["cam_params"]["position_meters"])
-        
-        # Point 3D monde (ajouter Z=0 si nécessaire)
-        if len(world_point) == 2:
-            world_point = [world_point[0], world_point[1], 0.0]
-        
-        world_point_h = np.array([world_point[0], world_point[1], world_point[2], 1])
-        
-        # Transformation
-        P = K @ np.hstack((R, t.reshape(-1,1)))
-        image_point_h = P @ world_point_h
-        
-        # Normalisation
-        image_point = image_point_h[:2] / image_point_h[2]
-        
-        return image_point.tolist()
+        return FieldProjector(cam_params).field_to_image([world_point])[0].tolist()
     
     @staticmethod
     def calculate_field_distance(point1: Dict, point2: Dict) -> float:
@@ -0,0 +1,95 @@
+"""
+Ré-enrichissement incrémental après un changement de calibration
+Recalcule uniquement les positions terrain depuis les points image stockés,
+pour tous les événements d'une vidéo en une seule projection
+"""
+
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from .field_projector import FieldProjector
+from .calibration_track import CalibrationTrack
+from .trajectory_smoother import TrajectorySmoother
+from ..analytics.trajectory_store import processed_to_original_frames
+
+
+class CalibrationReenricher:
+    """
+    Met à jour points.output.field de projets déjà enrichis avec une nouvelle calibration
+
+    Masques, bbox, points image et scores ne sont pas modifiés ; aucun tracking
+    n'est relancé. Les positions lissées (field_smoothed) sont recalculées
+    avec les réglages enregistrés dans metadata['smoothing'] ; celles d'un
+    projet lissé sans réglages enregistrés sont retirées.
+    """
+
+    def __init__(self, calibration: Dict[str, Any]):
+        """
+        Args:
+            calibration: Section 'calibration' du fichier _calib.json (camera_parameters, camera_track)
+        """
+        self.calibration = calibration
+        track = CalibrationTrack.from_calibration(calibration)
+        self.projector = track if track is not None else FieldProjector(calibration['camera_parameters'])
+
+    def reenrich(self, projects: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+        """
+        Ré-enrichit plusieurs projets (événements d'une même vidéo) en une passe
+
+        Args:
+            projects: {event_id: données projet}, modifiées sur place
+
+        Returns:
+            {event_id: {'patched', 'smoothed', 'smoothing_cleared'}}
+        """
+        image_points: List[Tuple[float, float]] = []
+        frames: List[int] = []
+        targets: List[Tuple[str, Dict[str, Any]]] = []
+        stats = {event_id: {'patched': 0, 'smoothed': 0, 'smoothing_cleared': 0} for event_id in projects}
+
+        # Collecte des points image de tous les événements
+        for event_id, project_data in projects.items():
+            processed_to_original = processed_to_original_frames(project_data)
+            for frame_key, frame_annotations in project_data.get('annotations', {}).items():
+                original_frame = processed_to_original.get(int(frame_key), int(frame_key))
+                for annotation in frame_annotations:
+                    output = (annotation.get('points') or {}).get('output')
+                    if not output:
+                        continue
+                    if output.pop('field_smoothed', None) is not None:
+                        stats[event_id]['smoothing_cleared'] += 1
+                    image_point = (output.get('image') or {}).get('CENTER_BOTTOM')
+                    if not image_point:
+                        continue
+                    image_points.append((image_point['x'], image_point['y']))
+                    frames.append(original_frame)
+                    targets.append((event_id, output))
+
+        # Une seule projection pour toute la vidéo
+        field_points = self._project(np.array(image_points, dtype=np.float64).reshape(-1, 2), frames)
+
+        for (event_id, output), field_point in zip(targets, field_points):
+            center_bottom = None
+            if np.all(np.isfinite(field_point)):
+                center_bottom = {"x": float(field_point[0]), "y": float(field_point[1])}
+            output.setdefault('field', {})['CENTER_BOTTOM'] = center_bottom
+            stats[event_id]['patched'] += 1
+
+        for event_id, project_data in projects.items():
+            project_data['calibration'] = self.calibration
+            # Lissage relancé sur les nouvelles positions brutes
+            counts = TrajectorySmoother.reapply(project_data)
+            if counts is not None:
+                stats[event_id]['smoothed'] = counts['smoothed'] + counts['filled']
+                stats[event_id]['smoothing_cleared'] = 0
+
+        return stats
+
+    def _project(self, image_points: np.ndarray, frames: List[int]) -> np.ndarray:
+        """Projection image → terrain (par frame si la calibration varie dans le temps)"""
+        if not len(image_points):
+            return np.zeros((0, 2))
+        if isinstance(self.projector, CalibrationTrack):
+            return self.projector.image_to_field(frames, image_points)
+        return self.projector.image_to_field(image_points)
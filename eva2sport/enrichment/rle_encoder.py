@@ -0,0 +1,81 @@
+"""
+Encodage RLE COCO en lot de tous les objets d'une frame
+Un buffer Fortran uint8 préalloué, un seul appel pycocotools par frame
+"""
+
+import base64
+import cv2
+import numpy as np
+from typing import Dict, List, Any
+
+from pycocotools.mask import encode as encode_rle
+
+
+class BatchRLEEncoder:
+    """
+    Encode les masques de N objets en un appel à pycocotools.mask.encode
+
+    Les masques sont écrits dans un buffer (H, W, N) en ordre Fortran réutilisé
+    d'une frame à l'autre : pas de copie np.asfortranarray ni d'allocation
+    astype(np.uint8) par objet. Pour un tenseur torch, la copie device → hôte
+    se fait directement dans ce buffer.
+    """
+
+    def __init__(self):
+        self._buffer = None
+
+    def encode(self, masks: Any) -> List[Dict]:
+        """
+        Encode un lot de masques binaires
+
+        Args:
+            masks: Masques (N, H, W) booléens ou uint8 (numpy ou torch)
+
+        Returns:
+            RLE COCO compressés ({'size', 'counts' bytes}) dans l'ordre des masques
+        """
+        n_masks, height, width = masks.shape
+        if n_masks == 0:
+            return []
+
+        buffer = self._get_buffer(height, width, n_masks)
+
+        # Vue (N, W, H) C-contiguë du buffer Fortran (H, W, N) : même mémoire
+        slabs = buffer.transpose(2, 1, 0)
+
+        if isinstance(masks, np.ndarray):
+            # Transposée par blocs d'OpenCV, bien plus rapide qu'un np.copyto strided
+            masks = masks.view(np.uint8) if masks.dtype == bool else masks.astype(np.uint8, copy=False)
+            for mask, slab in zip(masks, slabs):
+                cv2.transpose(mask, dst=slab)
+        else:
+            import torch
+            torch.from_numpy(slabs).copy_(masks.permute(0, 2, 1))
+
+        return encode_rle(buffer)
+
+    def encode_base64(self, masks: Any) -> List[Dict]:
+        """
+        Encode un lot de masques au format 'rle_coco_base64' du projet
+
+        Returns:
+            Dicts {'format', 'size', 'counts'} prêts à sérialiser
+        """
+        rles = self.encode(masks)
+        b64encode = base64.b64encode
+        return [
+            {
+                "format": "rle_coco_base64",
+                "size": [int(rle["size"][0]), int(rle["size"][1])],
+                "counts": b64encode(rle["counts"]).decode('ascii')
+            }
+            for rle in rles
+        ]
+
+    def _get_buffer(self, height: int, width: int, n_masks: int) -> np.ndarray:
+        """Retourne une vue (H, W, n_masks) Fortran du buffer, agrandi si nécessaire"""
+        buffer = self._buffer
+        if buffer is None or buffer.shape[:2] != (height, width) or buffer.shape[2] < n_masks:
+            buffer = np.zeros((height, width, n_masks), dtype=np.uint8, order='F')
+            self._buffer = buffer
+        return buffer[:, :, :n_masks]
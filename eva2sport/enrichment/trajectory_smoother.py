@@ -0,0 +1,246 @@
+"""
+Lissage des trajectoires terrain et comblement des trous courts
+Filtre de Kalman à vitesse constante + lisseur RTS, vectorisés sur tous les objets
+"""
+
+from typing import Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+from ..analytics.trajectory_store import TrajectoryStore
+
+
+class TrajectorySmoother:
+    """
+    Lisse les positions terrain CENTER_BOTTOM de tous les objets d'un segment
+
+    Modèle à vitesse constante par axe (état position/vitesse) avec bruit
+    d'accélération blanc ; le pas de temps réel de chaque objet est pris en
+    compte. Les objets sont traités ensemble : seule la boucle sur le temps
+    reste en Python, chaque pas est une opération sur (n_objets, 2, 2).
+    La covariance ne dépend que des instants mesurés, elle est donc partagée
+    par les axes x et y.
+    """
+
+    def __init__(self, fps: float, measurement_std: float = 0.5,
+                 acceleration_std: float = 3.0, max_gap_seconds: float = 1.0):
+        """
+        Args:
+            fps: FPS de la vidéo source
+            measurement_std: Écart-type du bruit de mesure (m) des points bas de bbox
+            acceleration_std: Écart-type de l'accélération (m/s²) du modèle
+            max_gap_seconds: Durée maximale d'un trou comblé par le lisseur
+        """
+        if not fps or fps <= 0:
+            raise ValueError(f"❌ FPS invalide: {fps}")
+        self.fps = float(fps)
+        self.measurement_std = measurement_std
+        self.acceleration_std = acceleration_std
+        self.max_gap_seconds = max_gap_seconds
+
+    def smooth(self, store: TrajectoryStore,
+               acceleration_std: Optional[Union[float, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions lissées pour toutes les lignes du store
+
+        Args:
+            store: Trajectoires colonnaires
+            acceleration_std: Surcharge par objet (n_objects,) ou globale
+
+        Returns:
+            (positions lissées (R, 2), NaN hors mesures et trous comblés ;
+             masque (R,) des lignes comblées sans mesure)
+        """
+        n_rows = store.n_rows
+        smoothed = np.full((n_rows, 2), np.nan)
+        filled = np.zeros(n_rows, dtype=bool)
+        if n_rows == 0:
+            return smoothed, filled
+
+        offsets = store.offsets
+        lengths = np.diff(offsets)
+        n_objects, n_steps = len(lengths), int(lengths.max())
+        object_index = np.repeat(np.arange(n_objects), lengths)
+        step_index = np.arange(n_rows) - offsets[:-1][object_index]
+
+        # Grille (objet, pas) complétée après la fin de chaque trajectoire (dt = 0, sans mesure)
+        time = np.asarray(store.columns['frames'], dtype=np.float64) / self.fps
+        measures = np.asarray(store.columns['field_xy'], dtype=np.float64)
+        grid_time = np.zeros((n_objects, n_steps))
+        grid_time[object_index, step_index] = time
+        last_time = time[offsets[1:] - 1]
+        padding = np.arange(n_steps)[None, :] >= lengths[:, None]
+        grid_time = np.where(padding, last_time[:, None], grid_time)
+        grid_z = np.full((n_objects, n_steps, 2), np.nan)
+        grid_z[object_index, step_index] = measures
+
+        accel = self.acceleration_std if acceleration_std is None else acceleration_std
+        q = np.broadcast_to(np.asarray(accel, dtype=np.float64) ** 2, (n_objects,))
+        grid_smoothed = self._kalman_rts(grid_time, grid_z, q, self.measurement_std ** 2)
+
+        values = grid_smoothed[object_index, step_index]
+        measured = np.isfinite(measures).all(axis=1)
+        filled = self._short_gaps(measured, time, object_index)
+        keep = measured | filled
+        smoothed[keep] = values[keep]
+        return smoothed, filled
+
+    def _kalman_rts(self, grid_time: np.ndarray, grid_z: np.ndarray,
+                    q: np.ndarray, r: float) -> np.ndarray:
+        """Filtre avant + lissage arrière RTS sur la grille (objets, pas, axes)"""
+        n_objects, n_steps = grid_time.shape
+        x_pred = np.zeros((n_steps, n_objects, 2, 2))   # (pas, objet, [pos, vit], axe)
+        x_filt = np.zeros_like(x_pred)
+        P_pred = np.zeros((n_steps, n_objects, 2, 2))
+        P_filt = np.zeros_like(P_pred)
+        F_all = np.zeros((n_steps, n_objects, 2, 2))
+
+        # A priori vague : la première mesure fixe la position, la vitesse reste libre
+        x = np.zeros((n_objects, 2, 2))
+        P = np.broadcast_to(np.diag([1e6, 1e2]), (n_objects, 2, 2)).copy()
+        identity = np.eye(2)
+
+        for k in range(n_steps):
+            if k > 0:
+                dt = grid_time[:, k] - grid_time[:, k - 1]
+                F = np.broadcast_to(identity, (n_objects, 2, 2)).copy()
+                F[:, 0, 1] = dt
+                Q = np.empty((n_objects, 2, 2))
+                Q[:, 0, 0] = dt ** 3 / 3
+                Q[:, 0, 1] = Q[:, 1, 0] = dt ** 2 / 2
+                Q[:, 1, 1] = dt
+                Q *= q[:, None, None]
+                x = F @ x
+                P = F @ P @ F.transpose(0, 2, 1) + Q
+                F_all[k] = F
+            x_pred[k], P_pred[k] = x, P
+
+            # Mise à jour sur les objets mesurés à ce pas (mêmes instants pour x et y)
+            z = grid_z[:, k]
+            measured = np.isfinite(z).all(axis=1)
+            if measured.any():
+                S = P[measured, 0, 0] + r
+                K = P[measured, :, 0] / S[:, None]                   # (m, 2)
+                innovation = z[measured] - x[measured, 0]            # (m, axes)
+                x = x.copy()
+                x[measured] += K[:, :, None] * innovation[:, None, :]
+                P = P.copy()
+                P[measured] -= K[:, :, None] * K[:, None, :] * S[:, None, None]
+            x_filt[k], P_filt[k] = x, P
+
+        # Lissage arrière Rauch-Tung-Striebel
+        x_smooth = x_filt[-1].copy()
+        positions = np.zeros((n_objects, n_steps, 2))
+        positions[:, -1] = x_smooth[:, 0]
+        for k in range(n_steps - 2, -1, -1):
+            C = P_filt[k] @ F_all[k + 1].transpose(0, 2, 1) @ np.linalg.pinv(P_pred[k + 1])
+            x_smooth = x_filt[k] + C @ (x_smooth - x_pred[k + 1])
+            positions[:, k] = x_smooth[:, 0]
+        return positions
+
+    def _short_gaps(self, measured: np.ndarray, time: np.ndarray,
+                    object_index: np.ndarray) -> np.ndarray:
+        """Lignes sans mesure encadrées par deux mesures du même objet à moins de max_gap_seconds"""
+        n_rows = len(measured)
+        rows = np.arange(n_rows)
+        measured_rows = np.flatnonzero(measured)
+        filled = np.zeros(n_rows, dtype=bool)
+        if len(measured_rows) < 2:
+            return filled
+
+        # Mesure précédente et suivante de chaque ligne
+        position = np.searchsorted(measured_rows, rows)
+        has_previous = position > 0
+        has_next = position < len(measured_rows)
+        previous = measured_rows[np.clip(position - 1, 0, len(measured_rows) - 1)]
+        following = measured_rows[np.clip(position, 0, len(measured_rows) - 1)]
+
+        filled = ~measured & has_previous & has_next
+        filled &= (object_index[previous] == object_index) & (object_index[following] == object_index)
+        filled &= (time[following] - time[previous]) <= self.max_gap_seconds
+        return filled
+
+    def apply(self, project_data: Dict[str, Any],
+              acceleration_std_by_type: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+        """
+        Écrit les positions lissées dans les annotations, à côté des positions brutes
+
+        Chaque annotation reçoit points.output.field_smoothed.CENTER_BOTTOM
+        (None hors mesures et trous comblés) et un indicateur 'filled'.
+        Les positions brutes points.output.field ne sont pas modifiées.
+        Les réglages sont enregistrés dans metadata['smoothing'] pour
+        relisser le projet plus tard (voir reapply).
+
+        Args:
+            project_data: Données projet enrichies
+            acceleration_std_by_type: Écart-type d'accélération par type d'objet (ex: ballon)
+
+        Returns:
+            Compteurs {'smoothed', 'filled'}
+        """
+        store = TrajectoryStore.from_project_data(project_data)
+        objects = project_data.get('objects', {})
+        acceleration_std = np.array([
+            (acceleration_std_by_type or {}).get(objects.get(obj_id, {}).get('type'), self.acceleration_std)
+            for obj_id in store.object_ids
+        ], dtype=np.float64)
+        smoothed, filled = self.smooth(store, acceleration_std)
+
+        # Ligne du store de chaque (objet, frame traitée)
+        row_of = {}
+        for row_obj, obj_id in enumerate(store.object_ids):
+            start, stop = int(store.offsets[row_obj]), int(store.offsets[row_obj + 1])
+            for row, processed in zip(range(start, stop), store.columns['processed'][start:stop].tolist()):
+                row_of[(obj_id, processed)] = row
+
+        project_data.setdefault('metadata', {})['smoothing'] = {
+            'measurement_std': self.measurement_std,
+            'acceleration_std': self.acceleration_std,
+            'max_gap_seconds': self.max_gap_seconds,
+            'acceleration_std_by_type': dict(acceleration_std_by_type or {})
+        }
+
+        counts = {'smoothed': 0, 'filled': 0}
+        for frame_key, frame_annotations in project_data.get('annotations', {}).items():
+            for annotation in frame_annotations:
+                row = row_of.get((str(annotation['objectId']), int(frame_key)))
+                if row is None:
+                    continue
+                point = None
+                if np.isfinite(smoothed[row, 0]):
+                    point = {"x": float(smoothed[row, 0]), "y": float(smoothed[row, 1])}
+                    counts['filled' if filled[row] else 'smoothed'] += 1
+
+                points = annotation.setdefault('points', {})
+                output = points.get('output')
+                if output is None:
+                    if point is None:
+                        continue
+                    # Objet perdu sur cette frame : seule la position comblée existe
+                    output = {"image": {"CENTER_BOTTOM": None}, "field": {"CENTER_BOTTOM": None}}
+                    points['output'] = output
+                output['field_smoothed'] = {"CENTER_BOTTOM": point, "filled": bool(filled[row])}
+
+        return counts
+
+    @classmethod
+    def reapply(cls, project_data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """
+        Relisse un projet avec les réglages enregistrés par apply
+
+        Sert après une modification des positions brutes (nouvelle calibration).
+
+        Returns:
+            Compteurs {'smoothed', 'filled'}, None si le projet n'a pas de réglages de lissage
+        """
+        metadata = project_data.get('metadata', {})
+        settings = metadata.get('smoothing')
+        if not settings:
+            return None
+        smoother = cls(
+            metadata['fps'],
+            measurement_std=settings['measurement_std'],
+            acceleration_std=settings['acceleration_std'],
+            max_gap_seconds=settings['max_gap_seconds']
+        )
+        return smoother.apply(project_data, settings.get('acceleration_std_by_type'))
@@ -4,5 +4,15 @@ Modules d'export EVA2SPORT
 
 from .project_exporter import ProjectExporter
 from .video_exporter import VideoExporter
+from .binary_project import (
+    BinaryProjectReader, FrameAnnotations, StreamingProjectWriter, save_project_binary, load_project_binary,
+    recover_project_binary
+)
+from .mask_store import MaskStore, MaskStoreWriter, build_mask_store
+from .project_schema import ProjectData, Annotation
+from .match_store import MatchStore
 
-__all__ = ['ProjectExporter', 'VideoExporter']
\ No newline at end of file
+__all__ = ['ProjectExporter', 'VideoExporter', 'BinaryProjectReader', 'FrameAnnotations', 'StreamingProjectWriter',
+           'save_project_binary', 'load_project_binary', 'recover_project_binary',
+           'MaskStore', 'MaskStoreWriter', 'build_mask_store', 'ProjectData', 'Annotation',
+           'MatchStore']
\ No newline at end of file
@@ -0,0 +1,795 @@
+"""
+Format binaire compact des projets EVA2SPORT (.evab)
+Flux d'enregistrements écrits frame par frame : en-tête projet, blocs d'annotations
+(lignes typées + blob RLE), puis index final ; un fichier interrompu reste relisible
+"""
+
+import json
+import mmap
+import base64
+import struct
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union, Tuple, Iterable, Iterator, Sequence
+from collections.abc import Mapping
+
+import numpy as np
+
+
+MAGIC = b'EVA2BIN\x00'
+FORMAT_VERSION = 2
+
+# magic, version, offset de l'index final, taille de l'index (0 tant que non finalisé)
+PREAMBLE = struct.Struct('<8sIQQ')
+# tag, taille du descripteur JSON, taille des données
+RECORD = struct.Struct('<4sIQ')
+TAG_HEADER = b'HEAD'
+TAG_FRAMES = b'FRMS'
+ALIGNMENT = 8
+
+# Une ligne par annotation ; les tailles fixes permettent de lire un bloc sans copie
+ROW_DTYPE = np.dtype([
+    ('bbox', '<i8', (4,)),
+    ('image_xy', '<f8', (2,)),
+    ('field_xy', '<f8', (2,)),
+    ('smoothed_xy', '<f8', (2,)),
+    ('centroid', '<f8', (2,)),
+    ('area', '<i8'),
+    ('score', '<f8'),
+    ('mask_end', '<u8'),
+    ('id', 'V16'),
+    ('mask_size', '<i4', (2,)),
+    ('object', '<i4'),
+    ('type', '<i2'),
+    ('flags', '<u2'),
+])
+
+# Bits de la colonne 'flags' : forme exacte de chaque annotation
+HAS_AREA = 1 << 0
+HAS_CENTROID_KEY = 1 << 1
+CENTROID_SET = 1 << 2
+BBOX_SET = 1 << 3
+POINTS_SET = 1 << 4
+IMAGE_POINT_SET = 1 << 5
+FIELD_POINT_SET = 1 << 6
+SMOOTHED_KEY = 1 << 7
+SMOOTHED_POINT_SET = 1 << 8
+SMOOTHED_FILLED = 1 << 9
+SCORE_SET = 1 << 10
+WARNING = 1 << 11
+MASK_SET = 1 << 12
+MASK_REF = 1 << 13
+MASK_DELTA_REF = 1 << 14
+MASK_FLAGS = MASK_SET | MASK_REF | MASK_DELTA_REF
+
+# Référence vers le store de masques (chunk, offset, length, box), stockée dans le blob
+MASK_REF_STRUCT = struct.Struct('<7q')
+MASK_REF_KEYS = {'format', 'size', 'chunk', 'offset', 'length', 'box'}
+
+ANNOTATION_KEYS = ('id', 'objectId', 'type', 'mask', 'bbox', 'points', 'area', 'centroid',
+                   'maskScore', 'pose', 'warning')
+
+_NAN2 = (np.nan, np.nan)
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Égalité stricte au sens JSON (1 et 1.0 ou True et 1 sont différents)"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _format_uuid(hex_id: str) -> str:
+    """Forme canonique 8-4-4-4-12 d'un uuid hexadécimal"""
+    return f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+
+
+def _padding(position: int) -> int:
+    """Octets de bourrage jusqu'au prochain alignement"""
+    return (-position) % ALIGNMENT
+
+
+def _point(xy) -> Dict[str, float]:
+    """Point {x, y} (valeurs Python issues de tolist)"""
+    return {"x": xy[0], "y": xy[1]}
+
+
+def _build_annotation(ann_id: str, object_id: str, ann_type: str, flags: int, bbox, image_xy,
+                      field_xy, smoothed_xy, area, centroid, score, mask_size,
+                      mask_bytes: bytes) -> Dict[str, Any]:
+    """
+    Annotation au schéma JSON du projet à partir des valeurs de colonnes
+
+    Les valeurs sont déjà des types Python (tolist côté lecture, conversions
+    de _encode côté écriture) : aucune conversion par champ ici.
+    """
+    mask = None
+    if flags & MASK_REF:
+        chunk, offset, length, *box = MASK_REF_STRUCT.unpack(mask_bytes)
+        mask = {
+            "format": "delta_ref" if flags & MASK_DELTA_REF else "packbits_ref",
+            "size": [mask_size[0], mask_size[1]],
+            "chunk": chunk,
+            "offset": offset,
+            "length": length,
+            "box": box
+        }
+    elif flags & MASK_SET:
+        mask = {
+            "format": "rle_coco_base64",
+            "size": [mask_size[0], mask_size[1]],
+            "counts": base64.b64encode(mask_bytes).decode('ascii')
+        }
+
+    output = None
+    if flags & POINTS_SET:
+        output = {
+            "image": {"CENTER_BOTTOM": _point(image_xy) if flags & IMAGE_POINT_SET else None},
+            "field": {"CENTER_BOTTOM": _point(field_xy) if flags & FIELD_POINT_SET else None}
+        }
+        if flags & SMOOTHED_KEY:
+            output["field_smoothed"] = {
+                "CENTER_BOTTOM": _point(smoothed_xy) if flags & SMOOTHED_POINT_SET else None,
+                "filled": bool(flags & SMOOTHED_FILLED)
+            }
+
+    annotation = {
+        "id": ann_id,
+        "objectId": object_id,
+        "type": ann_type,
+        "mask": mask,
+        "bbox": {
+            "output": {"x": bbox[0], "y": bbox[1], "width": bbox[2],
+                       "height": bbox[3]} if flags & BBOX_SET else None
+        },
+        "points": {"output": output}
+    }
+    if flags & HAS_AREA:
+        annotation["area"] = area
+    if flags & HAS_CENTROID_KEY:
+        annotation["centroid"] = _point(centroid) if flags & CENTROID_SET else None
+    annotation["maskScore"] = score if flags & SCORE_SET else None
+    annotation["pose"] = None
+    annotation["warning"] = bool(flags & WARNING)
+    return annotation
+
+
+class _BlockEncoder:
+    """Encode des frames en lignes ROW_DTYPE ; tables objets/types partagées entre blocs"""
+
+    def __init__(self):
+        self.object_ids: List[str] = []
+        self.types: List[str] = []
+        self._object_codes: Dict[str, int] = {}
+        self._type_codes: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self):
+        """Vide le bloc courant (les tables sont conservées)"""
+        self.frames: List[List[Any]] = []
+        self.rows: List[tuple] = []
+        self.mask_chunks: List[bytes] = []
+        self.mask_end = 0
+        self.overflow: Dict[str, Any] = {}
+        self.new_objects = len(self.object_ids)
+        self.new_types = len(self.types)
+
+    def add_frame(self, frame_key: str, annotations: List[Dict[str, Any]]):
+        """Ajoute toutes les annotations d'une frame au bloc courant"""
+        self.frames.append([str(frame_key), len(annotations)])
+        for annotation in annotations:
+            self._add(annotation)
+
+    def _add(self, annotation: Dict[str, Any]):
+        """Ajoute une annotation ; les formes non prévues partent dans 'overflow' (JSON)"""
+        encoded = self._encode(annotation)
+        if encoded is None or not _same(self._decode(encoded), annotation):
+            self.overflow[str(len(self.rows))] = annotation
+            encoded = ((0, 0, 0, 0), _NAN2, _NAN2, _NAN2, _NAN2, 0, np.nan, 0, bytes(16),
+                       (0, 0), -1, -1, 0, b'')
+
+        mask_bytes = encoded[-1]
+        self.mask_chunks.append(mask_bytes)
+        self.mask_end += len(mask_bytes)
+        self.rows.append(encoded[:7] + (self.mask_end,) + encoded[8:-1])
+
+    def _code(self, table: List[str], codes: Dict[str, int], value: str) -> int:
+        """Code d'une valeur dans une table (ajoutée si nouvelle)"""
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def _encode(self, annotation: Dict[str, Any]) -> Optional[tuple]:
+        """Ligne d'une annotation au schéma courant (None si hors schéma)"""
+        try:
+            if set(annotation) - set(ANNOTATION_KEYS) or annotation.get('pose') is not None:
+                return None
+            ann_id = uuid.UUID(annotation['id'])
+            flags = 0
+
+            mask_bytes, mask_size = b'', (0, 0)
+            mask = annotation.get('mask')
+            if mask is not None and mask.get('format') in ('packbits_ref', 'delta_ref'):
+                if set(mask) != MASK_REF_KEYS:
+                    return None
+                mask_bytes = MASK_REF_STRUCT.pack(int(mask['chunk']), int(mask['offset']),
+                                                  int(mask['length']), *(int(v) for v in mask['box']))
+                mask_size = (int(mask['size'][0]), int(mask['size'][1]))
+                flags |= MASK_REF | (MASK_DELTA_REF if mask['format'] == 'delta_ref' else 0)
+            elif mask is not None:
+                if set(mask) != {'format', 'size', 'counts'} or mask['format'] != 'rle_coco_base64':
+                    return None
+                mask_bytes = base64.b64decode(mask['counts'], validate=True)
+                mask_size = (int(mask['size'][0]), int(mask['size'][1]))
+                flags |= MASK_SET
+
+            bbox = annotation['bbox']['output']
+            bbox_values = (0, 0, 0, 0)
+            if bbox is not None:
+                bbox_values = (int(bbox['x']), int(bbox['y']), int(bbox['width']), int(bbox['height']))
+                flags |= BBOX_SET
+
+            image_xy = field_xy = smoothed_xy = _NAN2
+            output = annotation['points']['output']
+            if output is not None:
+                flags |= POINTS_SET
+                image_point = output['image']['CENTER_BOTTOM']
+                field_point = output['field']['CENTER_BOTTOM']
+                if image_point is not None:
+                    image_xy = (float(image_point['x']), float(image_point['y']))
+                    flags |= IMAGE_POINT_SET
+                if field_point is not None:
+                    field_xy = (float(field_point['x']), float(field_point['y']))
+                    flags |= FIELD_POINT_SET
+                smoothed = output.get('field_smoothed')
+                if smoothed is not None:
+                    flags |= SMOOTHED_KEY
+                    if smoothed['CENTER_BOTTOM'] is not None:
+                        smoothed_xy = (float(smoothed['CENTER_BOTTOM']['x']), float(smoothed['CENTER_BOTTOM']['y']))
+                        flags |= SMOOTHED_POINT_SET
+                    if smoothed['filled']:
+                        flags |= SMOOTHED_FILLED
+
+            area = int(annotation.get('area', 0))
+            if 'area' in annotation:
+                flags |= HAS_AREA
+            centroid_xy = _NAN2
+            if 'centroid' in annotation:
+                flags |= HAS_CENTROID_KEY
+                if annotation['centroid'] is not None:
+                    centroid_xy = (float(annotation['centroid']['x']), float(annotation['centroid']['y']))
+                    flags |= CENTROID_SET
+
+            score = annotation['maskScore']
+            if score is not None:
+                flags |= SCORE_SET
+            if annotation['warning'] is True:
+                flags |= WARNING
+            elif annotation['warning'] is not False:
+                return None
+
+            object_id, ann_type = annotation['objectId'], annotation['type']
+            if not isinstance(object_id, str) or not isinstance(ann_type, str):
+                return None
+            object_code = self._code(self.object_ids, self._object_codes, object_id)
+            type_code = self._code(self.types, self._type_codes, ann_type)
+        except (KeyError, TypeError, ValueError, AttributeError, struct.error):
+            return None
+
+        return (bbox_values, image_xy, field_xy, smoothed_xy, centroid_xy, area,
+                float(score) if score is not None else np.nan, 0, ann_id.bytes,
+                mask_size, object_code, type_code, flags, mask_bytes)
+
+    def _decode(self, encoded: tuple) -> Dict[str, Any]:
+        """Reconstruit une annotation depuis sa ligne (contrôle à l'écriture)"""
+        (bbox, image_xy, field_xy, smoothed_xy, centroid, area, score, _, ann_id,
+         mask_size, object_code, type_code, flags, mask_bytes) = encoded
+        return _build_annotation(
+            str(uuid.UUID(bytes=ann_id)), self.object_ids[object_code], self.types[type_code],
+            flags, bbox, image_xy, field_xy, smoothed_xy, area, centroid, score, mask_size, mask_bytes
+        )
+
+    def block(self) -> Tuple[Dict[str, Any], bytes]:
+        """Descripteur et données (lignes + blob RLE) du bloc courant"""
+        descriptor = {
+            'frames': self.frames,
+            'objects': self.object_ids[self.new_objects:],
+            'types': self.types[self.new_types:],
+            'overflow': self.overflow
+        }
+        rows = np.array(self.rows, dtype=ROW_DTYPE)
+        return descriptor, rows.tobytes() + b''.join(self.mask_chunks)
+
+
+class StreamingProjectWriter:
+    """
+    Écrit un projet .evab frame par frame
+
+    Chaque bloc de frames est ajouté au fichier dès qu'il est complet : la
+    mémoire reste bornée à un bloc. Seules les colonnes hors masque d'une
+    frame déjà écrite peuvent être réécrites sur place (update_frame, ex :
+    positions lissées calculées après le tracking). finalize() ajoute l'index
+    (blocs, tables, en-tête projet définitif). Un fichier non finalisé (crash)
+    est relu en parcourant les blocs complets, voir BinaryProjectReader et
+    recover_project_binary.
+
+    Usage:
+        with StreamingProjectWriter(path, project_header) as writer:
+            for frame_key, annotations in frames:
+                writer.write_frame(frame_key, annotations)
+    """
+
+    def __init__(self, path: Union[str, Path], project_header: Dict[str, Any],
+                 frames_per_block: int = 1):
+        """
+        Args:
+            path: Fichier .evab de sortie
+            project_header: Sections du projet hors annotations (metadata, objects...).
+                Une clé 'annotations' éventuelle ne sert qu'à fixer sa position.
+            frames_per_block: Nombre de frames regroupées par bloc écrit
+        """
+        self.path = Path(path)
+        self.frames_per_block = max(1, frames_per_block)
+        self.project_header = project_header
+        self._encoder = _BlockEncoder()
+        self._blocks: List[List[Any]] = []
+        self._overflow: Dict[str, Any] = {}
+        self._n_rows = 0
+        # Frame → (offset des données du bloc, première ligne dans le bloc, nombre de lignes,
+        #          première ligne dans le projet)
+        self._frame_rows: Dict[str, Tuple[int, int, int, int]] = {}
+        self._file = open(self.path, 'w+b')
+        self._file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, 0))
+        self._write_record(TAG_HEADER, {'project': _header_for_json(project_header)}, b'')
+
+    @property
+    def frames_written(self) -> int:
+        """Frames déjà écrites dans le fichier"""
+        return sum(len(block[2]) for block in self._blocks)
+
+    def write_frame(self, frame_key: Union[str, int], annotations: List[Dict[str, Any]]):
+        """Ajoute une frame ; le bloc est écrit dès qu'il contient frames_per_block frames"""
+        self._encoder.add_frame(frame_key, annotations)
+        if len(self._encoder.frames) >= self.frames_per_block:
+            self.flush()
+
+    def flush(self):
+        """Écrit le bloc en cours et vide les tampons Python vers le système"""
+        if self._encoder.frames:
+            descriptor, data = self._encoder.block()
+            data_offset = self._write_record(TAG_FRAMES, descriptor, data)
+            n_rows = len(self._encoder.rows)
+            self._blocks.append([data_offset, n_rows, self._encoder.frames])
+            first_row = 0
+            for frame_key, count in self._encoder.frames:
+                self._frame_rows[frame_key] = (data_offset, first_row, count, self._n_rows + first_row)
+                first_row += count
+            for row, annotation in self._encoder.overflow.items():
+                self._overflow[str(self._n_rows + int(row))] = annotation
+            self._n_rows += n_rows
+            self._encoder.reset()
+        self._file.flush()
+
+    def update_frame(self, frame_key: Union[str, int], annotations: List[Dict[str, Any]]):
+        """
+        Réécrit sur place les annotations d'une frame déjà écrite, hors masques
+
+        Les lignes ont une taille fixe : bbox, points (dont les positions
+        lissées), aire, centroïde et score sont remplacés, les masques écrits
+        avec la frame sont conservés. Une annotation qui ne tient plus dans
+        une ligne passe en 'overflow' (JSON de l'index final).
+
+        Args:
+            frame_key: Frame écrite par write_frame
+            annotations: Annotations à jour, mêmes ids et même ordre
+        """
+        frame_key = str(frame_key)
+        if frame_key not in self._frame_rows:
+            self.flush()
+        data_offset, first_row, count, project_row = self._frame_rows[frame_key]
+        if len(annotations) != count:
+            raise ValueError(f"❌ Nombre d'annotations modifié pour la frame {frame_key}: {count} → {len(annotations)}")
+
+        start = data_offset + first_row * ROW_DTYPE.itemsize
+        self._file.seek(start)
+        rows = np.frombuffer(self._file.read(count * ROW_DTYPE.itemsize), dtype=ROW_DTYPE).copy()
+
+        for i, annotation in enumerate(annotations):
+            row = rows[i]
+            key = str(project_row + i)
+            probe = dict(annotation, mask=None)
+            encoded = None if key in self._overflow else self._encoder._encode(probe)
+            if (encoded is None or encoded[8] != row['id'].tobytes()
+                    or not _same(self._encoder._decode(encoded), probe)):
+                # Ligne neutralisée, l'annotation complète est relue depuis l'overflow
+                self._overflow[key] = annotation
+                row['object'], row['type'], row['flags'] = -1, -1, 0
+                continue
+            (row['bbox'], row['image_xy'], row['field_xy'], row['smoothed_xy'], row['centroid'],
+             row['area'], row['score']) = encoded[:7]
+            row['object'], row['type'] = encoded[10], encoded[11]
+            row['flags'] = (encoded[12] & ~MASK_FLAGS) | (int(row['flags']) & MASK_FLAGS)
+
+        self._file.seek(start)
+        self._file.write(rows.tobytes())
+        self._file.seek(0, 2)
+
+    def finalize(self, project_header: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Écrit l'index final et ferme le fichier
+
+        Args:
+            project_header: En-tête projet définitif (sinon celui de l'ouverture)
+        """
+        self.flush()
+        if project_header is not None:
+            self.project_header = project_header
+        footer = _footer_bytes(_header_for_json(self.project_header), self._encoder.object_ids,
+                               self._encoder.types, self._blocks, self._overflow)
+        footer_offset = self._file.tell()
+        self._file.write(footer)
+        self._file.seek(0)
+        self._file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, footer_offset, len(footer)))
+        self._file.close()
+        return self.path
+
+    def close(self):
+        """Ferme sans finaliser : les blocs complets restent récupérables"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def _write_record(self, tag: bytes, descriptor: Dict[str, Any], data: bytes) -> int:
+        """Écrit un enregistrement aligné et retourne l'offset de ses données"""
+        descriptor_bytes = json.dumps(descriptor, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._file.write(RECORD.pack(tag, len(descriptor_bytes), len(data)))
+        self._file.write(descriptor_bytes)
+        self._file.write(b'\x00' * _padding(self._file.tell()))
+        data_offset = self._file.tell()
+        self._file.write(data)
+        self._file.write(b'\x00' * _padding(self._file.tell()))
+        return data_offset
+
+    def __enter__(self) -> 'StreamingProjectWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            if not self._file.closed:
+                self.finalize()
+        else:
+            self.close()
+
+
+def _header_for_json(project_header: Dict[str, Any]) -> Dict[str, Any]:
+    """En-tête projet sans annotations (position de la clé conservée)"""
+    return {key: (None if key == 'annotations' else value) for key, value in project_header.items()}
+
+
+def _footer_bytes(project: Dict[str, Any], object_ids: List[str], types: List[str],
+                  blocks: List[List[Any]], overflow: Dict[str, Any]) -> bytes:
+    """Index final : en-tête projet, tables, blocs [offset, lignes, frames] et overflow"""
+    return json.dumps({
+        'project': project,
+        'object_ids': object_ids,
+        'types': types,
+        'blocks': blocks,
+        'overflow': overflow
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def save_project_binary(project_data: Dict[str, Any], path: Union[str, Path],
+                        frames_per_block: int = 64) -> Path:
+    """
+    Écrit un projet complet au format .evab
+
+    Les annotations hors schéma courant sont conservées telles quelles en JSON
+    ('overflow') : la relecture est toujours sans perte.
+    """
+    path = Path(path)
+    temp_path = path.with_suffix(path.suffix + '.tmp')
+    with StreamingProjectWriter(temp_path, project_data, frames_per_block) as writer:
+        for frame_key, frame_annotations in project_data.get('annotations', {}).items():
+            writer.write_frame(frame_key, frame_annotations)
+    temp_path.replace(path)
+    return path
+
+
+class BinaryProjectReader:
+    """
+    Lecture d'un projet .evab
+
+    Le fichier est ouvert en mmap : les lignes de chaque bloc sont des vues
+    sans copie, les annotations JSON ne sont reconstruites que sur demande.
+    Un fichier non finalisé est relu jusqu'au dernier bloc complet.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, footer_offset, footer_size = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"❌ Fichier non reconnu comme projet EVA2SPORT binaire: {self.path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"❌ Version de format binaire non supportée: {version}")
+
+        self.finalized = footer_offset != 0
+        if self.finalized:
+            self.header = json.loads(self._mmap[footer_offset:footer_offset + footer_size].decode('utf-8'))
+        else:
+            self.header, self.recovered_end = self._scan()
+            print(f"⚠️ Fichier binaire non finalisé: {len(self.header['blocks'])} blocs récupérés ({self.path.name})")
+
+        self.blocks = self.header['blocks']
+        self._build_index()
+
+    def _scan(self) -> Tuple[Dict[str, Any], int]:
+        """Parcourt les enregistrements complets d'un fichier non finalisé"""
+        size = len(self._mmap)
+        position = PREAMBLE.size
+        project, object_ids, types, blocks, overflow = None, [], [], [], {}
+        n_rows = 0
+        while position + RECORD.size <= size:
+            tag, descriptor_size, data_size = RECORD.unpack_from(self._mmap, position)
+            descriptor_end = position + RECORD.size + descriptor_size
+            data_offset = descriptor_end + _padding(descriptor_end)
+            if tag not in (TAG_HEADER, TAG_FRAMES) or data_offset + data_size > size:
+                break
+            try:
+                descriptor = json.loads(self._mmap[position + RECORD.size:descriptor_end].decode('utf-8'))
+            except ValueError:
+                break
+            if tag == TAG_HEADER:
+                project = descriptor['project']
+            else:
+                object_ids.extend(descriptor['objects'])
+                types.extend(descriptor['types'])
+                block_rows = sum(count for _, count in descriptor['frames'])
+                blocks.append([data_offset, block_rows, descriptor['frames']])
+                for row, annotation in descriptor['overflow'].items():
+                    overflow[str(n_rows + int(row))] = annotation
+                n_rows += block_rows
+            position = data_offset + data_size + _padding(data_offset + data_size)
+
+        if project is None:
+            self.close()
+            raise ValueError(f"❌ En-tête projet absent, fichier irrécupérable: {self.path}")
+        header = {'project': project, 'object_ids': object_ids, 'types': types,
+                  'blocks': blocks, 'overflow': overflow}
+        return header, position
+
+    def block_rows(self, index: int) -> np.ndarray:
+        """Lignes ROW_DTYPE d'un bloc (vue lecture seule sur le fichier)"""
+        data_offset, n_rows, _ = self.blocks[index]
+        return np.frombuffer(self._mmap, dtype=ROW_DTYPE, count=n_rows, offset=data_offset)
+
+    def column(self, name: str) -> np.ndarray:
+        """Colonne de toutes les annotations, dans l'ordre des frames"""
+        parts = [self.block_rows(i)[name] for i in range(len(self.blocks))]
+        if not parts:
+            return np.zeros((0,) + ROW_DTYPE[name].shape, dtype=ROW_DTYPE[name].base)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    # ===== ACCÈS PAR FRAME =====
+
+    def _build_index(self):
+        """Index frame → (bloc, première ligne dans le bloc, nombre de lignes)"""
+        self.frame_keys: List[str] = []
+        self._frames: Dict[str, Tuple[int, int, int]] = {}
+        self._block_row_starts: List[int] = []
+        n_rows = 0
+        for index, (_, block_rows, frames) in enumerate(self.blocks):
+            self._block_row_starts.append(n_rows)
+            start = 0
+            for frame_key, count in frames:
+                self.frame_keys.append(frame_key)
+                self._frames[frame_key] = (index, start, count)
+                start += count
+            n_rows += block_rows
+
+    def __contains__(self, frame_key: Union[str, int]) -> bool:
+        return str(frame_key) in self._frames
+
+    def __len__(self) -> int:
+        return len(self.frame_keys)
+
+    def get_frame(self, frame_key: Union[str, int]) -> List[Dict[str, Any]]:
+        """Annotations d'une frame, seules ses lignes sont décodées"""
+        location = self._frames.get(str(frame_key))
+        if location is None:
+            raise KeyError(f"Frame absente du projet: {frame_key}")
+        index, start, count = location
+        return self._decode_rows(index, start, start + count)
+
+    def iter_frames(self, frames: Optional[Iterable[Union[str, int]]] = None
+                    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Parcourt (frame, annotations) à la demande
+
+        Args:
+            frames: Frames voulues (clés ou range d'index traités), toutes par défaut ;
+                les frames absentes du projet sont ignorées
+        """
+        keys = self.frame_keys if frames is None else [str(f) for f in frames if str(f) in self._frames]
+        for frame_key in keys:
+            yield frame_key, self.get_frame(frame_key)
+
+    def frame_sizes(self) -> Dict[str, int]:
+        """Nombre d'annotations (non nulles) par frame, sans décodage"""
+        sizes = {}
+        null_rows = {int(row) for row, annotation in self.header['overflow'].items() if annotation is None}
+        for frame_key in self.frame_keys:
+            index, start, count = self._frames[frame_key]
+            first = self._block_row_starts[index] + start
+            nulls = sum(1 for row in null_rows if first <= row < first + count) if null_rows else 0
+            sizes[frame_key] = count - nulls
+        return sizes
+
+    def object_slice(self, object_id: Union[str, int],
+                     columns: Sequence[str] = ('field_xy',)) -> Dict[str, np.ndarray]:
+        """
+        Lignes d'un objet sur tout le projet, sans reconstruire les annotations
+
+        Les annotations hors schéma ('overflow') ne sont pas incluses.
+
+        Returns:
+            {'frames': index traités (-1 si clé non numérique), colonne: valeurs}
+        """
+        object_ids = self.header['object_ids']
+        code = object_ids.index(str(object_id)) if str(object_id) in object_ids else -2
+        rows = np.flatnonzero(self.column('object') == code)
+
+        frame_numbers = np.array([int(k) if k.isdigit() else -1 for k in self.frame_keys], dtype=np.int64)
+        counts = np.array([self._frames[k][2] for k in self.frame_keys], dtype=np.int64)
+        result = {'frames': np.repeat(frame_numbers, counts)[rows]}
+        for name in columns:
+            result[name] = self.column(name)[rows]
+        return result
+
+    def lazy_project_data(self) -> Dict[str, Any]:
+        """Projet dont 'annotations' est lu frame par frame à l'accès (le lecteur doit rester ouvert)"""
+        project = dict(self.header['project'])
+        project['annotations'] = FrameAnnotations(self)
+        return project
+
+    def to_project_data(self) -> Dict[str, Any]:
+        """Reconstruit le projet complet au schéma JSON courant"""
+        project = json.loads(json.dumps(self.header['project']))
+        annotations = {}
+        for index, (_, n_rows, frames) in enumerate(self.blocks):
+            block_annotations = self._decode_rows(index, 0, n_rows)
+            start = 0
+            for frame_key, count in frames:
+                annotations[frame_key] = block_annotations[start:start + count]
+                start += count
+        project['annotations'] = annotations
+        return project
+
+    def _decode_rows(self, index: int, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Reconstruit les annotations des lignes [start, stop) d'un bloc"""
+        object_ids = self.header['object_ids']
+        types = self.header['types']
+        overflow = self.header['overflow']
+        data_offset, n_rows, _ = self.blocks[index]
+        row_start = self._block_row_starts[index]
+
+        block = self.block_rows(index)
+        rows = block[start:stop]
+        hex_ids = rows['id'].tobytes().hex()
+        flags = rows['flags'].tolist()
+        objects = rows['object'].tolist()
+        ann_types = rows['type'].tolist()
+        bbox = rows['bbox'].tolist()
+        image_xy = rows['image_xy'].tolist()
+        field_xy = rows['field_xy'].tolist()
+        smoothed_xy = rows['smoothed_xy'].tolist()
+        area = rows['area'].tolist()
+        centroid = rows['centroid'].tolist()
+        score = rows['score'].tolist()
+        mask_size = rows['mask_size'].tolist()
+        mask_end = rows['mask_end'].tolist()
+        blob_offset = data_offset + n_rows * ROW_DTYPE.itemsize
+        mask_start = int(block['mask_end'][start - 1]) if start else 0
+        buffer = self._mmap
+
+        annotations = []
+        for i in range(stop - start):
+            row = str(row_start + start + i)
+            if overflow and row in overflow:
+                annotations.append(overflow[row])
+            else:
+                annotations.append(_build_annotation(
+                    _format_uuid(hex_ids[i * 32:(i + 1) * 32]), object_ids[objects[i]],
+                    types[ann_types[i]], flags[i], bbox[i], image_xy[i], field_xy[i],
+                    smoothed_xy[i], area[i], centroid[i], score[i], mask_size[i],
+                    buffer[blob_offset + mask_start:blob_offset + mask_end[i]]
+                ))
+            mask_start = mask_end[i]
+        return annotations
+
+    def close(self):
+        """Libère le mmap et le fichier"""
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'BinaryProjectReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameAnnotations(Mapping):
+    """
+    Vue {frame: annotations} d'un projet .evab, décodée frame par frame
+
+    S'utilise à la place de project_data['annotations'] pour les lectures
+    qui ne parcourent que quelques frames (rendu, statistiques).
+    """
+
+    def __init__(self, reader: BinaryProjectReader):
+        self.reader = reader
+
+    def __getitem__(self, frame_key: Union[str, int]) -> List[Dict[str, Any]]:
+        return self.reader.get_frame(frame_key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.reader.frame_keys)
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def __contains__(self, frame_key: object) -> bool:
+        return str(frame_key) in self.reader
+
+    def sizes(self) -> Dict[str, int]:
+        """Nombre d'annotations par frame, sans décodage"""
+        return self.reader.frame_sizes()
+
+
+def load_project_binary(path: Union[str, Path]) -> Dict[str, Any]:
+    """Charge un projet .evab au schéma JSON courant"""
+    with BinaryProjectReader(path) as reader:
+        return reader.to_project_data()
+
+
+def recover_project_binary(path: Union[str, Path]) -> Dict[str, int]:
+    """
+    Finalise sur place un fichier .evab interrompu
+
+    Les données après le dernier bloc complet sont tronquées, puis l'index est écrit.
+
+    Returns:
+        {'blocks', 'frames'} récupérés
+    """
+    path = Path(path)
+    with BinaryProjectReader(path) as reader:
+        if reader.finalized:
+            return {'blocks': len(reader.blocks), 'frames': sum(len(b[2]) for b in reader.blocks)}
+        header, end = reader.header, reader.recovered_end
+
+    footer = _footer_bytes(header['project'], header['object_ids'], header['types'],
+                           header['blocks'], header['overflow'])
+    with open(path, 'r+b') as f:
+        f.truncate(end)
+        f.seek(end)
+        f.write(footer)
+        f.seek(0)
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, end, len(footer)))
+
+    frames = sum(len(block[2]) for block in header['blocks'])
+    print(f"✅ Projet binaire récupéré: {frames} frames ({path.name})")
+    return {'blocks': len(header['blocks']), 'frames': frames}
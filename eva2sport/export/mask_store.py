@@ -0,0 +1,374 @@
+"""
+Stockage des masques hors du JSON projet
+Découpes bbox bit-packées (np.packbits) dans des fichiers chunk memmappables,
+référencées depuis les annotations par (chunk, offset)
+
+Codec 'delta' optionnel : une découpe clé RLE tous les N masques d'un objet,
+puis des XOR avec la découpe précédente (réalignée sur le coin de la bbox),
+ré-encodés en RLE
+"""
+
+import json
+import base64
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+from pycocotools import mask as mask_utils
+
+from ..utils.compression import open_writer, read_bytes, is_compressed
+
+
+REF_FORMAT = "packbits_ref"
+DELTA_REF_FORMAT = "delta_ref"
+FORMAT_VERSION = 2
+CODECS = ('packbits', 'delta')
+
+# Nature d'une ligne d'index
+KIND_PACKBITS = 0
+KIND_KEYFRAME = 1
+KIND_DELTA = 2
+
+# Une ligne par masque stocké, triées par frame dans l'ordre d'écriture
+INDEX_DTYPE = np.dtype([
+    ('frame', '<i8'),
+    ('object', '<i4'),
+    ('chunk', '<i4'),
+    ('offset', '<i8'),
+    ('length', '<i8'),
+    ('box', '<i4', (4,)),
+    ('size', '<i4', (2,)),
+    ('kind', 'u1'),
+    ('previous', '<i8'),   # ligne précédente du même objet (codec delta), -1 sinon
+])
+
+
+def _tight_boxes(masks: np.ndarray) -> np.ndarray:
+    """(N, 4) boîtes englobantes [x, y, w, h] de N masques (H, W, N), zéros si vide"""
+    rows = masks.any(axis=1)     # (H, N)
+    cols = masks.any(axis=0)     # (W, N)
+    present = rows.any(axis=0)
+    y0 = rows.argmax(axis=0)
+    y1 = rows.shape[0] - rows[::-1].argmax(axis=0)
+    x0 = cols.argmax(axis=0)
+    x1 = cols.shape[0] - cols[::-1].argmax(axis=0)
+    boxes = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+    boxes[~present] = 0
+    return boxes
+
+
+def _aligned(crop: np.ndarray, h: int, w: int) -> np.ndarray:
+    """Découpe précédente recalée sur le coin haut-gauche d'une bbox (h, w)"""
+    canvas = np.zeros((h, w), dtype=bool)
+    ph, pw = min(h, crop.shape[0]), min(w, crop.shape[1])
+    canvas[:ph, :pw] = crop[:ph, :pw]
+    return canvas
+
+
+def _rle_counts(crop: np.ndarray) -> bytes:
+    """Counts RLE COCO compressés d'une découpe (vide pour une bbox vide)"""
+    if not crop.size:
+        return b''
+    return mask_utils.encode(np.asfortranarray(crop, dtype=np.uint8))['counts']
+
+
+def _rle_crop(data: bytes, h: int, w: int) -> np.ndarray:
+    """Découpe (h, w) bool depuis des counts RLE COCO"""
+    if not h * w:
+        return np.zeros((h, w), dtype=bool)
+    return mask_utils.decode({'size': [h, w], 'counts': data}).astype(bool)
+
+
+class MaskStoreWriter:
+    """
+    Écrit les masques frame par frame dans un répertoire de chunks
+
+    Chaque masque est réduit à sa boîte englobante puis bit-packé ; les
+    masques d'une frame sont contigus dans un même chunk, ce qui permet de
+    tous les décoder en un seul np.unpackbits.
+
+    Avec codec='delta', seul le premier masque d'un objet puis un masque sur
+    keyframe_interval sont stockés entiers (RLE) ; les autres sont le XOR RLE
+    avec le masque précédent du même objet. Un joueur qui se déplace sans
+    changer de silhouette donne un XOR presque vide.
+    """
+
+    def __init__(self, directory: Union[str, Path], chunk_frames: int = 256,
+                 codec: str = 'packbits', keyframe_interval: int = 10,
+                 compression: Optional[str] = None, level: Optional[int] = None):
+        """
+        Args:
+            directory: Répertoire du store (créé si besoin)
+            chunk_frames: Nombre de frames par fichier chunk
+            codec: 'packbits' (découpes indépendantes) ou 'delta' (clés + XOR)
+            keyframe_interval: Codec delta, masques par objet entre deux clés
+            compression: Chunks compressés en flux (None, 'zstd' ou 'gzip') ; les
+                offsets restent ceux du contenu décompressé
+            level: Niveau de compression (None = défaut du codec)
+        """
+        if codec not in CODECS:
+            raise ValueError(f"❌ Codec de store de masques inconnu: {codec}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_frames = max(1, chunk_frames)
+        self.codec = codec
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.compression = compression
+        self.level = level
+        self._offset = 0
+        self._tracks: Dict[int, tuple] = {}   # objet → (ligne, découpe, masques depuis la clé)
+        self.object_ids: List[str] = []
+        self._object_codes: Dict[str, int] = {}
+        self._rows: List[tuple] = []
+        self._chunk = -1
+        self._chunk_file = None
+        self._frames_in_chunk = 0
+
+    def add_frame(self, frame: int, object_ids: List[str], masks: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Ajoute les masques d'une frame
+
+        Args:
+            frame: Index de frame traitée
+            object_ids: Id de l'objet de chaque masque
+            masks: (H, W, N) masques binaires (sortie de pycocotools decode)
+
+        Returns:
+            Références à placer dans annotation['mask'], une par masque
+        """
+        if self._chunk_file is None or self._frames_in_chunk >= self.chunk_frames:
+            self._open_chunk()
+        self._frames_in_chunk += 1
+
+        height, width = masks.shape[:2]
+        boxes = _tight_boxes(masks)
+        refs = []
+        for i, (object_id, (x, y, w, h)) in enumerate(zip(object_ids, boxes.tolist())):
+            code = self._object_codes.get(object_id)
+            if code is None:
+                code = self._object_codes[object_id] = len(self.object_ids)
+                self.object_ids.append(object_id)
+
+            crop = masks[y:y + h, x:x + w, i].astype(bool, copy=False)
+            kind, previous = KIND_PACKBITS, -1
+            if self.codec == 'packbits':
+                data = np.packbits(crop.ravel()).tobytes()
+            else:
+                track = self._tracks.get(code)
+                if track is None or track[2] + 1 >= self.keyframe_interval:
+                    kind, since_key, data = KIND_KEYFRAME, 0, _rle_counts(crop)
+                else:
+                    kind, previous, since_key = KIND_DELTA, track[0], track[2] + 1
+                    data = _rle_counts(crop ^ _aligned(track[1], h, w))
+                self._tracks[code] = (len(self._rows), crop.copy(), since_key)
+
+            offset = self._offset
+            self._chunk_file.write(data)
+            self._offset += len(data)
+            self._rows.append((frame, code, self._chunk, offset, len(data), (x, y, w, h), (height, width),
+                               kind, previous))
+            refs.append({
+                "format": REF_FORMAT if kind == KIND_PACKBITS else DELTA_REF_FORMAT,
+                "size": [height, width],
+                "chunk": self._chunk,
+                "offset": offset,
+                "length": len(data),
+                "box": [x, y, w, h]
+            })
+        return refs
+
+    def close(self) -> Path:
+        """Ferme le dernier chunk et écrit l'index"""
+        if self._chunk_file is not None:
+            self._chunk_file.close()
+            self._chunk_file = None
+        np.save(self.directory / "index.npy", np.array(self._rows, dtype=INDEX_DTYPE))
+        with open(self.directory / "index.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'format_version': FORMAT_VERSION,
+                'codec': self.codec,
+                'keyframe_interval': self.keyframe_interval,
+                'compression': self.compression,
+                'object_ids': self.object_ids,
+                'chunks': self._chunk + 1,
+                'chunk_frames': self.chunk_frames
+            }, f, indent=2)
+        return self.directory
+
+    def _open_chunk(self):
+        """Passe au chunk suivant"""
+        if self._chunk_file is not None:
+            self._chunk_file.close()
+        self._chunk += 1
+        self._frames_in_chunk = 0
+        self._offset = 0
+        self._chunk_file = open_writer(MaskStore.chunk_path(self.directory, self._chunk), self.compression, self.level)
+
+
+class MaskStore:
+    """
+    Lecture d'un store de masques
+
+    Les chunks sont ouverts en memmap à la demande (décompressés en mémoire
+    s'ils sont compressés) ; decode_frame rend tous les masques d'une frame
+    en un np.unpackbits sur la plage de la frame.
+
+    Codec delta : un masque est reconstruit depuis la clé la plus proche en
+    amont (au plus keyframe_interval - 1 XOR). Les découpes de la dernière
+    frame décodée sont gardées, une lecture séquentielle ne coûte donc qu'un
+    XOR par objet.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        with open(self.directory / "index.json", 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if info.get('format_version') not in (1, FORMAT_VERSION):
+            raise ValueError(f"❌ Version de store de masques non supportée: {info.get('format_version')}")
+        self.codec: str = info.get('codec', 'packbits')
+        self.object_ids: List[str] = info['object_ids']
+        self.index = np.load(self.directory / "index.npy")
+        self._chunks: Dict[int, np.memmap] = {}
+        self._crops: Dict[int, np.ndarray] = {}
+        self._ref_rows: Optional[Dict[Tuple[int, int], int]] = None
+
+        # Plage de lignes de chaque frame
+        frames = self.index['frame']
+        starts = np.flatnonzero(np.r_[True, frames[1:] != frames[:-1]]) if len(frames) else np.zeros(0, int)
+        stops = np.r_[starts[1:], len(frames)]
+        self._frame_rows = {int(frames[s]): (int(s), int(e)) for s, e in zip(starts, stops)}
+
+    @staticmethod
+    def chunk_path(directory: Path, chunk: int) -> Path:
+        """Fichier d'un chunk"""
+        return Path(directory) / f"chunk_{chunk:05d}.bin"
+
+    def _chunk(self, chunk: int) -> np.ndarray:
+        """Chunk en memmap lecture seule (décompressé en mémoire s'il est compressé)"""
+        data = self._chunks.get(chunk)
+        if data is None:
+            path = self.chunk_path(self.directory, chunk)
+            if is_compressed(path):
+                data = np.frombuffer(read_bytes(path), dtype=np.uint8)
+            elif path.stat().st_size:
+                data = np.memmap(path, dtype=np.uint8, mode='r')
+            else:
+                data = np.zeros(0, np.uint8)
+            self._chunks[chunk] = data
+        return data
+
+    @property
+    def frames(self) -> List[int]:
+        """Frames présentes dans le store"""
+        return list(self._frame_rows)
+
+    def decode_frame(self, frame: int) -> Tuple[List[str], np.ndarray]:
+        """
+        Tous les masques d'une frame
+
+        Returns:
+            (ids des objets, masques (N, H, W) bool)
+        """
+        if frame not in self._frame_rows:
+            raise KeyError(f"Frame absente du store de masques: {frame}")
+        start, stop = self._frame_rows[frame]
+        rows = self.index[start:stop]
+        height, width = (int(v) for v in rows['size'][0]) if len(rows) else (0, 0)
+        masks = np.zeros((len(rows), height, width), dtype=bool)
+        if not len(rows):
+            return [], masks
+        object_ids = [self.object_ids[code] for code in rows['object'].tolist()]
+
+        if self.codec == 'delta':
+            crops = {row: self._delta_crop(row) for row in range(start, stop)}
+            for i, (x, y, w, h) in enumerate(rows['box'].tolist()):
+                masks[i, y:y + h, x:x + w] = crops[start + i]
+            self._crops = crops
+            return object_ids, masks
+
+        # Masques de la frame contigus dans un chunk : un seul dépaquetage
+        first = int(rows['offset'][0])
+        last = int(rows['offset'][-1] + rows['length'][-1])
+        bits = np.unpackbits(self._chunk(int(rows['chunk'][0]))[first:last]).view(bool)
+
+        bit_offsets = (rows['offset'] - first) * 8
+        for i, (bit_offset, (x, y, w, h)) in enumerate(zip(bit_offsets.tolist(), rows['box'].tolist())):
+            masks[i, y:y + h, x:x + w] = bits[bit_offset:bit_offset + w * h].reshape(h, w)
+        return object_ids, masks
+
+    def decode(self, ref: Dict[str, Any]) -> np.ndarray:
+        """Masque (H, W) bool d'une référence d'annotation"""
+        height, width = ref['size']
+        x, y, w, h = ref['box']
+        mask = np.zeros((height, width), dtype=bool)
+        if ref.get('format') == DELTA_REF_FORMAT:
+            if w * h:
+                if self._ref_rows is None:
+                    # Lignes non vides : (chunk, offset) unique
+                    filled = np.flatnonzero(self.index['length'] > 0)
+                    self._ref_rows = dict(zip(zip(self.index['chunk'][filled].tolist(),
+                                                  self.index['offset'][filled].tolist()), filled.tolist()))
+                mask[y:y + h, x:x + w] = self._delta_crop(self._ref_rows[(ref['chunk'], ref['offset'])])
+            return mask
+        data = self._chunk(ref['chunk'])[ref['offset']:ref['offset'] + ref['length']]
+        mask[y:y + h, x:x + w] = np.unpackbits(data)[:w * h].view(bool).reshape(h, w)
+        return mask
+
+    def _delta_crop(self, row: int) -> np.ndarray:
+        """Découpe d'une ligne du codec delta : clé la plus proche puis XOR successifs"""
+        chain = []
+        while row not in self._crops and self.index['kind'][row] == KIND_DELTA:
+            chain.append(row)
+            row = int(self.index['previous'][row])
+        crop = self._crops[row] if row in self._crops else self._stored_crop(row)
+        for row in reversed(chain):
+            delta = self._stored_crop(row)
+            crop = _aligned(crop, *delta.shape) ^ delta
+        return crop
+
+    def _stored_crop(self, row: int) -> np.ndarray:
+        """Découpe RLE telle qu'écrite (clé ou XOR)"""
+        entry = self.index[row]
+        _, _, w, h = (int(v) for v in entry['box'])
+        offset, length = int(entry['offset']), int(entry['length'])
+        return _rle_crop(self._chunk(int(entry['chunk']))[offset:offset + length].tobytes(), h, w)
+
+
+def build_mask_store(project_data: Dict[str, Any], directory: Union[str, Path],
+                     chunk_frames: int = 256, codec: str = 'packbits',
+                     keyframe_interval: int = 10, compression: Optional[str] = None,
+                     level: Optional[int] = None) -> Dict[str, int]:
+    """
+    Déplace les masques RLE d'un projet dans un store bit-packé
+
+    Les masques 'rle_coco_base64' de chaque frame sont décodés en un appel
+    pycocotools puis écrits dans le store ; annotation['mask'] est remplacé
+    sur place par sa référence (format 'packbits_ref', ou 'delta_ref' avec
+    codec='delta').
+
+    Returns:
+        {'frames', 'masks'} écrits
+    """
+    counts = {'frames': 0, 'masks': 0}
+    has_rle = any(isinstance(ann, dict) and (ann.get('mask') or {}).get('format') == 'rle_coco_base64'
+                  for frame_annotations in project_data.get('annotations', {}).values()
+                  for ann in frame_annotations)
+    if not has_rle and (Path(directory) / "index.json").exists():
+        # Masques déjà déplacés (export relancé) : le store existant reste valide
+        return counts
+
+    writer = MaskStoreWriter(directory, chunk_frames, codec, keyframe_interval, compression, level)
+    for frame_key, frame_annotations in project_data.get('annotations', {}).items():
+        with_rle = [ann for ann in frame_annotations
+                    if isinstance(ann, dict) and (ann.get('mask') or {}).get('format') == 'rle_coco_base64']
+        if not with_rle:
+            continue
+        rles = [{"size": ann['mask']['size'], "counts": base64.b64decode(ann['mask']['counts'])} for ann in with_rle]
+        masks = mask_utils.decode(rles)
+        refs = writer.add_frame(int(frame_key), [str(ann['objectId']) for ann in with_rle], masks)
+        for annotation, ref in zip(with_rle, refs):
+            annotation['mask'] = ref
+        counts['frames'] += 1
+        counts['masks'] += len(refs)
+    writer.close()
+    return counts
@@ -0,0 +1,284 @@
+"""
+Base SQLite d'un match : tous les événements d'une vidéo dans un seul fichier
+Événements, objets, positions par frame et références de masques, écrits
+événement par événement dans une transaction (mode WAL)
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ..analytics.trajectory_store import TrajectoryStore, processed_to_original_frames
+
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY,
+    timestamp_seconds REAL,
+    start_frame INTEGER,
+    end_frame INTEGER,
+    annotation_frame INTEGER,
+    fps REAL,
+    project_file TEXT,
+    status TEXT,
+    processed_at TEXT,
+    info TEXT
+);
+CREATE TABLE IF NOT EXISTS objects (
+    event_id TEXT NOT NULL REFERENCES events(event_id) ON DELETE CASCADE,
+    object_id TEXT NOT NULL,
+    type TEXT,
+    team TEXT,
+    info TEXT,
+    PRIMARY KEY (event_id, object_id)
+);
+CREATE TABLE IF NOT EXISTS positions (
+    event_id TEXT NOT NULL REFERENCES events(event_id) ON DELETE CASCADE,
+    object_id TEXT NOT NULL,
+    frame INTEGER NOT NULL,
+    processed INTEGER NOT NULL,
+    time_seconds REAL,
+    image_x REAL, image_y REAL,
+    field_x REAL, field_y REAL,
+    smoothed_x REAL, smoothed_y REAL,
+    bbox_x REAL, bbox_y REAL, bbox_width REAL, bbox_height REAL,
+    score REAL
+);
+CREATE INDEX IF NOT EXISTS positions_event_frame ON positions (event_id, frame);
+CREATE INDEX IF NOT EXISTS positions_object_frame ON positions (object_id, frame);
+CREATE TABLE IF NOT EXISTS masks (
+    event_id TEXT NOT NULL REFERENCES events(event_id) ON DELETE CASCADE,
+    object_id TEXT NOT NULL,
+    frame INTEGER NOT NULL,
+    processed INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    chunk INTEGER,
+    offset INTEGER,
+    length INTEGER,
+    box_x INTEGER, box_y INTEGER, box_width INTEGER, box_height INTEGER,
+    height INTEGER, width INTEGER
+);
+CREATE INDEX IF NOT EXISTS masks_event_frame ON masks (event_id, frame);
+CREATE INDEX IF NOT EXISTS masks_object_frame ON masks (object_id, frame);
+"""
+
+# Colonnes de positions rendues par les requêtes (hors event_id/object_id)
+POSITION_COLUMNS = ('frame', 'processed', 'time_seconds', 'image_x', 'image_y', 'field_x', 'field_y',
+                    'smoothed_x', 'smoothed_y', 'bbox_x', 'bbox_y', 'bbox_width', 'bbox_height', 'score')
+
+
+def _nullable(column: np.ndarray) -> List[Optional[float]]:
+    """Colonne float → liste Python, NaN → None (NULL SQLite)"""
+    return [None if value != value else value for value in column.tolist()]
+
+
+class MatchStore:
+    """
+    Base SQLite par vidéo regroupant les sorties de tous ses événements
+
+    Chaque événement est écrit (ou remplacé) dans une seule transaction :
+    une écriture interrompue laisse la base dans son état précédent. Le mode
+    WAL permet de lire pendant le traitement des événements suivants.
+    Les positions sont indexées par (event_id, frame) et (object_id, frame) :
+    la trajectoire d'un joueur sur une plage de frames de tout le match est
+    une lecture d'index.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Fichier SQLite (créé avec son schéma si absent)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None:
+                self.connection.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            elif int(row[0]) != SCHEMA_VERSION:
+                raise ValueError(f"❌ Version de base de match non supportée: {row[0]}")
+
+    def close(self):
+        """Ferme la connexion"""
+        self.connection.close()
+
+    def __enter__(self) -> 'MatchStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ===== ÉCRITURE =====
+
+    def write_event(self, event: Dict[str, Any], project_data: Dict[str, Any],
+                    trajectories: Optional[TrajectoryStore] = None) -> Dict[str, int]:
+        """
+        Écrit (ou remplace) un événement et toutes ses lignes en une transaction
+
+        Args:
+            event: Entrée d'index de l'événement (event_id, timestamp_seconds, frame_range, ...)
+            project_data: Projet enrichi de l'événement
+            trajectories: Trajectoires déjà construites (recalculées depuis le projet sinon)
+
+        Returns:
+            {'objects', 'positions', 'masks'} lignes écrites
+        """
+        event_id = event['event_id']
+        trajectories = trajectories or TrajectoryStore.from_project_data(project_data)
+        fps = project_data.get('metadata', {}).get('fps')
+        frame_range = event.get('frame_range') or [None, None]
+
+        objects = [(event_id, str(obj_id), obj.get('type'), obj.get('team'), json.dumps(obj, ensure_ascii=False))
+                   for obj_id, obj in project_data.get('objects', {}).items()]
+        positions = self._position_rows(event_id, trajectories, fps)
+        masks = self._mask_rows(event_id, project_data)
+
+        with self.connection:
+            # Suppression en cascade des lignes d'un traitement précédent
+            self.connection.execute("DELETE FROM events WHERE event_id = ?", (event_id,))
+            self.connection.execute(
+                "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (event_id, event.get('timestamp_seconds'), frame_range[0], frame_range[1],
+                 event.get('annotation_frame'), fps, event.get('project_file'), event.get('status'),
+                 event.get('processed_at'), json.dumps(event, ensure_ascii=False))
+            )
+            self.connection.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?)", objects)
+            self.connection.executemany(f"INSERT INTO positions VALUES ({', '.join('?' * 16)})", positions)
+            self.connection.executemany(f"INSERT INTO masks VALUES ({', '.join('?' * 14)})", masks)
+
+        return {'objects': len(objects), 'positions': len(positions), 'masks': len(masks)}
+
+    def delete_event(self, event_id: str) -> bool:
+        """Supprime un événement et ses lignes"""
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM events WHERE event_id = ?", (event_id,))
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _position_rows(event_id: str, trajectories: TrajectoryStore, fps: Optional[float]) -> List[tuple]:
+        """Lignes de positions depuis les colonnes des trajectoires"""
+        columns = trajectories.columns
+        n_rows = trajectories.n_rows
+        object_ids = np.repeat(np.array(trajectories.object_ids, dtype=object), np.diff(trajectories.offsets))
+        frames = columns['frames']
+        times = frames / fps if fps else np.full(n_rows, np.nan)
+        smoothed = columns.get('field_smoothed_xy')
+        if smoothed is None:
+            smoothed = np.full((n_rows, 2), np.nan)
+        return list(zip(
+            [event_id] * n_rows, object_ids.tolist(), frames.tolist(), columns['processed'].tolist(),
+            _nullable(times),
+            _nullable(columns['image_xy'][:, 0]), _nullable(columns['image_xy'][:, 1]),
+            _nullable(columns['field_xy'][:, 0]), _nullable(columns['field_xy'][:, 1]),
+            _nullable(smoothed[:, 0]), _nullable(smoothed[:, 1]),
+            *(_nullable(columns['bbox'][:, i]) for i in range(4)),
+            _nullable(columns['score'])
+        ))
+
+    @staticmethod
+    def _mask_rows(event_id: str, project_data: Dict[str, Any]) -> List[tuple]:
+        """Références de masques : (chunk, offset) du store, ou RLE resté dans le JSON projet"""
+        processed_to_original = processed_to_original_frames(project_data)
+        rows = []
+        for frame_key, frame_annotations in project_data.get('annotations', {}).items():
+            processed = int(frame_key)
+            frame = processed_to_original.get(processed, processed)
+            for annotation in frame_annotations:
+                mask = annotation.get('mask')
+                if not mask:
+                    continue
+                box = mask.get('box') or (None, None, None, None)
+                height, width = mask.get('size') or (None, None)
+                rows.append((event_id, str(annotation['objectId']), frame, processed, mask.get('format'),
+                             mask.get('chunk'), mask.get('offset'), mask.get('length'), *box, height, width))
+        return rows
+
+    # ===== LECTURE =====
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Entrées d'index des événements, par timestamp croissant"""
+        rows = self.connection.execute("SELECT info FROM events ORDER BY timestamp_seconds").fetchall()
+        return [json.loads(info) for info, in rows]
+
+    def object_positions(self, object_id: Union[str, int], start_frame: Optional[int] = None,
+                         end_frame: Optional[int] = None, event_ids: Optional[Sequence[str]] = None,
+                         columns: Sequence[str] = POSITION_COLUMNS) -> Dict[str, np.ndarray]:
+        """
+        Positions d'un objet sur tout le match, triées par frame
+
+        Args:
+            object_id: Id de l'objet
+            start_frame, end_frame: Plage [start_frame, end_frame) de frames originales
+            event_ids: Restreint à ces événements
+            columns: Colonnes de POSITION_COLUMNS à rendre
+
+        Returns:
+            {'event_id': (N,) object, colonne: (N,) float64/int64}
+        """
+        where, params = ["object_id = ?"], [str(object_id)]
+        if start_frame is not None:
+            where.append("frame >= ?")
+            params.append(int(start_frame))
+        if end_frame is not None:
+            where.append("frame < ?")
+            params.append(int(end_frame))
+        if event_ids is not None:
+            where.append(f"event_id IN ({', '.join('?' * len(event_ids))})")
+            params.extend(event_ids)
+        return self._select_positions(" AND ".join(where), params, columns, "frame, event_id")
+
+    def frame_positions(self, event_id: str, frame: int,
+                        columns: Sequence[str] = POSITION_COLUMNS) -> Dict[str, np.ndarray]:
+        """Positions de tous les objets d'un événement sur une frame originale"""
+        return self._select_positions("event_id = ? AND frame = ?", [event_id, int(frame)],
+                                      ('object_id', *columns), "rowid")
+
+    def mask_refs(self, event_id: str, frame: int) -> List[Dict[str, Any]]:
+        """Références de masques d'une frame, au format de annotation['mask'] (+ objectId)"""
+        rows = self.connection.execute(
+            "SELECT object_id, format, chunk, offset, length, box_x, box_y, box_width, box_height, height, width "
+            "FROM masks WHERE event_id = ? AND frame = ? ORDER BY rowid", (event_id, int(frame))
+        ).fetchall()
+        refs = []
+        for object_id, mask_format, chunk, offset, length, *box, height, width in rows:
+            ref = {"objectId": object_id, "format": mask_format, "size": [height, width]}
+            if chunk is not None:
+                ref.update(chunk=chunk, offset=offset, length=length, box=box)
+            refs.append(ref)
+        return refs
+
+    def _select_positions(self, where: str, params: List[Any], columns: Sequence[str],
+                          order_by: str) -> Dict[str, np.ndarray]:
+        """Requête de positions rendue en colonnes NumPy (NULL → NaN)"""
+        unknown = set(columns) - set(POSITION_COLUMNS) - {'object_id'}
+        if unknown:
+            raise ValueError(f"❌ Colonnes de positions inconnues: {sorted(unknown)}")
+        selected = ['event_id', *columns]
+        rows = self.connection.execute(
+            f"SELECT {', '.join(selected)} FROM positions WHERE {where} ORDER BY {order_by}", params
+        ).fetchall()
+
+        values = list(zip(*rows)) if rows else [()] * len(selected)
+        result = {}
+        for name, column in zip(selected, values):
+            if name in ('event_id', 'object_id'):
+                result[name] = np.array(column, dtype=object)
+            elif name in ('frame', 'processed'):
+                result[name] = np.array(column, dtype=np.int64)
+            else:
+                result[name] = np.array(column, dtype=np.float64)  # None → nan
+        return result
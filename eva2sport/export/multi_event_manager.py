@@ -3,35 +3,62 @@ Gestionnaire d'événements multiples pour EVA2SPORT
 Gère l'index global et les fichiers séparés par événement
 """
 
-import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Tuple
 from datetime import datetime
 
 from ..config import Config
 from ..pipeline import EVA2SportPipeline
 from ..utils import TimestampReader
+from ..enrichment.reenricher import CalibrationReenricher
+from ..analytics.trajectory_store import TrajectoryStore
+from ..analytics.spatial_index import FrameSpatialIndex
+from .match_store import MatchStore
+from ..utils.json_serializer import json_serializer
+from ..utils.compression import compressed_path, plain_path, path_compression, find_output, remove_other_variants
 
 
 class MultiEventManager:
     """Gestionnaire pour traiter plusieurs événements avec index global"""
     
-    def __init__(self, video_name: str, working_dir: Optional[str] = None):
+    DEFAULT_VIDEO_PARAMS = {
+        'fps': 5,
+        'show_minimap': True,
+        'cleanup_frames': True,
+        'force_regenerate': True
+    }
+    
+    def __init__(self, video_name: str, working_dir: Optional[str] = None,
+                 output_compression: Optional[str] = None, output_compression_level: Optional[int] = None,
+                 match_store: Optional[bool] = False):
         """
         Initialise le gestionnaire d'événements multiples
         
         Args:
             video_name: Nom de la vidéo de base (sans suffixe d'événement)
             working_dir: Répertoire de travail
+            output_compression: Compression de l'index et des sorties des événements (None, 'zstd', 'gzip')
+            output_compression_level: Niveau de compression (None = défaut du codec)
+            match_store: Consolide aussi chaque événement dans la base SQLite du match
+                (None : seulement si la base existe déjà)
+        
+        La connexion à la base est fermée par close() ou en sortie de bloc with.
         """
         self.video_name = video_name
         self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.output_compression = output_compression
+        self.output_compression_level = output_compression_level
         
         # Chemins pour l'index global - Structure hiérarchique
         self.videos_dir = self.working_dir / "data" / "videos"
         self.base_output_dir = self.videos_dir / "outputs"
         self.video_output_dir = self.base_output_dir / video_name
-        self.index_file = self.video_output_dir / f"{video_name}_events_index.json"
+        self.index_file = compressed_path(self.video_output_dir / f"{video_name}_events_index.json",
+                                          output_compression)
+        self.match_store_path = self.video_output_dir / f"{video_name}_match.sqlite"
+        if match_store is None:
+            match_store = self.match_store_path.exists()
+        self.match_store = MatchStore(self.match_store_path) if match_store else None
         
         # Utilitaires - Créer avec une config temporaire pour la résolution des chemins
         from ..config import Config
@@ -46,9 +73,10 @@ class MultiEventManager:
         # Créer le dossier de la vidéo si nécessaire
         self.video_output_dir.mkdir(parents=True, exist_ok=True)
         
-        if self.index_file.exists():
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        # Index existant, éventuellement écrit avec une autre compression
+        existing_index = find_output(self.index_file)
+        if existing_index is not None:
+            return json_serializer.load(existing_index)
         else:
             return {
                 "video_name": self.video_name,
@@ -75,101 +103,21 @@ class MultiEventManager:
         """
         event_id = f"event_{int(event_timestamp)}s"
         
-        print(f"🎯 Traitement de l'événement: {event_id}")
-        print(f"   ⏰ Timestamp: {event_timestamp}s")
-        
-        # Vérifier si l'événement existe déjà
-        existing_event = self._find_event_by_id(event_id)
-        if existing_event:
-            print(f"   ⚠️ Événement {event_id} existe déjà")
-            return existing_event
-        
         try:
-            # Extraire les paramètres segment_offset_* des kwargs pour éviter les conflits
-            pipeline_kwargs = kwargs.copy()
-            
-            # Utiliser les valeurs des kwargs si présentes, sinon les paramètres par défaut
-            segment_offset_before_seconds = kwargs.get('segment_offset_before_seconds', segment_offset_before)
-            segment_offset_after_seconds = kwargs.get('segment_offset_after_seconds', segment_offset_after)
-            
-            # Supprimer ces paramètres des kwargs pour éviter les conflits
-            pipeline_kwargs.pop('segment_offset_before_seconds', None)
-            pipeline_kwargs.pop('segment_offset_after_seconds', None)
-            
-            # Vérifier s'il y a des annotations valides AVANT de créer toute config
-            if not self._has_valid_annotations_for_event(
-                event_timestamp, 
-                segment_offset_before_seconds, 
-                segment_offset_after_seconds
-            ):
-                print(f"   ❌ Événement {event_id} ignoré - pas de tracking possible")
-                return None
-            
-            # Créer et exécuter la pipeline pour cet événement
-            pipeline = EVA2SportPipeline(
-                self.video_name,
-                event_timestamp_seconds=event_timestamp,
-                segment_offset_before_seconds=segment_offset_before_seconds,
-                segment_offset_after_seconds=segment_offset_after_seconds,
-                **pipeline_kwargs
+            pipeline, existing_result = self._prepare_event_pipeline(
+                event_timestamp, segment_offset_before, segment_offset_after, **kwargs
             )
+            if pipeline is None:
+                return existing_result
             
-            # Exécuter la pipeline
+            # Exécuter la pipeline (l'extraction est revalidée, les étapes inchangées viennent du cache)
             results = pipeline.run_full_pipeline(
-                force_extraction=True,
+                force_extraction=False,
                 export_video=True,
-                video_params=kwargs.get('video_params', {
-                    'fps': 5,
-                    'show_minimap': True,
-                    'cleanup_frames': True,
-                    'force_regenerate': True
-                })
+                video_params=kwargs.get('video_params', self.DEFAULT_VIDEO_PARAMS)
             )
             
-            if results['status'] == 'success':
-                # Ajouter à l'index
-                event_info = {
-                    "event_id": event_id,
-                    "timestamp_seconds": event_timestamp,
-                    "frame_range": [
-                        results.get('segment_start_frame', 0),
-                        results.get('segment_end_frame', 0)
-                    ],
-                    "annotation_frame": results.get('reference_frame', 0),
-                    "project_file": str(Path(results['export_paths']['json']).relative_to(self.video_output_dir)),
-                    "video_file": str(Path(results['export_paths']['video']).relative_to(self.video_output_dir)) if 'video' in results['export_paths'] else None,
-                    "objects_count": results['objects_tracked'],
-                    "annotations_count": results['total_annotations'],
-                    "frames_count": results['frames_extracted'],
-                    "status": "completed",
-                    "processed_at": datetime.now().isoformat(),
-                    "config": {
-                        "segment_offset_before": segment_offset_before_seconds,
-                        "segment_offset_after": segment_offset_after_seconds,
-                        "frame_interval": results['config']['frame_interval']
-                    }
-                }
-                
-                self.events_index["events"].append(event_info)
-                self.events_index["total_events"] = len(self.events_index["events"])
-                self.events_index["last_updated"] = datetime.now().isoformat()
-                
-                self._save_index()
-                
-                print(f"   ✅ Événement {event_id} traité avec succès")
-                return event_info
-            else:
-                error_msg = results.get('error', 'Erreur inconnue')
-                print(f"   ❌ Échec du traitement de l'événement {event_id}: {error_msg}")
-                
-                # Afficher les détails de l'erreur si disponibles
-                if 'error_details' in results and results['error_details']:
-                    print(f"   💥 Détails de l'erreur:")
-                    for line in results['error_details'].split('\n'):
-                        if line.strip():
-                            print(f"      {line}")
-                
-                return None
+            return self._register_event_results(event_timestamp, pipeline, results)
                 
         except Exception as e:
             import traceback
@@ -181,11 +129,195 @@ class MultiEventManager:
                     print(f"      {line}")
             return None
     
+    def add_events_batch(self, event_timestamps: List[float],
+                         segment_offset_before: float = 3.0,
+                         segment_offset_after: float = 3.0,
+                         max_batch_size: Optional[int] = None,
+                         **kwargs) -> List[Optional[Dict[str, Any]]]:
+        """
+        Ajoute plusieurs événements avec un tracking SAM2 en lot
+        
+        Les clips sont propagés en lockstep avec un seul predictor : à chaque pas,
+        leurs frames forment un seul batch pour l'encodeur d'image.
+        
+        Args:
+            event_timestamps: Timestamps des événements en secondes
+            segment_offset_before: Offset avant l'événement
+            segment_offset_after: Offset après l'événement
+            max_batch_size: Nombre maximal de frames par passage encodeur
+            **kwargs: Autres paramètres pour la pipeline
+            
+        Returns:
+            Résultats par événement (None en cas d'échec), dans l'ordre des timestamps
+        """
+        event_results: List[Optional[Dict[str, Any]]] = [None] * len(event_timestamps)
+        pipelines = []
+        positions = []
+        
+        for position, event_timestamp in enumerate(event_timestamps):
+            try:
+                pipeline, existing_result = self._prepare_event_pipeline(
+                    event_timestamp, segment_offset_before, segment_offset_after, **kwargs
+                )
+            except Exception as e:
+                print(f"   ❌ Erreur lors de la préparation de event_{int(event_timestamp)}s: {e}")
+                continue
+            
+            if pipeline is None:
+                event_results[position] = existing_result
+            else:
+                pipelines.append(pipeline)
+                positions.append(position)
+        
+        if not pipelines:
+            return event_results
+        
+        print(f"🚀 Tracking en lot de {len(pipelines)} événements")
+        all_results = EVA2SportPipeline.run_batch(
+            pipelines,
+            max_batch_size=max_batch_size,
+            export_video=True,
+            video_params=kwargs.get('video_params', self.DEFAULT_VIDEO_PARAMS)
+        )
+        
+        for position, pipeline, results in zip(positions, pipelines, all_results):
+            event_results[position] = self._register_event_results(
+                event_timestamps[position], pipeline, results
+            )
+        
+        return event_results
+    
+    def _prepare_event_pipeline(self, event_timestamp: float,
+                                segment_offset_before: float,
+                                segment_offset_after: float,
+                                **kwargs) -> Tuple[Optional[EVA2SportPipeline], Optional[Dict[str, Any]]]:
+        """
+        Crée la pipeline d'un événement, ou retourne l'entrée existante si rien n'a changé
+        
+        Returns:
+            Tuple (pipeline à exécuter ou None, résultat direct si pas d'exécution)
+        """
+        event_id = f"event_{int(event_timestamp)}s"
+        
+        print(f"🎯 Traitement de l'événement: {event_id}")
+        print(f"   ⏰ Timestamp: {event_timestamp}s")
+        
+        # Vérifier si l'événement existe déjà (entrées sans clé de cache : ancien index)
+        existing_event = self._find_event_by_id(event_id)
+        if existing_event and not existing_event.get('cache_key'):
+            print(f"   ⚠️ Événement {event_id} existe déjà")
+            return None, existing_event
+        
+        # Extraire les paramètres segment_offset_* des kwargs pour éviter les conflits
+        pipeline_kwargs = kwargs.copy()
+        
+        # Utiliser les valeurs des kwargs si présentes, sinon les paramètres par défaut
+        segment_offset_before_seconds = kwargs.get('segment_offset_before_seconds', segment_offset_before)
+        segment_offset_after_seconds = kwargs.get('segment_offset_after_seconds', segment_offset_after)
+        
+        # Supprimer ces paramètres des kwargs pour éviter les conflits
+        pipeline_kwargs.pop('segment_offset_before_seconds', None)
+        pipeline_kwargs.pop('segment_offset_after_seconds', None)
+        pipeline_kwargs.pop('video_params', None)
+        if self.output_compression:
+            pipeline_kwargs.setdefault('output_compression', self.output_compression)
+            pipeline_kwargs.setdefault('output_compression_level', self.output_compression_level)
+        
+        # Vérifier s'il y a des annotations valides AVANT de créer toute config
+        if not self._has_valid_annotations_for_event(
+            event_timestamp, 
+            segment_offset_before_seconds, 
+            segment_offset_after_seconds
+        ):
+            print(f"   ❌ Événement {event_id} ignoré - pas de tracking possible")
+            return None, None
+        
+        # Créer la pipeline pour cet événement
+        pipeline = EVA2SportPipeline(
+            self.video_name,
+            event_timestamp_seconds=event_timestamp,
+            segment_offset_before_seconds=segment_offset_before_seconds,
+            segment_offset_after_seconds=segment_offset_after_seconds,
+            **pipeline_kwargs
+        )
+        
+        # Entrées inchangées → simple lecture du cache
+        if existing_event:
+            cache_key = self._compute_event_cache_key(pipeline)
+            project_file = self.video_output_dir / existing_event['project_file']
+            if cache_key == existing_event['cache_key'] and project_file.exists():
+                print(f"   ✅ Événement {event_id} inchangé (cache {cache_key[:12]})")
+                return None, existing_event
+            print(f"   🔄 Entrées modifiées, retraitement de {event_id}")
+        
+        return pipeline, None
+    
+    def _register_event_results(self, event_timestamp: float, pipeline: EVA2SportPipeline,
+                                results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ajoute (ou remplace) l'entrée d'index d'un événement traité"""
+        event_id = f"event_{int(event_timestamp)}s"
+        
+        if results['status'] != 'success':
+            error_msg = results.get('error', 'Erreur inconnue')
+            print(f"   ❌ Échec du traitement de l'événement {event_id}: {error_msg}")
+            
+            # Afficher les détails de l'erreur si disponibles
+            if 'error_details' in results and results['error_details']:
+                print(f"   💥 Détails de l'erreur:")
+                for line in results['error_details'].split('\n'):
+                    if line.strip():
+                        print(f"      {line}")
+            
+            return None
+        
+        # Ajouter à l'index
+        event_info = {
+            "event_id": event_id,
+            "timestamp_seconds": event_timestamp,
+            "frame_range": [
+                results.get('segment_start_frame', 0),
+                results.get('segment_end_frame', 0)
+            ],
+            "annotation_frame": results.get('reference_frame', 0),
+            "project_file": str(Path(results['export_paths']['json']).relative_to(self.video_output_dir)),
+            "video_file": str(Path(results['export_paths']['video']).relative_to(self.video_output_dir)) if 'video' in results['export_paths'] else None,
+            "objects_count": results['objects_tracked'],
+            "annotations_count": results['total_annotations'],
+            "frames_count": results['frames_extracted'],
+            "status": "completed",
+            "processed_at": datetime.now().isoformat(),
+            "cache_key": results.get('cache_keys', {}).get('enrichment'),
+            "config": {
+                "segment_offset_before": pipeline.config.SEGMENT_OFFSET_BEFORE_SECONDS,
+                "segment_offset_after": pipeline.config.SEGMENT_OFFSET_AFTER_SECONDS,
+                "frame_interval": results['config']['frame_interval']
+            }
+        }
+        
+        existing_event = self._find_event_by_id(event_id)
+        if existing_event:
+            position = self.events_index["events"].index(existing_event)
+            self.events_index["events"][position] = event_info
+        else:
+            self.events_index["events"].append(event_info)
+        self.events_index["total_events"] = len(self.events_index["events"])
+        self.events_index["last_updated"] = datetime.now().isoformat()
+        
+        self._save_index()
+        
+        if self.match_store is not None:
+            counts = self.match_store.write_event(event_info, pipeline.project_data, pipeline.trajectories)
+            print(f"   🗄️ Base du match: {counts['positions']} positions, {counts['masks']} masques")
+        
+        print(f"   ✅ Événement {event_id} traité avec succès")
+        return event_info
+    
     def process_multiple_events(self, event_timestamps: Optional[List[float]] = None,
                                csv_file: Optional[Union[str, Path]] = None,
                                json_file: Optional[Union[str, Path]] = None,
                                csv_config: Optional[Dict[str, str]] = None,
                                validate_timestamps: bool = True,
+                               batch_size: int = 1,
                                **kwargs) -> Dict[str, Any]:
         """
         Traite plusieurs événements depuis différentes sources
@@ -196,6 +328,7 @@ class MultiEventManager:
             json_file: Fichier JSON contenant les timestamps
             csv_config: Configuration pour la lecture CSV (timestamp_column, filter_column, filter_value)
             validate_timestamps: Valider les timestamps contre la durée de la vidéo
+            batch_size: Nombre d'événements propagés ensemble (tracking SAM2 en lot si > 1)
             **kwargs: Paramètres communs pour tous les événements
             
         Returns:
@@ -225,10 +358,20 @@ class MultiEventManager:
             "events_details": []
         }
         
+        if batch_size > 1:
+            event_results = []
+            for start in range(0, len(timestamps), batch_size):
+                print(f"\n--- Lot {start // batch_size + 1} ({len(timestamps[start:start + batch_size])} événements) ---")
+                event_results.extend(self.add_events_batch(timestamps[start:start + batch_size], **kwargs))
+        else:
+            event_results = None
+        
         for i, timestamp in enumerate(timestamps):
-            print(f"\n--- Événement {i+1}/{len(timestamps)} ---")
-            
-            event_result = self.add_event(timestamp, **kwargs)
+            if event_results is not None:
+                event_result = event_results[i]
+            else:
+                print(f"\n--- Événement {i+1}/{len(timestamps)} ---")
+                event_result = self.add_event(timestamp, **kwargs)
             
             if event_result:
                 results["successful_events"] += 1
@@ -269,12 +412,22 @@ class MultiEventManager:
                 return event
         return None
     
+    def _compute_event_cache_key(self, pipeline: EVA2SportPipeline) -> str:
+        """Calcule la clé de cache finale d'un événement sans lancer le tracking (reprise par la pipeline)"""
+        return pipeline.prepare()['enrichment']
+    
     def _save_index(self):
-        """Sauvegarde l'index des événements"""
+        """
+        Sauvegarde l'index des événements
+        
+        L'index est écrit avec la compression courante ; une version écrite avec
+        une autre compression est supprimée pour qu'aucun index périmé ne soit relu.
+        """
         # S'assurer que le dossier parent existe
         self.index_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(self.events_index, f, indent=2, ensure_ascii=False)
+        json_serializer.dump(self.events_index, self.index_file, compression=self.output_compression,
+                             level=self.output_compression_level)
+        remove_other_variants(self.index_file)
     
     def _has_valid_annotations_for_event(self, event_timestamp: float,
                                         segment_offset_before_seconds: float,
@@ -304,15 +457,12 @@ class MultiEventManager:
         try:
             if calib_path.exists() and objects_path.exists():
                 # Nouveau format : deux fichiers
-                with open(calib_path, 'r', encoding='utf-8') as f:
-                    calib_data = json.load(f)
-                with open(objects_path, 'r', encoding='utf-8') as f:
-                    objects_data = json.load(f)
+                calib_data = json_serializer.load(calib_path)
+                objects_data = json_serializer.load(objects_path)
                 project_config = {**calib_data, **objects_data}
             elif config_path.exists():
                 # Ancien format : un seul fichier
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    project_config = json.load(f)
+                project_config = json_serializer.load(config_path)
             else:
                 print(f"   ❌ Configuration non trouvée pour {self.video_name}")
                 return False
@@ -478,6 +628,137 @@ class MultiEventManager:
         """
         return self.timestamp_reader.get_csv_info(csv_file)
     
+    def reenrich_calibration(self, calibration_file: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """
+        Recalcule les positions terrain de tous les événements avec la calibration courante
+        
+        Seuls points.output.field, les positions lissées (et la section calibration)
+        des JSON projet sont réécrits ; masques et tracking sont conservés. Les
+        trajectoires colonnaires existantes sont reconstruites.
+        
+        Args:
+            calibration_file: Fichier de calibration (défaut: {video}_calib.json, sinon {video}_config.json)
+        
+        Returns:
+            Résumé par événement
+        """
+        print(f"📐 RÉ-ENRICHISSEMENT CALIBRATION - {self.video_name}")
+        print("=" * 50)
+        
+        calibration = self._load_calibration(calibration_file)
+        
+        # Charger tous les projets pour une projection unique
+        project_paths = {}
+        projects = {}
+        for event in self.events_index["events"]:
+            if event.get("status") != "completed" or not event.get("project_file"):
+                continue
+            project_path = self.video_output_dir / event["project_file"]
+            if not project_path.exists():
+                print(f"   ⚠️ Projet introuvable pour {event['event_id']}: {project_path}")
+                continue
+            projects[event["event_id"]] = json_serializer.load(project_path)
+            project_paths[event["event_id"]] = project_path
+        
+        if not projects:
+            print("   ❌ Aucun projet à ré-enrichir")
+            return {'events': {}, 'total_patched': 0}
+        
+        stats = CalibrationReenricher(calibration).reenrich(projects)
+        
+        for event_id, project_data in projects.items():
+            project_path = project_paths[event_id]
+            temp_path = project_path.with_name(project_path.name + '.tmp')
+            json_serializer.dump(project_data, temp_path, compression=path_compression(project_path),
+                                 level=self.output_compression_level)
+            temp_path.replace(project_path)
+            
+            # Trajectoires colonnaires et index spatial écrits à côté du JSON
+            trajectories_dir = project_path.parent / plain_path(project_path).name.replace('_project.json', '_trajectories')
+            spatial_dir = project_path.parent / plain_path(project_path).name.replace('_project.json', '_spatial')
+            if trajectories_dir.exists() or spatial_dir.exists():
+                store = TrajectoryStore.from_project_data(project_data)
+                if trajectories_dir.exists():
+                    store.save(trajectories_dir)
+                if spatial_dir.exists():
+                    # Même colonne de positions (brute ou lissée) que l'index exporté
+                    position_column = json_serializer.load(spatial_dir / "index.json")['position_column']
+                    FrameSpatialIndex.from_store(store, project_data.get('objects', {}), position_column).save(spatial_dir)
+            
+            event = self._find_event_by_id(event_id)
+            event["recalibrated_at"] = datetime.now().isoformat()
+            if self.match_store is not None:
+                self.match_store.write_event(event, project_data)
+            smoothed = stats[event_id]['smoothed']
+            cleared = stats[event_id]['smoothing_cleared']
+            print(f"   ✅ {event_id}: {stats[event_id]['patched']} positions recalculées"
+                  + (f", {smoothed} positions relissées" if smoothed else "")
+                  + (f", {cleared} positions lissées retirées (réglages de lissage absents)" if cleared else ""))
+        
+        self.events_index["last_updated"] = datetime.now().isoformat()
+        self._save_index()
+        
+        total_patched = sum(event_stats['patched'] for event_stats in stats.values())
+        print(f"\n✅ {total_patched} positions terrain recalculées sur {len(projects)} événements")
+        return {'events': stats, 'total_patched': total_patched}
+    
+    def sync_match_store(self) -> Dict[str, int]:
+        """
+        Écrit dans la base SQLite du match tous les événements terminés de l'index
+
+        Sert à construire la base pour des événements traités avant son
+        activation ; chaque événement est remplacé dans sa propre transaction.
+        """
+        if self.match_store is None:
+            self.match_store = MatchStore(self.match_store_path)
+        
+        totals = {'events': 0, 'positions': 0, 'masks': 0}
+        for event in self.events_index["events"]:
+            if event.get("status") != "completed" or not event.get("project_file"):
+                continue
+            project_path = self.video_output_dir / event["project_file"]
+            if not project_path.exists():
+                print(f"   ⚠️ Projet introuvable pour {event['event_id']}: {project_path}")
+                continue
+            counts = self.match_store.write_event(event, json_serializer.load(project_path))
+            totals['events'] += 1
+            totals['positions'] += counts['positions']
+            totals['masks'] += counts['masks']
+        
+        print(f"🗄️ Base du match: {self.match_store_path} ({totals['events']} événements, "
+              f"{totals['positions']} positions)")
+        return totals
+    
+    def _load_calibration(self, calibration_file: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """Charge la section calibration (fichier _calib.json séparé ou config unique)"""
+        if calibration_file is None:
+            calibration_file = self.videos_dir / f"{self.video_name}_calib.json"
+            if not calibration_file.exists():
+                calibration_file = self.videos_dir / f"{self.video_name}_config.json"
+        
+        calibration_file = Path(calibration_file)
+        if not calibration_file.exists():
+            raise FileNotFoundError(f"❌ Fichier de calibration introuvable: {calibration_file}")
+        
+        data = json_serializer.load(calibration_file)
+        
+        if 'calibration' not in data:
+            raise ValueError(f"❌ Section 'calibration' absente de {calibration_file}")
+        print(f"   📄 Calibration: {calibration_file}")
+        return data['calibration']
+    
+    def close(self):
+        """Ferme la base SQLite du match si elle est ouverte"""
+        if self.match_store is not None:
+            self.match_store.close()
+            self.match_store = None
+    
+    def __enter__(self) -> 'MultiEventManager':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
     def display_events_summary(self):
         """Affiche un résumé des événements"""
         print(f"\n📋 RÉSUMÉ DES ÉVÉNEMENTS - {self.video_name}")
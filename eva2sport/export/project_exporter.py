@@ -2,7 +2,6 @@
 Exporteur de projets EVA2SPORT - Version Simplifiée
 """
 
-import json
 import uuid
 import colorsys
 import random
@@ -11,6 +10,13 @@ from datetime import datetime
 from typing import Dict, Any, List, Tuple, Optional
 
 from ..config import Config
+from ..analytics.trajectory_store import TrajectoryStore
+from ..analytics.spatial_index import FrameSpatialIndex
+from .binary_project import save_project_binary, StreamingProjectWriter
+from .mask_store import build_mask_store
+from ..utils.frame_mapping import FrameMapping
+from ..utils.json_serializer import json_serializer
+from ..utils.compression import compressed_path, plain_path
 
 
 class ProjectExporter:
@@ -25,16 +31,16 @@ class ProjectExporter:
         
         print(f"💾 Sauvegarde du projet JSON...")
         
-        # Sauvegarde principale (formatée)
+        # Sauvegarde principale (formatée, compressée si OUTPUT_COMPRESSION)
         json_path = self.config.output_json_path
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(project_data, f, indent=2, ensure_ascii=False)
+        compression = self.config.OUTPUT_COMPRESSION
+        level = self.config.OUTPUT_COMPRESSION_LEVEL
+        json_serializer.dump(project_data, json_path, compression=compression, level=level)
         
         # Sauvegarde compacte optionnelle
         if compact:
-            compact_path = json_path.with_suffix('.compact.json')
-            with open(compact_path, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, separators=(',', ':'), ensure_ascii=False)
+            compact_path = compressed_path(plain_path(json_path).with_suffix('.compact.json'), compression)
+            json_serializer.dump(project_data, compact_path, indent=False, compression=compression, level=level)
         
         # Statistiques
         file_size = json_path.stat().st_size / 1024  # KB
@@ -43,6 +49,44 @@ class ProjectExporter:
         
         return json_path
     
+    def save_project_binary(self, project_data: Dict[str, Any]) -> Path:
+        """Sauvegarde le projet au format binaire .evab, écrit bloc par bloc (relecture identique au JSON)"""
+        binary_path = save_project_binary(project_data, self.config.output_binary_path)
+        file_size = binary_path.stat().st_size / 1024  # KB
+        print(f"   📦 Binaire sauvé: {binary_path} ({file_size:.1f} KB)")
+        return binary_path
+    
+    def finalize_project_binary(self, writer: StreamingProjectWriter, project_data: Dict[str, Any]) -> Path:
+        """Termine le .evab écrit pendant le tracking : champs enrichis réécrits sur place, puis index final"""
+        for frame_key, frame_annotations in project_data['annotations'].items():
+            writer.update_frame(frame_key, frame_annotations)
+        binary_path = writer.finalize(project_data)
+        file_size = binary_path.stat().st_size / 1024  # KB
+        print(f"   📦 Binaire finalisé: {binary_path} ({file_size:.1f} KB)")
+        return binary_path
+    
+    def save_mask_store(self, project_data: Dict[str, Any]) -> Path:
+        """Déplace les masques RLE dans le store de masques (annotations modifiées sur place)"""
+        counts = build_mask_store(project_data, self.config.mask_store_dir,
+                                  codec=self.config.MASK_STORE_CODEC,
+                                  keyframe_interval=self.config.MASK_KEYFRAME_INTERVAL,
+                                  compression=self.config.OUTPUT_COMPRESSION,
+                                  level=self.config.OUTPUT_COMPRESSION_LEVEL)
+        print(f"   🎭 Masques sauvés: {self.config.mask_store_dir} ({counts['masks']} masques, {counts['frames']} frames)")
+        return self.config.mask_store_dir
+    
+    def save_trajectories(self, trajectories: TrajectoryStore) -> Path:
+        """Sauvegarde les trajectoires colonnaires à côté du JSON projet"""
+        directory = trajectories.save(self.config.trajectories_dir)
+        print(f"   📈 Trajectoires sauvées: {directory} ({len(trajectories)} objets, {trajectories.n_rows} positions)")
+        return directory
+    
+    def save_spatial_index(self, spatial_index: FrameSpatialIndex) -> Path:
+        """Sauvegarde l'index spatial par frame à côté des trajectoires"""
+        directory = spatial_index.save(self.config.spatial_index_dir)
+        print(f"   🗺️ Index spatial sauvé: {directory} ({len(spatial_index.frames)} frames, {len(spatial_index.object_ids)} objets)")
+        return directory
+    
     def create_visualizations(self, project_data: Dict[str, Any]) -> Dict[str, Path]:
         """Crée les visualisations du projet"""
         viz_paths = {}
@@ -127,9 +171,7 @@ class ProjectExporter:
         anchor_frame = self._get_anchor_frame(project_config)
         
         # Mapping des frames
-        frame_mapping, processed_frames = self._generate_frame_mapping(
-            video_info['total_frames'], anchor_frame
-        )
+        frame_mapping = self._generate_frame_mapping(video_info['total_frames'], anchor_frame)
         
         # Structure des objets avec couleurs
         objects = self._create_objects_structure(project_config, added_objects)
@@ -147,9 +189,10 @@ class ProjectExporter:
                     "aspect_ratio": round(video_info['width'] / video_info['height'], 2)
                 },
                 "frame_interval": self.config.FRAME_INTERVAL,
+                "sampling": "adaptive" if self.config.ADAPTIVE_SAMPLING else "fixed",
                 "frame_count_original": video_info['total_frames'],
-                "frame_count_processed": len(processed_frames),
-                "frame_mapping": frame_mapping,
+                "frame_count_processed": len(frame_mapping),
+                "frame_mapping": frame_mapping.to_json(),
                 "anchor_frame": anchor_frame,
                 "static_video": False
             },
@@ -180,33 +223,14 @@ class ProjectExporter:
         
         return anchor_frame_in_segment
             
-    def _generate_frame_mapping(self, total_frames: int, anchor_frame: int) -> Tuple[List[Optional[int]], List[int]]:
-        """Génère le mapping frame_originale → frame_traitée"""
-        frame_mapping = [None] * total_frames
-        processed_frames = set()
-        processed_idx = 0
-        
-        # S'assurer que anchor_frame est incluse
-        if 0 <= anchor_frame * self.config.FRAME_INTERVAL < total_frames:
-            frame_mapping[anchor_frame * self.config.FRAME_INTERVAL] = processed_idx
-            processed_frames.add(anchor_frame * self.config.FRAME_INTERVAL)
-            processed_idx += 1
-        
-        # Ajouter les frames selon l'intervalle
-        for original_idx in range(0, total_frames, self.config.FRAME_INTERVAL):
-            if original_idx not in processed_frames:
-                frame_mapping[original_idx] = processed_idx
-                processed_frames.add(original_idx)
-                processed_idx += 1
-        
-        # Réorganiser par ordre chronologique
-        sorted_frames = sorted(processed_frames)
-        final_mapping = [None] * total_frames
-        
-        for new_idx, original_frame in enumerate(sorted_frames):
-            final_mapping[original_frame] = new_idx
-        
-        return final_mapping, sorted_frames
+    def _generate_frame_mapping(self, total_frames: int, anchor_frame: int) -> FrameMapping:
+        """Génère le mapping frame_originale → frame_traitée (plages compactes)"""
+        # Frames réellement extraites (pas fixe ou adaptatif) : mapping exact
+        if self.config.processed_frames:
+            return FrameMapping.from_frames(self.config.processed_frames, total_frames)
+        
+        # Pas fixe : une seule plage, la frame d'ancrage (multiple de l'intervalle) y est incluse
+        return FrameMapping([[0, total_frames, self.config.FRAME_INTERVAL]], total_frames)
     
     def _create_objects_structure(self, project_config: Dict[str, Any], 
                                 added_objects: List[Dict]) -> Dict[str, Dict]:
@@ -0,0 +1,74 @@
+"""
+Schémas typés du projet JSON EVA2SPORT
+TypedDict du format d'export : annotations typage statique, décodage validé avec msgspec
+"""
+
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class Point(TypedDict):
+    x: float
+    y: float
+
+
+class BBox(TypedDict):
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class BBoxOutput(TypedDict):
+    output: Optional[BBox]
+
+
+class MaskRLE(TypedDict, total=False):
+    """Masque RLE COCO en base64, ou référence vers le store de masques"""
+    format: str                 # 'rle_coco_base64', 'packbits_ref' ou 'delta_ref'
+    size: List[int]
+    counts: str                 # rle_coco_base64
+    chunk: int                  # références du store
+    offset: int
+    length: int
+    box: List[int]
+
+
+class AnchorPoint(TypedDict, total=False):
+    CENTER_BOTTOM: Optional[Point]
+    filled: bool                # field_smoothed : position interpolée
+
+
+class PointsOutput(TypedDict, total=False):
+    image: AnchorPoint
+    field: AnchorPoint
+    field_smoothed: AnchorPoint
+
+
+class Points(TypedDict):
+    output: Optional[PointsOutput]
+
+
+class Annotation(TypedDict, total=False):
+    """Annotation d'un objet sur une frame traitée"""
+    id: str
+    objectId: str
+    type: str                   # 'mask' ou 'bbox'
+    mask: Optional[MaskRLE]
+    bbox: BBoxOutput
+    points: Points
+    area: int
+    centroid: Optional[Point]
+    maskScore: Optional[float]
+    pose: Any
+    warning: bool
+
+
+class ProjectData(TypedDict, total=False):
+    """Projet exporté ({nom}_project.json) ; metadata, calibration et objets restent ouverts"""
+    format_version: str
+    video: str
+    metadata: Dict[str, Any]
+    calibration: Dict[str, Any]
+    objects: Dict[str, Dict[str, Any]]
+    initial_annotations: List[Dict[str, Any]]
+    annotations: Dict[str, List[Annotation]]
@@ -4,7 +4,6 @@ Pipeline principale EVA2SPORT
 Orchestrateur complet du workflow de tracking vidéo
 """
 
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List
 
@@ -12,13 +11,25 @@ from .config import Config
 from .tracking.video_processor import VideoProcessor
 from .tracking.sam2_tracker import SAM2Tracker
 from .enrichment.annotation_enricher import AnnotationEnricher
+from .enrichment.trajectory_smoother import TrajectorySmoother
+from .enrichment.calibration_track import CalibrationTrack
 from .export.project_exporter import ProjectExporter
+from .export.binary_project import StreamingProjectWriter
 from .visualization import VideoExporter, VisualizationConfig, MinimapConfig
+from .utils.result_cache import ResultCache
+from .utils.frame_mapping import FrameMapping
+from .utils.json_serializer import json_serializer
+from .analytics.trajectory_store import TrajectoryStore
+from .analytics.kinematics import KinematicsEngine, KinematicsResult
+from .analytics.spatial_index import FrameSpatialIndex
 
 
 class EVA2SportPipeline:
     """Pipeline principale pour le tracking vidéo avec SAM2"""
     
+    # Champs d'annotation écrits par l'enrichissement et le lissage (entrée de cache différentielle)
+    ENRICHMENT_FIELDS = ('points', 'bbox')
+    
     def __init__(self, video_name: str, working_dir: Optional[str] = None,
                  segment_offset_before_seconds: Optional[float] = None,
                  segment_offset_after_seconds: Optional[float] = None,
@@ -49,11 +60,24 @@ class EVA2SportPipeline:
         self.sam2_tracker = SAM2Tracker(self.config)
         self.enricher = AnnotationEnricher(self.config)
         self.exporter = ProjectExporter(self.config)
+        # Empreintes vidéo/checkpoint partagées par les événements de la vidéo
+        self.result_cache = ResultCache(self.config.cache_dir, enabled=self.config.USE_CACHE,
+                                        digests_dir=self.config.video_output_dir)
+        self._completed_stages: Dict[str, str] = {}
+        # Clés calculées par prepare(), reprises une fois par run_full_pipeline
+        self._prepared_keys: Optional[Dict[str, str]] = None
         
         # État de la pipeline
         self.project_config = None
         self.project_data = None
+        self.trajectories: Optional[TrajectoryStore] = None
+        self.spatial_index: Optional[FrameSpatialIndex] = None
         self.results = {}
+        
+        # Projet binaire écrit en flux pendant la propagation (PROJECT_BINARY)
+        self._binary_writer: Optional[StreamingProjectWriter] = None
+        self._stream_block: Dict[int, Any] = {}
+        self._stream_projector = None
     
     def load_project_config(self) -> Dict[str, Any]:
         """Charge la configuration du projet depuis les JSONs (séparés ou non)"""
@@ -65,17 +89,14 @@ class EVA2SportPipeline:
 
         if calib_path.exists() and objects_path.exists():
             # Nouveau format : deux fichiers
-            with open(calib_path, 'r', encoding='utf-8') as f:
-                calib_data = json.load(f)
-            with open(objects_path, 'r', encoding='utf-8') as f:
-                objects_data = json.load(f)
+            calib_data = json_serializer.load(calib_path)
+            objects_data = json_serializer.load(objects_path)
             # Fusionne les deux dictionnaires (sans écraser)
             self.project_config = {**calib_data, **objects_data}
             print(f"✅ Config séparée chargée : calibration + {len(self.project_config.get('objects', []))} objets")
         elif self.config.config_path.exists():
             # Ancien format : un seul fichier
-            with open(self.config.config_path, 'r', encoding='utf-8') as f:
-                self.project_config = json.load(f)
+            self.project_config = json_serializer.load(self.config.config_path)
             print(f"✅ Config unique chargée : {len(self.project_config.get('objects', []))} objets")
         else:
             raise FileNotFoundError("❌ Aucun fichier de configuration trouvé")
@@ -110,11 +131,16 @@ class EVA2SportPipeline:
             self.results['reference_frame'] = reference_frame
             frames_count = self.video_processor.extract_segment_frames(
                 reference_frame=reference_frame,
-                force_extraction=force
+                force_extraction=force,
+                required_frames=[ann.get('frame', 0) for ann in initial_annotations]
             )
         else:
             # Mode complet
-            frames_count = self.video_processor.extract_all_frames(force_extraction=force)
+            initial_annotations = (self.project_config or {}).get('initial_annotations', [])
+            frames_count = self.video_processor.extract_all_frames(
+                force_extraction=force,
+                required_frames=[ann.get('frame', 0) for ann in initial_annotations]
+            )
         
         self.config.extracted_frames_count = frames_count
         self.results['extracted_frames'] = frames_count
@@ -122,19 +148,35 @@ class EVA2SportPipeline:
         print(f"✅ {frames_count} frames extraites")
         return frames_count
     
-    def initialize_tracking(self) -> None:
-        """Initialise le système de tracking SAM2 avec multi-anchor"""
+    def initialize_tracking(self, predictor=None) -> None:
+        """
+        Initialise le système de tracking SAM2 avec multi-anchor
+        
+        Args:
+            predictor: Predictor SAM2 déjà construit à partager (tracking en lot)
+        """
         from .utils import eva_logger
         eva_logger.tracking("Initialisation du tracking SAM2 multi-anchor...")
         
         # Initialiser SAM2
-        self.sam2_tracker.initialize_predictor()
+        if predictor is not None:
+            self.sam2_tracker.predictor = predictor
+        else:
+            self.sam2_tracker.initialize_predictor()
         self.sam2_tracker.initialize_inference_state()
         
         # Ajouter les annotations initiales - VERSION MULTI-ANCHOR
         if not self.project_config:
             raise ValueError("❌ Configuration projet requise")
         
+        if self.config.DRIFT_DETECTION or self.config.DRIFT_AUTO_REANCHOR:
+            # Piste de calibration si la caméra bouge, sinon calibration statique
+            calibration = self.project_config['calibration']
+            self.sam2_tracker.enable_drift_monitor(
+                CalibrationTrack.from_calibration(calibration) or calibration.get('camera_parameters'),
+                {obj['obj_id']: obj['obj_type'] for obj in self.project_config['objects']}
+            )
+        
         segment_info = None
         if self.config.is_segment_mode or self.config.is_event_mode:
             reference_frame = self.results.get('reference_frame')
@@ -152,19 +194,51 @@ class EVA2SportPipeline:
         
         eva_logger.success(f"Tracking multi-anchor initialisé: {len(added_objects)} objets")
     
-    def run_tracking_propagation(self) -> Dict[str, Any]:
-        """Exécute la propagation du tracking avec support multi-anchor"""
+    def get_propagation_plan(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Paramètres de propagation du clip (anchors, bornes, changements de plan)
+        
+        Returns:
+            Arguments de SAM2Tracker.plan_propagation
+        """
+        initial_annotations = self.results.get('initial_annotations', [])
+        anchor_frames = sorted(set(ann['frame_idx'] for ann in initial_annotations))
+        
+        if self.config.is_segment_mode or self.config.is_event_mode:
+            end_frame = self.config.extracted_frames_count - 1
+        else:
+            end_frame = len(FrameMapping.from_project_data(project_data)) - 1
+        
+        return {
+            'anchor_frames': anchor_frames or [0],
+            'start_frame': 0,
+            'end_frame': end_frame,
+            'shot_cuts': self.config.get_processed_shot_cuts()
+        }
+    
+    def run_tracking_propagation(self, propagation_results: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        """
+        Exécute la propagation du tracking avec support multi-anchor
+        
+        Args:
+            propagation_results: Résultats déjà propagés (tracking en lot), sinon propagation locale
+        """
         from .utils import eva_logger
         eva_logger.info("Propagation du tracking...")
         
         if not self.project_config:
             raise ValueError("❌ Configuration projet requise")
 
-        # 1. Créer la structure projet vide
-        project_data = self.exporter.create_project_structure(
-            self.project_config, 
-            self.results['added_objects']
-        )
+        # 1. Créer la structure projet vide (déjà ouverte en flux par le tracking en lot)
+        if self._binary_writer is not None:
+            project_data = self.project_data
+        else:
+            project_data = self.exporter.create_project_structure(
+                self.project_config, 
+                self.results['added_objects']
+            )
+            if propagation_results is None:
+                self._open_binary_stream(project_data)
 
         # 2. Vérifier si on a plusieurs anchors
         initial_annotations = self.results.get('initial_annotations', [])
@@ -172,40 +246,62 @@ class EVA2SportPipeline:
         anchor_frames = [ann['frame_idx'] for ann in initial_annotations]
         unique_anchor_frames = sorted(list(set(anchor_frames)))
         
-        if len(unique_anchor_frames) > 1:
-            # MODE MULTI-ANCHOR
-            eva_logger.info(f"Mode multi-anchor détecté: {len(unique_anchor_frames)} frames d'ancrage")
+        # Changements de plan détectés à l'extraction (index traités)
+        shot_cuts = self.config.get_processed_shot_cuts()
+        
+        # Workers d'enrichissement démarrés pendant la propagation
+        self.enricher.start_workers()
+        
+        try:
+            if propagation_results is not None:
+                eva_logger.info("Résultats de propagation fournis (tracking en lot)")
+            elif len(unique_anchor_frames) > 1:
+                # MODE MULTI-ANCHOR
+                eva_logger.info(f"Mode multi-anchor détecté: {len(unique_anchor_frames)} frames d'ancrage")
             
-            if self.config.is_segment_mode or self.config.is_event_mode:
-                total_frames = self.config.extracted_frames_count
-                start_frame = 0
-                end_frame = total_frames - 1
+                if self.config.is_segment_mode or self.config.is_event_mode:
+                    total_frames = self.config.extracted_frames_count
+                    start_frame = 0
+                    end_frame = total_frames - 1
+                else:
+                    start_frame = 0
+                    end_frame = len(FrameMapping.from_project_data(project_data)) - 1
+            
+                # Utiliser la nouvelle méthode multi-anchor
+                propagation_results = self.sam2_tracker.run_multi_anchor_propagation(
+                    unique_anchor_frames, start_frame, end_frame, shot_cuts
+                )
             else:
-                start_frame = 0
-                end_frame = len([f for f in project_data['metadata']['frame_mapping'] if f is not None]) - 1
+                # MODE SINGLE-ANCHOR (fallback)
+                eva_logger.info("Mode single-anchor (fallback)")
+                anchor_frame_idx = unique_anchor_frames[0] if unique_anchor_frames else 0
             
-            # Utiliser la nouvelle méthode multi-anchor
-            propagation_results = self.sam2_tracker.run_multi_anchor_propagation(
-                unique_anchor_frames, start_frame, end_frame
-            )
-        else:
-            # MODE SINGLE-ANCHOR (fallback)
-            eva_logger.info("Mode single-anchor (fallback)")
-            anchor_frame_idx = unique_anchor_frames[0] if unique_anchor_frames else 0
+                if self.config.is_segment_mode or self.config.is_event_mode:
+                    total_frames = self.config.extracted_frames_count
+                else:
+                    total_frames = len(FrameMapping.from_project_data(project_data))
             
-            if self.config.is_segment_mode or self.config.is_event_mode:
-                total_frames = self.config.extracted_frames_count
-            else:
-                total_frames = len([f for f in project_data['metadata']['frame_mapping'] if f is not None])
+                propagation_results = self.sam2_tracker.run_bidirectional_propagation(
+                    anchor_frame_idx, total_frames, shot_cuts
+                )
             
-            propagation_results = self.sam2_tracker.run_bidirectional_propagation(
-                anchor_frame_idx, total_frames
-            )
+            # Dernier bloc du flux (les frames déjà écrites ne restent qu'en annotations)
+            if self._binary_writer is not None:
+                self._flush_stream_block()
+        except Exception:
+            self._abort_binary_stream()
+            raise
+        
+        project_data['metadata']['shot_cuts'] = shot_cuts
+        project_data['metadata']['untracked_frames'] = list(self.sam2_tracker.untracked_frames)
+        if self.sam2_tracker.drift_monitor is not None:
+            project_data['metadata']['drift_ranges'] = self.sam2_tracker.drift_ranges
 
-        # 3. Convertir les résultats en annotations enrichies
-        project_data = self.enricher.process_propagation_results(
-            propagation_results, project_data, self.project_config
-        )
+        # 3. Convertir les résultats en annotations enrichies (déjà fait bloc par bloc en flux)
+        if self._binary_writer is None:
+            project_data = self.enricher.process_propagation_results(
+                propagation_results, project_data, self.project_config
+            )
         
         self.project_data = project_data
         total_annotations = sum(len(annotations) for annotations in project_data['annotations'].values())
@@ -213,6 +309,53 @@ class EVA2SportPipeline:
         eva_logger.success(f"Propagation terminée: {total_annotations} annotations sur {len(project_data['annotations'])} frames")
         return project_data
     
+    def _resolve_project_binary(self, export_video: bool) -> None:
+        """Projet binaire par défaut si la vidéo est rendue : lecture indexée au lieu du JSON complet"""
+        if self.config.PROJECT_BINARY is None:
+            self.config.PROJECT_BINARY = export_video
+    
+    def _open_binary_stream(self, project_data: Dict[str, Any]) -> None:
+        """Ouvre le .evab en écriture : chaque bloc de frames propagées y est converti puis écrit"""
+        if not self.config.PROJECT_BINARY:
+            return
+        self.project_data = project_data
+        self._stream_block = {}
+        # Projecteur (et cache par frame de la piste de calibration) partagé par tous les blocs
+        self._stream_projector = self.enricher.build_projector(self.project_config)
+        self._binary_writer = StreamingProjectWriter(
+            self.config.output_binary_path, project_data, self.config.BINARY_FRAMES_PER_BLOCK
+        )
+        self.sam2_tracker.result_sink = self._consume_frame
+    
+    def _consume_frame(self, frame_idx: int, obj_ids: List[int], mask_logits: Any) -> None:
+        """Reçoit une frame propagée ; le bloc est écrit dès qu'il est complet"""
+        self._stream_block[frame_idx] = {'obj_ids': obj_ids, 'mask_logits': mask_logits}
+        if len(self._stream_block) >= self.config.BINARY_FRAMES_PER_BLOCK:
+            self._flush_stream_block()
+    
+    def _flush_stream_block(self) -> None:
+        """Convertit le bloc en annotations, l'écrit et libère ses logits"""
+        block, self._stream_block = self._stream_block, {}
+        if block:
+            self.enricher.process_propagation_results(block, self.project_data, self.project_config,
+                                                      verbose=False, projector=self._stream_projector)
+            for frame_idx in block:
+                self._binary_writer.write_frame(frame_idx, self.project_data['annotations'][str(frame_idx)])
+        self._binary_writer.flush()
+    
+    def _close_binary_stream(self) -> None:
+        """Détache le flux binaire du tracker"""
+        self._binary_writer = None
+        self._stream_block = {}
+        self._stream_projector = None
+        self.sam2_tracker.result_sink = None
+    
+    def _abort_binary_stream(self) -> None:
+        """Ferme le .evab sans le finaliser : les blocs écrits restent récupérables (eva2sport recover)"""
+        if self._binary_writer is not None:
+            self._binary_writer.close()
+            self._close_binary_stream()
+    
     def enrich_annotations(self) -> Dict[str, Any]:
         """Enrichit les annotations avec projections terrain et calculs"""
         print("🎯 Enrichissement des annotations...")
@@ -227,9 +370,76 @@ class EVA2SportPipeline:
         )
         
         self.project_data = enriched_data
+        
+        # Trajectoires colonnaires et index spatial construits une fois depuis les annotations enrichies
+        self.trajectories = TrajectoryStore.from_project_data(enriched_data)
+        self.build_spatial_index()
         print(f"✅ Annotations enrichies")
         return enriched_data
     
+    def smooth_trajectories(self) -> Dict[str, Any]:
+        """Lisse les positions terrain (Kalman/RTS) et comble les trous courts"""
+        print("📈 Lissage des trajectoires terrain...")
+        
+        if not self.project_data:
+            raise ValueError("❌ Données projet requises")
+        
+        smoother = TrajectorySmoother(
+            self.project_data['metadata']['fps'],
+            measurement_std=self.config.SMOOTHING_MEASUREMENT_STD,
+            acceleration_std=self.config.SMOOTHING_ACCELERATION_STD,
+            max_gap_seconds=self.config.SMOOTHING_MAX_GAP_SECONDS
+        )
+        counts = smoother.apply(
+            self.project_data,
+            acceleration_std_by_type={'ball': self.config.SMOOTHING_BALL_ACCELERATION_STD}
+        )
+        
+        # Les trajectoires colonnaires incluent désormais la colonne lissée (utilisée par l'index)
+        self.trajectories = TrajectoryStore.from_project_data(self.project_data)
+        self.build_spatial_index()
+        print(f"✅ {counts['smoothed']} positions lissées, {counts['filled']} comblées")
+        return self.project_data
+    
+    def compute_kinematics(self, **kwargs) -> KinematicsResult:
+        """
+        Cinématique de tous les objets du projet (vitesse, accélération, cap, distance, sprints)
+        
+        Utilise les positions lissées si le lissage des trajectoires est activé.
+        
+        Args:
+            **kwargs: Paramètres de KinematicsEngine (max_gap_seconds, sprint_thresholds...)
+        """
+        if not self.project_data:
+            raise ValueError("❌ Données projet requises")
+        
+        if self.trajectories is None:
+            self.trajectories = TrajectoryStore.from_project_data(self.project_data)
+        
+        position_column = 'field_smoothed_xy' if self.config.TRAJECTORY_SMOOTHING else 'field_xy'
+        engine = KinematicsEngine.from_project_data(self.project_data, **kwargs)
+        return engine.compute(self.trajectories, position_column)
+    
+    def build_spatial_index(self) -> FrameSpatialIndex:
+        """
+        Index spatial par frame des positions terrain du projet
+        
+        Sert aux requêtes de proximité (plus proche du ballon, rayon, adversaire
+        le plus proche) et aux métriques de possession / pression sur tout le segment.
+        Construit à l'enrichissement et exporté à côté des trajectoires.
+        """
+        if not self.project_data:
+            raise ValueError("❌ Données projet requises")
+        
+        if self.trajectories is None:
+            self.trajectories = TrajectoryStore.from_project_data(self.project_data)
+        
+        position_column = 'field_smoothed_xy' if self.config.TRAJECTORY_SMOOTHING else 'field_xy'
+        self.spatial_index = FrameSpatialIndex.from_store(
+            self.trajectories, self.project_data.get('objects', {}), position_column
+        )
+        return self.spatial_index
+    
     def export_results(self, include_visualization: bool = True) -> Dict[str, Path]:
         """Exporte les résultats finaux"""
         print("💾 Export des résultats...")
@@ -237,9 +447,30 @@ class EVA2SportPipeline:
         if not self.project_data:
             raise ValueError("❌ Données projet requises")
         
+        # Masques hors JSON : les annotations ne gardent qu'une référence (chunk, offset)
+        mask_store_path = None
+        if self.config.MASK_OUTPUT == 'store':
+            mask_store_path = self.exporter.save_mask_store(self.project_data)
+        
         # Export JSON principal
         json_path = self.exporter.save_project_json(self.project_data)
         results_paths = {'json': json_path}
+        if mask_store_path is not None:
+            results_paths['masks'] = mask_store_path
+        
+        # Projet binaire écrit après le JSON (le rendu vidéo lit le plus récent des deux) : celui
+        # écrit pendant le tracking est finalisé (champs enrichis réécrits, masques RLE conservés)
+        if self._binary_writer is not None:
+            results_paths['binary'] = self.exporter.finalize_project_binary(self._binary_writer, self.project_data)
+            self._close_binary_stream()
+        elif self.config.PROJECT_BINARY:
+            results_paths['binary'] = self.exporter.save_project_binary(self.project_data)
+        
+        # Trajectoires colonnaires et index spatial (reconstruits si l'enrichissement vient du cache)
+        if self.trajectories is None or self.spatial_index is None:
+            self.build_spatial_index()
+        results_paths['trajectories'] = self.exporter.save_trajectories(self.trajectories)
+        results_paths['spatial_index'] = self.exporter.save_spatial_index(self.spatial_index)
         
         # Export visualisations si demandé
         if include_visualization:
@@ -345,29 +576,40 @@ class EVA2SportPipeline:
             Dictionnaire avec les résultats et chemins de fichiers
         """
         self.config.display_config()
+        self._resolve_project_binary(export_video)
         
         from .utils import eva_logger
         
         try:
-            # Étape 1: Charger la configuration
-            eva_logger.step(1, 7, "Chargement de la configuration")
-            self.load_project_config()
+            # Étapes 1-2: Configuration et extraction (déjà faites si prepare() a précédé)
+            cache_keys = self._prepared_keys if not force_extraction else None
+            self._prepared_keys = None
+            if cache_keys is None:
+                eva_logger.step(1, 7, "Chargement de la configuration")
+                self.load_project_config()
+                
+                eva_logger.step(2, 7, "Extraction des frames")
+                self.extract_frames(force=force_extraction)
+                
+                cache_keys = self.compute_cache_keys()
             
-            # Étape 2: Extraire les frames
-            eva_logger.step(2, 7, "Extraction des frames")
-            self.extract_frames(force=force_extraction)
-            
-            # Étape 3: Initialiser le tracking
-            eva_logger.step(3, 7, "Initialisation du tracking")
-            self.initialize_tracking()
-            
-            # Étape 4: Propagation du tracking
-            eva_logger.step(4, 7, "Propagation du tracking")
-            self.run_tracking_propagation()
+            if not self._restore_stage_from_cache('tracking', cache_keys['tracking']):
+                # Étape 3: Initialiser le tracking
+                eva_logger.step(3, 7, "Initialisation du tracking")
+                self.initialize_tracking()
+                
+                # Étape 4: Propagation du tracking
+                eva_logger.step(4, 7, "Propagation du tracking")
+                self.run_tracking_propagation()
+                self._store_stage_in_cache('tracking', cache_keys['tracking'])
             
             # Étape 5: Enrichissement
-            eva_logger.step(5, 7, "Enrichissement des annotations")
-            self.enrich_annotations()
+            if not self._restore_stage_from_cache('enrichment', cache_keys['enrichment']):
+                eva_logger.step(5, 7, "Enrichissement des annotations")
+                self.enrich_annotations()
+                if self.config.TRAJECTORY_SMOOTHING:
+                    self.smooth_trajectories()
+                self._store_stage_in_cache('enrichment', cache_keys['enrichment'])
             
             # Étape 6: Export
             eva_logger.step(6, 7, "Export des résultats")
@@ -394,6 +636,7 @@ class EVA2SportPipeline:
             return final_results
             
         except Exception as e:
+            self._abort_binary_stream()
             import traceback
             error_details = traceback.format_exc()
             from datetime import datetime
@@ -411,6 +654,243 @@ class EVA2SportPipeline:
             eva_logger.error(error_details)
             
             return error_result
+        
+        finally:
+            # Pool de l'enrichissement parallèle gardé pour tout le tracking (blocs du flux inclus)
+            self.enricher.close()
+    
+    @classmethod
+    def run_batch(cls, pipelines: List['EVA2SportPipeline'],
+                  force_extraction: bool = False,
+                  max_batch_size: Optional[int] = None,
+                  **pipeline_kwargs) -> List[Dict[str, Any]]:
+        """
+        Exécute plusieurs pipelines (clips d'événements) avec un tracking SAM2 en lot
+        
+        Les clips dont le tracking n'est pas en cache partagent un seul predictor
+        et sont propagés en lockstep (un batch encodeur par pas). Le reste de
+        chaque pipeline (enrichissement, export) s'exécute ensuite normalement.
+        
+        Args:
+            pipelines: Pipelines à exécuter
+            force_extraction: Force la ré-extraction des frames
+            max_batch_size: Nombre maximal de frames par passage encodeur
+            **pipeline_kwargs: Arguments de run_full_pipeline (export vidéo, visualisations...)
+            
+        Returns:
+            Résultats de run_full_pipeline par pipeline
+        """
+        from .tracking.batch_tracker import BatchSAM2Tracker
+        from .utils import eva_logger
+        
+        # 1. Préparation : configuration, extraction, clés de cache (reprises par run_full_pipeline)
+        pending = []
+        for pipeline in pipelines:
+            try:
+                cache_keys = pipeline.prepare(force_extraction)
+                if not pipeline.results.get('extracted_frames'):
+                    continue
+                if not pipeline.result_cache.has('tracking', cache_keys['tracking']):
+                    pending.append(pipeline)
+            except Exception as e:
+                # L'erreur sera reportée par run_full_pipeline
+                eva_logger.warning(f"Préparation échouée pour {pipeline.config.VIDEO_NAME_WITH_EVENT}: {e}")
+        
+        # 2. Tracking en lot avec un predictor partagé
+        if pending:
+            eva_logger.tracking(f"Tracking en lot de {len(pending)} clips")
+            pending[0].sam2_tracker.initialize_predictor()
+            predictor = pending[0].sam2_tracker.predictor
+            
+            ready = []
+            for pipeline in pending:
+                try:
+                    pipeline.initialize_tracking(predictor=predictor)
+                    ready.append(pipeline)
+                except Exception as e:
+                    eva_logger.warning(f"Initialisation échouée pour {pipeline.config.VIDEO_NAME_WITH_EVENT}: {e}")
+            
+            if ready:
+                plans = []
+                for pipeline in ready:
+                    project_data = pipeline.exporter.create_project_structure(
+                        pipeline.project_config, pipeline.results['added_objects']
+                    )
+                    plans.append(pipeline.get_propagation_plan(project_data))
+                    pipeline._resolve_project_binary(pipeline_kwargs.get('export_video', False))
+                    pipeline._open_binary_stream(project_data)
+                
+                batch_tracker = BatchSAM2Tracker(
+                    [pipeline.sam2_tracker for pipeline in ready], max_batch_size
+                )
+                try:
+                    all_results = batch_tracker.run_propagation(plans)
+                except Exception:
+                    for pipeline in ready:
+                        pipeline._abort_binary_stream()
+                    raise
+                
+                # Démultiplexage vers le projet de chaque événement
+                for pipeline, propagation_results in zip(ready, all_results):
+                    pipeline.run_tracking_propagation(propagation_results)
+                    pipeline._store_stage_in_cache('tracking', pipeline.results['cache_keys']['tracking'])
+        
+        # 3. Enrichissement et export par pipeline (tracking restauré)
+        return [
+            pipeline.run_full_pipeline(force_extraction=False, **pipeline_kwargs)
+            for pipeline in pipelines
+        ]
+    
+    def prepare(self, force_extraction: bool = False) -> Dict[str, str]:
+        """
+        Charge la configuration, extrait les frames et calcule les clés de cache
+        
+        Sans ré-extraction forcée, une préparation déjà faite est réutilisée ;
+        le prochain run_full_pipeline la reprend au lieu de refaire l'extraction
+        et le calcul des clés.
+        
+        Returns:
+            Clés 'extraction', 'tracking' et 'enrichment'
+        """
+        if self._prepared_keys is None or force_extraction:
+            self.load_project_config()
+            self.extract_frames(force=force_extraction)
+            self._prepared_keys = self.compute_cache_keys()
+        return self._prepared_keys
+    
+    def compute_cache_keys(self) -> Dict[str, str]:
+        """
+        Calcule les clés de cache chaînées des étapes (après extraction)
+        
+        Returns:
+            Clés 'extraction', 'tracking' et 'enrichment'
+        """
+        if not self.project_config:
+            raise ValueError("❌ Configuration projet requise")
+        
+        extraction_key = ResultCache.hash_payload(
+            'extraction',
+            self.result_cache.file_digest(self.config.video_path),
+            self.config.FRAME_INTERVAL,
+            self.config.ADAPTIVE_SAMPLING,
+            self.config.event_timestamp_seconds,
+            self.config.SEGMENT_OFFSET_BEFORE_SECONDS,
+            self.config.SEGMENT_OFFSET_AFTER_SECONDS,
+            self.config.processed_frames,
+            self.config.shot_cut_frames
+        )
+        
+        tracking_key = ResultCache.hash_payload(
+            'tracking',
+            extraction_key,
+            self.results.get('reference_frame'),
+            self.project_config.get('objects', []),
+            self.project_config.get('initial_annotations', []),
+            self.config.SAM2_MODEL,
+            self.config.MASK_OUTPUT,
+            self.result_cache.file_digest(self.config.checkpoint_path) or self.config.SAM2_CHECKPOINT,
+            {
+                'drift_detection': self.config.DRIFT_DETECTION,
+                'drift_auto_reanchor': self.config.DRIFT_AUTO_REANCHOR,
+                'drift_min_object_score': self.config.DRIFT_MIN_OBJECT_SCORE,
+                'drift_max_area_ratio': self.config.DRIFT_MAX_AREA_RATIO,
+                'drift_max_speed': self.config.DRIFT_MAX_SPEED
+            }
+        )
+        
+        enrichment_key = ResultCache.hash_payload(
+            'enrichment',
+            tracking_key,
+            self.project_config.get('calibration'),
+            {
+                'trajectory_smoothing': self.config.TRAJECTORY_SMOOTHING,
+                'smoothing_measurement_std': self.config.SMOOTHING_MEASUREMENT_STD,
+                'smoothing_acceleration_std': self.config.SMOOTHING_ACCELERATION_STD,
+                'smoothing_ball_acceleration_std': self.config.SMOOTHING_BALL_ACCELERATION_STD,
+                'smoothing_max_gap_seconds': self.config.SMOOTHING_MAX_GAP_SECONDS
+            }
+        )
+        
+        cache_keys = {
+            'extraction': extraction_key,
+            'tracking': tracking_key,
+            'enrichment': enrichment_key
+        }
+        self.results['cache_keys'] = cache_keys
+        return cache_keys
+    
+    def _restore_stage_from_cache(self, stage: str, key: str) -> bool:
+        """Restaure la sortie d'une étape depuis le cache si la clé correspond"""
+        from .utils import eva_logger
+        
+        # Étape déjà exécutée par cette instance (ex: tracking en lot)
+        if self._completed_stages.get(stage) == key:
+            return True
+        
+        payload = self.result_cache.get(stage, key)
+        if payload is None:
+            return False
+        
+        if stage == 'tracking':
+            self.project_data = payload['project_data']
+            self.results['added_objects'] = payload['added_objects']
+            self.results['initial_annotations'] = payload['initial_annotations']
+            # La calibration ne fait pas partie de la clé de tracking
+            self.project_data['calibration'] = self.project_config['calibration']
+        elif not self._apply_enrichment_diff(payload):
+            return False
+        self.trajectories = None
+        self.spatial_index = None
+        
+        self.results.setdefault('cached_stages', []).append(stage)
+        eva_logger.success(f"Étape '{stage}' restaurée depuis le cache ({key[:12]})")
+        return True
+    
+    def _store_stage_in_cache(self, stage: str, key: str) -> None:
+        """Enregistre la sortie d'une étape dans le cache"""
+        self._completed_stages[stage] = key
+        if stage == 'tracking':
+            payload = {
+                'project_data': self.project_data,
+                'added_objects': self.results.get('added_objects', []),
+                'initial_annotations': self.results.get('initial_annotations', [])
+            }
+        else:
+            payload = self._enrichment_diff()
+        self.result_cache.put(stage, key, payload)
+    
+    def _enrichment_diff(self) -> Dict[str, Any]:
+        """
+        Sortie de l'enrichissement sous forme de différence sur le tracking
+        
+        Les masques (l'essentiel du volume) sont déjà dans l'entrée de tracking :
+        seuls les champs enrichis de chaque annotation, repérée par son id,
+        et les sections du projet hors annotations sont enregistrés.
+        """
+        return {
+            'project': {name: value for name, value in self.project_data.items() if name != 'annotations'},
+            'annotations': {
+                frame_key: [[annotation['id'], *(annotation.get(field) for field in self.ENRICHMENT_FIELDS)]
+                            for annotation in frame_annotations]
+                for frame_key, frame_annotations in self.project_data['annotations'].items()
+            }
+        }
+    
+    def _apply_enrichment_diff(self, payload: Dict[str, Any]) -> bool:
+        """Applique une entrée d'enrichissement au projet issu du tracking (False si incohérente)"""
+        annotations = (self.project_data or {}).get('annotations', {})
+        if set(annotations) != set(payload['annotations']):
+            return False
+        for frame_key, rows in payload['annotations'].items():
+            frame_annotations = annotations[frame_key]
+            if [annotation['id'] for annotation in frame_annotations] != [row[0] for row in rows]:
+                return False
+        
+        for frame_key, rows in payload['annotations'].items():
+            for annotation, row in zip(annotations[frame_key], rows):
+                annotation.update(zip(self.ENRICHMENT_FIELDS, row[1:]))
+        self.project_data.update(payload['project'])
+        return True
     
     def run_simple(self, force_extraction: bool = False) -> str:
         """
@@ -442,8 +922,11 @@ class EVA2SportPipeline:
             'total_annotations': sum(len(annotations) for annotations in self.project_data['annotations'].values()),
             'frames_annotated': len(self.project_data['annotations']),
             'export_paths': export_paths,
+            'cache_keys': self.results.get('cache_keys', {}),
+            'cached_stages': self.results.get('cached_stages', []),
             'config': {
                 'frame_interval': self.config.FRAME_INTERVAL,
+                'adaptive_sampling': self.config.ADAPTIVE_SAMPLING,
                 'event_mode': self.config.is_event_mode,
                 'segment_mode': self.config.is_segment_mode,
                 'output_dir': str(self.config.output_dir)
@@ -4,5 +4,10 @@ Modules de tracking EVA2SPORT
 
 from .video_processor import VideoProcessor
 from .sam2_tracker import SAM2Tracker
+from .adaptive_sampler import AdaptiveFrameSampler
+from .shot_detector import ShotBoundaryDetector
+from .drift_monitor import DriftMonitor, DriftRange
+from .batch_tracker import BatchSAM2Tracker
 
-__all__ = ['VideoProcessor', 'SAM2Tracker']
\ No newline at end of file
+__all__ = ['VideoProcessor', 'SAM2Tracker', 'AdaptiveFrameSampler', 'ShotBoundaryDetector',
+           'DriftMonitor', 'DriftRange', 'BatchSAM2Tracker']
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Échantillonnage adaptatif des frames selon le mouvement
+Remplace le pas fixe FRAME_INTERVAL par une sélection guidée par le mouvement
+"""
+
+import cv2
+import numpy as np
+from typing import List, Optional, Iterable
+
+
+class AdaptiveFrameSampler:
+    """
+    Sélectionne les frames à traiter à partir d'un score de mouvement par frame
+
+    Le score est la différence absolue moyenne entre deux frames consécutives,
+    calculée en niveaux de gris sur une version réduite de l'image. Les phases
+    rapides (contre-attaques) reçoivent plus de frames, les arrêts de jeu moins,
+    dans la limite d'un budget de frames par événement.
+
+    select_frames choisit sur les scores de tout un segment déjà calculés ;
+    begin_stream/select_next décident frame par frame pendant le décodage
+    (une seule passe vidéo), en normalisant par la moyenne courante des scores.
+    """
+
+    def __init__(self, downscale_width: int = 160, min_interval: int = 1,
+                 max_interval: Optional[int] = None, floor_ratio: float = 0.1):
+        """
+        Args:
+            downscale_width: Largeur de l'image réduite pour le calcul du score
+            min_interval: Écart minimal entre deux frames retenues
+            max_interval: Écart maximal entre deux frames retenues (None = illimité)
+            floor_ratio: Poids minimal relatif d'une frame sans mouvement
+        """
+        self.downscale_width = downscale_width
+        self.min_interval = max(1, int(min_interval))
+        self.max_interval = int(max_interval) if max_interval else None
+        self.floor_ratio = floor_ratio
+
+        self._previous = None
+        self.scores: List[float] = []
+        self.selected: List[int] = []
+        self._stream = None
+
+    def reset(self) -> None:
+        """Réinitialise l'état entre deux segments"""
+        self._previous = None
+        self.scores = []
+        self.selected = []
+        self._stream = None
+
+    def prepare_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Réduit une frame BGR en niveaux de gris float32"""
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / float(width)
+        small = cv2.resize(
+            frame, (self.downscale_width, max(1, int(round(height * scale)))),
+            interpolation=cv2.INTER_AREA
+        )
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    def update(self, frame: np.ndarray, prepared: Optional[np.ndarray] = None) -> float:
+        """
+        Ajoute une frame et retourne son score de mouvement
+
+        Args:
+            frame: Frame BGR décodée
+            prepared: Frame déjà réduite par prepare_frame (évite un second resize)
+        """
+        gray = prepared if prepared is not None else self.prepare_frame(frame)
+
+        if self._previous is None:
+            score = 0.0
+        else:
+            score = float(np.mean(np.abs(gray - self._previous)))
+
+        self._previous = gray
+        self.scores.append(score)
+        return score
+
+    def select_frames(self, budget: int, start_frame: int = 0,
+                      required_frames: Optional[Iterable[int]] = None,
+                      scores: Optional[List[float]] = None) -> List[int]:
+        """
+        Sélectionne les frames à conserver selon le score de mouvement
+
+        Args:
+            budget: Nombre cible de frames pour le segment
+            start_frame: Frame originale correspondant au premier score
+            required_frames: Frames originales à conserver obligatoirement (annotations)
+            scores: Scores à utiliser (défaut: scores accumulés par update)
+
+        Returns:
+            Liste triée des frames originales retenues
+        """
+        scores = np.asarray(self.scores if scores is None else scores, dtype=np.float64)
+        n_frames = len(scores)
+        if n_frames == 0:
+            return []
+
+        required = set()
+        for frame in required_frames or []:
+            relative = int(frame) - start_frame
+            if 0 <= relative < n_frames:
+                required.add(relative)
+
+        if budget >= n_frames:
+            return [start_frame + i for i in range(n_frames)]
+
+        # Poids = mouvement normalisé + plancher pour garder des frames pendant les arrêts
+        mean_score = scores.mean()
+        normalized = scores / mean_score if mean_score > 0 else np.zeros_like(scores)
+        weights = normalized + self.floor_ratio
+
+        # Quantiles réguliers sur l'importance cumulée → plus dense où le mouvement est fort
+        cumulative = np.cumsum(weights)
+        targets = (np.arange(max(1, budget)) + 0.5) * cumulative[-1] / max(1, budget)
+        selected = set(np.searchsorted(cumulative, targets).clip(0, n_frames - 1).tolist())
+        selected.update({0, n_frames - 1})
+
+        selected = self._enforce_min_interval(sorted(selected), required)
+        selected = self._enforce_max_interval(sorted(set(selected) | required))
+
+        return [start_frame + i for i in selected]
+
+    def begin_stream(self, n_frames: int, budget: int, start_frame: int = 0,
+                     required_frames: Optional[Iterable[int]] = None) -> None:
+        """
+        Prépare une sélection en flux sur un segment de n_frames frames
+
+        Args:
+            n_frames: Nombre de frames du segment
+            budget: Nombre cible de frames pour le segment
+            start_frame: Frame originale de la première frame du flux
+            required_frames: Frames originales à conserver obligatoirement (annotations)
+        """
+        self.reset()
+        required = set()
+        for frame in required_frames or []:
+            relative = int(frame) - start_frame
+            if 0 <= relative < n_frames:
+                required.add(relative)
+
+        # Pas entre deux quantiles : poids moyen (1 + plancher) × frames par frame retenue
+        step = n_frames * (1.0 + self.floor_ratio) / max(1, budget)
+        self._stream = {
+            'n_frames': n_frames,
+            'start_frame': start_frame,
+            'required': required,
+            'keep_all': budget >= n_frames,
+            'step': step,
+            'next_target': 0.5 * step,
+            'cumulative': 0.0,
+            'score_sum': 0.0,
+            'last_kept': None
+        }
+
+    def select_next(self, frame: np.ndarray) -> bool:
+        """
+        Ajoute la frame suivante du flux et indique si elle doit être conservée
+
+        Mêmes règles que select_frames (quantiles du poids cumulé, première et
+        dernière frame, frames obligatoires, écarts min/max), avec la moyenne des
+        scores vus jusqu'ici à la place de la moyenne du segment.
+        """
+        stream = self._stream
+        if stream is None:
+            raise ValueError("❌ begin_stream doit être appelé avant select_next")
+
+        score = self.update(frame)
+        idx = len(self.scores) - 1
+
+        # Le premier score (0 par construction) n'entre pas dans la moyenne
+        if idx > 0:
+            stream['score_sum'] += score
+        mean_score = stream['score_sum'] / idx if idx > 0 else 0.0
+        stream['cumulative'] += (score / mean_score if mean_score > 0 else 0.0) + self.floor_ratio
+
+        reached = stream['cumulative'] >= stream['next_target']
+        while stream['cumulative'] >= stream['next_target']:
+            stream['next_target'] += stream['step']
+
+        last_kept = stream['last_kept']
+        keep = (stream['keep_all'] or last_kept is None or idx == stream['n_frames'] - 1
+                or idx in stream['required'])
+        if not keep and reached:
+            keep = idx - last_kept >= self.min_interval
+        if not keep and self.max_interval:
+            keep = idx - last_kept >= self.max_interval
+
+        if keep:
+            stream['last_kept'] = idx
+            self.selected.append(stream['start_frame'] + idx)
+        return keep
+
+    def _enforce_min_interval(self, selected: List[int], required: set) -> List[int]:
+        """Supprime les frames trop proches (hors frames obligatoires)"""
+        if self.min_interval <= 1:
+            return selected
+
+        kept = []
+        for idx in selected:
+            if kept and idx - kept[-1] < self.min_interval and idx not in required:
+                continue
+            kept.append(idx)
+        return kept
+
+    def _enforce_max_interval(self, selected: List[int]) -> List[int]:
+        """Comble les trous plus grands que max_interval"""
+        if not self.max_interval or len(selected) < 2:
+            return selected
+
+        filled = [selected[0]]
+        for idx in selected[1:]:
+            previous = filled[-1]
+            while idx - previous > self.max_interval:
+                previous += self.max_interval
+                filled.append(previous)
+            filled.append(idx)
+        return filled
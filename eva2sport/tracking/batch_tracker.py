@@ -0,0 +1,194 @@
+"""
+Tracking SAM2 multi-clips en lot
+Fait avancer plusieurs clips d'événements en parallèle avec un seul passage
+de l'encodeur d'image par pas de propagation
+"""
+
+import torch
+from typing import Dict, Any, List, Optional
+
+from .sam2_tracker import SAM2Tracker
+from ..utils import eva_logger
+
+
+class _ClipPropagation:
+    """État de propagation d'un clip : segments planifiés, générateur SAM2 courant et résultats"""
+
+    def __init__(self, tracker: SAM2Tracker, segments: List[Dict]):
+        self.tracker = tracker
+        self.segments = segments
+        self.segment_index = -1
+        self.segment = None
+        self.generator = None
+        self.pending_frames: List[int] = []
+        self.results: Dict[int, Any] = {}
+
+    @property
+    def next_frame(self) -> Optional[int]:
+        """Frame que le générateur SAM2 va traiter au prochain pas"""
+        return self.pending_frames[0] if self.pending_frames else None
+
+    def ensure_segment(self) -> bool:
+        """Ouvre le segment suivant si nécessaire ; False quand le clip est terminé"""
+        while not self.pending_frames:
+            if self.generator is not None:
+                # Terminer proprement le générateur du segment écoulé
+                for _ in self.generator:
+                    pass
+                self.generator = None
+                self.segment = None
+
+            self.segment_index += 1
+            if self.segment_index >= len(self.segments):
+                return False
+
+            self.segment = self.segments[self.segment_index]
+            self._open_segment()
+        return True
+
+    def step(self) -> None:
+        """Avance le générateur d'une frame et stocke le résultat"""
+        out_frame_idx, out_obj_ids, out_mask_logits = next(self.generator)
+        self.pending_frames.pop(0)
+
+        segment = self.segment
+        if segment['start'] <= out_frame_idx <= segment['end']:
+            # Mêmes règles que SAM2Tracker.run_multi_anchor_propagation
+            if segment['direction'] == 'reverse' or out_frame_idx not in self.results:
+                self.tracker._store_frame_result(self.results, out_frame_idx, out_obj_ids, out_mask_logits)
+
+    def _open_segment(self) -> None:
+        tracker = self.tracker
+        segment = self.segment
+        reverse = segment['direction'] == 'reverse'
+        num_frames = tracker.inference_state["num_frames"]
+
+        eva_logger.debug(f"[{tracker.config.VIDEO_NAME_WITH_EVENT}] {segment['name']}")
+        if tracker.drift_monitor is not None:
+            tracker.drift_monitor.start_pass(segment['direction'])
+
+        # Plage réellement parcourue par SAM2 : anchor ± max_frame_num_to_track
+        # (max_frames + 1 frames), la dernière frame est donc aussi encodée en batch
+        anchor = segment['anchor']
+        if reverse:
+            last = max(anchor - segment['max_frames'], 0)
+            self.pending_frames = list(range(anchor, last - 1, -1))
+        else:
+            last = min(anchor + segment['max_frames'], num_frames - 1)
+            self.pending_frames = list(range(anchor, last + 1))
+
+        self.generator = tracker.predictor.propagate_in_video(
+            tracker.inference_state,
+            start_frame_idx=anchor,
+            max_frame_num_to_track=segment['max_frames'],
+            reverse=reverse
+        )
+
+
+class BatchSAM2Tracker:
+    """
+    Propage N clips indépendants en lockstep avec un predictor SAM2 partagé
+
+    À chaque pas, les prochaines frames de tous les clips actifs sont empilées
+    et passées dans l'encodeur d'image en un seul batch. Les features de chaque
+    clip sont ensuite injectées dans le cache de son propre état d'inférence :
+    les banques mémoire restent séparées et SAM2 réutilise les features au lieu
+    de relancer l'encodeur pour la frame.
+    """
+
+    def __init__(self, trackers: List[SAM2Tracker], max_batch_size: Optional[int] = None):
+        """
+        Args:
+            trackers: Trackers initialisés (état d'inférence + annotations), même predictor
+            max_batch_size: Nombre maximal de frames par passage encodeur (None = tous les clips)
+        """
+        if not trackers:
+            raise ValueError("❌ Aucun tracker à propager")
+
+        self.predictor = trackers[0].predictor
+        if self.predictor is None or any(t.inference_state is None for t in trackers):
+            raise ValueError("❌ SAM2 non initialisé pour tous les clips")
+        if any(t.predictor is not self.predictor for t in trackers):
+            raise ValueError("❌ Les clips doivent partager le même predictor SAM2")
+
+        self.trackers = trackers
+        self.max_batch_size = max_batch_size or len(trackers)
+
+    def run_propagation(self, plans: List[Dict[str, Any]]) -> List[Dict[int, Any]]:
+        """
+        Propage tous les clips en lockstep
+
+        Args:
+            plans: Par clip, les arguments de SAM2Tracker.plan_propagation
+                (anchor_frames, start_frame, end_frame, shot_cuts)
+
+        Returns:
+            Résultats de propagation par clip, dans l'ordre des trackers
+        """
+        clips = []
+        for tracker, plan in zip(self.trackers, plans):
+            segments, tracker.untracked_frames = tracker.plan_propagation(
+                plan['anchor_frames'], plan['start_frame'], plan['end_frame'], plan.get('shot_cuts')
+            )
+            clips.append(_ClipPropagation(tracker, segments))
+
+        eva_logger.info(f"Propagation en lot: {len(clips)} clips, batch encodeur ≤ {self.max_batch_size}")
+
+        steps = 0
+        encoded = 0
+        active = [clip for clip in clips if clip.ensure_segment()]
+        while active:
+            encoded += self._prefetch_features(active)
+            for clip in active:
+                clip.step()
+            steps += 1
+            active = [clip for clip in active if clip.ensure_segment()]
+
+        for clip in clips:
+            clip.tracker._handle_drift(clip.results)
+
+        eva_logger.success(f"Propagation en lot terminée: {steps} pas, {encoded} frames encodées en batch")
+        return [clip.results for clip in clips]
+
+    @torch.inference_mode()
+    def _prefetch_features(self, clips: List[_ClipPropagation]) -> int:
+        """Encode en batch la prochaine frame de chaque clip et l'injecte dans son cache"""
+        requests = [
+            (clip.tracker.inference_state, clip.next_frame) for clip in clips
+            if not self._is_conditioning_frame(clip.tracker.inference_state, clip.next_frame)
+        ]
+
+        for start in range(0, len(requests), self.max_batch_size):
+            chunk = requests[start:start + self.max_batch_size]
+            device = chunk[0][0]["device"]
+            images = torch.stack([
+                state["images"][frame_idx].to(device).float() for state, frame_idx in chunk
+            ])
+            backbone_out = self.predictor.forward_image(images)
+
+            for i, (state, frame_idx) in enumerate(chunk):
+                # Même format que SAM2VideoPredictor._get_image_feature (cache d'une frame)
+                state["cached_features"] = {
+                    frame_idx: (images[i:i + 1], self._select_batch_item(backbone_out, i))
+                }
+
+        return len(requests)
+
+    @staticmethod
+    def _is_conditioning_frame(inference_state: Dict[str, Any], frame_idx: int) -> bool:
+        """Une frame d'ancrage réutilise ses sorties : pas besoin de l'encoder"""
+        per_obj = inference_state.get("output_dict_per_obj", {})
+        return bool(per_obj) and all(
+            frame_idx in obj_outputs["cond_frame_outputs"] for obj_outputs in per_obj.values()
+        )
+
+    @classmethod
+    def _select_batch_item(cls, value: Any, index: int) -> Any:
+        """Extrait l'élément `index` (batch de 1) de la sortie du backbone"""
+        if isinstance(value, torch.Tensor):
+            return value[index:index + 1]
+        if isinstance(value, dict):
+            return {k: cls._select_batch_item(v, index) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(cls._select_batch_item(v, index) for v in value)
+        return value
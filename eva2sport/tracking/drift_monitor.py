@@ -0,0 +1,210 @@
+"""
+Surveillance de la dérive du tracking pendant la propagation SAM2
+Détecte les plages de frames suspectes par objet et fournit la dernière frame fiable
+"""
+
+import torch
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Union
+
+import numpy as np
+
+from ..enrichment.field_projector import FieldProjector
+from ..enrichment.calibration_track import CalibrationTrack
+from ..enrichment.mask_ops import compute_mask_stats
+
+
+@dataclass
+class DriftRange:
+    """Plage de frames où un objet a dérivé"""
+    obj_id: int
+    start_frame: int
+    end_frame: int
+    direction: str
+    reasons: List[str] = field(default_factory=list)
+    anchor_frame: Optional[int] = None
+    anchor_bbox: Optional[List[int]] = None
+    reanchored: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable pour les métadonnées projet"""
+        return {
+            "obj_id": self.obj_id,
+            "start_frame": self.start_frame,
+            "end_frame": self.end_frame,
+            "direction": self.direction,
+            "reasons": sorted(set(self.reasons)),
+            "anchor_frame": self.anchor_frame,
+            "reanchored": self.reanchored
+        }
+
+
+class DriftMonitor:
+    """
+    Suit par objet le score SAM2, la variation d'aire du masque et le saut de
+    position terrain entre frames, et regroupe les frames suspectes en plages
+
+    Un score faible n'est une dérive que si un masque est encore produit : un
+    objet sorti du champ (aire nulle) n'est pas signalé. Seuls frame, aire,
+    bbox et position terrain de la dernière frame fiable sont conservés (aucun
+    masque gardé sur le device) ; le masque de ré-ancrage est relu dans les
+    résultats de propagation retenus.
+    """
+
+    def __init__(self, cam_params: Optional[Union[Dict, FieldProjector, CalibrationTrack]] = None,
+                 frame_to_seconds: Optional[Callable[[int], float]] = None,
+                 frame_to_original: Optional[Callable[[int], int]] = None,
+                 obj_types: Optional[Dict[int, str]] = None,
+                 min_object_score: float = 0.5,
+                 max_area_ratio: float = 3.0,
+                 max_speed: float = 12.0,
+                 max_ball_speed: float = 40.0):
+        """
+        Args:
+            cam_params: Calibration statique, projecteur compilé ou piste de
+                calibration par frame (saut terrain ignoré si None)
+            frame_to_seconds: Conversion index traité → secondes
+            frame_to_original: Conversion index traité → frame originale (piste de calibration)
+            obj_types: Mapping obj_id → type d'objet ('ball', 'player', ...)
+            min_object_score: Score d'objet SAM2 minimal d'un masque non vide
+            max_area_ratio: Rapport d'aire maximal par rapport à la dernière frame fiable
+            max_speed: Vitesse terrain maximale plausible (m/s)
+            max_ball_speed: Vitesse terrain maximale plausible pour le ballon (m/s)
+        """
+        self.cam_params = cam_params
+        self.frame_to_seconds = frame_to_seconds or (lambda idx: float(idx))
+        self.frame_to_original = frame_to_original or (lambda idx: int(idx))
+        self.obj_types = obj_types or {}
+        self.min_object_score = min_object_score
+        self.max_area_ratio = max_area_ratio
+        self.max_speed = max_speed
+        self.max_ball_speed = max_ball_speed
+
+        if isinstance(cam_params, (FieldProjector, CalibrationTrack)):
+            self.projector = cam_params
+        else:
+            self.projector = FieldProjector(cam_params) if cam_params else None
+        self.ranges: List[DriftRange] = []
+
+        # État par passe de propagation
+        self._direction = 'forward'
+        self._last_good: Dict[int, Dict[str, Any]] = {}
+        self._open_ranges: Dict[int, DriftRange] = {}
+
+    def start_pass(self, direction: str) -> None:
+        """Démarre une nouvelle passe de propagation (les frames sont observées depuis l'anchor)"""
+        self._close_open_ranges()
+        self._direction = direction
+        self._last_good = {}
+
+    def observe(self, frame_idx: int, obj_ids: List[int], mask_logits: torch.Tensor,
+                object_scores: Optional[List[Optional[float]]] = None) -> List[int]:
+        """
+        Analyse les masques d'une frame propagée
+
+        Args:
+            frame_idx: Index traité de la frame
+            obj_ids: IDs des objets dans l'ordre des masques
+            mask_logits: Logits SAM2 (N, 1, H, W)
+            object_scores: Scores d'objet SAM2 (sigmoid) par objet, si disponibles
+
+        Returns:
+            IDs des objets en dérive sur cette frame
+        """
+        # Réduction batchée sur le device (seul seuillage des logits) : aire et bbox de tous les objets
+        stats = compute_mask_stats(mask_logits)
+        field_points = self._project_bottom_centers(frame_idx, stats['bbox'])
+        drifting = []
+
+        for i, obj_id in enumerate(obj_ids):
+            area = int(stats['area'][i])
+            score = object_scores[i] if object_scores else None
+            reasons = []
+
+            # Score faible avec un masque présent ; aire nulle = objet hors champ, pas une dérive
+            if score is not None and score < self.min_object_score and area > 0:
+                reasons.append('object_score')
+
+            field_point = None
+            if area > 0:
+                last = self._last_good.get(obj_id)
+                if last is not None and last['area'] > 0:
+                    ratio = area / last['area']
+                    if ratio > self.max_area_ratio or ratio < 1.0 / self.max_area_ratio:
+                        reasons.append('area_change')
+
+                field_point = field_points[i] if field_points is not None else None
+                if last is not None and field_point is not None and last['field'] is not None:
+                    elapsed = abs(self.frame_to_seconds(frame_idx) - self.frame_to_seconds(last['frame']))
+                    jump = ((field_point[0] - last['field'][0]) ** 2 +
+                            (field_point[1] - last['field'][1]) ** 2) ** 0.5
+                    max_speed = self.max_ball_speed if self.obj_types.get(obj_id) == 'ball' else self.max_speed
+                    if elapsed > 0 and jump / elapsed > max_speed:
+                        reasons.append('field_jump')
+
+            if reasons:
+                drifting.append(obj_id)
+                self._extend_range(obj_id, frame_idx, reasons)
+            else:
+                self._close_range(obj_id)
+                if area > 0:
+                    # Dernière frame fiable : son masque (ou à défaut sa bbox) sert de prompt de ré-ancrage
+                    self._last_good[obj_id] = {
+                        'frame': frame_idx,
+                        'area': area,
+                        'field': field_point,
+                        'bbox': [int(v) for v in stats['bbox'][i]]
+                    }
+
+        return drifting
+
+    def get_drift_ranges(self) -> List[DriftRange]:
+        """Retourne toutes les plages de dérive détectées"""
+        self._close_open_ranges()
+        return list(self.ranges)
+
+    def _project_bottom_centers(self, frame_idx: int, bboxes: np.ndarray) -> Optional[List[tuple]]:
+        """
+        Projette en un lot les bas-centres des bbox [x, y, width, height] d'une frame
+
+        Avec une piste de calibration, la projection utilise les paramètres
+        de la frame originale correspondante (caméra mobile).
+        """
+        if self.projector is None or len(bboxes) == 0:
+            return None
+        points = FieldProjector.bbox_bottom_centers(bboxes)
+        if isinstance(self.projector, CalibrationTrack):
+            frames = [self.frame_to_original(frame_idx)] * len(points)
+            field_points = self.projector.image_to_field(frames, points)
+        else:
+            field_points = self.projector.image_to_field(points)
+        return [(float(x), float(y)) for x, y in field_points]
+
+    def _extend_range(self, obj_id: int, frame_idx: int, reasons: List[str]) -> None:
+        """Ouvre ou prolonge la plage de dérive d'un objet"""
+        current = self._open_ranges.get(obj_id)
+        if current is None:
+            last = self._last_good.get(obj_id)
+            current = DriftRange(
+                obj_id=obj_id,
+                start_frame=frame_idx,
+                end_frame=frame_idx,
+                direction=self._direction,
+                anchor_frame=last['frame'] if last else None,
+                anchor_bbox=last['bbox'] if last else None
+            )
+            self._open_ranges[obj_id] = current
+        current.start_frame = min(current.start_frame, frame_idx)
+        current.end_frame = max(current.end_frame, frame_idx)
+        current.reasons.extend(reasons)
+
+    def _close_range(self, obj_id: int) -> None:
+        """Ferme la plage de dérive ouverte d'un objet"""
+        current = self._open_ranges.pop(obj_id, None)
+        if current is not None:
+            self.ranges.append(current)
+
+    def _close_open_ranges(self) -> None:
+        """Ferme toutes les plages ouvertes (fin de passe)"""
+        for obj_id in list(self._open_ranges):
+            self._close_range(obj_id)
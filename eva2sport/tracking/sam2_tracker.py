@@ -6,7 +6,7 @@ Extrait du notebook SAM_inference_segment.ipynb
 import torch
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Callable
 
 from ..config import Config
 from ..utils import eva_logger
@@ -21,6 +21,12 @@ class SAM2Tracker:
         self.inference_state = None
         self.added_objects = []
         self.initial_annotations_data = []
+        self.untracked_frames = []
+        self.drift_monitor = None
+        self.drift_ranges = []
+        # Consommateur des frames propagées (frame_idx, obj_ids, mask_logits) : les
+        # résultats lui sont passés dès qu'ils sont définitifs et ne sont pas conservés
+        self.result_sink: Optional[Callable[[int, List[int], torch.Tensor], None]] = None
     
     def initialize_predictor(self, verbose: bool = True) -> None:
         """Initialise le predictor SAM2"""
@@ -226,11 +232,18 @@ class SAM2Tracker:
 
         return added_objects, all_annotations
     
-    def run_bidirectional_propagation(self, anchor_frame: int, total_frames: int) -> Dict[str, Any]:
+    def run_bidirectional_propagation(self, anchor_frame: int, total_frames: int,
+                                      shot_cuts: Optional[List[int]] = None) -> Dict[str, Any]:
         """Exécute la propagation bidirectionnelle SAM2 depuis l'anchor frame"""
         if self.predictor is None or self.inference_state is None:
             raise ValueError("❌ SAM2 non initialisé")
         
+        # Avec des changements de plan, la propagation reste dans le plan de l'anchor
+        if shot_cuts:
+            return self.run_multi_anchor_propagation([anchor_frame], 0, total_frames - 1, shot_cuts)
+        
+        self.untracked_frames = []
+        
         print("🔄 Propagation bidirectionnelle SAM2...")
         print(f"   📊 Anchor index: {anchor_frame}, Total frames: {total_frames}")
         
@@ -239,6 +252,8 @@ class SAM2Tracker:
         # Phase 1: Propagation inverse (anchor → 0)
         if anchor_frame > 0:
             print(f"🔄 Phase 1: Propagation inverse (frame {anchor_frame} → 0)")
+            if self.drift_monitor is not None:
+                self.drift_monitor.start_pass('reverse')
             
             for out_frame_idx, out_obj_ids, out_mask_logits in self.predictor.propagate_in_video(
                 self.inference_state,
@@ -246,15 +261,14 @@ class SAM2Tracker:
                 max_frame_num_to_track=anchor_frame + 1,
                 reverse=True
             ):
-                propagation_results[out_frame_idx] = {
-                    'obj_ids': out_obj_ids,
-                    'mask_logits': out_mask_logits
-                }
+                self._store_frame_result(propagation_results, out_frame_idx, out_obj_ids, out_mask_logits)
         
         # Phase 2: Propagation avant (anchor → fin)
         remaining_frames = total_frames - anchor_frame
         if remaining_frames > 1:
             print(f"🔄 Phase 2: Propagation avant (frame {anchor_frame} → {total_frames - 1})")
+            if self.drift_monitor is not None:
+                self.drift_monitor.start_pass('forward')
             
             for out_frame_idx, out_obj_ids, out_mask_logits in self.predictor.propagate_in_video(
                 self.inference_state,
@@ -266,10 +280,9 @@ class SAM2Tracker:
                 if out_frame_idx == anchor_frame and out_frame_idx in propagation_results:
                     continue
                 
-                propagation_results[out_frame_idx] = {
-                    'obj_ids': out_obj_ids,
-                    'mask_logits': out_mask_logits
-                }
+                self._store_frame_result(propagation_results, out_frame_idx, out_obj_ids, out_mask_logits)
+        
+        self._handle_drift(propagation_results)
         
         print(f"✅ Propagation terminée: {len(propagation_results)} frames")
         return propagation_results
@@ -321,7 +334,7 @@ class SAM2Tracker:
             if segment_info:
                 processed_frame_idx = self._calculate_processed_frame_index(frame_idx, segment_info)
             else:
-                processed_frame_idx = frame_idx
+                processed_frame_idx = self.config.processed_index_for_frame(frame_idx)
             
             # Ajouter les annotations pour cette frame
             frame_objects, frame_data = self._add_annotations_for_frame(
@@ -336,9 +349,9 @@ class SAM2Tracker:
         return all_added_objects, all_annotations_data
 
     def _calculate_processed_frame_index(self, original_frame: int, segment_info: Dict) -> int:
-        """Calcule l'index de frame dans le segment traité"""
+        """Calcule l'index de frame dans le segment traité (pas fixe ou échantillonnage adaptatif)"""
         start_frame = segment_info['start_frame']
-        return (original_frame - start_frame) // self.config.FRAME_INTERVAL
+        return self.config.processed_index_for_frame(original_frame, start_frame)
 
     def _add_annotations_for_frame(self, frame_idx: int, annotations: List[Dict], 
                                 project_config: Dict) -> Tuple[List[Dict], List[Dict]]:
@@ -390,7 +403,8 @@ class SAM2Tracker:
         
         return added_objects, annotations_data
 
-    def run_multi_anchor_propagation(self, anchor_frames: List[int], start_frame: int, end_frame: int) -> Dict[str, Any]:
+    def run_multi_anchor_propagation(self, anchor_frames: List[int], start_frame: int, end_frame: int,
+                                     shot_cuts: Optional[List[int]] = None) -> Dict[str, Any]:
         """
         Exécute la propagation SAM2 avec multiple anchors par segments
         
@@ -398,6 +412,7 @@ class SAM2Tracker:
             anchor_frames: Liste des frames d'ancrage (triées par ordre croissant)
             start_frame: Frame de début du segment
             end_frame: Frame de fin du segment
+            shot_cuts: Index traités ouvrant un nouveau plan (la propagation ne les traverse pas)
             
         Returns:
             Résultats de propagation pour toutes les frames
@@ -410,12 +425,68 @@ class SAM2Tracker:
         eva_logger.info(f"Propagation multi-anchor avec {len(anchor_frames)} anchors")
         eva_logger.info(f"Segment: [{start_frame}, {end_frame}], Anchors: {anchor_frames}")
         
+        segments, self.untracked_frames = self.plan_propagation(
+            anchor_frames, start_frame, end_frame, shot_cuts
+        )
+        
         propagation_results = {}
         
-        # Trier les anchors pour s'assurer qu'ils sont dans l'ordre
-        sorted_anchors = sorted(anchor_frames)
+        # Exécuter chaque segment
+        for segment in segments:
+            eva_logger.info(f"🔄 {segment['name']}")
+            if self.drift_monitor is not None:
+                self.drift_monitor.start_pass(segment['direction'])
+            
+            for out_frame_idx, out_obj_ids, out_mask_logits in self.predictor.propagate_in_video(
+                self.inference_state,
+                start_frame_idx=segment['anchor'],
+                max_frame_num_to_track=segment['max_frames'],
+                reverse=segment['direction'] == 'reverse'
+            ):
+                if segment['start'] <= out_frame_idx <= segment['end']:
+                    # Éviter de réécraser les frames d'ancrage déjà traitées
+                    if segment['direction'] == 'reverse' or out_frame_idx not in propagation_results:
+                        self._store_frame_result(propagation_results, out_frame_idx, out_obj_ids, out_mask_logits)
+        
+        self._handle_drift(propagation_results)
+        
+        if self.untracked_frames:
+            eva_logger.warning(f"{len(self.untracked_frames)} frames non suivies (plan sans anchor)")
+        
+        eva_logger.success(f"Propagation multi-anchor terminée: {len(propagation_results)} frames")
+        return propagation_results
+    
+    def plan_propagation(self, anchor_frames: List[int], start_frame: int, end_frame: int,
+                         shot_cuts: Optional[List[int]] = None) -> Tuple[List[Dict], List[int]]:
+        """
+        Planifie les segments de propagation en respectant les changements de plan
+        
+        Chaque plan est traité indépendamment avec ses propres anchors ; un plan sans
+        anchor n'est pas propagé et ses frames sont marquées non suivies.
+        
+        Returns:
+            Tuple (segments de propagation, frames non suivies)
+        """
+        from .shot_detector import ShotBoundaryDetector
         
-        # Segments à traiter
+        sorted_anchors = sorted(set(anchor_frames))
+        segments = []
+        untracked_frames = []
+        
+        for shot_start, shot_end in ShotBoundaryDetector.split_into_shots(start_frame, end_frame, shot_cuts):
+            shot_anchors = [a for a in sorted_anchors if shot_start <= a <= shot_end]
+            if not shot_anchors:
+                untracked_frames.extend(range(shot_start, shot_end + 1))
+                continue
+            segments.extend(self._build_propagation_segments(
+                shot_anchors, shot_start, shot_end, first_index=len(segments) + 1
+            ))
+        
+        return segments, untracked_frames
+    
+    def _build_propagation_segments(self, sorted_anchors: List[int], start_frame: int,
+                                    end_frame: int, first_index: int = 1) -> List[Dict]:
+        """Construit les segments [début → anchor], [anchor_i → anchor_i+1], [anchor → fin]"""
         segments = []
         
         # Segment 1: start_frame → premier_anchor (si le premier anchor n'est pas au début)
@@ -425,7 +496,8 @@ class SAM2Tracker:
                 'end': sorted_anchors[0],
                 'anchor': sorted_anchors[0],
                 'direction': 'reverse',
-                'name': f"Segment 1: [{start_frame} → {sorted_anchors[0]}] depuis anchor({sorted_anchors[0]})"
+                'max_frames': sorted_anchors[0] - start_frame + 1,
+                'name': f"Segment {first_index}: [{start_frame} → {sorted_anchors[0]}] depuis anchor({sorted_anchors[0]})"
             })
         
         # Segments intermédiaires: anchor_i → anchor_i+1
@@ -438,7 +510,8 @@ class SAM2Tracker:
                 'end': next_anchor,
                 'anchor': current_anchor,
                 'direction': 'forward',
-                'name': f"Segment {i+2}: [{current_anchor} → {next_anchor}] depuis anchor({current_anchor})"
+                'max_frames': next_anchor - current_anchor + 1,
+                'name': f"Segment {first_index + len(segments)}: [{current_anchor} → {next_anchor}] depuis anchor({current_anchor})"
             })
         
         # Segment final: dernier_anchor → end_frame (si le dernier anchor n'est pas à la fin)
@@ -448,45 +521,152 @@ class SAM2Tracker:
                 'end': end_frame,
                 'anchor': sorted_anchors[-1],
                 'direction': 'forward',
-                'name': f"Segment {len(segments)+1}: [{sorted_anchors[-1]} → {end_frame}] depuis anchor({sorted_anchors[-1]})"
+                'max_frames': end_frame - sorted_anchors[-1] + 1,
+                'name': f"Segment {first_index + len(segments)}: [{sorted_anchors[-1]} → {end_frame}] depuis anchor({sorted_anchors[-1]})"
             })
         
-        # Exécuter chaque segment
-        for i, segment in enumerate(segments, 1):
-            eva_logger.info(f"🔄 {segment['name']}")
+        return segments
+    
+    # ===== SURVEILLANCE DE LA DÉRIVE =====
+    
+    def enable_drift_monitor(self, cam_params: Optional[Any] = None,
+                             obj_types: Optional[Dict[int, str]] = None) -> None:
+        """
+        Active la surveillance de dérive pendant la propagation
+        
+        Args:
+            cam_params: Calibration statique ou CalibrationTrack (caméra mobile)
+            obj_types: Mapping obj_id → type d'objet
+        """
+        from .drift_monitor import DriftMonitor
+        
+        fps = self.config.get_video_fps()
+        self.drift_monitor = DriftMonitor(
+            cam_params=cam_params,
+            frame_to_seconds=lambda idx: self.config.original_frame_for_index(idx) / fps,
+            frame_to_original=self.config.original_frame_for_index,
+            obj_types=obj_types,
+            min_object_score=self.config.DRIFT_MIN_OBJECT_SCORE,
+            max_area_ratio=self.config.DRIFT_MAX_AREA_RATIO,
+            max_speed=self.config.DRIFT_MAX_SPEED
+        )
+        eva_logger.info(f"Surveillance de dérive activée (ré-ancrage auto: {self.config.DRIFT_AUTO_REANCHOR})")
+    
+    def _store_frame_result(self, propagation_results: Dict[int, Any], frame_idx: int,
+                            obj_ids: List[int], mask_logits: torch.Tensor) -> None:
+        """Enregistre le résultat d'une frame propagée et l'analyse si le moniteur est actif"""
+        propagation_results[frame_idx] = {
+            'obj_ids': obj_ids,
+            'mask_logits': mask_logits
+        }
+        if self.drift_monitor is not None:
+            scores = [self._get_object_score(frame_idx, obj_id) for obj_id in obj_ids]
+            self.drift_monitor.observe(frame_idx, obj_ids, mask_logits, scores)
+        
+        # Une frame stockée n'est plus réécrite par les segments suivants (voir
+        # plan_propagation) : seul le ré-ancrage automatique impose de la retenir
+        if self.result_sink is not None and not self._holds_results():
+            self._release_frame(propagation_results, frame_idx)
+    
+    def _holds_results(self) -> bool:
+        """Vrai si les frames doivent rester en mémoire jusqu'au ré-ancrage automatique"""
+        return self.drift_monitor is not None and self.config.DRIFT_AUTO_REANCHOR
+    
+    def _release_frame(self, propagation_results: Dict[int, Any], frame_idx: int) -> None:
+        """Passe une frame au consommateur ; seule sa clé reste dans les résultats"""
+        frame_result = propagation_results[frame_idx]
+        propagation_results[frame_idx] = None
+        self.result_sink(frame_idx, frame_result['obj_ids'], frame_result['mask_logits'])
+    
+    def _get_object_score(self, frame_idx: int, obj_id: int) -> Optional[float]:
+        """Récupère le score d'objet SAM2 d'une frame depuis l'état d'inférence"""
+        try:
+            obj_idx = self.predictor._obj_id_to_idx(self.inference_state, obj_id)
+            obj_output_dict = self.inference_state["output_dict_per_obj"][obj_idx]
+            for key in ("non_cond_frame_outputs", "cond_frame_outputs"):
+                frame_output = obj_output_dict[key].get(frame_idx)
+                if frame_output and "object_score_logits" in frame_output:
+                    return torch.sigmoid(frame_output["object_score_logits"]).item()
+            return None
+        except Exception:
+            return None
+    
+    def _handle_drift(self, propagation_results: Dict[int, Any]) -> None:
+        """
+        Signale les plages de dérive et les re-propage localement en mode automatique
+        
+        Les frames retenues pour le ré-ancrage sont ensuite passées au consommateur.
+        """
+        if self.drift_monitor is not None:
+            self._report_drift(propagation_results)
+        
+        if self.result_sink is not None:
+            for frame_idx, frame_result in propagation_results.items():
+                if frame_result is not None:
+                    self._release_frame(propagation_results, frame_idx)
+    
+    def _report_drift(self, propagation_results: Dict[int, Any]) -> None:
+        """Plages de dérive du moniteur, ré-ancrées si DRIFT_AUTO_REANCHOR"""
+        ranges = self.drift_monitor.get_drift_ranges()
+        if ranges:
+            eva_logger.warning(f"Dérive détectée: {len(ranges)} plage(s) sur {len(set(r.obj_id for r in ranges))} objet(s)")
+            for drift_range in ranges:
+                eva_logger.debug(f"  Objet {drift_range.obj_id}: frames [{drift_range.start_frame}, {drift_range.end_frame}] "
+                                 f"({', '.join(sorted(set(drift_range.reasons)))})")
             
-            if segment['direction'] == 'reverse':
-                # Propagation inverse
-                max_frames = segment['anchor'] - segment['start'] + 1
-                
-                for out_frame_idx, out_obj_ids, out_mask_logits in self.predictor.propagate_in_video(
-                    self.inference_state,
-                    start_frame_idx=segment['anchor'],
-                    max_frame_num_to_track=max_frames,
-                    reverse=True
-                ):
-                    if segment['start'] <= out_frame_idx <= segment['end']:
-                        propagation_results[out_frame_idx] = {
-                            'obj_ids': out_obj_ids,
-                            'mask_logits': out_mask_logits
-                        }
-            else:
-                # Propagation avant
-                max_frames = segment['end'] - segment['start'] + 1
-                
-                for out_frame_idx, out_obj_ids, out_mask_logits in self.predictor.propagate_in_video(
-                    self.inference_state,
-                    start_frame_idx=segment['anchor'],
-                    max_frame_num_to_track=max_frames,
-                    reverse=False
-                ):
-                    if segment['start'] <= out_frame_idx <= segment['end']:
-                        # Éviter de réécraser les frames d'ancrage déjà traitées
-                        if out_frame_idx not in propagation_results:
-                            propagation_results[out_frame_idx] = {
-                                'obj_ids': out_obj_ids,
-                                'mask_logits': out_mask_logits
-                            }
+            if self.config.DRIFT_AUTO_REANCHOR:
+                for drift_range in ranges:
+                    self._reanchor_range(drift_range, propagation_results)
         
-        eva_logger.success(f"Propagation multi-anchor terminée: {len(propagation_results)} frames")
-        return propagation_results
\ No newline at end of file
+        self.drift_ranges = [r.to_dict() for r in ranges]
+    
+    def _reanchor_range(self, drift_range, propagation_results: Dict[int, Any]) -> None:
+        """
+        Ré-ancre un objet sur sa dernière frame fiable et re-propage uniquement la plage
+        
+        SAM2 re-propage tous les objets de l'état d'inférence : toutes les lignes
+        rafraîchies sont conservées, pour que les résultats restent ceux de l'état.
+        """
+        if drift_range.anchor_frame is None:
+            return
+        
+        anchor = drift_range.anchor_frame
+        reverse = drift_range.direction == 'reverse'
+        last_frame = drift_range.start_frame if reverse else drift_range.end_frame
+        
+        # Prompt masque depuis les logits retenus de la frame fiable, sinon prompt bbox
+        anchor_result = propagation_results.get(anchor)
+        if anchor_result is not None and drift_range.obj_id in anchor_result['obj_ids']:
+            row = list(anchor_result['obj_ids']).index(drift_range.obj_id)
+            anchor_logits = anchor_result['mask_logits'][row]
+            if anchor_logits.ndim == 3:
+                anchor_logits = anchor_logits[0]
+            self.predictor.add_new_mask(self.inference_state, anchor, drift_range.obj_id, anchor_logits > 0.0)
+        elif drift_range.anchor_bbox is not None:
+            x, y, width, height = drift_range.anchor_bbox
+            self.predictor.add_new_points_or_box(
+                self.inference_state, anchor, drift_range.obj_id,
+                box=np.array([x, y, x + width, y + height], dtype=np.float32)
+            )
+        else:
+            return
+        
+        low, high = min(drift_range.start_frame, drift_range.end_frame), max(drift_range.start_frame, drift_range.end_frame)
+        for out_frame_idx, out_obj_ids, out_mask_logits in self.predictor.propagate_in_video(
+            self.inference_state,
+            start_frame_idx=anchor,
+            max_frame_num_to_track=abs(last_frame - anchor) + 1,
+            reverse=reverse
+        ):
+            if not low <= out_frame_idx <= high or propagation_results.get(out_frame_idx) is None:
+                continue
+            
+            # Lignes remises dans l'ordre des objets du résultat stocké
+            frame_result = propagation_results[out_frame_idx]
+            out_rows = {obj_id: row for row, obj_id in enumerate(out_obj_ids)}
+            order = [out_rows[obj_id] for obj_id in frame_result['obj_ids']]
+            frame_result['mask_logits'] = out_mask_logits[order]
+        
+        drift_range.reanchored = True
+        eva_logger.info(f"Objet {drift_range.obj_id} ré-ancré depuis la frame {anchor} "
+                        f"(plage [{low}, {high}])")
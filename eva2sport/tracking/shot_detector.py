@@ -0,0 +1,113 @@
+"""
+Détection des changements de plan (coupes, ralentis) dans les vidéos broadcast
+Utilisée pendant l'extraction pour borner les fenêtres de propagation SAM2
+"""
+
+import cv2
+import numpy as np
+from typing import List, Optional
+
+
+class ShotBoundaryDetector:
+    """
+    Détecte les coupes franches à partir d'histogrammes couleur et de différences réduites
+
+    Une coupe est déclarée quand la distance de Bhattacharyya entre les histogrammes
+    HSV de deux frames consécutives ET la différence moyenne des images réduites
+    dépassent leurs seuils. Les coupes trop rapprochées (flashs, incrustations)
+    sont ignorées grâce à une longueur de plan minimale.
+    """
+
+    def __init__(self, hist_threshold: float = 0.5, diff_threshold: float = 0.12,
+                 min_shot_length: int = 5, downscale_width: int = 96):
+        """
+        Args:
+            hist_threshold: Distance d'histogramme minimale (0-1) pour une coupe
+            diff_threshold: Différence moyenne minimale (0-1) des images réduites
+            min_shot_length: Nombre minimal de frames entre deux coupes
+            downscale_width: Largeur de l'image réduite
+        """
+        self.hist_threshold = hist_threshold
+        self.diff_threshold = diff_threshold
+        self.min_shot_length = min_shot_length
+        self.downscale_width = downscale_width
+
+        self._previous_hist = None
+        self._previous_gray = None
+        self._last_cut = None
+        self.cuts: List[int] = []
+
+    def reset(self) -> None:
+        """Réinitialise l'état entre deux segments"""
+        self._previous_hist = None
+        self._previous_gray = None
+        self._last_cut = None
+        self.cuts = []
+
+    def update(self, frame_idx: int, frame: np.ndarray) -> bool:
+        """
+        Analyse une frame décodée
+
+        Args:
+            frame_idx: Index de la frame originale
+            frame: Frame BGR
+
+        Returns:
+            True si la frame ouvre un nouveau plan
+        """
+        height, width = frame.shape[:2]
+        small_height = max(1, int(round(height * self.downscale_width / float(width))))
+        small = cv2.resize(frame, (self.downscale_width, small_height), interpolation=cv2.INTER_AREA)
+
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255.0
+
+        is_cut = False
+        if self._previous_hist is not None:
+            hist_distance = cv2.compareHist(self._previous_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+            diff = float(np.mean(np.abs(gray - self._previous_gray)))
+
+            far_enough = self._last_cut is None or frame_idx - self._last_cut >= self.min_shot_length
+            if hist_distance > self.hist_threshold and diff > self.diff_threshold and far_enough:
+                is_cut = True
+                self._last_cut = frame_idx
+                self.cuts.append(frame_idx)
+
+        self._previous_hist = hist
+        self._previous_gray = gray
+        return is_cut
+
+    @staticmethod
+    def cuts_to_processed(cuts: List[int], processed_frames: List[int]) -> List[int]:
+        """
+        Convertit des coupes en frames originales en index traités
+
+        Chaque coupe devient l'index de la première frame traitée du nouveau plan.
+
+        Args:
+            cuts: Frames originales ouvrant un nouveau plan
+            processed_frames: Frames originales retenues (ordre traité)
+        """
+        from bisect import bisect_left
+
+        processed_cuts = set()
+        for cut in cuts:
+            idx = bisect_left(processed_frames, cut)
+            if 0 < idx < len(processed_frames):
+                processed_cuts.add(idx)
+        return sorted(processed_cuts)
+
+    @staticmethod
+    def split_into_shots(start_frame: int, end_frame: int,
+                         cuts: Optional[List[int]] = None) -> List[tuple]:
+        """Découpe [start_frame, end_frame] en plans (start, end) inclusifs"""
+        bounds = [c for c in sorted(set(cuts or [])) if start_frame < c <= end_frame]
+        shots = []
+        current = start_frame
+        for cut in bounds:
+            shots.append((current, cut - 1))
+            current = cut
+        shots.append((current, end_frame))
+        return shots
@@ -3,10 +3,13 @@ Processeur vidéo pour extraction de frames - Version Simplifiée
 """
 
 import cv2
+import json
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, List, Iterable
 
 from ..config import Config
+from .adaptive_sampler import AdaptiveFrameSampler
+from .shot_detector import ShotBoundaryDetector
 
 
 class VideoProcessor:
@@ -15,8 +18,9 @@ class VideoProcessor:
     def __init__(self, config: Config):
         self.config = config
     
-    def extract_all_frames(self, force_extraction: bool = False) -> int:
-        """Extrait toutes les frames de la vidéo selon l'intervalle"""
+    def extract_all_frames(self, force_extraction: bool = False,
+                           required_frames: Optional[Iterable[int]] = None) -> int:
+        """Extrait toutes les frames de la vidéo selon l'intervalle (ou l'échantillonnage adaptatif)"""
         
         print(f"🎬 Extraction des frames...")
         print(f"   📹 Source: {self.config.video_path}")
@@ -27,60 +31,42 @@ class VideoProcessor:
         if not self.config.video_path.exists():
             raise FileNotFoundError(f"❌ Vidéo non trouvée: {self.config.video_path}")
 
-        # Vérification si extraction déjà faite
-        existing_frames = list(self.config.frames_dir.glob("*.jpg"))
-        if existing_frames and not force_extraction:
-            print(f"📂 {len(existing_frames)} frames déjà extraites - SKIP")
-            return len(existing_frames)
-        elif existing_frames and force_extraction:
-            print(f"🔄 {len(existing_frames)} frames existantes - SUPPRESSION et ré-extraction...")
-            for frame_file in existing_frames:
-                frame_file.unlink()
-
         # Utiliser la méthode centralisée pour obtenir les informations vidéo
         video_info = self.config.get_video_info()
         total_frames = video_info['total_frames']
         fps = video_info['fps']
 
-        print(f"📊 Vidéo: {total_frames} frames, {fps:.1f} FPS")
-        print(f"📊 Frames à extraire: ~{total_frames // self.config.FRAME_INTERVAL}")
-
-        from ..utils import video_context
-
-        with video_context.open_video(self.config.video_path) as cap:
-            extracted_count = 0
-            frame_idx = 0
-            frame_mapping = []
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+        # Réutiliser une extraction faite avec les mêmes réglages
+        if not force_extraction:
+            reused_count = self._reuse_extraction(0, total_frames - 1, required_frames)
+            if reused_count is not None:
+                return reused_count
 
-                # Extraire seulement selon l'intervalle
-                if frame_idx % self.config.FRAME_INTERVAL == 0:
-                    output_idx = frame_idx // self.config.FRAME_INTERVAL
-                    filename = self.config.frames_dir / f"{output_idx:05d}.jpg"
-                    cv2.imwrite(str(filename), frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
-                    extracted_count += 1
+        # Frames d'une extraction forcée, incomplète ou faite avec d'autres réglages
+        existing_frames = list(self.config.frames_dir.glob("*.jpg"))
+        if existing_frames:
+            print(f"🔄 {len(existing_frames)} frames existantes - SUPPRESSION et ré-extraction...")
+            for frame_file in existing_frames:
+                frame_file.unlink()
 
-                    if extracted_count % 50 == 0:
-                        progress = (frame_idx / total_frames) * 100
-                        print(f"📊 Progrès: {extracted_count} frames extraites ({progress:.1f}%)")
+        print(f"📊 Vidéo: {total_frames} frames, {fps:.1f} FPS")
 
-                frame_idx += 1
+        written_frames = self._write_frames(0, total_frames - 1, required_frames, total_frames)
 
-        print(f"✅ {extracted_count} frames extraites")
-        return extracted_count
+        self._save_extraction_info(0, total_frames - 1, written_frames)
+        print(f"✅ {len(written_frames)} frames extraites")
+        return len(written_frames)
     
     def extract_segment_frames(self, reference_frame: int, 
-                              force_extraction: bool = False) -> int:
+                              force_extraction: bool = False,
+                              required_frames: Optional[Iterable[int]] = None) -> int:
         """
         Extrait les frames du segment
         
         Args:
             reference_frame: Frame d'annotation de référence
             force_extraction: Force la ré-extraction même si les frames existent
+            required_frames: Frames originales à conserver en échantillonnage adaptatif
         """
         
         # Utiliser la méthode centralisée pour obtenir les informations vidéo
@@ -109,7 +95,7 @@ class VideoProcessor:
             print(f"   🎬 Segment: frames {start_frame} à {end_frame}")
         
         return self._extract_segment_frames(
-            start_frame, end_frame, force_extraction
+            start_frame, end_frame, force_extraction, required_frames
         )
     
     def count_existing_frames(self) -> int:
@@ -165,58 +151,193 @@ class VideoProcessor:
         return start_frame, end_frame, processed_start_idx, processed_end_idx
         
     def _extract_segment_frames(self, start_frame: int, end_frame: int, 
-                            force_extraction: bool) -> int:
+                            force_extraction: bool,
+                            required_frames: Optional[Iterable[int]] = None) -> int:
         """Extrait les frames du segment avec nommage séquentiel"""
         
         print(f"🎬 EXTRACTION DU SEGMENT:")
         print(f"   🎯 Segment: frames {start_frame} à {end_frame}")
         print(f"   ⏯️  Intervalle: {self.config.FRAME_INTERVAL}")
         
-        # Calculer les frames attendues
-        expected_frames = []
-        sequential_idx = 0
-        
-        for frame_idx in range(start_frame, end_frame + 1, self.config.FRAME_INTERVAL):
-            expected_frames.append((frame_idx, sequential_idx))
-            sequential_idx += 1
-        
-        # NOUVEAU : Nettoyer complètement le dossier en mode segment
-        all_existing_frames = list(self.config.frames_dir.glob("*.jpg"))
-        
+        # Réutiliser l'extraction précédente si elle couvre le même segment avec les mêmes
+        # réglages (sinon coupes de plan et mapping seraient ceux d'une autre extraction)
         if not force_extraction:
-            # Vérifier si exactement les bonnes frames existent
-            expected_files = [self.config.frames_dir / f"{seq_idx:05d}.jpg" 
-                            for _, seq_idx in expected_frames]
-            
-            if (len(all_existing_frames) == len(expected_files) and 
-                all(f.exists() for f in expected_files)):
-                print(f"📂 {len(expected_files)} frames du segment déjà extraites - SKIP")
-                return len(expected_files)
+            reused_count = self._reuse_extraction(start_frame, end_frame, required_frames)
+            if reused_count is not None:
+                return reused_count
         
         # Nettoyage complet du dossier
+        all_existing_frames = list(self.config.frames_dir.glob("*.jpg"))
         if all_existing_frames:
             print(f"🧹 Nettoyage du dossier: suppression de {len(all_existing_frames)} frames")
             for frame_file in all_existing_frames:
                 frame_file.unlink()
         
-        # Extraction des frames du segment
+        # Extraction des frames du segment (pas fixe ou adaptatif)
+        written_frames = self._write_frames(start_frame, end_frame, required_frames)
+        
+        self._save_extraction_info(start_frame, end_frame, written_frames)
+        print(f"✅ {len(written_frames)} frames du segment extraites")
+        return len(written_frames)
+    
+    def _reuse_extraction(self, start_frame: int, end_frame: int,
+                          required_frames: Optional[Iterable[int]] = None) -> Optional[int]:
+        """
+        Reprend l'extraction précédente si ses réglages et ses fichiers correspondent
+        
+        Returns:
+            Nombre de frames réutilisées, None s'il faut ré-extraire
+        """
+        info = self._load_extraction_info(start_frame, end_frame)
+        if info is None:
+            return None
+        
+        selected_frames = info['processed_frames']
+        if self.config.ADAPTIVE_SAMPLING:
+            # Les frames annotées doivent faire partie de la sélection adaptative
+            required = {int(f) for f in required_frames or [] if start_frame <= int(f) <= end_frame}
+            if not required.issubset(selected_frames):
+                return None
+        
+        # Vérifier si exactement les bonnes frames existent
+        existing_count = len(list(self.config.frames_dir.glob("*.jpg")))
+        expected_files = [self.config.frames_dir / f"{seq_idx:05d}.jpg"
+                          for seq_idx in range(len(selected_frames))]
+        if existing_count != len(expected_files) or not all(f.exists() for f in expected_files):
+            return None
+        
+        print(f"📂 {len(expected_files)} frames déjà extraites - SKIP")
+        self.config.processed_frames = selected_frames
+        self.config.shot_cut_frames = info.get('shot_cuts', [])
+        return len(expected_files)
+    
+    def _create_sampler(self, start_frame: int, end_frame: int,
+                        required_frames: Optional[Iterable[int]] = None) -> AdaptiveFrameSampler:
+        """Échantillonneur adaptatif prêt à sélectionner [start_frame, end_frame] en flux"""
+        sampler = AdaptiveFrameSampler(
+            min_interval=self.config.ADAPTIVE_MIN_INTERVAL,
+            max_interval=self.config.ADAPTIVE_MAX_INTERVAL
+        )
+        n_frames = end_frame - start_frame + 1
+        budget = self.config.ADAPTIVE_FRAME_BUDGET or -(-n_frames // self.config.FRAME_INTERVAL)
+        sampler.begin_stream(n_frames, budget, start_frame, required_frames)
+        print(f"   🏃 Échantillonnage adaptatif: budget {budget} frames sur {n_frames}")
+        return sampler
+    
+    def _write_frames(self, start_frame: int, end_frame: int,
+                      required_frames: Optional[Iterable[int]] = None,
+                      total_frames: Optional[int] = None) -> List[int]:
+        """
+        Décode [start_frame, end_frame] une seule fois et écrit les frames retenues en nommage séquentiel
+        
+        En échantillonnage adaptatif, le score de mouvement, la sélection et
+        l'écriture se font dans la même passe ; sinon les frames sont prises au pas fixe.
+        
+        Returns:
+            Frames originales écrites (ordre traité)
+        """
         from ..utils import video_context
         
+        sampler = None
+        if self.config.ADAPTIVE_SAMPLING:
+            sampler = self._create_sampler(start_frame, end_frame, required_frames)
+        else:
+            print(f"📊 Frames à extraire: ~{len(range(start_frame, end_frame + 1, self.config.FRAME_INTERVAL))}")
+        
+        # Détection des coupes sur toutes les frames décodées (pas seulement celles retenues)
+        shot_detector = None
+        if self.config.SHOT_DETECTION:
+            shot_detector = ShotBoundaryDetector(
+                hist_threshold=self.config.SHOT_HIST_THRESHOLD,
+                diff_threshold=self.config.SHOT_DIFF_THRESHOLD
+            )
+        
+        written_frames = []
+        skipped = None  # Dernière frame décodée non retenue : écrite si la vidéo s'arrête avant end_frame
+        
+        def write(frame_idx, frame):
+            filename = self.config.frames_dir / f"{len(written_frames):05d}.jpg"
+            cv2.imwrite(str(filename), frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            written_frames.append(frame_idx)
+            if total_frames and len(written_frames) % 50 == 0:
+                progress = (frame_idx / total_frames) * 100
+                print(f"📊 Progrès: {len(written_frames)} frames extraites ({progress:.1f}%)")
+        
         with video_context.open_video(self.config.video_path) as cap:
-            extracted_count = 0
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            if start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
             
             for frame_idx in range(start_frame, end_frame + 1):
                 ret, frame = cap.read()
                 if not ret:
                     break
                 
-                if (frame_idx - start_frame) % self.config.FRAME_INTERVAL == 0:
-                    sequential_idx = (frame_idx - start_frame) // self.config.FRAME_INTERVAL
-                    filename = self.config.frames_dir / f"{sequential_idx:05d}.jpg"
-                    
-                    cv2.imwrite(str(filename), frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
-                    extracted_count += 1
-        
-        print(f"✅ {extracted_count} frames du segment extraites")
-        return extracted_count
\ No newline at end of file
+                if shot_detector is not None:
+                    shot_detector.update(frame_idx, frame)
+                
+                if sampler is not None:
+                    keep = sampler.select_next(frame)
+                else:
+                    keep = (frame_idx - start_frame) % self.config.FRAME_INTERVAL == 0
+                
+                if keep:
+                    write(frame_idx, frame)
+                    skipped = None
+                else:
+                    skipped = (frame_idx, frame)
+            
+            # Vidéo plus courte qu'annoncé : la dernière frame décodée reste la borne du segment
+            if sampler is not None and skipped is not None:
+                write(*skipped)
+        
+        if sampler is not None:
+            self._motion_scores = sampler.scores
+            print(f"   🏃 {len(written_frames)}/{len(sampler.scores)} frames retenues")
+        
+        self.config.shot_cut_frames = shot_detector.cuts if shot_detector is not None else []
+        if self.config.shot_cut_frames:
+            print(f"   ✂️ {len(self.config.shot_cut_frames)} changement(s) de plan détecté(s): {self.config.shot_cut_frames}")
+        
+        return written_frames
+    
+    def _save_extraction_info(self, start_frame: int, end_frame: int,
+                              selected_frames: List[int]) -> None:
+        """Sauvegarde le mapping frames traitées → frames originales"""
+        self.config.processed_frames = list(selected_frames)
+        
+        info = {
+            'sampling': 'adaptive' if self.config.ADAPTIVE_SAMPLING else 'fixed',
+            'frame_interval': self.config.FRAME_INTERVAL,
+            'shot_detection': bool(self.config.SHOT_DETECTION),
+            'start_frame': start_frame,
+            'end_frame': end_frame,
+            'processed_frames': self.config.processed_frames,
+            'shot_cuts': self.config.shot_cut_frames
+        }
+        if self.config.ADAPTIVE_SAMPLING:
+            info['motion_scores'] = [round(score, 4) for score in getattr(self, '_motion_scores', [])]
+        
+        with open(self.config.extraction_info_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+    
+    def _load_extraction_info(self, start_frame: int, end_frame: int) -> Optional[Dict[str, Any]]:
+        """Charge le mapping d'une extraction précédente s'il correspond au segment demandé"""
+        path = self.config.extraction_info_path
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        sampling = 'adaptive' if self.config.ADAPTIVE_SAMPLING else 'fixed'
+        if (info.get('sampling') != sampling or
+                info.get('frame_interval') != self.config.FRAME_INTERVAL or
+                info.get('shot_detection', False) != bool(self.config.SHOT_DETECTION) or
+                info.get('start_frame') != start_frame or
+                info.get('end_frame') != end_frame):
+            return None
+        
+        return info
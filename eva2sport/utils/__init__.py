@@ -6,6 +6,9 @@ from .timestamp_reader import TimestampReader
 from .video_context import VideoContextManager, video_context
 from .eva_logger import EVA2SportLogger, eva_logger
 from .gpu_optimizer import GPUMemoryOptimizer, gpu_optimizer
+from .result_cache import ResultCache
+from .frame_mapping import FrameMapping
+from .json_serializer import JSONSerializer, json_serializer
 
 __all__ = [
     'TimestampReader',
@@ -14,5 +17,9 @@ __all__ = [
     'EVA2SportLogger',
     'eva_logger',
     'GPUMemoryOptimizer',
-    'gpu_optimizer'
+    'gpu_optimizer',
+    'ResultCache',
+    'FrameMapping',
+    'JSONSerializer',
+    'json_serializer'
 ] 
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Compression des sorties (projet JSON, store de masques, index d'événements)
+zstd (zstandard, optionnel) ou gzip, détection du format par les octets magiques
+"""
+
+import gzip
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIONS = ('zstd', 'gzip')
+SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+DEFAULT_LEVELS = {'zstd': 3, 'gzip': 6}
+MAGICS = {'zstd': b'\x28\xb5\x2f\xfd', 'gzip': b'\x1f\x8b'}
+
+
+def _check(compression: str):
+    """Valide un nom de compression et la présence de son module"""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"❌ Compression inconnue: {compression} (disponibles: {', '.join(COMPRESSIONS)})")
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError("❌ zstandard non installé. Installez-le avec: pip install zstandard")
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """Compression d'un contenu d'après ses premiers octets (None si non compressé)"""
+    for compression, magic in MAGICS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def compressed_path(path: Union[str, Path], compression: Optional[str]) -> Path:
+    """Chemin de sortie avec le suffixe de la compression (.zst, .gz)"""
+    path = Path(path)
+    return path.with_name(path.name + SUFFIXES[compression]) if compression else path
+
+
+def plain_path(path: Union[str, Path]) -> Path:
+    """Chemin sans suffixe de compression"""
+    path = Path(path)
+    if path.suffix in SUFFIXES.values():
+        return path.with_suffix('')
+    return path
+
+
+def path_compression(path: Union[str, Path]) -> Optional[str]:
+    """Compression d'un fichier d'après son suffixe"""
+    suffix = Path(path).suffix
+    return next((name for name, value in SUFFIXES.items() if value == suffix), None)
+
+
+def output_variants(path: Union[str, Path]) -> List[Path]:
+    """Chemins possibles d'une sortie : non compressée puis chaque compression"""
+    plain = plain_path(path)
+    return [plain, *(compressed_path(plain, name) for name in COMPRESSIONS)]
+
+
+def find_output(path: Union[str, Path]) -> Optional[Path]:
+    """
+    Fichier de sortie existant, compressé ou non
+
+    Une sortie écrite avec une autre compression que la configuration
+    courante reste trouvée (x.json, x.json.zst, x.json.gz).
+    """
+    for candidate in (Path(path), *output_variants(path)):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def remove_other_variants(path: Union[str, Path]) -> List[Path]:
+    """Supprime les variantes d'une sortie écrites avec une autre compression que path"""
+    removed = [variant for variant in output_variants(path) if variant != Path(path) and variant.exists()]
+    for variant in removed:
+        variant.unlink()
+    return removed
+
+
+def compress(data: bytes, compression: Optional[str], level: Optional[int] = None) -> bytes:
+    """Compresse un contenu en une passe (None : inchangé)"""
+    if not compression:
+        return data
+    _check(compression)
+    level = DEFAULT_LEVELS[compression] if level is None else level
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def decompress(data: bytes) -> bytes:
+    """Décompresse un contenu zstd/gzip, un contenu non compressé est rendu tel quel"""
+    compression = detect_compression(data[:4])
+    if compression is None:
+        return data
+    _check(compression)
+    if compression == 'zstd':
+        # decompressobj : trame sans taille de contenu (écriture en flux)
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+def open_writer(path: Union[str, Path], compression: Optional[str], level: Optional[int] = None) -> BinaryIO:
+    """Fichier binaire en écriture, compressé au fil de l'eau"""
+    if not compression:
+        return open(path, 'wb')
+    _check(compression)
+    level = DEFAULT_LEVELS[compression] if level is None else level
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=level).stream_writer(open(path, 'wb'), closefd=True)
+    return gzip.GzipFile(path, 'wb', compresslevel=level, mtime=0)
+
+
+def read_bytes(path: Union[str, Path]) -> bytes:
+    """Contenu d'un fichier, décompressé si besoin"""
+    with open(path, 'rb') as f:
+        return decompress(f.read())
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    """Vrai si le fichier commence par un en-tête zstd/gzip"""
+    with open(path, 'rb') as f:
+        return detect_compression(f.read(4)) is not None
+
@@ -0,0 +1,125 @@
+"""
+Correspondance frames originales ↔ index traités
+Encodage compact en plages (start, stop, step) de metadata.frame_mapping
+"""
+
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+
+class FrameMapping:
+    """
+    Frames originales retenues, en plages arithmétiques consécutives
+
+    Les index traités sont attribués dans l'ordre des plages : la plage k
+    couvre les index [offsets[k], offsets[k + 1]). Un échantillonnage fixe tient
+    en une plage, un échantillonnage adaptatif en quelques plages ; les
+    recherches sont en O(1) pour une plage et O(log plages) sinon.
+
+    Forme JSON (metadata.frame_mapping) :
+        {"format": "ranges", "total_frames": N, "ranges": [[start, stop, step], ...]}
+    """
+
+    FORMAT = "ranges"
+
+    def __init__(self, ranges: Sequence[Sequence[int]], total_frames: int):
+        """
+        Args:
+            ranges: Plages [start, stop, step) croissantes et disjointes de frames originales
+            total_frames: Nombre de frames de la vidéo source
+        """
+        self.ranges = [[int(start), int(stop), int(step)] for start, stop, step in ranges]
+        self.total_frames = int(total_frames)
+        self._starts = [start for start, _, _ in self.ranges]
+        self._offsets = [0]
+        for start, stop, step in self.ranges:
+            self._offsets.append(self._offsets[-1] + len(range(start, stop, step)))
+
+    @classmethod
+    def from_frames(cls, original_frames: Sequence[int], total_frames: int) -> 'FrameMapping':
+        """Regroupe des frames originales triées en plages arithmétiques"""
+        frames = sorted(set(int(f) for f in original_frames if 0 <= f < total_frames))
+        ranges = []
+        i = 0
+        while i < len(frames):
+            if i + 1 == len(frames):
+                ranges.append([frames[i], frames[i] + 1, 1])
+                break
+            step = frames[i + 1] - frames[i]
+            j = i + 1
+            while j + 1 < len(frames) and frames[j + 1] - frames[j] == step:
+                j += 1
+            ranges.append([frames[i], frames[j] + 1, step])
+            i = j + 1
+        return cls(ranges, total_frames)
+
+    @classmethod
+    def from_metadata(cls, frame_mapping: Union[Dict[str, Any], List[Optional[int]], None],
+                      total_frames: Optional[int] = None) -> 'FrameMapping':
+        """
+        Lit metadata.frame_mapping, compact ou ancien format
+
+        L'ancien format est une liste de longueur total_frames : index traité
+        de chaque frame originale, None si la frame n'est pas traitée.
+        """
+        if isinstance(frame_mapping, dict):
+            if frame_mapping.get('format') != cls.FORMAT:
+                raise ValueError(f"❌ Format de frame_mapping inconnu: {frame_mapping.get('format')}")
+            return cls(frame_mapping['ranges'], frame_mapping['total_frames'])
+
+        frame_mapping = frame_mapping or []
+        originals = [None] * sum(1 for p in frame_mapping if p is not None)
+        for original, processed in enumerate(frame_mapping):
+            if processed is not None and processed < len(originals):
+                originals[processed] = original
+        mapping = cls.from_frames([f for f in originals if f is not None],
+                                  total_frames if total_frames is not None else len(frame_mapping))
+        if mapping.original_frames() != originals:
+            raise ValueError("❌ frame_mapping non croissant : index traités non chronologiques")
+        return mapping
+
+    @classmethod
+    def from_project_data(cls, project_data: Dict[str, Any]) -> 'FrameMapping':
+        """Mapping d'un projet (les deux formats sont acceptés)"""
+        metadata = project_data.get('metadata', {})
+        return cls.from_metadata(metadata.get('frame_mapping'), metadata.get('frame_count_original'))
+
+    def to_json(self) -> Dict[str, Any]:
+        """Forme compacte écrite dans metadata.frame_mapping"""
+        return {"format": self.FORMAT, "total_frames": self.total_frames, "ranges": self.ranges}
+
+    def to_list(self) -> List[Optional[int]]:
+        """Ancien format : liste de longueur total_frames (None hors frames traitées)"""
+        mapping: List[Optional[int]] = [None] * self.total_frames
+        for processed, original in enumerate(self.original_frames()):
+            mapping[original] = processed
+        return mapping
+
+    def __len__(self) -> int:
+        """Nombre de frames traitées"""
+        return self._offsets[-1]
+
+    def processed_index(self, original_frame: int) -> Optional[int]:
+        """Index traité d'une frame originale (None si elle n'est pas traitée)"""
+        k = bisect_right(self._starts, original_frame) - 1
+        if k < 0:
+            return None
+        start, stop, step = self.ranges[k]
+        if original_frame >= stop or (original_frame - start) % step:
+            return None
+        return self._offsets[k] + (original_frame - start) // step
+
+    def original_frame(self, processed_idx: int) -> int:
+        """Frame originale d'un index traité"""
+        if not 0 <= processed_idx < len(self):
+            raise IndexError(f"Index traité hors limites: {processed_idx}")
+        k = bisect_right(self._offsets, processed_idx) - 1
+        start, _, step = self.ranges[k]
+        return start + (processed_idx - self._offsets[k]) * step
+
+    def original_frames(self) -> List[int]:
+        """Frames originales traitées, dans l'ordre des index traités"""
+        frames = []
+        for start, stop, step in self.ranges:
+            frames.extend(range(start, stop, step))
+        return frames
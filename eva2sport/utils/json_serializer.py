@@ -0,0 +1,117 @@
+"""
+Sérialisation JSON des projets, index et configurations
+Backend rapide (orjson, msgspec) s'il est installé, module json standard sinon
+"""
+
+import json
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from .compression import compress, read_bytes
+
+
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+
+class JSONSerializer:
+    """
+    Lecture/écriture JSON avec le backend le plus rapide disponible
+
+    Avec orjson, les fichiers écrits ont la même mise en forme que ceux du
+    module json (indent=2, ensure_ascii=False, ordre des clés) et se relisent
+    à l'identique, mais ne sont pas identiques octet pour octet : les floats
+    en notation exponentielle sont écrits autrement (1e-05 → 0.00001,
+    1e+16 → 1e16, 1.5e-07 → 1.5e-7) et un float NaN est écrit null (JSON
+    valide) au lieu de NaN. Ce qu'un backend rapide refuse (NaN en lecture,
+    types non supportés en écriture) repasse par le module json.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: 'orjson', 'msgspec' ou 'json' (None = le plus rapide installé)
+        """
+        available = self.available_backends()
+        backend = backend or available[0]
+        if backend not in available:
+            raise ValueError(f"❌ Backend JSON non disponible: {backend} (disponibles: {', '.join(available)})")
+        self.backend = backend
+        if backend == 'msgspec':
+            self._encoder = msgspec.json.Encoder()
+            self._decoders = {}
+
+    @staticmethod
+    def available_backends() -> List[str]:
+        """Backends installés, du plus rapide au plus lent"""
+        installed = {'orjson': orjson is not None, 'msgspec': msgspec is not None, 'json': True}
+        return [name for name in BACKENDS if installed[name]]
+
+    def dumps(self, data: Any, indent: bool = False) -> bytes:
+        """Encode en JSON UTF-8 (indent=True : indentation de 2 espaces)"""
+        try:
+            if self.backend == 'orjson':
+                option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                return orjson.dumps(data, option=option | orjson.OPT_INDENT_2 if indent else option)
+            if self.backend == 'msgspec':
+                encoded = self._encoder.encode(data)
+                return msgspec.json.format(encoded, indent=2) if indent else encoded
+        except TypeError:
+            pass  # Type non géré par le backend rapide : module json
+        if indent:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data: Union[bytes, str], schema: Optional[type] = None) -> Any:
+        """
+        Décode un document JSON
+
+        Args:
+            data: Document JSON
+            schema: Type (TypedDict de project_schema) pour un décodage validé
+                avec msgspec ; ignoré par les autres backends. Les clés hors
+                schéma sont alors ignorées.
+        """
+        if self.backend == 'msgspec' and schema is not None:
+            decoder = self._decoders.get(schema)
+            if decoder is None:
+                decoder = self._decoders[schema] = msgspec.json.Decoder(schema)
+            return decoder.decode(data)
+        try:
+            if self.backend == 'orjson':
+                return orjson.loads(data)
+            if self.backend == 'msgspec':
+                return msgspec.json.decode(data)
+        except (ValueError, msgspec.DecodeError if msgspec else ValueError):
+            pass  # NaN/Infinity écrits par le module json : relecture standard
+        return json.loads(data)
+
+    def dump(self, data: Any, path: Union[str, Path], indent: bool = True,
+             compression: Optional[str] = None, level: Optional[int] = None) -> Path:
+        """
+        Écrit un fichier JSON (indenté par défaut, comme les sorties historiques)
+
+        Args:
+            compression: None, 'zstd' ou 'gzip' (le nom du fichier est laissé à l'appelant)
+            level: Niveau de compression (None = défaut du codec)
+        """
+        path = Path(path)
+        path.write_bytes(compress(self.dumps(data, indent=indent), compression, level))
+        return path
+
+    def load(self, path: Union[str, Path], schema: Optional[type] = None) -> Any:
+        """Lit un fichier JSON, compressé (zstd, gzip) ou non"""
+        return self.loads(read_bytes(path), schema=schema)
+
+
+# Instance globale
+json_serializer = JSONSerializer()
@@ -0,0 +1,167 @@
+"""
+Cache des résultats de la pipeline EVA2SPORT
+Chaque étape (tracking, enrichissement) est indexée par une clé déterministe
+dérivée de ses entrées et de la clé de l'étape précédente
+"""
+
+import re
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional, Union
+
+from .json_serializer import json_serializer
+
+
+class ResultCache:
+    """
+    Cache disque des sorties d'étapes, une entrée par étape
+
+    Les clés sont chaînées : extraction → tracking → enrichissement. Modifier
+    une entrée (calibration, prompts, modèle...) ne change que la clé de
+    l'étape concernée et celles qui en dépendent.
+    """
+
+    # À incrémenter quand le format des sorties d'étape change
+    CACHE_VERSION = 2
+
+    # En-tête d'une entrée : 'stage' et 'key' sont écrits avant le payload
+    HEADER_BYTES = 512
+    _KEY_PATTERN = re.compile(rb'"key"\s*:\s*"([0-9a-f]+)"')
+
+    # Empreintes déjà calculées par ce processus : chemin → (signature, sha256)
+    _digest_memo: Dict[str, tuple] = {}
+
+    def __init__(self, cache_dir: Union[str, Path], enabled: bool = True,
+                 digests_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            cache_dir: Dossier de stockage des entrées
+            enabled: Désactive lecture et écriture si False
+            digests_dir: Dossier des empreintes de fichiers, partageable entre
+                événements d'une même vidéo (défaut: cache_dir)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self._digests_path = Path(digests_dir or cache_dir) / "file_digests.json"
+
+    @classmethod
+    def hash_payload(cls, *parts: Any) -> str:
+        """Calcule une clé SHA-256 stable à partir d'éléments sérialisables"""
+        payload = json.dumps([cls.CACHE_VERSION, *parts], sort_keys=True,
+                             separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def file_digest(self, path: Union[str, Path], chunk_size: int = 8 * 1024 * 1024) -> Optional[str]:
+        """
+        Empreinte SHA-256 du contenu d'un fichier
+
+        L'empreinte est mémorisée par (chemin, taille, date de modification),
+        en mémoire pour le processus et sur disque dans digests_dir, pour éviter
+        de relire une vidéo ou un checkpoint inchangé à chaque événement.
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        stat = path.stat()
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        resolved = str(path.resolve())
+        memo = self._digest_memo.get(resolved)
+        if memo and memo[0] == signature:
+            return memo[1]
+
+        digests = self._load_digests()
+        entry = digests.get(resolved)
+        if entry and entry.get('signature') == signature:
+            self._digest_memo[resolved] = (signature, entry['sha256'])
+            return entry['sha256']
+
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        self._digest_memo[resolved] = (signature, digest)
+
+        if self.enabled:
+            digests[resolved] = {'signature': signature, 'sha256': digest}
+            self._digests_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._digests_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(digests, f, indent=2)
+            tmp_path.replace(self._digests_path)
+        return digest
+
+    def has(self, stage: str, key: str) -> bool:
+        """Vrai si l'entrée d'une étape correspond à la clé (seul l'en-tête est lu)"""
+        if not self.enabled:
+            return False
+
+        try:
+            with open(self._entry_path(stage), 'rb') as f:
+                header = f.read(self.HEADER_BYTES)
+        except OSError:
+            return False
+
+        match = self._KEY_PATTERN.search(header)
+        return match is not None and match.group(1).decode('ascii') == key
+
+    def get(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne la sortie mise en cache d'une étape, ou None si absente/périmée"""
+        if not self.enabled:
+            return None
+
+        entry_path = self._entry_path(stage)
+        if not entry_path.exists():
+            return None
+
+        try:
+            entry = json_serializer.load(entry_path)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('key') != key:
+            return None
+        return entry.get('payload')
+
+    def put(self, stage: str, key: str, payload: Dict[str, Any]) -> Optional[Path]:
+        """Enregistre la sortie d'une étape (remplace l'entrée précédente)"""
+        if not self.enabled:
+            return None
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(stage)
+        tmp_path = entry_path.with_suffix('.tmp')
+
+        json_serializer.dump({
+            'stage': stage,
+            'key': key,
+            'created_at': datetime.now().isoformat(),
+            'payload': payload
+        }, tmp_path, indent=False)
+        tmp_path.replace(entry_path)
+        return entry_path
+
+    def invalidate(self, stage: Optional[str] = None) -> None:
+        """Supprime l'entrée d'une étape (ou toutes les entrées)"""
+        if stage is not None:
+            paths = [self._entry_path(stage)]
+        else:
+            paths = list(self.cache_dir.glob("stage_*.json")) if self.cache_dir.exists() else []
+        for path in paths:
+            if path.exists():
+                path.unlink()
+
+    def _entry_path(self, stage: str) -> Path:
+        return self.cache_dir / f"stage_{stage}.json"
+
+    def _load_digests(self) -> Dict[str, Any]:
+        if not self._digests_path.exists():
+            return {}
+        try:
+            with open(self._digests_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
@@ -3,7 +3,6 @@ Exporteur vidéo refactorisé utilisant l'architecture modulaire
 """
 
 import os
-import json
 import numpy as np
 from pathlib import Path
 from PIL import Image
@@ -18,9 +17,19 @@ from ..config.visualization_config import VisualizationConfig
 from ..config.minimap_config import MinimapConfig
 from ..objects.object_renderer_factory import ObjectRendererFactory
 from ..field.field_drawer import FieldDrawer
+from ...export.binary_project import BinaryProjectReader, FrameAnnotations
+from ...utils.json_serializer import json_serializer
+from ...utils.compression import find_output
 
 class VideoExporter:
-    """Exporteur vidéo avec architecture modulaire"""
+    """
+    Exporteur vidéo avec architecture modulaire
+    
+    Le rendu lit les annotations frame par frame depuis le projet binaire
+    (.evab, project_binary) s'il est à jour ; sans lui, tout le JSON du projet
+    est chargé en mémoire. La pipeline l'écrit d'office quand l'export vidéo
+    est demandé (project_binary non renseigné).
+    """
     
     def __init__(self, config: Config, visualization_config: Optional[VisualizationConfig] = None):
         """
@@ -93,9 +102,10 @@ class VideoExporter:
         print(f"📁 Frames temporaires: {temp_frames_dir}")
         print(f"🎥 Vidéo de sortie: {output_video_path}")
         
+        reader = None
         try:
             # Charger le projet et obtenir toutes les frames
-            project = self._load_project_data()
+            project, reader = self._open_project_data()
             available_frames = self._get_available_frames(project)
             
             if not available_frames:
@@ -140,11 +150,29 @@ class VideoExporter:
             import traceback
             traceback.print_exc()
             return False
+        finally:
+            if reader is not None:
+                reader.close()
     
-    def _load_project_data(self) -> Dict:
-        """Charge les données du projet depuis le fichier JSON"""
-        with open(self.config.output_json_path) as f:
-            return json.load(f)
+    def _open_project_data(self) -> Tuple[Dict, Optional[BinaryProjectReader]]:
+        """
+        Charge les données du projet
+        
+        Si un .evab au moins aussi récent que le JSON existe, les annotations
+        sont lues frame par frame via son index au lieu de charger tout le JSON.
+        
+        Returns:
+            (projet, lecteur binaire à fermer par l'appelant ou None)
+        """
+        binary_path = self.config.output_binary_path
+        # JSON compressé ou non, quelle que soit la compression configurée
+        json_path = find_output(self.config.output_json_path) or self.config.output_json_path
+        if binary_path.exists() and (not json_path.exists()
+                                     or binary_path.stat().st_mtime >= json_path.stat().st_mtime):
+            reader = BinaryProjectReader(binary_path)
+            return reader.lazy_project_data(), reader
+        
+        return json_serializer.load(json_path), None
     
     def _get_available_frames(self, project: Dict) -> List[str]:
         """Récupère la liste des frames disponibles"""
@@ -466,14 +494,20 @@ class VideoExporter:
     
     def get_export_stats(self) -> Dict:
         """Retourne des statistiques sur les données disponibles pour l'export"""
+        reader = None
         try:
-            project = self._load_project_data()
+            project, reader = self._open_project_data()
             available_frames = self._get_available_frames(project)
             
-            # Compter les objets par frame
+            # Compter les objets par frame (sans décoder les frames si l'index binaire est disponible)
             total_objects = 0
+            annotations = project['annotations']
+            sizes = annotations.sizes() if isinstance(annotations, FrameAnnotations) else None
             for frame_id in available_frames:
-                frame_annotations = project['annotations'][frame_id]
+                if sizes is not None:
+                    total_objects += sizes[frame_id]
+                    continue
+                frame_annotations = annotations[frame_id]
                 objects_count = len([ann for ann in frame_annotations if ann is not None])
                 total_objects += objects_count
             
@@ -491,6 +525,9 @@ class VideoExporter:
         except Exception as e:
             print(f"❌ Erreur lors du calcul des statistiques: {e}")
             return {}
+        finally:
+            if reader is not None:
+                reader.close()
     
     def get_supported_object_types(self) -> List[str]:
         """Retourne les types d'objets supportés"""
@@ -0,0 +1,70 @@
+"""
+Projets synthétiques partagés par les tests
+Annotations au schéma courant (masque RLE, bbox, points image/terrain) et
+projet complet avec frame_mapping, objets et métadonnées
+"""
+
+import uuid
+from typing import Dict, List
+
+
+FPS = 25.0
+
+
+def make_annotation(obj_id: str, field_x: float, field_y: float,
+                    image_x: float = 110.0, bbox_x: int = 100, score: float = 0.875) -> dict:
+    """Annotation au schéma courant avec un point terrain CENTER_BOTTOM"""
+    return {
+        "id": str(uuid.uuid4()),
+        "objectId": obj_id,
+        "type": "mask",
+        "mask": {"format": "rle_coco_base64", "size": [1080, 1920], "counts": "AAECAwQ="},
+        "bbox": {"output": {"x": bbox_x, "y": 200, "width": 20, "height": 60}},
+        "points": {"output": {
+            "image": {"CENTER_BOTTOM": {"x": image_x, "y": 260.0}},
+            "field": {"CENTER_BOTTOM": {"x": field_x, "y": field_y}}
+        }},
+        "area": 850,
+        "centroid": {"x": 110.0, "y": 230.0},
+        "maskScore": score,
+        "pose": None,
+        "warning": False
+    }
+
+
+def make_project(annotations: Dict[str, List[dict]], frame_interval: int, fps: float = FPS) -> dict:
+    """Projet complet : frame traitée i = frame originale i * frame_interval, un ballon '0' et un joueur '1'"""
+    frame_mapping = [None] * (len(annotations) * frame_interval)
+    for processed in range(len(annotations)):
+        frame_mapping[processed * frame_interval] = processed
+    return {
+        "format_version": "1.0",
+        "video": "test.mp4",
+        "calibration": {"camera_parameters": {"pan_degrees": 1.0}},
+        "metadata": {"fps": fps, "frame_interval": frame_interval, "frame_mapping": frame_mapping,
+                     "anchor_frame": 0},
+        "objects": {"0": {"type": "ball"}, "1": {"type": "player", "team": "A"}},
+        "annotations": annotations
+    }
+
+
+def make_schema_project(n_frames: int = 6) -> dict:
+    """Projet synthétique : deux objets, un objet perdu et des variantes du schéma"""
+    annotations = {
+        str(processed): [make_annotation(obj_id, 0.1 * processed, -3.25, image_x=110.5 + processed,
+                                         bbox_x=100 + processed) for obj_id in ("1", "0")]
+        for processed in range(n_frames)
+    }
+
+    variants = annotations["1"]
+    variants[0]["points"]["output"]["field"]["CENTER_BOTTOM"] = None
+    variants[0]["points"]["output"]["field_smoothed"] = {"CENTER_BOTTOM": {"x": 1.5, "y": 2.5}, "filled": True}
+    variants[1].update(mask=None, centroid=None, maskScore=None, warning=True)
+    variants[1]["bbox"]["output"] = None
+    variants[1]["points"]["output"] = None
+    del annotations["2"][0]["area"]
+    annotations["2"][1]["mask"] = {"format": "packbits_ref", "size": [1080, 1920], "chunk": 0,
+                                   "offset": 4096, "length": 150, "box": [100, 200, 20, 60]}
+    annotations["3"] = []
+
+    return make_project(annotations, frame_interval=2)
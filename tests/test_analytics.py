@@ -0,0 +1,171 @@
+"""
+Test des analyses de trajectoires
+Stockage colonnaire, cinématique, lissage et requêtes spatiales sur des données synthétiques
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.analytics.trajectory_store import TrajectoryStore
+from eva2sport.analytics.kinematics import KinematicsEngine
+from eva2sport.enrichment.trajectory_smoother import TrajectorySmoother
+from eva2sport.analytics.spatial_index import FrameSpatialIndex
+from project_factory import FPS, make_annotation, make_project
+
+
+FRAME_INTERVAL = 3
+
+
+def _make_project(n_frames: int = 20) -> dict:
+    """Projet synthétique : joueur '1' à 5 m/s selon x, ballon '0' absent une frame sur quatre"""
+    annotations = {}
+    for processed in range(n_frames):
+        t = processed * FRAME_INTERVAL / FPS
+        frame_annotations = [make_annotation("1", 5.0 * t, 10.0)]
+        if processed % 4 != 3:
+            frame_annotations.append(make_annotation("0", 0.0, 2.0 * t))
+        annotations[str(processed)] = frame_annotations
+    return make_project(annotations, FRAME_INTERVAL)
+
+
+def test_trajectory_store_round_trip():
+    """Colonnes par objet, frames originales et rechargement memmap sans copie"""
+    store = TrajectoryStore.from_project_data(_make_project())
+
+    assert store.object_ids == ["0", "1"]
+    player = store.get(1)
+    assert len(player) == 20
+    assert np.array_equal(player.frames, np.arange(20) * FRAME_INTERVAL)
+    assert np.allclose(player.field_xy[-1], [5.0 * 57 / FPS, 10.0])
+    assert len(store.get("0")) == 15
+
+    with tempfile.TemporaryDirectory() as directory:
+        store.save(directory)
+        loaded = TrajectoryStore.load(directory)
+        assert isinstance(loaded.columns['field_xy'], np.memmap)
+        assert np.array_equal(loaded.get(1).field_xy, player.field_xy)
+        del loaded
+
+
+def test_kinematics():
+    """Vitesse réelle via frame_interval/fps, trous non traversés, sprints comptés"""
+    store = TrajectoryStore.from_project_data(_make_project())
+    engine = KinematicsEngine(FPS, max_gap_seconds=0.2, sprint_thresholds={'run': 4.0},
+                              min_sprint_duration=1.0)
+    kinematics = engine.compute(store)
+
+    player = kinematics.get(1)
+    assert np.allclose(player['speed'], 5.0)
+    assert np.allclose(player['heading'], 0.0)
+    assert np.allclose(player['acceleration'], 0.0)
+    assert np.isclose(player['cumulative_distance'][-1], 5.0 * 57 / FPS)
+
+    # Ballon : trous de 0.24 s > max_gap, la distance ne les traverse pas
+    ball = kinematics.get(0)
+    assert np.allclose(ball['speed'], 2.0)
+    assert np.isclose(ball['cumulative_distance'][-1], 2.0 * 10 * FRAME_INTERVAL / FPS)
+
+    summary = kinematics.summary()
+    assert summary['1']['sprints']['run'] == 1
+    assert summary['0']['sprints']['run'] == 0
+
+
+def test_smoothing_fills_short_gaps():
+    """Le lissage réduit le bruit, comble un trou court et conserve les positions brutes"""
+    project = _make_project(40)
+    rng = np.random.default_rng(1)
+    for frame_key, frame_annotations in project["annotations"].items():
+        player = frame_annotations[0]
+        if int(frame_key) in (10, 11):
+            player["bbox"]["output"] = None
+            player["points"]["output"] = None
+        else:
+            player["points"]["output"]["field"]["CENTER_BOTTOM"]["x"] += rng.normal(0, 0.3)
+
+    counts = TrajectorySmoother(FPS, max_gap_seconds=0.5).apply(project)
+    assert counts["filled"] == 2
+
+    player = TrajectoryStore.from_project_data(project).get(1)
+    truth = 5.0 * player.frames / FPS
+    raw_error = np.nanstd(player.field_xy[:, 0] - truth)
+    smoothed_error = np.std(player.field_smoothed_xy[:, 0] - truth)
+    assert smoothed_error < raw_error / 2
+
+    gap = project["annotations"]["10"][0]["points"]["output"]
+    assert gap["field"]["CENTER_BOTTOM"] is None
+    assert gap["field_smoothed"]["filled"]
+    assert abs(gap["field_smoothed"]["CENTER_BOTTOM"]["x"] - 6.0) < 0.3
+
+
+def test_spatial_queries():
+    """Requêtes par frame comparées à un parcours naïf des positions"""
+    rng = np.random.default_rng(2)
+    n_frames, object_ids = 50, [str(i) for i in range(7)]
+    positions = rng.uniform(-30, 30, size=(n_frames, 7, 2))
+    positions[5, 3] = np.nan
+    types = ["ball"] + ["player"] * 6
+    teams = [None, "A", "A", "A", "B", "B", "B"]
+    index = FrameSpatialIndex(np.arange(n_frames) * FRAME_INTERVAL, object_ids, positions, types, teams,
+                              chunk_size=16)
+
+    nearest = index.nearest_to_ball()
+    for f in range(n_frames):
+        candidates = [(np.hypot(*(positions[f, c] - positions[f, 0])), c) for c in range(1, 7)
+                      if np.isfinite(positions[f, c, 0])]
+        assert nearest["object_ids"][f] == object_ids[min(candidates)[1]]
+
+    closest = index.closest_opponent(1)
+    expected = np.argmin(np.hypot(*(positions[:, 4:] - positions[:, 1:2]).transpose(2, 0, 1)), axis=1) + 4
+    assert [int(c) for c in closest["object_ids"]] == expected.tolist()
+
+    pressure = index.pressure(radius=15.0)
+    within = index.within_radius(1, 15.0)
+    assert np.array_equal(pressure[:, 1], within[:, 4:].sum(axis=1))
+    assert not pressure[:, 0].any()
+
+    possession = index.possession(max_distance=100.0)
+    assert np.isclose(sum(possession["shares"].values()), 1.0)
+
+
+def test_spatial_index_persistence():
+    """Index écrit à côté des trajectoires, rechargé en memmap avec les mêmes réponses"""
+    project = _make_project()
+    index = FrameSpatialIndex.from_project_data(project)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        loaded = FrameSpatialIndex.load(directory)
+        assert isinstance(loaded.positions, np.memmap)
+        assert loaded.position_column == 'field_xy'
+        assert loaded.object_ids == index.object_ids
+        assert np.array_equal(loaded.frames, index.frames)
+        assert np.array_equal(loaded.positions, index.positions, equal_nan=True)
+        assert loaded.nearest_to_ball()["object_ids"] == index.nearest_to_ball()["object_ids"]
+        assert loaded.possession(max_distance=100.0)["shares"] == index.possession(max_distance=100.0)["shares"]
+        del loaded
+
+
+if __name__ == "__main__":
+    print("🧪 TEST ANALYSE DES TRAJECTOIRES")
+    print("=" * 50)
+
+    tests = [test_trajectory_store_round_trip, test_kinematics, test_smoothing_fills_short_gaps,
+             test_spatial_queries, test_spatial_index_persistence]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
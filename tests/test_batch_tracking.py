@@ -0,0 +1,188 @@
+"""
+Test du tracking SAM2 multi-clips en lot
+Vérifie avec un predictor factice que toutes les frames parcourues par SAM2
+passent par l'encodeur en batch (aucun encodage frame par frame), et que le
+projet binaire écrit en flux pendant la propagation survit à un crash
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import torch
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.pipeline import EVA2SportPipeline
+from eva2sport.tracking.sam2_tracker import SAM2Tracker
+from eva2sport.tracking.batch_tracker import BatchSAM2Tracker
+from eva2sport.export.binary_project import BinaryProjectReader, load_project_binary, recover_project_binary
+from test_field_projection import CAM_PARAMS
+
+
+class FakePredictor:
+    """Predictor SAM2 minimal : parcourt la même plage que propagate_in_video et compte les encodages"""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.single_encodings = 0
+
+    def forward_image(self, images):
+        self.batch_sizes.append(len(images))
+        return {"vision_features": images}
+
+    def propagate_in_video(self, inference_state, start_frame_idx, max_frame_num_to_track, reverse=False):
+        num_frames = inference_state["num_frames"]
+        if reverse:
+            end_frame_idx = max(start_frame_idx - max_frame_num_to_track, 0)
+            frames = range(start_frame_idx, end_frame_idx - 1, -1)
+        else:
+            end_frame_idx = min(start_frame_idx + max_frame_num_to_track, num_frames - 1)
+            frames = range(start_frame_idx, end_frame_idx + 1)
+
+        for frame_idx in frames:
+            conditioning = all(frame_idx in outputs["cond_frame_outputs"]
+                               for outputs in inference_state["output_dict_per_obj"].values())
+            # Comme SAM2VideoPredictor._get_image_feature : encodeur relancé hors cache
+            if not conditioning and frame_idx not in inference_state["cached_features"]:
+                self.single_encodings += 1
+            yield frame_idx, [1], torch.zeros(1, 1, 4, 4)
+
+
+def make_tracker(predictor: FakePredictor, name: str, num_frames: int, anchors) -> SAM2Tracker:
+    """Tracker initialisé sur un état d'inférence factice (anchors = frames de conditionnement)"""
+    tracker = SAM2Tracker(SimpleNamespace(VIDEO_NAME_WITH_EVENT=name, DRIFT_AUTO_REANCHOR=False))
+    tracker.predictor = predictor
+    tracker.inference_state = {
+        "num_frames": num_frames,
+        "images": torch.zeros(num_frames, 3, 8, 8),
+        "device": torch.device("cpu"),
+        "cached_features": {},
+        "output_dict_per_obj": {0: {"cond_frame_outputs": {a: {} for a in anchors}, "non_cond_frame_outputs": {}}}
+    }
+    return tracker
+
+
+def test_batch_encoder_covers_segments():
+    """Chaque frame propagée (dernière frame de segment incluse) est encodée en batch"""
+    predictor = FakePredictor()
+    clips = [("clip_a", 20, [5, 12]), ("clip_b", 16, [3, 9])]
+    trackers = [make_tracker(predictor, name, num_frames, anchors) for name, num_frames, anchors in clips]
+    plans = [{"anchor_frames": anchors, "start_frame": 0, "end_frame": num_frames - 1, "shot_cuts": None}
+             for _, num_frames, anchors in clips]
+
+    results = BatchSAM2Tracker(trackers).run_propagation(plans)
+
+    for (name, num_frames, _), clip_results in zip(clips, results):
+        assert sorted(clip_results) == list(range(num_frames)), f"Frames manquantes pour {name}"
+    assert predictor.batch_sizes, "Aucun passage encodeur en batch"
+    assert predictor.single_encodings == 0, f"{predictor.single_encodings} frames encodées hors batch"
+
+
+class MovingBoxPredictor:
+    """Predictor factice : un carré qui se déplace, crash optionnel après N frames"""
+
+    def __init__(self, num_frames: int, crash_after: int = None):
+        self.num_frames = num_frames
+        self.crash_after = crash_after
+
+    def propagate_in_video(self, inference_state, start_frame_idx, max_frame_num_to_track, reverse=False):
+        end_frame_idx = min(start_frame_idx + max_frame_num_to_track, self.num_frames)
+        for frame_idx in range(start_frame_idx, end_frame_idx):
+            if frame_idx == self.crash_after:
+                raise RuntimeError("CUDA out of memory (simulé)")
+            logits = torch.full((1, 1, 48, 64), -1.0)
+            logits[0, 0, 10 + frame_idx:20 + frame_idx, 5 + 2 * frame_idx:15 + 2 * frame_idx] = 1.0
+            yield frame_idx, [1], logits
+
+
+def make_streaming_pipeline(directory: str, predictor: MovingBoxPredictor) -> EVA2SportPipeline:
+    """Pipeline plein-vidéo (frame_interval=1) sur une vidéo noire, projet binaire en blocs de 4 frames"""
+    videos_dir = Path(directory) / "data" / "videos"
+    videos_dir.mkdir(parents=True)
+    writer = cv2.VideoWriter(str(videos_dir / "clip.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 25, (64, 48))
+    for _ in range(predictor.num_frames):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    pipeline = EVA2SportPipeline("clip", working_dir=directory, frame_interval=1,
+                                 project_binary=True, binary_frames_per_block=4)
+    pipeline.project_config = {
+        "calibration": {"camera_parameters": CAM_PARAMS},
+        "objects": [{"obj_id": 1, "obj_type": "player"}],
+        "initial_annotations": []
+    }
+    pipeline.results = {"added_objects": [{"obj_id": 1, "obj_type": "player"}],
+                        "initial_annotations": [{"frame_idx": 0}]}
+    pipeline.sam2_tracker.predictor = predictor
+    pipeline.sam2_tracker.inference_state = {}
+    return pipeline
+
+
+def test_streamed_binary_matches_project():
+    """Le .evab écrit pendant la propagation est finalisé avec les champs du lissage"""
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = make_streaming_pipeline(directory, MovingBoxPredictor(10))
+        pipeline.run_tracking_propagation()
+
+        # Frames écrites dans le fichier pendant la propagation, logits libérés
+        with BinaryProjectReader(pipeline.config.output_binary_path) as reader:
+            assert not reader.finalized
+            assert len(reader) == 10
+        assert pipeline._stream_block == {}
+
+        pipeline.smooth_trajectories()
+        paths = pipeline.export_results(include_visualization=False)
+
+        project = load_project_binary(paths["binary"])
+        assert project["annotations"] == pipeline.project_data["annotations"]
+        assert project["metadata"]["smoothing"] == pipeline.project_data["metadata"]["smoothing"]
+        assert pipeline.sam2_tracker.result_sink is None
+
+
+def test_streamed_binary_crash_recovery():
+    """Crash en pleine propagation : les blocs complets sont relus puis récupérés"""
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = make_streaming_pipeline(directory, MovingBoxPredictor(20, crash_after=10))
+        try:
+            pipeline.run_tracking_propagation()
+            raise AssertionError("La propagation aurait dû échouer")
+        except RuntimeError:
+            pass
+        assert pipeline._binary_writer is None and pipeline.sam2_tracker.result_sink is None
+
+        # Frames 0-7 écrites (2 blocs de 4), 8-9 perdues avec le bloc en cours
+        path = pipeline.config.output_binary_path
+        with BinaryProjectReader(path) as reader:
+            assert not reader.finalized
+            assert sorted(int(frame) for frame in reader.lazy_project_data()["annotations"]) == list(range(8))
+            assert reader.get_frame(5) == pipeline.project_data["annotations"]["5"]
+
+        assert recover_project_binary(path) == {"blocks": 2, "frames": 8}
+        with BinaryProjectReader(path) as reader:
+            assert reader.finalized
+            assert reader.get_frame(7) == pipeline.project_data["annotations"]["7"]
+
+
+if __name__ == "__main__":
+    print("🧪 TEST TRACKING EN LOT")
+    print("=" * 50)
+
+    tests = [test_batch_encoder_covers_segments, test_streamed_binary_matches_project,
+             test_streamed_binary_crash_recovery]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
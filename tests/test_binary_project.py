@@ -0,0 +1,152 @@
+"""
+Test du format binaire de projet
+Relecture sans perte du format .evab, écriture en flux, récupération
+et lecture indexée sur des données synthétiques
+"""
+
+import sys
+import copy
+import tempfile
+import importlib
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.export.binary_project import (
+    save_project_binary, load_project_binary, BinaryProjectReader,
+    StreamingProjectWriter, recover_project_binary
+)
+from project_factory import make_schema_project
+
+
+def test_binary_round_trip():
+    """Relecture identique au JSON, types compris (int, float, None, bool)"""
+    project = make_schema_project()
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_project_binary(project, Path(directory) / "test_project.evab")
+        loaded = load_project_binary(path)
+
+        assert loaded == project
+        assert list(loaded['metadata']) == list(project['metadata'])
+        annotation = loaded['annotations']['0'][0]
+        assert type(annotation['bbox']['output']['x']) is int
+        assert type(annotation['points']['output']['field']['CENTER_BOTTOM']['x']) is float
+
+        with BinaryProjectReader(path) as reader:
+            assert reader.column('field_xy').shape == (10, 2)
+            assert not reader.header['overflow']
+
+
+def test_binary_overflow_lossless():
+    """Les annotations hors schéma sont conservées telles quelles"""
+    project = make_schema_project()
+    odd = project['annotations']['4'][0]
+    odd['pose'] = {"keypoints": [[1, 2]]}
+    odd['bbox']['output']['x'] = 100.5
+    project['annotations']['5'][1]['maskScore'] = 1
+    expected = copy.deepcopy(project)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_project_binary(project, Path(directory) / "test_project.evab")
+        loaded = load_project_binary(path)
+        assert loaded == expected
+        assert type(loaded['annotations']['5'][1]['maskScore']) is int
+        with BinaryProjectReader(path) as reader:
+            assert len(reader.header['overflow']) == 2
+
+
+def test_streaming_partial_recovery():
+    """Un écrivain interrompu laisse un fichier relisible jusqu'au dernier bloc complet"""
+    project = make_schema_project()
+    frames = list(project['annotations'].items())
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "test_project.evab"
+        try:
+            with StreamingProjectWriter(path, project, frames_per_block=2) as writer:
+                for frame_key, frame_annotations in frames[:5]:
+                    writer.write_frame(frame_key, frame_annotations)
+                raise RuntimeError("crash simulé")
+        except RuntimeError:
+            pass
+        # Bloc tronqué en fin de fichier (écriture coupée)
+        with open(path, 'ab') as f:
+            f.write(b'FRMS\x10\x00')
+
+        partial = load_project_binary(path)
+        assert list(partial['annotations']) == [key for key, _ in frames[:5]]
+        assert partial['annotations']['4'] == project['annotations']['4']
+        assert partial['metadata'] == project['metadata']
+
+        assert recover_project_binary(path) == {'blocks': 3, 'frames': 5}
+        with BinaryProjectReader(path) as reader:
+            assert reader.finalized
+            assert reader.to_project_data() == partial
+
+
+def test_video_export_closes_reader():
+    """Stats d'export lues via l'index binaire : fichier et mmap du lecteur fermés ensuite"""
+    video_exporter = importlib.import_module("eva2sport.visualization.exporters.video_exporter")
+    project = make_schema_project()
+    opened = []
+
+    class TrackedReader(BinaryProjectReader):
+        def __init__(self, path):
+            super().__init__(path)
+            opened.append(self)
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = SimpleNamespace(output_binary_path=Path(directory) / "test_project.evab",
+                                 output_json_path=Path(directory) / "test_project.json")
+        save_project_binary(project, config.output_binary_path)
+        video_exporter.BinaryProjectReader = TrackedReader
+        try:
+            stats = video_exporter.VideoExporter(config).get_export_stats()
+        finally:
+            video_exporter.BinaryProjectReader = BinaryProjectReader
+
+    assert stats['total_objects'] == sum(len(a) for a in project['annotations'].values())
+    assert len(opened) == 1 and opened[0]._file is None and opened[0]._mmap is None
+
+
+def test_indexed_reader():
+    """Accès direct par frame, itération partielle et tranches par objet"""
+    project = make_schema_project()
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_project_binary(project, Path(directory) / "test_project.evab", frames_per_block=2)
+        with BinaryProjectReader(path) as reader:
+            assert len(reader) == 6 and 3 in reader and "9" not in reader
+            assert reader.get_frame(5) == project['annotations']['5']
+            assert reader.get_frame("3") == []
+            assert [key for key, _ in reader.iter_frames(range(4, 9))] == ["4", "5"]
+            assert reader.frame_sizes() == {key: len(anns) for key, anns in project['annotations'].items()}
+
+            player = reader.object_slice("0", columns=('field_xy', 'bbox'))
+            assert player['frames'].tolist() == [0, 1, 2, 4, 5]
+            assert player['field_xy'][-1].tolist() == [0.5, -3.25]
+
+            lazy = reader.lazy_project_data()
+            assert lazy['objects'] == project['objects']
+            assert lazy['annotations']['2'] == project['annotations']['2']
+            assert list(lazy['annotations']) == list(project['annotations'])
+
+
+if __name__ == "__main__":
+    print("🧪 TEST FORMAT BINAIRE DE PROJET")
+    print("=" * 50)
+
+    tests = [test_binary_round_trip, test_binary_overflow_lossless, test_streaming_partial_recovery,
+             test_video_export_closes_reader, test_indexed_reader]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
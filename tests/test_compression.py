@@ -0,0 +1,87 @@
+"""
+Test des sorties compressées
+Projet JSON, store de masques et index des événements en gzip/zstd
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.utils.json_serializer import JSONSerializer
+from eva2sport.utils.compression import zstandard, compressed_path, find_output, is_compressed
+from eva2sport.export.mask_store import MaskStore, MaskStoreWriter
+from eva2sport.export.multi_event_manager import MultiEventManager
+from project_factory import make_schema_project
+
+
+def test_compressed_outputs():
+    """Projet JSON et store de masques compressés : relecture transparente"""
+    project = make_schema_project()
+    rng = np.random.default_rng(0)
+    masks = rng.random((4, 30, 40, 3)) > 0.7
+    serializer = JSONSerializer('json')
+    compressions = ['gzip'] + (['zstd'] if zstandard is not None else [])
+    with tempfile.TemporaryDirectory() as directory:
+        plain = Path(directory) / "test_project.json"
+        for compression in compressions:
+            path = serializer.dump(project, compressed_path(plain, compression), compression=compression, level=1)
+            assert path.name == f"test_project.json{'.gz' if compression == 'gzip' else '.zst'}"
+            assert is_compressed(path) and serializer.load(path) == project
+            assert find_output(plain) == path
+            path.unlink()
+
+            store_dir = Path(directory) / f"masks_{compression}"
+            writer = MaskStoreWriter(store_dir, chunk_frames=3, compression=compression)
+            refs = [writer.add_frame(frame, ["0", "1", "2"], masks[frame]) for frame in range(4)]
+            writer.close()
+            assert is_compressed(MaskStore.chunk_path(store_dir, 0))
+            store = MaskStore(store_dir)
+            for frame in range(4):
+                assert np.array_equal(store.decode_frame(frame)[1], masks[frame].transpose(2, 0, 1))
+            assert np.array_equal(store.decode(refs[3][1]), masks[3][..., 1])
+
+        # Un fichier non compressé reste lu tel quel
+        serializer.dump(project, plain)
+        assert not is_compressed(plain) and serializer.load(plain) == project
+
+
+def test_index_compression_switch():
+    """Index d'événements relu puis réécrit avec une autre compression : une seule version, à jour"""
+    with tempfile.TemporaryDirectory() as directory:
+        plain_manager = MultiEventManager("match", working_dir=directory)
+        plain_manager.events_index["events"].append({"event_id": "event_10s"})
+        plain_manager._save_index()
+
+        gzip_manager = MultiEventManager("match", working_dir=directory, output_compression='gzip')
+        assert [e["event_id"] for e in gzip_manager.events_index["events"]] == ["event_10s"]
+        gzip_manager.events_index["events"].append({"event_id": "event_40s"})
+        gzip_manager._save_index()
+
+        index_files = sorted(p.name for p in gzip_manager.video_output_dir.glob("match_events_index.json*"))
+        assert index_files == ["match_events_index.json.gz"], index_files
+        reloaded = MultiEventManager("match", working_dir=directory)
+        assert [e["event_id"] for e in reloaded.events_index["events"]] == ["event_10s", "event_40s"]
+
+
+if __name__ == "__main__":
+    print("🧪 TEST SORTIES COMPRESSÉES")
+    print("=" * 50)
+
+    tests = [test_compressed_outputs, test_index_compression_switch]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
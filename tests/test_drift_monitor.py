@@ -0,0 +1,154 @@
+"""
+Test de la surveillance de dérive du tracking
+Plages de dérive détectées par DriftMonitor.observe et ré-ancrage d'une plage
+avec un predictor factice
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import torch
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.tracking.drift_monitor import DriftMonitor, DriftRange
+from eva2sport.tracking.sam2_tracker import SAM2Tracker
+from test_field_projection import CAM_PARAMS
+
+
+HEIGHT, WIDTH = 1080, 1920
+
+
+def _logits(boxes) -> torch.Tensor:
+    """Logits (N, 1, H, W) : +1 dans chaque bbox (x, y, w, h), -1 ailleurs ; None = objet absent"""
+    logits = -torch.ones(len(boxes), 1, HEIGHT, WIDTH)
+    for i, box in enumerate(boxes):
+        if box is not None:
+            x, y, w, h = box
+            logits[i, 0, y:y + h, x:x + w] = 1.0
+    return logits
+
+
+def test_area_change_range():
+    """Aire multipliée pendant deux frames : une plage, ancrée sur la dernière frame fiable"""
+    monitor = DriftMonitor(max_area_ratio=3.0)
+    monitor.start_pass('forward')
+    player = (900, 600, 20, 40)
+    sizes = {3: (900, 600, 80, 80), 4: (900, 600, 90, 90)}
+
+    drifting = [monitor.observe(frame, [7], _logits([sizes.get(frame, player)])) for frame in range(7)]
+    assert drifting == [[], [], [], [7], [7], [], []], drifting
+
+    ranges = monitor.get_drift_ranges()
+    assert len(ranges) == 1
+    drift = ranges[0]
+    assert (drift.obj_id, drift.start_frame, drift.end_frame, drift.direction) == (7, 3, 4, 'forward')
+    assert drift.to_dict()['reasons'] == ['area_change']
+    assert drift.anchor_frame == 2
+    assert drift.anchor_bbox == [900, 600, 20, 40]
+
+
+def test_low_score_needs_a_mask():
+    """Score faible : dérive si un masque est produit, pas pour un objet sorti du champ (aire nulle)"""
+    monitor = DriftMonitor(min_object_score=0.5)
+    monitor.start_pass('reverse')
+    box = (100, 700, 20, 40)
+
+    assert monitor.observe(10, [1, 2], _logits([box, box]), [0.9, 0.9]) == []
+    # Objet 1 hors champ (aire nulle, score faible), objet 2 masque douteux
+    assert monitor.observe(9, [1, 2], _logits([None, box]), [0.05, 0.2]) == [2]
+    assert monitor.observe(8, [1, 2], _logits([None, box]), [0.05, 0.9]) == []
+
+    ranges = monitor.get_drift_ranges()
+    assert [(r.obj_id, r.start_frame, r.end_frame, r.direction) for r in ranges] == [(2, 9, 9, 'reverse')]
+    assert ranges[0].to_dict()['reasons'] == ['object_score']
+    assert ranges[0].anchor_frame == 10
+
+
+def test_field_jump_range():
+    """Saut terrain impossible entre deux frames : dérive sur la frame du saut seulement"""
+    monitor = DriftMonitor(cam_params=CAM_PARAMS, frame_to_seconds=lambda idx: idx / 25.0, max_speed=12.0)
+    monitor.start_pass('forward')
+    near, far = (900, 900, 20, 40), (300, 420, 20, 40)
+
+    assert monitor.observe(0, [3], _logits([near])) == []
+    assert monitor.observe(1, [3], _logits([near])) == []
+    assert monitor.observe(2, [3], _logits([far])) == [3]
+    # Retour à la position fiable : la plage se ferme
+    assert monitor.observe(3, [3], _logits([near])) == []
+
+    ranges = monitor.get_drift_ranges()
+    assert [(r.start_frame, r.end_frame) for r in ranges] == [(2, 2)]
+    assert ranges[0].to_dict()['reasons'] == ['field_jump']
+    assert ranges[0].anchor_frame == 1
+
+
+class ReanchorPredictor:
+    """Predictor factice : enregistre le prompt de ré-ancrage et re-propage tous les objets"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def add_new_mask(self, inference_state, frame_idx, obj_id, mask):
+        self.prompts.append(('mask', frame_idx, obj_id, mask))
+
+    def add_new_points_or_box(self, inference_state, frame_idx, obj_id, points=None, labels=None, box=None):
+        self.prompts.append(('box', frame_idx, obj_id, box))
+
+    def propagate_in_video(self, inference_state, start_frame_idx, max_frame_num_to_track, reverse=False):
+        for frame_idx in range(start_frame_idx, start_frame_idx + max_frame_num_to_track):
+            # Ordre des objets différent de celui des résultats stockés
+            yield frame_idx, [2, 1], torch.full((2, 1, 4, 4), float(10 * frame_idx)) + torch.tensor([2.0, 1.0])[:, None, None, None]
+
+
+def test_reanchor_keeps_refreshed_rows():
+    """Prompt masque relu dans les résultats retenus ; toutes les lignes re-propagées gardées dans l'ordre stocké"""
+    tracker = SAM2Tracker(SimpleNamespace(VIDEO_NAME_WITH_EVENT="clip", DRIFT_AUTO_REANCHOR=True))
+    tracker.predictor = ReanchorPredictor()
+    tracker.inference_state = {}
+    results = {frame: {'obj_ids': [1, 2], 'mask_logits': -torch.ones(2, 1, 4, 4)} for frame in range(6)}
+    results[1]['mask_logits'][0, 0, :2, :2] = 1.0
+
+    drift = DriftRange(obj_id=1, start_frame=3, end_frame=4, direction='forward',
+                       anchor_frame=1, anchor_bbox=[0, 0, 2, 2])
+    tracker._reanchor_range(drift, results)
+
+    kind, frame, obj_id, mask = tracker.predictor.prompts[0]
+    assert (kind, frame, obj_id) == ('mask', 1, 1)
+    assert mask.shape == (4, 4) and int(mask.sum()) == 4
+    assert drift.reanchored
+
+    for frame in (3, 4):
+        values = results[frame]['mask_logits'][:, 0, 0, 0].tolist()
+        assert values == [10 * frame + 1.0, 10 * frame + 2.0], (frame, values)
+    # Hors plage : inchangé
+    assert (results[2]['mask_logits'] == -1).all() and (results[5]['mask_logits'] == -1).all()
+
+    # Frame fiable non retenue : prompt bbox (x0, y0, x1, y1)
+    del results[1]
+    tracker._reanchor_range(drift, results)
+    kind, frame, obj_id, box = tracker.predictor.prompts[1]
+    assert (kind, frame, obj_id) == ('box', 1, 1)
+    assert box.tolist() == [0, 0, 2, 2]
+
+
+if __name__ == "__main__":
+    print("🧪 TEST SURVEILLANCE DE LA DÉRIVE")
+    print("=" * 50)
+
+    tests = [test_area_change_range, test_low_score_needs_a_mask, test_field_jump_range,
+             test_reanchor_keeps_refreshed_rows]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,211 @@
+"""
+Test du moteur de projection image ↔ terrain
+Compare la projection vectorisée à la rétro-projection point par point d'origine
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.enrichment.field_projector import FieldProjector
+from eva2sport.enrichment.bbox_calculator import BBoxCalculator
+from eva2sport.enrichment.calibration_track import CalibrationTrack
+from eva2sport.enrichment.reenricher import CalibrationReenricher
+from eva2sport.enrichment.trajectory_smoother import TrajectorySmoother
+
+
+# Caméra de tribune synthétique (rotation autour de X, hauteur 15 m)
+ANGLE = np.deg2rad(110)
+CAM_PARAMS = {
+    "cam_params": {
+        "x_focal_length": 1500.0,
+        "y_focal_length": 1490.0,
+        "principal_point": [960.0, 540.0],
+        "rotation_matrix": [
+            [1.0, 0.0, 0.0],
+            [0.0, float(np.cos(ANGLE)), float(-np.sin(ANGLE))],
+            [0.0, float(np.sin(ANGLE)), float(np.cos(ANGLE))]
+        ],
+        "position_meters": [0.0, 60.0, -15.0]
+    }
+}
+
+
+def _reference_image_to_world(point_2d, cam_params):
+    """Rétro-projection point par point (implémentation historique)"""
+    params = cam_params["cam_params"]
+    K = np.array([
+        [params["x_focal_length"], 0, params["principal_point"][0]],
+        [0, params["y_focal_length"], params["principal_point"][1]],
+        [0, 0, 1]
+    ])
+    R = np.array(params["rotation_matrix"])
+    ray = R.T @ (np.linalg.inv(K) @ np.array([point_2d[0], point_2d[1], 1]))
+    camera_pos = np.array(params["position_meters"])
+    return (camera_pos + (-camera_pos[2] / ray[2]) * ray)[:2]
+
+
+def test_image_to_field_matches_reference():
+    """La projection en lot donne les mêmes points que la version point par point"""
+    rng = np.random.default_rng(0)
+    points = rng.uniform([0, 300], [1920, 1080], size=(500, 2))
+
+    projected = FieldProjector(CAM_PARAMS).image_to_field(points)
+    reference = np.array([_reference_image_to_world(p, CAM_PARAMS) for p in points])
+
+    assert projected.shape == (500, 2)
+    assert np.allclose(projected, reference, atol=1e-6)
+
+
+def test_round_trip():
+    """terrain → image → terrain retrouve les points d'origine"""
+    projector = FieldProjector(CAM_PARAMS)
+    field_points = np.array([[0.0, 0.0], [10.0, -5.0], [-30.0, 20.0]])
+
+    image_points = projector.field_to_image(field_points)
+    assert np.allclose(projector.image_to_field(image_points), field_points, atol=1e-6)
+
+
+def test_distortion_round_trip():
+    """Avec distorsion, image → terrain inverse exactement terrain → image"""
+    cam_params = {"cam_params": dict(
+        CAM_PARAMS["cam_params"],
+        radial_distortion=[-0.25, 0.08, -0.01, 0.02, 0.0, 0.001],
+        tangential_distortion=[0.001, -0.0008],
+        thin_prism_distortion=[0.0005, 0.0, -0.0004, 0.0]
+    )}
+    projector = FieldProjector(cam_params)
+    assert projector.has_distortion
+
+    field_points = np.array([[0.0, 0.0], [40.0, 25.0], [-45.0, 30.0]])
+    image_points = projector.field_to_image(field_points)
+
+    # La distorsion déplace bien les points par rapport au modèle linéaire
+    linear = FieldProjector(CAM_PARAMS).field_to_image(field_points)
+    assert np.abs(image_points - linear).max() > 1.0
+    assert np.allclose(projector.image_to_field(image_points), field_points, atol=1e-4)
+
+
+def test_calibration_track():
+    """La piste de calibration retrouve ses keyframes et interpole entre elles"""
+    zoomed = {"cam_params": dict(CAM_PARAMS["cam_params"], x_focal_length=2000.0, y_focal_length=1990.0)}
+    track = CalibrationTrack([
+        {"frame": 0, "camera_parameters": CAM_PARAMS},
+        {"frame": 100, "camera_parameters": zoomed}
+    ])
+
+    points = np.array([[800.0, 700.0], [1200.0, 900.0]])
+    assert np.allclose(track.image_to_field([0, 0], points),
+                       FieldProjector(CAM_PARAMS).image_to_field(points), atol=1e-6)
+    assert np.allclose(track.image_to_field([150, 150], points),
+                       FieldProjector(zoomed).image_to_field(points), atol=1e-6)
+
+    # Focale interpolée linéairement, lot (frame, points) cohérent avec la projection par frame
+    assert np.isclose(track.interpolate([50])['linear'][0, 0], 1750.0)
+    mixed = track.image_to_field([25, 75], points)
+    assert np.allclose(mixed[1], track.projector_for_frame(75).image_to_field(points[1:])[0], atol=1e-6)
+
+
+def test_bbox_batch_points():
+    """Le calcul en lot des points conserve les bbox absentes et le format de sortie"""
+    bboxes = [{"x": 100, "y": 500, "width": 40, "height": 90}, None]
+    points = BBoxCalculator().calculate_points_from_bboxes(bboxes, CAM_PARAMS)
+
+    assert points[1] is None
+    assert points[0]["image"]["CENTER_BOTTOM"] == {"x": 120.0, "y": 590.0}
+    expected = _reference_image_to_world([120.0, 590.0], CAM_PARAMS)
+    field = points[0]["field"]["CENTER_BOTTOM"]
+    assert np.allclose([field["x"], field["y"]], expected, atol=1e-6)
+
+
+def test_reenrich_calibration():
+    """Le ré-enrichissement ne recalcule que les positions terrain, pour tous les événements"""
+    bboxes = [{"x": 100, "y": 500, "width": 40, "height": 90}, {"x": 900, "y": 700, "width": 30, "height": 80}]
+    points = BBoxCalculator().calculate_points_from_bboxes(bboxes, CAM_PARAMS)
+    mask = {"format": "rle_coco_base64", "size": [1080, 1920], "counts": "abc"}
+    projects = {
+        f"event_{i}s": {
+            "metadata": {"frame_mapping": [0, None, None, 1]},
+            "calibration": {"camera_parameters": CAM_PARAMS},
+            "annotations": {"0": [{"objectId": "1", "mask": dict(mask), "bbox": {"output": bboxes[i]},
+                                   "points": {"output": points[i]}}]}
+        }
+        for i in range(2)
+    }
+
+    moved = {"cam_params": dict(CAM_PARAMS["cam_params"], position_meters=[2.0, 60.0, -15.0])}
+    stats = CalibrationReenricher({"camera_parameters": moved}).reenrich(projects)
+
+    assert stats == {"event_0s": {"patched": 1, "smoothed": 0, "smoothing_cleared": 0},
+                     "event_1s": {"patched": 1, "smoothed": 0, "smoothing_cleared": 0}}
+    for i, project in enumerate(projects.values()):
+        annotation = project["annotations"]["0"][0]
+        field = annotation["points"]["output"]["field"]["CENTER_BOTTOM"]
+        image = annotation["points"]["output"]["image"]["CENTER_BOTTOM"]
+        expected = FieldProjector(moved).image_to_field([[image["x"], image["y"]]])[0]
+        assert np.allclose([field["x"], field["y"]], expected, atol=1e-9)
+        assert annotation["mask"] == mask
+        assert project["calibration"]["camera_parameters"] == moved
+
+
+
+def _smoothed_project(cam_params, n_frames: int = 12) -> dict:
+    """Projet d'un joueur en mouvement (une frame manquante), lissé avec des réglages non par défaut"""
+    bboxes = [{"x": 100 + 6 * k, "y": 500 + 2 * k, "width": 40, "height": 90} for k in range(n_frames)]
+    points = BBoxCalculator().calculate_points_from_bboxes(bboxes, cam_params)
+    project = {
+        "metadata": {"fps": 25.0, "frame_mapping": [k for k in range(n_frames)]},
+        "objects": {"1": {"type": "player"}},
+        "calibration": {"camera_parameters": cam_params},
+        "annotations": {
+            str(k): [{"objectId": "1", "bbox": {"output": bboxes[k]}, "points": {"output": points[k]}}]
+            for k in range(n_frames) if k != 5
+        }
+    }
+    TrajectorySmoother(25.0, measurement_std=0.3, acceleration_std=2.0, max_gap_seconds=0.5).apply(
+        project, acceleration_std_by_type={"ball": 10.0}
+    )
+    return project
+
+
+def test_reenrich_smoothed_project():
+    """Les positions lissées sont recalculées avec la nouvelle calibration et les réglages du projet"""
+    moved = {"cam_params": dict(CAM_PARAMS["cam_params"], position_meters=[2.0, 60.0, -15.0])}
+    project = _smoothed_project(CAM_PARAMS)
+    stats = CalibrationReenricher({"camera_parameters": moved}).reenrich({"event_0s": project})
+
+    # Référence : projet lissé directement avec la nouvelle calibration
+    expected = _smoothed_project(moved)
+    assert stats["event_0s"] == {"patched": 11, "smoothed": 11, "smoothing_cleared": 0}
+    assert project["metadata"]["smoothing"] == expected["metadata"]["smoothing"]
+    for frame_key, frame_annotations in expected["annotations"].items():
+        smoothed = project["annotations"][frame_key][0]["points"]["output"].get("field_smoothed")
+        reference = frame_annotations[0]["points"]["output"]["field_smoothed"]
+        assert smoothed and smoothed["CENTER_BOTTOM"], f"Position lissée absente frame {frame_key}"
+        assert np.allclose([smoothed["CENTER_BOTTOM"]["x"], smoothed["CENTER_BOTTOM"]["y"]],
+                           [reference["CENTER_BOTTOM"]["x"], reference["CENTER_BOTTOM"]["y"]], atol=1e-9)
+
+
+if __name__ == "__main__":
+    print("🧪 TEST PROJECTION TERRAIN")
+    print("=" * 50)
+
+    tests = [test_image_to_field_matches_reference, test_round_trip,
+             test_distortion_round_trip, test_calibration_track, test_bbox_batch_points,
+             test_reenrich_calibration, test_reenrich_smoothed_project]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
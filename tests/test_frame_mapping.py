@@ -0,0 +1,53 @@
+"""
+Test du frame_mapping compact
+Plages (start, stop, step), recherches directes et lecture de l'ancien format liste
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.utils.frame_mapping import FrameMapping
+
+
+def test_frame_mapping_compact():
+    """Plages (start, stop, step), recherches directes et lecture de l'ancien format liste"""
+    fixed = FrameMapping([[0, 135000, 3]], 135000)
+    assert len(fixed) == 45000
+    assert fixed.processed_index(3000) == 1000 and fixed.processed_index(3001) is None
+    assert fixed.original_frame(44999) == 134997
+    assert fixed.to_json() == {"format": "ranges", "total_frames": 135000, "ranges": [[0, 135000, 3]]}
+
+    # Échantillonnage adaptatif : quelques plages
+    adaptive = FrameMapping.from_frames([10, 13, 16, 17, 18, 19, 40], 50)
+    assert adaptive.ranges == [[10, 17, 3], [17, 20, 1], [40, 41, 1]]
+    assert [adaptive.processed_index(f) for f in (16, 17, 19, 40, 41)] == [2, 3, 5, 6, None]
+    assert adaptive.original_frames() == [10, 13, 16, 17, 18, 19, 40]
+
+    # Ancien format : liste de longueur total_frames
+    legacy = adaptive.to_list()
+    assert len(legacy) == 50 and legacy[18] == 4 and legacy[11] is None
+    assert FrameMapping.from_metadata(legacy).ranges == adaptive.ranges
+    project = {"metadata": {"frame_mapping": adaptive.to_json()}}
+    assert FrameMapping.from_project_data(project).original_frame(6) == 40
+
+
+if __name__ == "__main__":
+    print("🧪 TEST FRAME MAPPING")
+    print("=" * 50)
+
+    tests = [test_frame_mapping_compact]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,234 @@
+"""
+Test de la sélection des frames à l'extraction
+Échantillonnage adaptatif (hors ligne et en flux), changements de plan
+et réutilisation des frames extraites
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.config import Config
+from eva2sport.tracking.adaptive_sampler import AdaptiveFrameSampler
+from eva2sport.tracking.shot_detector import ShotBoundaryDetector
+from eva2sport.tracking.sam2_tracker import SAM2Tracker
+from eva2sport.tracking.video_processor import VideoProcessor
+
+
+HEIGHT, WIDTH = 48, 64
+
+
+def _motion_frames(n_frames: int = 60) -> list:
+    """Frames BGR synthétiques : plan fixe, puis un carré rapide entre les frames 20 et 40"""
+    frames = []
+    for i in range(n_frames):
+        frame = np.full((HEIGHT, WIDTH, 3), 60, dtype=np.uint8)
+        x = 4 + (i - 20) * 2 if 20 <= i < 40 else 4
+        cv2.rectangle(frame, (x, 16), (x + 12, 28), (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def _cut_frames(n_frames: int = 40, cut: int = 25) -> list:
+    """Frames BGR synthétiques : coupe franche (terrain vert → plan serré rouge) à la frame cut"""
+    frames = []
+    for i in range(n_frames):
+        color = (60, 200, 60) if i < cut else (20, 20, 120)
+        frame = np.full((HEIGHT, WIDTH, 3), color, dtype=np.uint8)
+        cv2.circle(frame, (10 + i, 24), 4, (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def _write_video(path: Path, frames: list):
+    """Écrit les frames dans un mp4 (25 fps)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 25, (WIDTH, HEIGHT))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def _check_selection(selected, start_frame, n_frames, required, sampler):
+    """Bornes, frames obligatoires, ordre strict et écart maximal d'une sélection"""
+    assert selected[0] == start_frame and selected[-1] == start_frame + n_frames - 1, selected
+    assert all(start_frame <= f < start_frame + n_frames for f in selected)
+    assert all(b > a for a, b in zip(selected, selected[1:])), "sélection non monotone"
+    assert set(required) <= set(selected), "frame obligatoire manquante"
+    if sampler.max_interval:
+        assert max(b - a for a, b in zip(selected, selected[1:])) <= sampler.max_interval
+
+
+def test_select_frames_bounds_and_required():
+    """select_frames : bornes, frames obligatoires, monotonie, plus dense pendant le mouvement"""
+    frames = _motion_frames()
+    sampler = AdaptiveFrameSampler(min_interval=2, max_interval=8)
+    for frame in frames:
+        sampler.update(frame)
+
+    start_frame, required = 100, [103, 157]
+    selected = sampler.select_frames(15, start_frame, required)
+    _check_selection(selected, start_frame, len(frames), required, sampler)
+
+    # Écart minimal respecté hors frames obligatoires
+    for a, b in zip(selected, selected[1:]):
+        assert b - a >= 2 or a in required or b in required, (a, b)
+
+    moving = sum(120 <= f < 140 for f in selected)
+    still = sum(140 <= f < 160 for f in selected)
+    assert moving > still, (moving, still)
+
+    # Budget suffisant : toutes les frames
+    assert sampler.select_frames(len(frames), start_frame) == list(range(100, 160))
+    assert AdaptiveFrameSampler().select_frames(5) == []
+
+
+def test_stream_selection_matches_rules():
+    """Sélection en flux : mêmes garanties que select_frames, budget approximativement tenu"""
+    frames = _motion_frames()
+    sampler = AdaptiveFrameSampler(min_interval=2, max_interval=8)
+    start_frame, required = 100, [103, 157]
+    sampler.begin_stream(len(frames), 15, start_frame, required)
+    kept = [start_frame + i for i, frame in enumerate(frames) if sampler.select_next(frame)]
+
+    assert kept == sampler.selected
+    assert len(sampler.scores) == len(frames)
+    _check_selection(kept, start_frame, len(frames), required, sampler)
+    assert 10 <= len(kept) <= 22, len(kept)
+
+    moving = sum(120 <= f < 140 for f in kept)
+    still = sum(140 <= f < 160 for f in kept)
+    assert moving > still, (moving, still)
+
+    # Budget suffisant : toutes les frames
+    sampler.begin_stream(10, 10)
+    assert all(sampler.select_next(frame) for frame in frames[:10])
+
+    try:
+        AdaptiveFrameSampler().select_next(frames[0])
+        assert False, "select_next sans begin_stream doit échouer"
+    except ValueError:
+        pass
+
+
+def test_shot_detector_and_split():
+    """Coupe détectée sur la frame qui ouvre le plan, découpe en plans inclusifs"""
+    detector = ShotBoundaryDetector()
+    for i, frame in enumerate(_cut_frames()):
+        detector.update(100 + i, frame)
+    assert detector.cuts == [125], detector.cuts
+
+    assert ShotBoundaryDetector.split_into_shots(100, 139, [125]) == [(100, 124), (125, 139)]
+    # Coupes hors segment, en double ou sur la première frame ignorées
+    assert ShotBoundaryDetector.split_into_shots(100, 139, [90, 100, 130, 130, 140]) == [(100, 129), (130, 139)]
+    assert ShotBoundaryDetector.split_into_shots(100, 139) == [(100, 139)]
+
+
+def test_cuts_to_processed():
+    """Coupe → index de la première frame traitée du nouveau plan"""
+    processed = [0, 3, 6, 9, 12, 15]
+    assert ShotBoundaryDetector.cuts_to_processed([7], processed) == [3]
+    assert ShotBoundaryDetector.cuts_to_processed([6], processed) == [2]
+    # Avant la première frame, après la dernière, doublons fusionnés
+    assert ShotBoundaryDetector.cuts_to_processed([0, 16, 7, 8], processed) == [3]
+
+
+def test_plan_propagation_respects_shots():
+    """Chaque plan est propagé depuis ses propres anchors ; un plan sans anchor n'est pas suivi"""
+    tracker = SAM2Tracker(SimpleNamespace(VIDEO_NAME_WITH_EVENT="clip", DRIFT_AUTO_REANCHOR=False))
+    segments, untracked = tracker.plan_propagation([5, 30], 0, 49, shot_cuts=[20, 40])
+
+    spans = [(s['start'], s['end'], s['anchor'], s['direction']) for s in segments]
+    assert spans == [(0, 5, 5, 'reverse'), (5, 19, 5, 'forward'),
+                     (20, 30, 30, 'reverse'), (30, 39, 30, 'forward')], spans
+    assert untracked == list(range(40, 50))
+    # Aucun segment ne traverse une coupe
+    for segment in segments:
+        assert not any(segment['start'] < cut <= segment['end'] for cut in (20, 40))
+
+    segments, untracked = tracker.plan_propagation([5, 30], 0, 49)
+    assert untracked == [] and segments[-1]['end'] == 49
+
+
+def test_extraction_reused_only_with_matching_settings():
+    """Frames réutilisées si les réglages correspondent, ré-extraites (une passe) sinon"""
+    frames = _motion_frames()
+    with tempfile.TemporaryDirectory() as directory:
+        _write_video(Path(directory) / "data" / "videos" / "clip.mp4", frames)
+
+        config = Config("clip", working_dir=directory, frame_interval=5)
+        processor = VideoProcessor(config)
+        assert processor.extract_all_frames() == 12
+        assert config.processed_frames == list(range(0, 60, 5))
+
+        # Mêmes réglages : réutilisation sans décodage
+        config.processed_frames = None
+        assert processor.extract_all_frames() == 12
+        assert config.processed_frames == list(range(0, 60, 5))
+
+        # Passage en adaptatif : l'ancienne extraction à pas fixe n'est pas reprise
+        config.ADAPTIVE_SAMPLING = True
+        config.ADAPTIVE_MAX_INTERVAL = 8
+        count = processor.extract_all_frames(required_frames=[7])
+        info = json.loads(config.extraction_info_path.read_text())
+        assert info['sampling'] == 'adaptive'
+        assert info['processed_frames'] == config.processed_frames
+        assert len(info['motion_scores']) == len(frames)
+        assert count == len(config.processed_frames) == len(list(config.frames_dir.glob("*.jpg")))
+        assert 7 in config.processed_frames
+
+        # Frame obligatoire absente de la sélection enregistrée : ré-extraction
+        processor.extract_all_frames(required_frames=[7, 33])
+        assert 33 in config.processed_frames
+
+
+def test_segment_reextracted_for_shot_detection():
+    """Activer la détection de plans ré-extrait le segment : coupes et info à jour"""
+    with tempfile.TemporaryDirectory() as directory:
+        _write_video(Path(directory) / "data" / "videos" / "clip.mp4", _cut_frames())
+
+        config = Config("clip", working_dir=directory, frame_interval=2)
+        processor = VideoProcessor(config)
+        assert processor._extract_segment_frames(0, 39, force_extraction=False) == 20
+        assert config.shot_cut_frames == []
+
+        config.SHOT_DETECTION = True
+        assert processor._extract_segment_frames(0, 39, force_extraction=False) == 20
+        assert config.shot_cut_frames == [25], config.shot_cut_frames
+        info = json.loads(config.extraction_info_path.read_text())
+        assert info['shot_detection'] is True and info['shot_cuts'] == [25]
+        assert config.get_processed_shot_cuts() == [13]
+
+        # Relance avec les mêmes réglages : coupes relues depuis l'info
+        config.shot_cut_frames = []
+        assert processor._extract_segment_frames(0, 39, force_extraction=False) == 20
+        assert config.shot_cut_frames == [25]
+
+
+if __name__ == "__main__":
+    print("🧪 TEST SÉLECTION DES FRAMES")
+    print("=" * 50)
+
+    tests = [test_select_frames_bounds_and_required, test_stream_selection_matches_rules,
+             test_shot_detector_and_split, test_cuts_to_processed, test_plan_propagation_respects_shots,
+             test_extraction_reused_only_with_matching_settings, test_segment_reextracted_for_shot_detection]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
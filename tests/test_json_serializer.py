@@ -0,0 +1,70 @@
+"""
+Test du sérialiseur JSON
+Relecture identique et mise en forme avec chaque backend installé
+"""
+
+import sys
+import json
+import math
+from pathlib import Path
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.utils.json_serializer import JSONSerializer
+from project_factory import make_schema_project
+
+
+def test_json_serializer_backends():
+    """Chaque backend installé relit le projet à l'identique ; orjson garde la mise en forme de json"""
+    project = make_schema_project()
+    reference = json.dumps(project, indent=2, ensure_ascii=False).encode('utf-8')
+    # Floats en notation exponentielle : orjson les écrit autrement que json
+    exponents = dict(project, residuals=[1e-05, 1e16, 1.5e-07])
+    exponents_reference = json.dumps(exponents, indent=2, ensure_ascii=False).encode('utf-8')
+    for backend in JSONSerializer.available_backends():
+        serializer = JSONSerializer(backend)
+        assert serializer.loads(serializer.dumps(project, indent=True)) == project, backend
+        assert serializer.loads(serializer.dumps(project)) == project, backend
+        assert serializer.loads(reference) == project, backend
+        if backend in ('orjson', 'json'):
+            assert serializer.dumps(project, indent=True) == reference, backend
+        assert serializer.loads(serializer.dumps(exponents, indent=True)) == exponents, backend
+        assert serializer.loads(exponents_reference) == exponents, backend
+        if backend == 'orjson':
+            written = serializer.dumps(exponents, indent=True)
+            assert written != exponents_reference
+            assert b'0.00001' in written and b'1e16' in written and b'1.5e-7' in written
+            assert b'1e-05' in exponents_reference and b'1e+16' in exponents_reference
+        # NaN écrit par l'ancien json.dump, types hors JSON : repli sur le module json
+        assert math.isnan(serializer.loads(b'{"x": NaN}')['x']), backend
+        assert serializer.loads(serializer.dumps({"path": str(Path("a"))})) == {"path": "a"}
+        try:
+            serializer.dumps({"path": Path("a")})
+            assert False, f"{backend}: Path sérialisé"
+        except TypeError:
+            pass
+    try:
+        JSONSerializer('inconnu')
+        assert False, "backend inconnu accepté"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    print("🧪 TEST SÉRIALISEUR JSON")
+    print("=" * 50)
+
+    tests = [test_json_serializer_backends]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
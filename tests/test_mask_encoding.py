@@ -0,0 +1,232 @@
+"""
+Test de l'encodage des masques
+Encodage RLE en lot et enrichissement parallèle des frames comparés au chemin objet par objet
+"""
+
+import sys
+import copy
+import subprocess
+import base64
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+from pycocotools import mask as mask_utils
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.enrichment.rle_encoder import BatchRLEEncoder
+from eva2sport.enrichment.mask_ops import compute_mask_stats
+from eva2sport.enrichment.parallel_enricher import ParallelFrameEnricher
+from eva2sport.export.mask_store import MaskStore, build_mask_store
+
+
+HEIGHT, WIDTH = 120, 200
+
+
+def _make_logits(n_frames: int, n_objects: int, seed: int = 0) -> list:
+    """Logits (N, 1, H, W) synthétiques : ellipses, dernier objet absent"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(n_frames):
+        masks = np.zeros((n_objects, HEIGHT, WIDTH), dtype=np.uint8)
+        for mask in masks[:-1]:
+            center = (int(rng.integers(10, WIDTH - 10)), int(rng.integers(10, HEIGHT - 10)))
+            cv2.ellipse(mask, center, (4, 9), 0, 0, 360, 1, -1)
+        frames.append((masks.astype(np.float32) * 2 - 1)[:, None])
+    return frames
+
+
+def _decode(encoded: dict) -> np.ndarray:
+    """Décode un masque 'rle_coco_base64'"""
+    rle = {"size": encoded["size"], "counts": base64.b64decode(encoded["counts"])}
+    return mask_utils.decode(rle)
+
+
+def test_batch_rle_matches_per_object():
+    """Le RLE en lot est identique à l'encodage objet par objet"""
+    masks = _make_logits(1, 6)[0][:, 0] > 0
+    encoded = BatchRLEEncoder().encode(masks)
+
+    for mask, rle in zip(masks, encoded):
+        reference = mask_utils.encode(np.asfortranarray(mask.astype(np.uint8)))
+        assert rle["counts"] == reference["counts"]
+
+
+def _edge_case_masks() -> np.ndarray:
+    """Masques (N, H, W) limites : vide, plein, bords, pixel isolé, plusieurs morceaux, bruit"""
+    rng = np.random.default_rng(3)
+    masks = np.zeros((7, HEIGHT, WIDTH), dtype=np.uint8)
+    masks[1] = 1
+    masks[2, :, 0] = 1
+    masks[2, HEIGHT - 1, :] = 1
+    masks[3, 57, 133] = 1
+    masks[4, 5:20, 3:9] = 1
+    masks[4, 90:118, 150:199] = 1
+    masks[5] = rng.random((HEIGHT, WIDTH)) > 0.5
+    masks[6, 0, WIDTH - 1] = 1
+    return masks
+
+
+def test_batch_rle_edge_cases():
+    """RLE en lot identique à pycocotools sur les masques limites, base64 décodable"""
+    masks = _edge_case_masks()
+    encoder = BatchRLEEncoder()
+    encoded = encoder.encode(masks)
+    assert len(encoded) == len(masks)
+    for mask, rle in zip(masks, encoded):
+        reference = mask_utils.encode(np.asfortranarray(mask))
+        assert rle["counts"] == reference["counts"]
+        assert list(rle["size"]) == [HEIGHT, WIDTH]
+
+    # Masques booléens torch (sortie du seuillage des logits)
+    for mask, rle in zip(masks, encoder.encode_base64(torch.from_numpy(masks.astype(bool)))):
+        assert rle["format"] == "rle_coco_base64"
+        assert np.array_equal(_decode(rle), mask)
+
+    assert encoder.encode(np.zeros((0, HEIGHT, WIDTH), dtype=np.uint8)) == []
+
+
+def test_mask_stats_match_pycocotools():
+    """Aire et bbox de compute_mask_stats identiques à pycocotools area/toBbox, centroïde exact"""
+    masks = _edge_case_masks()
+    stats = compute_mask_stats(torch.from_numpy(masks.astype(np.float32) * 2 - 1)[:, None])
+
+    rles = mask_utils.encode(np.asfortranarray(masks.transpose(1, 2, 0)))
+    assert np.array_equal(stats['area'], mask_utils.area(rles).astype(np.int64))
+    assert np.array_equal(stats['present'], masks.reshape(len(masks), -1).any(axis=1))
+
+    reference_bbox = mask_utils.toBbox(rles)
+    for i, mask in enumerate(masks):
+        if not stats['present'][i]:
+            assert stats['area'][i] == 0
+            continue
+        assert np.array_equal(stats['bbox'][i], reference_bbox[i].astype(np.int64)), (i, stats['bbox'][i], reference_bbox[i])
+        ys, xs = np.nonzero(mask)
+        assert np.allclose(stats['centroid'][i], [xs.mean(), ys.mean()], atol=1e-3)
+
+    # Seuil appliqué aux logits, formes (N, H, W) et lot vide
+    logits = torch.from_numpy(masks.astype(np.float32)) * 0.4
+    assert not compute_mask_stats(logits, threshold=0.5)['present'].any()
+    assert compute_mask_stats(logits)['area'].tolist() == stats['area'].tolist()
+    assert compute_mask_stats(torch.zeros(0, 1, HEIGHT, WIDTH))['bbox'].shape == (0, 4)
+
+
+def test_parallel_enrichment_ordered():
+    """Les workers rendent les mêmes stats et masques que le chemin séquentiel, dans l'ordre des frames"""
+    frames = _make_logits(6, 5)
+    sequential = ParallelFrameEnricher(workers=1).run(frames)
+    with ParallelFrameEnricher(workers=2, slots_per_worker=1) as enricher:
+        parallel = enricher.run(frames)
+        # Pool persistant : réutilisé d'un appel à l'autre (ex. blocs du flux binaire)
+        pool = enricher._pool
+        again = enricher.run(frames[:3])
+        assert enricher._pool is pool
+    assert enricher._pool is None and enricher._memory is None
+
+    assert len(parallel) == len(frames)
+    for logits, seq, par in zip(frames, sequential, parallel):
+        assert np.array_equal(seq['bbox'], par['bbox'])
+        assert seq['masks'] == par['masks']
+        assert not par['present'][-1]
+
+        # Bbox et aire cohérentes avec pycocotools
+        mask = logits[0, 0] > 0
+        assert np.array_equal(_decode(par['masks'][0]), mask)
+        assert par['area'][0] == mask.sum()
+        rle = mask_utils.encode(np.asfortranarray(mask.astype(np.uint8)))
+        assert np.array_equal(mask_utils.toBbox(rle), par['bbox'][0])
+    for seq, par in zip(sequential, again):
+        assert seq['masks'] == par['masks']
+
+
+def test_worker_import_is_light():
+    """Le module des workers s'importe sans torch ni la pipeline (démarrage 'spawn' rapide)"""
+    code = ("import sys; import eva2sport.enrichment.parallel_enricher; "
+            "print(sorted(m for m in ('torch', 'eva2sport.pipeline', 'eva2sport.config') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]", output
+
+
+def test_mask_store_round_trip():
+    """Store bit-packé : références (chunk, offset), décodage par frame identique aux RLE"""
+    encoder = BatchRLEEncoder()
+    frames = _make_logits(5, 4)
+    project = {"annotations": {
+        str(i): [{"objectId": str(obj), "mask": rle} for obj, rle in enumerate(encoder.encode_base64(logits[:, 0] > 0))]
+        for i, logits in enumerate(frames)
+    }}
+    original = copy.deepcopy(project)
+
+    with tempfile.TemporaryDirectory() as directory:
+        counts = build_mask_store(project, Path(directory) / "masks", chunk_frames=2)
+        assert counts == {'frames': 5, 'masks': 20}
+
+        ref = project['annotations']['4'][1]['mask']
+        assert ref['format'] == 'packbits_ref' and ref['chunk'] == 2
+
+        store = MaskStore(Path(directory) / "masks")
+        for frame_key, logits in enumerate(frames):
+            object_ids, masks = store.decode_frame(frame_key)
+            assert object_ids == ["0", "1", "2", "3"]
+            assert np.array_equal(masks, logits[:, 0] > 0)
+        assert not store.decode_frame(0)[1][3].any()
+        assert np.array_equal(store.decode(ref), _decode(original['annotations']['4'][1]['mask']).astype(bool))
+
+
+def test_mask_store_delta_codec():
+    """Codec delta : clés + XOR, accès direct à n'importe quelle frame identique aux masques"""
+    encoder = BatchRLEEncoder()
+    frames = []
+    for i in range(12):
+        masks = np.zeros((3, HEIGHT, WIDTH), dtype=np.uint8)
+        cv2.ellipse(masks[0], (20 + 3 * i, 40 + i), (5, 12), 0, 0, 360, 1, -1)
+        cv2.ellipse(masks[1], (150 - 4 * i, 60), (6 + i % 3, 10), 0, 0, 360, 1, -1)
+        if i % 5 != 2:  # objet perdu par intermittence
+            cv2.ellipse(masks[2], (100, 100 - i), (3, 3), 0, 0, 360, 1, -1)
+        frames.append(masks.astype(bool))
+    project = {"annotations": {
+        str(i): [{"objectId": str(obj), "mask": rle} for obj, rle in enumerate(encoder.encode_base64(masks))]
+        for i, masks in enumerate(frames)
+    }}
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_mask_store(project, Path(directory) / "masks", chunk_frames=5, codec='delta', keyframe_interval=4)
+        ref = project['annotations']['10'][1]['mask']
+        assert ref['format'] == 'delta_ref' and ref['chunk'] == 2
+
+        store = MaskStore(Path(directory) / "masks")
+        assert store.codec == 'delta'
+        for frame in [7, 0, 11, 2, 3, 4, 5, 1]:
+            assert np.array_equal(store.decode_frame(frame)[1], frames[frame]), frame
+        assert np.array_equal(store.decode(ref), frames[10][1])
+        assert not store.decode(project['annotations']['7'][2]['mask']).any()
+
+        # Translation pure : XOR recalé vide, bien plus court que la clé
+        lengths = store.index['length'][store.index['object'] == 0]
+        assert lengths[1] < lengths[0] // 2
+
+
+if __name__ == "__main__":
+    print("🧪 TEST ENCODAGE DES MASQUES")
+    print("=" * 50)
+
+    tests = [test_batch_rle_matches_per_object, test_batch_rle_edge_cases, test_mask_stats_match_pycocotools,
+             test_parallel_enrichment_ordered, test_worker_import_is_light,
+             test_mask_store_round_trip, test_mask_store_delta_codec]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,93 @@
+"""
+Test de la base SQLite du match
+Remplacement par événement, requêtes par objet et par frame,
+cycle de vie dans le gestionnaire multi-événements et la CLI
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.export.match_store import MatchStore
+from eva2sport.export.multi_event_manager import MultiEventManager
+from eva2sport.cli import build_parser
+from project_factory import make_schema_project
+
+
+def test_match_store():
+    """Base SQLite du match : remplacement par événement, requêtes par objet et par frame"""
+    first, second = make_schema_project(), make_schema_project()
+    second['metadata']['frame_mapping'] = [None] * 100 + [i if i < 6 else None for i in range(12)]
+    event = {"event_id": "event_10s", "timestamp_seconds": 10.0, "frame_range": [0, 12], "status": "completed"}
+    with tempfile.TemporaryDirectory() as directory:
+        with MatchStore(Path(directory) / "match.sqlite") as store:
+            store.write_event(event, first)
+            counts = store.write_event(event, first)  # retraitement : remplace l'événement
+            assert counts == {'objects': 2, 'positions': 10, 'masks': 9}
+            store.write_event({**event, "event_id": "event_40s", "timestamp_seconds": 40.0}, second)
+
+            assert [e['event_id'] for e in store.events()] == ["event_10s", "event_40s"]
+            player = store.object_positions("0", columns=('frame', 'field_x', 'time_seconds'))
+            assert player['event_id'].tolist() == ["event_10s"] * 5 + ["event_40s"] * 5
+            assert player['frame'].tolist() == [0, 2, 4, 8, 10, 100, 101, 102, 104, 105]
+            assert player['time_seconds'][1] == 2 / 25.0
+
+            second_half = store.object_positions(0, start_frame=100)
+            assert second_half['frame'].tolist() == [100, 101, 102, 104, 105]
+            assert np.allclose(second_half['field_x'], [0.0, np.nan, 0.2, 0.4, 0.5], equal_nan=True)
+            assert np.isnan(store.object_positions("1", end_frame=3)['field_x'][1])
+
+            at_frame = store.frame_positions("event_10s", 2)
+            assert sorted(at_frame['object_id'].tolist()) == ["0", "1"]
+            refs = store.mask_refs("event_10s", 4)
+            assert refs[1] == {"objectId": "0", "format": "packbits_ref", "size": [1080, 1920], "chunk": 0,
+                               "offset": 4096, "length": 150, "box": [100, 200, 20, 60]}
+
+            assert store.delete_event("event_40s")
+            assert len(store.object_positions("0")['frame']) == 5
+
+
+def test_manager_match_store_lifecycle():
+    """Base du match ouverte d'office si elle existe (reenrich), connexion fermée en sortie de with"""
+    with tempfile.TemporaryDirectory() as directory:
+        with MultiEventManager("match", working_dir=directory, match_store=None) as manager:
+            assert manager.match_store is None and not manager.match_store_path.exists()
+        with MultiEventManager("match", working_dir=directory, match_store=True) as manager:
+            store = manager.match_store
+        assert manager.match_store is None
+        try:
+            store.events()
+            assert False, "connexion SQLite restée ouverte"
+        except Exception as e:
+            assert "closed" in str(e), e
+
+        with MultiEventManager("match", working_dir=directory, match_store=None) as manager:
+            assert manager.match_store is not None
+
+    parser = build_parser()
+    assert parser.parse_args(["reenrich", "match"]).match_store is None
+    assert parser.parse_args(["reenrich", "match", "--no-match-store"]).match_store is False
+
+
+if __name__ == "__main__":
+    print("🧪 TEST BASE DU MATCH")
+    print("=" * 50)
+
+    tests = [test_match_store, test_manager_match_store_lifecycle]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,191 @@
+"""
+Test du cache des résultats par étape
+Clés chaînées extraction → tracking → enrichissement, entrée d'enrichissement
+en différence sur le tracking et empreintes de fichiers partagées entre événements
+"""
+
+import sys
+import copy
+import json
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Ajouter le module eva2sport au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eva2sport.pipeline import EVA2SportPipeline
+from eva2sport.utils.result_cache import ResultCache
+from test_field_projection import CAM_PARAMS
+
+
+PROJECT_CONFIG = {
+    "calibration": {"camera_parameters": CAM_PARAMS},
+    "objects": [{"obj_id": 1, "obj_type": "player"}],
+    "initial_annotations": [{"frame": 0, "obj_id": 1, "points": [{"x": 10, "y": 10, "label": 1}]}]
+}
+
+
+def _make_pipeline(directory: str, **kwargs) -> EVA2SportPipeline:
+    """Pipeline sur un clip synthétique de 12 frames avec sa configuration projet"""
+    videos_dir = Path(directory) / "data" / "videos"
+    videos_dir.mkdir(parents=True, exist_ok=True)
+    video_path = videos_dir / "clip.mp4"
+    if not video_path.exists():
+        writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*'mp4v'), 25, (64, 48))
+        for i in range(12):
+            writer.write(np.full((48, 64, 3), 20 * i, dtype=np.uint8))
+        writer.release()
+        (videos_dir / "clip_config.json").write_text(json.dumps(PROJECT_CONFIG))
+    return EVA2SportPipeline("clip", working_dir=directory, frame_interval=2, **kwargs)
+
+
+def _tracked_project() -> dict:
+    """Projet issu du tracking : annotations avec masque, sans points"""
+    return {
+        "config": {"display": {}},
+        "annotations": {
+            str(frame): [{"id": f"a{frame}-{obj}", "objectId": str(obj), "mask": {"counts": "xyz"},
+                          "bbox": {"output": {"x": obj, "y": frame, "width": 4, "height": 8}},
+                          "points": {"output": None}}
+                         for obj in (1, 2)]
+            for frame in range(3)
+        }
+    }
+
+
+def test_stage_keys_invalidate_per_stage():
+    """Chaque entrée ne change que la clé de son étape et celles qui en dépendent"""
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = _make_pipeline(directory)
+        pipeline.project_config = copy.deepcopy(PROJECT_CONFIG)
+        pipeline.config.processed_frames = [0, 2, 4]
+        base = dict(pipeline.compute_cache_keys())
+
+        pipeline.project_config["calibration"]["camera_parameters"] = {"cam_params": {"x_focal_length": 1.0}}
+        calibration = dict(pipeline.compute_cache_keys())
+        assert calibration['extraction'] == base['extraction']
+        assert calibration['tracking'] == base['tracking']
+        assert calibration['enrichment'] != base['enrichment']
+
+        pipeline.project_config["objects"].append({"obj_id": 2, "obj_type": "ball"})
+        objects = dict(pipeline.compute_cache_keys())
+        assert objects['extraction'] == base['extraction']
+        assert objects['tracking'] != base['tracking']
+        assert objects['enrichment'] not in (base['enrichment'], calibration['enrichment'])
+
+        pipeline.config.processed_frames = [0, 3, 6]
+        extraction = pipeline.compute_cache_keys()
+        assert all(extraction[stage] != objects[stage] for stage in extraction)
+
+
+def test_put_get_has_invalidate():
+    """Entrée lue seulement avec sa clé ; has() lit l'en-tête ; invalidation par étape"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(Path(directory) / "cache")
+        assert not cache.has('tracking', 'a' * 64)
+
+        cache.put('tracking', 'a' * 64, {"project_data": {"x": 1}, "padding": "p" * 10000})
+        cache.put('enrichment', 'b' * 64, {"annotations": {}})
+        assert cache.has('tracking', 'a' * 64) and not cache.has('tracking', 'c' * 64)
+        assert cache.get('tracking', 'a' * 64)["project_data"] == {"x": 1}
+        assert cache.get('tracking', 'c' * 64) is None
+
+        cache.invalidate('tracking')
+        assert not cache.has('tracking', 'a' * 64)
+        assert cache.has('enrichment', 'b' * 64)
+        cache.invalidate()
+        assert not cache.has('enrichment', 'b' * 64)
+
+        disabled = ResultCache(Path(directory) / "cache", enabled=False)
+        assert disabled.put('tracking', 'a' * 64, {}) is None
+        assert not disabled.has('tracking', 'a' * 64)
+
+
+def test_file_digests_shared_between_events():
+    """Empreinte calculée une fois pour la vidéo, relue par le cache d'un autre événement"""
+    with tempfile.TemporaryDirectory() as directory:
+        video = Path(directory) / "video.mp4"
+        video.write_bytes(b"frames" * 1000)
+        first = ResultCache(Path(directory) / "event_10s" / "cache", digests_dir=directory)
+        digest = first.file_digest(video)
+
+        # Nouveau processus simulé : seule l'empreinte partagée sur disque reste
+        ResultCache._digest_memo.clear()
+        shared = json.loads((Path(directory) / "file_digests.json").read_text())
+        shared[str(video.resolve())]['sha256'] = "relu"
+        (Path(directory) / "file_digests.json").write_text(json.dumps(shared))
+        second = ResultCache(Path(directory) / "event_20s" / "cache", digests_dir=directory)
+        assert second.file_digest(video) == "relu"
+        assert not (Path(directory) / "event_20s" / "cache").exists()
+
+        # Fichier modifié : empreinte recalculée
+        video.write_bytes(b"other" * 1000)
+        assert second.file_digest(video) not in (digest, "relu")
+        assert first.file_digest(Path(directory) / "absent.pt") is None
+
+
+def test_enrichment_diff_round_trip():
+    """Entrée d'enrichissement : champs enrichis par id, réappliqués sur le projet issu du tracking"""
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = _make_pipeline(directory)
+        pipeline.project_data = _tracked_project()
+        for frame_annotations in pipeline.project_data['annotations'].values():
+            for annotation in frame_annotations:
+                annotation['points'] = {"output": {"image": [1.0, 2.0], "field": [3.0, 4.0]}}
+        pipeline.project_data['trajectories'] = {"smoothed": True}
+        enriched = copy.deepcopy(pipeline.project_data)
+        pipeline._store_stage_in_cache('enrichment', 'e' * 64)
+
+        # L'entrée ne contient pas les masques
+        entry = pipeline.result_cache.get('enrichment', 'e' * 64)
+        assert 'xyz' not in json.dumps(entry)
+
+        restored = _make_pipeline(directory)
+        restored.project_data = _tracked_project()
+        assert restored._restore_stage_from_cache('enrichment', 'e' * 64)
+        assert restored.project_data == enriched
+        assert restored.results['cached_stages'] == ['enrichment']
+
+        # Annotations du tracking différentes : entrée rejetée
+        mismatched = _make_pipeline(directory)
+        mismatched.project_data = _tracked_project()
+        mismatched.project_data['annotations']['1'][0]['id'] = "autre"
+        assert not mismatched._restore_stage_from_cache('enrichment', 'e' * 64)
+
+
+def test_prepare_reused_by_next_run():
+    """prepare() extrait une fois ; relancé sans ré-extraction forcée, il reprend ses clés"""
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = _make_pipeline(directory)
+        calls = []
+        extract_frames = pipeline.extract_frames
+        pipeline.extract_frames = lambda force=False: calls.append(force) or extract_frames(force=force)
+
+        keys = pipeline.prepare()
+        assert pipeline.results['extracted_frames'] == 6
+        assert pipeline.prepare() is keys and calls == [False]
+        assert pipeline.prepare(force_extraction=True) == keys and calls == [False, True]
+
+
+if __name__ == "__main__":
+    print("🧪 TEST CACHE DES RÉSULTATS")
+    print("=" * 50)
+
+    tests = [test_stage_keys_invalidate_per_stage, test_put_get_has_invalidate,
+             test_file_digests_shared_between_events, test_enrichment_diff_round_trip,
+             test_prepare_reused_by_next_run]
+    failures = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Résultat global: {len(tests) - failures}/{len(tests)} tests réussis")
+    if failures:
+        sys.exit(1)